@@ -0,0 +1,134 @@
+"""Micro-benchmark for the Slack webhook ack path.
+
+Slack retries any event not acknowledged within 3 seconds, so everything
+between receiving POST /slack/events and returning 200 must stay cheap.
+Measures each stage in isolation (signature check, JSON decode, dedup claim,
+filter + enqueue) and the full request through the ASGI app. The async
+stages run one at a time on an event loop, so their timings include a
+run_until_complete() round.
+
+Every iteration enqueues a job and no worker drains them, so the queue depth
+limit is raised out of reach: the benchmark times admitted messages, not shed
+ones.
+
+Usage:
+    uv run python benchmarks/ack_path.py [--iterations N]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+
+SIGNING_SECRET = "bench_signing_secret"
+ALLOWED_USER = "U_BENCH"
+
+# Configure settings before importing the app
+os.environ.update(
+    {
+        "SLACK_SIGNING_SECRET": SIGNING_SECRET,
+        "ALLOWED_USER_ID": ALLOWED_USER,
+        "DATA_DIR": tempfile.mkdtemp(prefix="kh-bench-"),
+        "QUEUE_WORKERS": "0",
+        "MAX_QUEUE_DEPTH": str(2**31),
+    }
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from knowledge_hub.app import app  # noqa: E402
+from knowledge_hub.slack.dedup import event_keys, get_event_deduplicator  # noqa: E402
+from knowledge_hub.slack.handlers import handle_slack_event  # noqa: E402
+from knowledge_hub.slack.verification import get_verifier, loads_json  # noqa: E402
+
+
+def _payload(n: int) -> dict:
+    return {
+        "type": "event_callback",
+        "event_id": f"EvBench{n}",
+        "event": {
+            "type": "message",
+            "user": ALLOWED_USER,
+            "channel": "C_BENCH",
+            "ts": f"1700000000.{n:06d}",
+            "text": "Reading list <https://example.com/a> <https://example.com/b|B>",
+        },
+    }
+
+
+def _sign(body: bytes) -> tuple[str, str]:
+    timestamp = str(int(time.time()))
+    basestring = b"v0:" + timestamp.encode() + b":" + body
+    digest = hmac.new(SIGNING_SECRET.encode(), basestring, hashlib.sha256).hexdigest()
+    return timestamp, "v0=" + digest
+
+
+def _measure(name: str, iterations: int, fn: Callable[[int], object]) -> None:
+    samples = []
+    for n in range(iterations):
+        start = time.perf_counter_ns()
+        fn(n)
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(
+        f"{name:<22} mean {statistics.fmean(samples):9.1f} us   "
+        f"p50 {samples[len(samples) // 2]:9.1f} us   p99 {p99:9.1f} us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    iterations = args.iterations
+    logging.disable(logging.WARNING)  # per-request INFO logs would dominate the timings
+
+    bodies = [json.dumps(_payload(n)).encode() for n in range(iterations)]
+    signed = [_sign(body) for body in bodies]
+    verifier = get_verifier(SIGNING_SECRET)
+
+    _measure("verify signature", iterations, lambda n: verifier.is_valid(bodies[n], *signed[n]))
+    _measure("decode json", iterations, lambda n: loads_json(bodies[n]))
+
+    deduplicator = get_event_deduplicator()
+    payloads = [loads_json(body) for body in bodies]
+    with asyncio.Runner() as runner:
+        _measure(
+            "dedup claim",
+            iterations,
+            lambda n: runner.run(deduplicator.aclaim(event_keys(payloads[n]))),
+        )
+        _measure(
+            "filter + enqueue", iterations, lambda n: runner.run(handle_slack_event(payloads[n]))
+        )
+
+    offset = iterations  # fresh event IDs so the full request is not deduplicated
+    full_bodies = [json.dumps(_payload(offset + n)).encode() for n in range(iterations)]
+    with TestClient(app) as client:
+
+        def full_request(n: int) -> None:
+            timestamp, signature = _sign(full_bodies[n])
+            response = client.post(
+                "/slack/events",
+                content=full_bodies[n],
+                headers={
+                    "X-Slack-Request-Timestamp": timestamp,
+                    "X-Slack-Signature": signature,
+                    "Content-Type": "application/json",
+                },
+            )
+            assert response.status_code == 200
+
+        _measure("full ack request", iterations, full_request)
+
+
+if __name__ == "__main__":
+    main()
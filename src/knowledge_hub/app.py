@@ -4,10 +4,30 @@ import logging
 from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI, HTTPException, Request
+from pydantic import BaseModel
 
 from knowledge_hub.config import get_settings
 from knowledge_hub.digest import check_daily_cost, send_weekly_digest
+from knowledge_hub.executors import executor_stats, shutdown_executors
+from knowledge_hub.extraction.cache import extraction_cache_stats
+from knowledge_hub.extraction.parse_pool import get_parse_pool, shutdown_parse_pool
+from knowledge_hub.http_client import close_http_client, get_http_client, http_stats
 from knowledge_hub.logging_config import configure_logging
+from knowledge_hub.pipeline import (
+    WorkerPool,
+    get_admission_controller,
+    get_inflight_registry,
+    get_job_queue,
+    get_stage_limits,
+    lane_weights,
+)
+from knowledge_hub.slack.backfill import BACKFILL_PAGE_JOB, run_backfill_page, start_backfill
+from knowledge_hub.slack.handlers import (
+    PROCESS_FILE_SHARE_JOB,
+    PROCESS_MESSAGE_JOB,
+    run_file_share_job,
+    run_process_message_job,
+)
 from knowledge_hub.slack.router import router as slack_router
 
 logger = logging.getLogger(__name__)
@@ -15,11 +35,39 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan: configure logging and load config on startup."""
+    """Application lifespan: configure logging, load config, and run queue workers.
+
+    On shutdown (SIGTERM from Cloud Run), workers stop leasing and running jobs
+    get settings.shutdown_grace_seconds to finish before they are interrupted
+    and released for another instance to resume.
+    """
     configure_logging()
     settings = get_settings()
     app.state.settings = settings
+    get_http_client()  # open the shared connection pool before the first job
+    await get_parse_pool().start()  # warm the parse workers before the first job
+
+    worker_pool = WorkerPool(
+        get_job_queue(),
+        {
+            PROCESS_MESSAGE_JOB: run_process_message_job,
+            PROCESS_FILE_SHARE_JOB: run_file_share_job,
+            BACKFILL_PAGE_JOB: run_backfill_page,
+        },
+        concurrency=settings.queue_workers,
+        visibility_timeout=settings.queue_visibility_timeout,
+        poll_interval=settings.queue_poll_interval,
+        admission=get_admission_controller(),
+        lane_weights=lane_weights(settings),
+        reserved_interactive=settings.interactive_reserved_workers,
+    )
+    worker_pool.start()
+    app.state.worker_pool = worker_pool
     yield
+    await worker_pool.drain(settings.shutdown_grace_seconds)
+    await close_http_client()
+    shutdown_parse_pool()
+    shutdown_executors()
 
 
 app = FastAPI(
@@ -51,6 +99,29 @@ async def health():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Pipeline pressure for operators and autoscaling: queue depth, in-flight work, memory.
+
+    Also reports outbound HTTP connection reuse, parse worker activity, the
+    queue wait and utilization of the blocking-call executors, and extraction
+    cache hits.
+    """
+    return {
+        "admission": get_admission_controller().snapshot_dict(),
+        "lanes": get_job_queue().depth_by_lane(),
+        "stages": get_stage_limits().snapshot(),
+        "inflight": {
+            "urls": len(get_inflight_registry()),
+            "coalesced_total": get_inflight_registry().coalesced_total,
+        },
+        "http": http_stats(),
+        "parse": get_parse_pool().snapshot(),
+        "executors": executor_stats(),
+        "extraction_cache": extraction_cache_stats(),
+    }
+
+
 @app.post("/digest")
 async def digest_endpoint(_: None = Depends(verify_scheduler)):
     """Trigger weekly digest: query Notion, build summary, send Slack DM."""
@@ -62,6 +133,19 @@ async def digest_endpoint(_: None = Depends(verify_scheduler)):
         return {"status": "error", "error": str(e)}
 
 
+class BackfillRequest(BaseModel):
+    """Body of POST /backfill."""
+
+    channel_id: str
+    restart: bool = False
+
+
+@app.post("/backfill")
+async def backfill_endpoint(body: BackfillRequest, _: None = Depends(verify_scheduler)):
+    """Start or resume a channel history backfill; returns its saved progress."""
+    return start_backfill(body.channel_id, restart=body.restart)
+
+
 @app.post("/cost-check")
 async def cost_check_endpoint(_: None = Depends(verify_scheduler)):
     """Trigger daily cost check: alert if Gemini spend exceeds threshold."""
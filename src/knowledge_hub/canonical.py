@@ -0,0 +1,247 @@
+"""URL canonicalization and resource identity keys for duplicate detection.
+
+The same article reaches the pipeline under many URLs: with click-tracking
+parameters (fbclid, gclid, mc_cid, ...), on a mobile or AMP variant, as
+youtu.be vs youtube.com/watch, or as an arXiv PDF vs its abstract page. Each
+variant that is not recognized as a duplicate costs a full Gemini call.
+
+canonicalize_url() rewrites a URL to one canonical form:
+
+1. Query parameters on the tracking denylist are dropped: TRACKING_PARAMS
+   plus settings.url_tracking_params (comma-separated; a trailing `*` makes
+   an entry a prefix, as in `utm_*`).
+2. Mobile and AMP variants are folded onto the desktop page (`m.`, `mobile.`
+   and `amp.` host labels, `/amp` path segments).
+3. Per-site rules rewrite known sites to a single form (YouTube watch URLs,
+   arXiv abstract pages). More can be added with register_site_rule().
+
+The scheme and trailing slash are left alone so that pages saved before
+canonicalization existed still compare equal.
+
+identity_key() names the resource itself where a site has stable ids
+("youtube:<video id>", "arxiv:<paper id>"), so every URL form of the same
+video or paper matches, whatever was stored. canonical_from_html() reads a
+page's declared canonical URL (<link rel="canonical"> or og:url) from HTML
+that has already been downloaded.
+"""
+
+import re
+from collections.abc import Callable
+from functools import lru_cache
+from urllib.parse import SplitResult, parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from url_normalize import url_normalize
+
+from knowledge_hub.config import get_settings
+
+# Click-tracking and campaign parameters that never change the page served
+TRACKING_PARAMS = frozenset(
+    {
+        "utm_*",
+        "fbclid",
+        "gclid",
+        "gclsrc",
+        "dclid",
+        "gbraid",
+        "wbraid",
+        "msclkid",
+        "yclid",
+        "twclid",
+        "ttclid",
+        "li_fat_id",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "_hsenc",
+        "_hsmi",
+        "hsctatracking",
+        "mkt_tok",
+        "vero_id",
+        "vero_conv",
+        "oly_anon_id",
+        "oly_enc_id",
+        "rb_clickid",
+        "s_cid",
+        "cmpid",
+        "ref",
+        "ref_src",
+        "ref_url",
+        "referrer",
+        "smid",
+        "sr_share",
+        "amp",
+    }
+)
+
+# Host labels of mobile and AMP mirrors (dropped when a real domain remains)
+_MIRROR_LABELS = frozenset({"m", "mobile", "amp"})
+# "/amp/<path>" and "<path>/amp" variants of a page
+_AMP_PREFIX = re.compile(r"^/amp(?=/[^/])", re.IGNORECASE)
+_AMP_SUFFIX = re.compile(r"(?<=[^/])/amp(/?)$", re.IGNORECASE)
+
+SiteRule = Callable[[SplitResult], SplitResult]
+
+_YOUTUBE_HOSTS = frozenset({"youtube.com", "youtu.be", "youtube-nocookie.com"})
+_YOUTUBE_PATH_ID = re.compile(r"^/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})")
+_YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+_ARXIV_HOSTS = frozenset({"arxiv.org", "export.arxiv.org"})
+_ARXIV_PATH = re.compile(
+    r"^/(?:abs|pdf|html)/(\d{4}\.\d{4,5}|[a-z-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?(?:\.pdf)?/?$"
+)
+
+
+def _bare_host(parts: SplitResult) -> str:
+    return (parts.hostname or "").lower().removeprefix("www.")
+
+
+def _youtube_id(parts: SplitResult) -> str | None:
+    host = _bare_host(parts)
+    if host not in _YOUTUBE_HOSTS and not host.endswith(".youtube.com"):
+        return None
+    if host == "youtu.be":
+        video_id = parts.path.strip("/").split("/", 1)[0]
+        return video_id if _YOUTUBE_ID.match(video_id) else None
+    if parts.path == "/watch":
+        video_id = dict(parse_qsl(parts.query)).get("v", "")
+        return video_id if _YOUTUBE_ID.match(video_id) else None
+    match = _YOUTUBE_PATH_ID.match(parts.path)
+    return match.group(1) if match else None
+
+
+def _arxiv_id(parts: SplitResult) -> str | None:
+    if _bare_host(parts) not in _ARXIV_HOSTS:
+        return None
+    match = _ARXIV_PATH.match(parts.path)
+    return match.group(1) if match else None
+
+
+def _youtube_rule(parts: SplitResult) -> SplitResult:
+    """Every YouTube video URL form -> https://www.youtube.com/watch?v=<id>."""
+    video_id = _youtube_id(parts)
+    if video_id is None:
+        return parts
+    return SplitResult("https", "www.youtube.com", "/watch", f"v={video_id}", "")
+
+
+def _arxiv_rule(parts: SplitResult) -> SplitResult:
+    """Abstract, PDF, and HTML pages of any version -> https://arxiv.org/abs/<id>."""
+    paper_id = _arxiv_id(parts)
+    if paper_id is None:
+        return parts
+    return SplitResult("https", "arxiv.org", f"/abs/{paper_id}", "", "")
+
+
+_SITE_RULES: dict[str, SiteRule] = {
+    "youtube.com": _youtube_rule,
+    "youtu.be": _youtube_rule,
+    "youtube-nocookie.com": _youtube_rule,
+    "arxiv.org": _arxiv_rule,
+    "export.arxiv.org": _arxiv_rule,
+}
+
+# Resource identity extractors: (namespace, function returning the id or None)
+_IDENTITIES: list[tuple[str, Callable[[SplitResult], str | None]]] = [
+    ("youtube", _youtube_id),
+    ("arxiv", _arxiv_id),
+]
+
+
+def register_site_rule(host: str, rule: SiteRule) -> None:
+    """Apply `rule` to URLs on `host` (without "www.") during canonicalization."""
+    _SITE_RULES[host.lower().removeprefix("www.")] = rule
+
+
+@lru_cache(maxsize=1)
+def _denylist(extra: str) -> tuple[frozenset[str], tuple[str, ...]]:
+    """(exact names, prefixes) from TRACKING_PARAMS plus the configured extras."""
+    entries = TRACKING_PARAMS | {p.strip().lower() for p in extra.split(",") if p.strip()}
+    exact = frozenset(e for e in entries if not e.endswith("*"))
+    prefixes = tuple(e[:-1] for e in entries if e.endswith("*"))
+    return exact, prefixes
+
+
+def is_tracking_param(name: str) -> bool:
+    """True if query parameter `name` is on the tracking denylist."""
+    exact, prefixes = _denylist(get_settings().url_tracking_params)
+    name = name.lower()
+    return name in exact or name.startswith(prefixes)
+
+
+def _strip_mirrors(parts: SplitResult) -> SplitResult:
+    """Fold mobile/AMP hosts and /amp paths onto the regular page."""
+    host = parts.hostname or ""
+    labels = host.split(".")
+    kept = [
+        label
+        for i, label in enumerate(labels)
+        if label.lower() not in _MIRROR_LABELS or len(labels) - i <= 2
+    ]
+    netloc = parts.netloc
+    if len(kept) != len(labels):
+        netloc = netloc.lower().replace(host, ".".join(kept), 1)
+
+    path = _AMP_SUFFIX.sub(r"\1", _AMP_PREFIX.sub("", parts.path))
+    return parts._replace(netloc=netloc, path=path)
+
+
+def canonicalize_url(raw_url: str) -> str:
+    """Canonical form of `raw_url` for storage and duplicate comparison."""
+    parts = urlsplit(raw_url.strip())
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    parts = parts._replace(
+        query=urlencode([(k, v) for k, v in query if not is_tracking_param(k)]),
+        # Fragments only select a position on the page, except hash-routed apps
+        fragment=parts.fragment if parts.fragment.startswith(("!", "/")) else "",
+    )
+    parts = _strip_mirrors(parts)
+    rule = _SITE_RULES.get(_bare_host(parts))
+    if rule is not None:
+        parts = rule(parts)
+    return url_normalize(urlunsplit(parts))
+
+
+def identity_key(url: str) -> str | None:
+    """Site-independent key of the resource at `url` (e.g. "youtube:<id>"), if known."""
+    parts = _strip_mirrors(urlsplit(url.strip()))
+    for namespace, extract in _IDENTITIES:
+        resource_id = extract(parts)
+        if resource_id is not None:
+            return f"{namespace}:{resource_id}"
+    return None
+
+
+def dedup_key(url: str) -> str:
+    """Key under which two URLs for the same resource compare equal."""
+    return identity_key(url) or canonicalize_url(url)
+
+
+_CANONICAL_LINK = re.compile(
+    r"<link\b(?=[^>]*\brel=[\"']?canonical\b)[^>]*\bhref=[\"']([^\"'>]+)", re.IGNORECASE
+)
+_OG_URL = re.compile(
+    r"<meta\b(?=[^>]*\bproperty=[\"']og:url[\"'])[^>]*\bcontent=[\"']([^\"'>]+)", re.IGNORECASE
+)
+
+
+def canonical_from_html(html: str, page_url: str) -> str | None:
+    """The canonical URL a page declares (rel=canonical, then og:url), if usable.
+
+    Only the document head is searched. Declarations that are not http(s),
+    or that point a deep link at the site's home page (a common CMS
+    misconfiguration), are ignored.
+    """
+    end = html.lower().find("</head>")
+    head = html[:end] if end != -1 else html[:65536]
+    for pattern in (_CANONICAL_LINK, _OG_URL):
+        match = pattern.search(head)
+        if match is None:
+            continue
+        candidate = urljoin(page_url, match.group(1).strip().replace("&amp;", "&"))
+        parts = urlsplit(candidate)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            continue
+        if parts.path in ("", "/") and urlsplit(page_url).path not in ("", "/"):
+            continue
+        return candidate
+    return None
@@ -0,0 +1,122 @@
+"""Command-line entry point (`knowledge-hub`).
+
+Commands:
+    import FILE   Run every URL in a reading-list export through the pipeline.
+                  Progress is journaled in DATA_DIR; rerun the same command to
+                  resume an interrupted import.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.executors import shutdown_executors
+from knowledge_hub.extraction.parse_pool import shutdown_parse_pool
+from knowledge_hub.http_client import close_http_client
+from knowledge_hub.importer import (
+    FORMATS,
+    ImportJournal,
+    ImportStats,
+    ProgressLine,
+    pending_items,
+    read_items,
+    run_import,
+)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="knowledge-hub", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser(
+        "import",
+        help="import URLs from a Pocket, Raindrop, CSV, or plain-text export",
+        description="Import URLs from a Pocket, Raindrop, CSV, or plain-text export.",
+    )
+    importer.add_argument("file", type=Path, help="export file to import")
+    importer.add_argument(
+        "--format",
+        choices=("auto", *FORMATS),
+        default="auto",
+        help="export format (default: from the file extension)",
+    )
+    importer.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="URLs processed at once (default: URL_CONCURRENCY)",
+    )
+    importer.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="retry URLs that failed in an earlier run",
+    )
+    importer.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="list the URLs that would be imported and exit",
+    )
+    importer.add_argument("-v", "--verbose", action="store_true", help="log each URL")
+    return parser
+
+
+def _import(args: argparse.Namespace) -> int:
+    path = args.file.resolve()
+    try:
+        items = read_items(path, args.format)
+    except (OSError, ValueError) as exc:
+        print(f"knowledge-hub import: {exc}", file=sys.stderr)
+        return 2
+
+    source = str(path)
+    journal = ImportJournal()
+    try:
+        if args.dry_run:
+            for item in pending_items(items, journal.outcomes(source), args.retry_failed):
+                print(item.url)
+            return 0
+
+        concurrency = args.concurrency or get_settings().url_concurrency
+
+        async def run() -> ImportStats:
+            try:
+                return await run_import(
+                    items,
+                    source,
+                    journal,
+                    concurrency=concurrency,
+                    retry_failed=args.retry_failed,
+                    progress=ProgressLine(),
+                )
+            finally:
+                await close_http_client()
+                shutdown_parse_pool()
+                shutdown_executors()
+
+        try:
+            stats = asyncio.run(run())
+        except KeyboardInterrupt:
+            print("\nInterrupted; rerun the same command to resume.", file=sys.stderr)
+            return 130
+    finally:
+        journal.close()
+
+    print(
+        f"Imported {stats.saved}, duplicates {stats.duplicates}, failed {stats.failed}, "
+        f"skipped {stats.skipped} (done earlier); Gemini cost ${stats.cost_usd:.4f}",
+        file=sys.stderr,
+    )
+    return 1 if stats.failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse arguments and run the requested command. Returns the exit code."""
+    args = _build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(levelname)s %(name)s: %(message)s",
+    )
+    return _import(args)
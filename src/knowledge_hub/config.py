@@ -29,9 +29,109 @@ class Settings(BaseSettings):
     # YouTube (optional — proxy to bypass cloud IP blocking)
     youtube_proxy_url: str = ""
 
+    # Slack event deduplication (in-memory LRU tier in front of the shared state)
+    dedup_ttl_seconds: float = 86400.0
+    dedup_cache_size: int = 10_000
+
     # Scheduler
     scheduler_secret: str = ""
 
+    # Local storage (SQLite files for the job queue and pipeline state).
+    # Cloud Run's /tmp is in-memory; mount a volume here for cross-restart durability.
+    data_dir: str = "/tmp/knowledge-hub"
+
+    # Shared outbound HTTP client (resolution and extraction): pool sizes, concurrent
+    # requests per host, DNS cache, and HTTP/2 (used if the optional h2 package is installed)
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_max_connections_per_host: int = 6
+    http_dns_cache_ttl_seconds: float = 300.0
+    http2_enabled: bool = True
+
+    # Shortener resolution: extra redirector hosts (comma-separated) and result cache
+    resolver_extra_hosts: str = ""
+    resolver_cache_ttl_seconds: float = 3600.0
+    resolver_cache_size: int = 2048
+
+    # Extra query parameters stripped during URL canonicalization (comma-separated;
+    # a trailing * matches a prefix). Added to canonical.TRACKING_PARAMS.
+    url_tracking_params: str = ""
+
+    # Shared state for costs, dedup keys, and schema caches across workers and
+    # instances ("sqlite", "memory", or "redis" with shared_state_url)
+    shared_state_backend: str = "sqlite"
+    shared_state_url: str = ""
+
+    # Job queue ("sqlite" or "memory")
+    queue_backend: str = "sqlite"
+    queue_workers: int = 2
+    queue_visibility_timeout: float = 600.0
+    queue_max_attempts: int = 3
+    queue_poll_interval: float = 1.0
+
+    # Channel backfill: history page size, and bulk-lane backlog at which paging pauses
+    backfill_page_size: int = 100
+    backfill_max_queued_jobs: int = 50
+    backfill_backoff_seconds: float = 30.0
+
+    # Shutdown: how long running jobs may finish after SIGTERM (Cloud Run allows 10s),
+    # and how long per-URL stage checkpoints are kept for resumption
+    shutdown_grace_seconds: float = 8.0
+    checkpoint_ttl_seconds: float = 86400.0
+
+    # Priority lanes: relative share of workers and Gemini/Notion capacity under
+    # contention, and workers that bulk jobs may never occupy
+    interactive_lane_weight: int = 4
+    bulk_lane_weight: int = 1
+    interactive_reserved_workers: int = 1
+
+    # Admission control (defaults sized for a 512Mi Cloud Run instance)
+    max_queue_depth: int = 200
+    memory_budget_mb: int = 256
+    memory_high_watermark_mb: int = 400
+
+    # Pipeline concurrency: URLs per queued batch, URLs in flight per message,
+    # and global per-stage limits
+    message_batch_size: int = 10
+    url_concurrency: int = 4
+    extract_concurrency: int = 8
+    llm_concurrency: int = 3
+    notion_concurrency: int = 2
+
+    # CPU-bound parsing (trafilatura, pypdf): "process" (warm worker processes,
+    # recycled after N tasks) or "thread"; 0 workers = one per available CPU
+    # (cgroup quota included), fewer when memory_budget_mb cannot hold them
+    parse_executor: str = "process"
+    parse_workers: int = 0
+    parse_max_tasks_per_child: int = 100
+    parse_queue_size: int = 32
+
+    # PDF extraction: pages per parse task (ranges run in parallel across the parse
+    # workers), words after which no more pages are read (0 = every page; the
+    # prompt has room for ~8k tokens), and closing pages also read when a PDF is cut
+    pdf_pages_per_task: int = 8
+    pdf_word_budget: int = 6000
+    pdf_sample_tail_pages: int = 2
+    # Directory downloaded PDFs are spooled to while parsed ("" = the system temp
+    # directory). Cloud Run's /tmp is in-memory, so a spooled PDF still costs RAM
+    # there; point this at a disk-backed mount to keep it out of memory.
+    pdf_spool_dir: str = ""
+
+    # Thread executors for other blocking calls, per workload: threads, and how
+    # many calls may wait for one before new calls are rejected
+    network_executor_threads: int = 4
+    network_executor_queue: int = 64
+    transcript_executor_threads: int = 2
+    transcript_executor_queue: int = 16
+
+    # Extraction result cache (SQLite under data_dir, compressed, LRU-evicted):
+    # total size in MB (0 disables) and freshness per content type (0 = not cached)
+    extraction_cache_max_mb: int = 256
+    extraction_cache_article_ttl_seconds: float = 86400.0
+    extraction_cache_video_ttl_seconds: float = 30 * 86400.0
+    extraction_cache_pdf_ttl_seconds: float = 30 * 86400.0
+
     # App
     environment: str = "development"
     log_level: str = "INFO"
@@ -7,41 +7,44 @@ and logging structured usage data for monitoring and cost alerts.
 
 import logging
 from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from knowledge_hub.shared_state import get_shared_state
 
 logger = logging.getLogger(__name__)
 
-# In-memory cost accumulators (reset on instance restart -- acceptable for personal tool)
-_daily_cost: float = 0.0
-_weekly_cost: float = 0.0
+# Cost accumulators live in shared state so every worker and instance adds to
+# the same totals (see knowledge_hub.shared_state). The daily total is keyed by
+# UTC date, so it starts from zero each day without a reset job.
+_DAILY_COST_KEY = "cost:daily:{date}"
+_DAILY_COST_TTL_SECONDS = 2 * 86400
+_WEEKLY_COST_KEY = "cost:weekly"
+
+
+def _daily_key() -> str:
+    return _DAILY_COST_KEY.format(date=datetime.now(UTC).date().isoformat())
 
 
 def add_cost(amount: float) -> None:
     """Add cost to both daily and weekly accumulators."""
-    global _daily_cost, _weekly_cost
-    _daily_cost += amount
-    _weekly_cost += amount
+    state = get_shared_state()
+    state.incr(_daily_key(), amount, ttl=_DAILY_COST_TTL_SECONDS)
+    state.incr(_WEEKLY_COST_KEY, amount)
 
 
 def get_daily_cost() -> float:
     """Return accumulated daily Gemini cost."""
-    return _daily_cost
+    return float(get_shared_state().get(_daily_key()) or 0.0)
 
 
 def get_weekly_cost() -> float:
     """Return accumulated weekly Gemini cost."""
-    return _weekly_cost
-
-
-def reset_daily_cost() -> None:
-    """Reset daily cost accumulator to zero."""
-    global _daily_cost
-    _daily_cost = 0.0
+    return float(get_shared_state().get(_WEEKLY_COST_KEY) or 0.0)
 
 
 def reset_weekly_cost() -> None:
     """Reset weekly cost accumulator to zero."""
-    global _weekly_cost
-    _weekly_cost = 0.0
+    get_shared_state().delete(_WEEKLY_COST_KEY)
 
 
 # Gemini 3 Flash pricing -- single source of truth
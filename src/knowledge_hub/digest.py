@@ -11,6 +11,7 @@ from datetime import datetime, timedelta, timezone
 from knowledge_hub.config import get_settings
 from knowledge_hub.cost import get_daily_cost, get_weekly_cost, reset_weekly_cost
 from knowledge_hub.notion.client import get_notion_client, get_data_source_id
+from knowledge_hub.shared_state import get_shared_state
 from knowledge_hub.slack.client import get_slack_client
 
 logger = logging.getLogger(__name__)
@@ -171,7 +172,7 @@ async def send_weekly_digest() -> dict:
         return {"status": "error", "error": f"Failed to query Notion: {e}"}
 
     # Get accumulated cost
-    total_cost = get_weekly_cost()
+    total_cost = await get_shared_state().run(get_weekly_cost)
 
     # Build message
     message = build_weekly_digest(entries, total_cost=total_cost)
@@ -188,7 +189,7 @@ async def send_weekly_digest() -> dict:
         return {"status": "error", "error": f"Failed to send Slack message: {e}", "entries": len(entries)}
 
     # Reset weekly accumulator only after successful send
-    reset_weekly_cost()
+    await get_shared_state().run(reset_weekly_cost)
 
     logger.info(
         "Weekly digest sent",
@@ -205,7 +206,7 @@ async def check_daily_cost() -> dict:
         Dict with status and current cost.
     """
     settings = get_settings()
-    cost = get_daily_cost()
+    cost = await get_shared_state().run(get_daily_cost)
 
     if cost > 5.0:
         try:
@@ -0,0 +1,188 @@
+"""Named, bounded executors for blocking calls, with saturation metrics.
+
+asyncio.to_thread() shares one default executor (min(32, CPUs + 4) threads,
+so five on a 1 vCPU instance) between every kind of blocking call. A burst of
+slow ones, such as transcript requests to a throttling YouTube, then delays
+unrelated ones like DNS lookups. Each workload gets its own executor instead:
+
+- "network": blocking network calls (DNS lookups for the shared HTTP client)
+- "transcript": YouTubeTranscriptApi requests
+- CPU parsing has its own pool (extraction.parse_pool), which uses the same
+  BoundedSlots admission and metrics
+
+Every executor has a fixed number of threads and a bounded queue of calls
+waiting for one. A call that arrives with the queue full fails at once with
+ExecutorSaturated instead of piling up behind work that may never finish in
+time. Per executor, /metrics reports calls running and queued, rejections,
+total and maximum queue wait, and utilization (busy thread time over
+available thread time since start), which is what sizing needs.
+"""
+
+import asyncio
+import functools
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from knowledge_hub.config import get_settings
+
+NETWORK = "network"
+TRANSCRIPT = "transcript"
+
+
+class ExecutorSaturated(RuntimeError):
+    """The executor's queue is full; the call was not run."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"{name} executor saturated")
+        self.name = name
+
+
+@dataclass
+class SlotStats:
+    """Counters behind BoundedSlots.snapshot()."""
+
+    submitted: int = 0
+    completed: int = 0
+    rejected: int = 0
+    running: int = 0
+    queued: int = 0
+    queue_wait_seconds: float = 0.0
+    max_queue_wait_seconds: float = 0.0
+    busy_seconds: float = 0.0
+
+
+class BoundedSlots:
+    """`workers` run slots plus a queue of at most `queue_size` waiting calls."""
+
+    def __init__(self, name: str, workers: int, queue_size: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self._semaphore = asyncio.Semaphore(workers)
+        self._created = time.monotonic()
+        self.stats = SlotStats()
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns the start time to pass to release()."""
+        if self.stats.queued >= self.queue_size and self._semaphore.locked():
+            self.stats.rejected += 1
+            raise ExecutorSaturated(self.name)
+        self.stats.submitted += 1
+        self.stats.queued += 1
+        queued_at = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.stats.queued -= 1
+        started = time.monotonic()
+        wait = started - queued_at
+        self.stats.queue_wait_seconds += wait
+        self.stats.max_queue_wait_seconds = max(self.stats.max_queue_wait_seconds, wait)
+        self.stats.running += 1
+        return started
+
+    def release(self, started: float) -> None:
+        """Free a slot taken at `started`."""
+        self.stats.running -= 1
+        self.stats.completed += 1
+        self.stats.busy_seconds += time.monotonic() - started
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        started = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(started)
+
+    def snapshot(self) -> dict:
+        """Sizes, counters, queue wait, and utilization for /metrics."""
+        stats = self.stats
+        elapsed = max(time.monotonic() - self._created, 1e-9)
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": stats.running,
+            "queued": stats.queued,
+            "submitted": stats.submitted,
+            "completed": stats.completed,
+            "rejected": stats.rejected,
+            "queue_wait_seconds": round(stats.queue_wait_seconds, 3),
+            "max_queue_wait_seconds": round(stats.max_queue_wait_seconds, 3),
+            "utilization": round(min(1.0, stats.busy_seconds / (elapsed * self.workers)), 4),
+        }
+
+
+class BoundedExecutor:
+    """A named thread pool behind BoundedSlots."""
+
+    def __init__(self, name: str, threads: int, queue_size: int) -> None:
+        self.name = name
+        self.slots = BoundedSlots(name, threads, queue_size)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"kh-{name}")
+
+    async def run[T](self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn(*args, **kwargs)` on one of this executor's threads.
+
+        Raises ExecutorSaturated if the queue is full. If the caller is
+        cancelled, the slot stays taken until the thread actually finishes,
+        so the metrics and the bound reflect threads really in use.
+        """
+        started = await self.slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self.slots.release(started)
+            raise
+        future.add_done_callback(lambda _: self._finished(loop, started))
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, loop: asyncio.AbstractEventLoop, started: float) -> None:
+        """Done callback (runs on the pool thread): free the slot on the loop."""
+        try:
+            loop.call_soon_threadsafe(self.slots.release, started)
+        except RuntimeError:
+            pass  # loop already closed (shutdown)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executors: dict[str, BoundedExecutor] = {}
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """Return the named executor (NETWORK or TRANSCRIPT), created from settings on first use."""
+    executor = _executors.get(name)
+    if executor is None:
+        settings = get_settings()
+        sizes = {
+            NETWORK: (settings.network_executor_threads, settings.network_executor_queue),
+            TRANSCRIPT: (settings.transcript_executor_threads, settings.transcript_executor_queue),
+        }
+        threads, queue_size = sizes[name]
+        executor = _executors[name] = BoundedExecutor(name, threads, queue_size)
+    return executor
+
+
+def executor_stats() -> dict[str, dict]:
+    """Snapshot of every named executor, for /metrics."""
+    return {name: get_executor(name).slots.snapshot() for name in (NETWORK, TRANSCRIPT)}
+
+
+def shutdown_executors() -> None:
+    """Stop every executor's threads (app shutdown)."""
+    for executor in _executors.values():
+        executor.shutdown()
+    _executors.clear()
+
+
+def reset_executors() -> None:
+    """Drop every executor. Used for testing."""
+    shutdown_executors()
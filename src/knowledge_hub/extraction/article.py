@@ -1,52 +1,115 @@
 """Article content extraction using trafilatura."""
 
-import asyncio
+import logging
 
-from trafilatura import bare_extraction, fetch_url
+import httpx
+from trafilatura import bare_extraction
 
+from knowledge_hub.canonical import canonical_from_html
+from knowledge_hub.executors import ExecutorSaturated
+from knowledge_hub.extraction import download, fetch_cache, revalidation
+from knowledge_hub.extraction.fetch_cache import FetchedResponse
+from knowledge_hub.extraction.parse_pool import WorkerCrashed, run_parser
 from knowledge_hub.extraction.paywall import is_paywalled_domain
+from knowledge_hub.extraction.pdf import MAX_PDF_SIZE_BYTES, extract_pdf_bytes
 from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
 
+logger = logging.getLogger(__name__)
+
+# Larger HTML is almost never an article (feeds, dumps, generated listings)
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+_ACCEPTED = {download.HTML: MAX_PAGE_BYTES, download.PDF: MAX_PDF_SIZE_BYTES}
+
+_DOCUMENT_FIELDS = ("text", "title", "author", "date", "sitename", "hostname", "description")
+
+
+async def fetch_url(url: str) -> FetchedResponse | None:
+    """Download a page (or a PDF behind an article-looking URL) through the shared client.
+
+    The body is streamed with a hard cap per kind and bounded decompression
+    (see extraction.download). Returns None on network errors and non-2xx
+    answers; raises DownloadError for oversized or unsupported bodies, which
+    are refused before they are read in full, and revalidation.NotModified
+    when a revalidated page is unchanged.
+    """
+    try:
+        return await download.fetch_document(url, _ACCEPTED)
+    except httpx.HTTPError as exc:
+        logger.debug("Failed to download %s: %s", url, exc)
+        return None
+
+
+def parse_html(html: str, url: str) -> dict[str, str | None] | None:
+    """Run trafilatura on a page. Executed in a parse worker.
+
+    Returns only the Document fields extract_article uses (empty values as
+    None), or None if trafilatura finds nothing.
+    """
+    doc = bare_extraction(html, url=url)
+    if doc is None:
+        return None
+    return {field: getattr(doc, field, None) or None for field in _DOCUMENT_FIELDS}
+
 
 async def extract_article(url: str) -> ExtractedContent:
     """Extract article content via trafilatura.
 
-    All sync trafilatura calls are wrapped in asyncio.to_thread() to avoid
-    blocking the event loop.
+    The page is downloaded asynchronously through the shared HTTP client, so
+    an extraction timeout cancels it; only trafilatura's parsing runs in a
+    parse worker (extraction.parse_pool). A response that turns out to be a PDF is handed to
+    the PDF extractor instead.
 
     Returns ExtractedContent with appropriate ExtractionStatus:
     - FULL: body text extracted successfully
     - PARTIAL: paywalled domain with short/empty body text
-    - METADATA_ONLY: bare_extraction returned no body text but metadata exists
-    - FAILED: fetch_url returned None (could not download)
+    - METADATA_ONLY: bare_extraction returned no body text but metadata exists,
+      or the page exceeds MAX_PAGE_BYTES
+    - FAILED: the page could not be downloaded or is not HTML, or no parse
+      worker could take it (pool saturated, worker crashed)
+
+    A page already downloaded while resolving the URL is taken from the
+    fetch cache instead of being fetched again. The canonical URL the page
+    declares is read from the same HTML for duplicate detection. When the
+    page is being revalidated and is unchanged, revalidation.NotModified
+    propagates to the caller.
     """
-    # Download page (sync, runs in thread pool)
-    downloaded = await asyncio.to_thread(fetch_url, url)
-    if downloaded is None:
-        return ExtractedContent(
-            url=url,
-            content_type=ContentType.ARTICLE,
-            extraction_status=ExtractionStatus.FAILED,
-            extraction_method="trafilatura",
-        )
-
-    # Extract content (sync, runs in thread pool)
-    doc = await asyncio.to_thread(bare_extraction, downloaded, url=url)
+    page = fetch_cache.take(url)
+    if page is None:
+        try:
+            page = await fetch_url(url)
+        except download.BodyTooLarge as exc:
+            return _unparsed(url, ExtractionStatus.METADATA_ONLY, str(exc))
+        except download.DownloadError as exc:
+            return _unparsed(url, ExtractionStatus.FAILED, str(exc))
+    if page is None:
+        return _unparsed(url, ExtractionStatus.FAILED)
+    revalidation.observe(url, page.headers)
+
+    if download.classify(page.headers.get("content-type", ""), page.content[:8]) == download.PDF:
+        return await extract_pdf_bytes(page.content, url)
+    if len(page.content) > MAX_PAGE_BYTES:
+        # A cached page may have been read under a larger cap than fetch_url's
+        too_large = download.BodyTooLarge(download.HTML, MAX_PAGE_BYTES)
+        return _unparsed(url, ExtractionStatus.METADATA_ONLY, str(too_large))
+    downloaded = page.text
+
+    # Extract content (CPU-bound, runs in a parse worker)
+    try:
+        doc = await run_parser(parse_html, downloaded, url)
+    except (ExecutorSaturated, WorkerCrashed) as exc:
+        logger.warning("Could not parse %s: %s", url, exc)
+        return _unparsed(url, ExtractionStatus.FAILED, str(exc))
     if doc is None:
-        return ExtractedContent(
-            url=url,
-            content_type=ContentType.ARTICLE,
-            extraction_status=ExtractionStatus.METADATA_ONLY,
-            extraction_method="trafilatura",
-        )
+        return _unparsed(url, ExtractionStatus.METADATA_ONLY)
 
     # Map trafilatura Document fields to ExtractedContent
-    text = doc.text or None
-    title = doc.title or None
-    author = doc.author or None
-    published_date = doc.date or None
-    source_domain = doc.sitename or doc.hostname or None
-    description = doc.description or None
+    text = doc["text"]
+    title = doc["title"]
+    author = doc["author"]
+    published_date = doc["date"]
+    source_domain = doc["sitename"] or doc["hostname"]
+    description = doc["description"]
     word_count = len(text.split()) if text else None
 
     # Determine extraction status
@@ -60,6 +123,7 @@ async def extract_article(url: str) -> ExtractedContent:
 
     return ExtractedContent(
         url=url,
+        canonical_url=canonical_from_html(downloaded, url),
         content_type=ContentType.ARTICLE,
         title=title,
         author=author,
@@ -71,3 +135,15 @@ async def extract_article(url: str) -> ExtractedContent:
         extraction_method="trafilatura",
         extraction_status=extraction_status,
     )
+
+
+def _unparsed(
+    url: str, status: ExtractionStatus, description: str | None = None
+) -> ExtractedContent:
+    return ExtractedContent(
+        url=url,
+        content_type=ContentType.ARTICLE,
+        extraction_status=status,
+        extraction_method="trafilatura",
+        description=description,
+    )
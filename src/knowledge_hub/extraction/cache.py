@@ -0,0 +1,325 @@
+"""Persistent cache of extraction results, keyed by resource identity.
+
+A URL that is re-posted, reprocessed, or imported again would otherwise pay
+the full extraction again: the download, trafilatura or pypdf, or a
+transcript request. extract_with_timeout() looks here first and stores every
+usable result (FULL or PARTIAL) it extracts.
+
+- Entries are keyed by canonical.dedup_key(), so every URL form of the same
+  resource (tracking parameters, mobile/AMP variants, youtu.be vs
+  youtube.com/watch, arXiv PDF vs abstract) shares one entry.
+- Each entry expires after the TTL for its content type: pages change, so
+  articles are kept for a day by default, while transcripts and PDFs are
+  kept for a month. A TTL of 0 disables caching for that type.
+- Bodies are stored compressed: zstd when the optional `zstandard` package
+  is installed, zlib otherwise. The codec is recorded per entry, so a cache
+  written with either is readable after installing or removing zstandard.
+- The total compressed size stays under settings.extraction_cache_max_mb;
+  least recently read entries are evicted first. 0 disables the cache.
+- An entry whose response carried an ETag or Last-Modified is kept past its
+  TTL. Once expired it is revalidated with a conditional request instead of
+  being extracted again, and a 304 makes it fresh for another TTL (see
+  extraction.revalidation). Validators belong to the URL that was fetched,
+  which is stored with the entry: another URL form of the resource (arXiv
+  /abs vs /pdf) is a different document with its own ETag, so it is
+  extracted again in full.
+
+The cache is a SQLite file under settings.data_dir, so it survives restarts
+when that is a mounted volume and is shared by processes that share it.
+Like checkpoints, it is best-effort: a failed read or write is logged and
+extraction proceeds as if it missed.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+
+from pydantic import ValidationError
+
+from knowledge_hub.canonical import dedup_key
+from knowledge_hub.config import Settings, get_settings
+from knowledge_hub.extraction.revalidation import Validators
+from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
+from knowledge_hub.storage import open_sqlite
+
+try:
+    import zstandard
+except ImportError:  # optional, better ratio and speed than zlib when installed
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_CACHE_DB_FILENAME = "extraction_cache.db"
+
+# Results worth reusing; failures and metadata-only results are retried instead
+_CACHEABLE = frozenset({ExtractionStatus.FULL, ExtractionStatus.PARTIAL})
+
+
+def _compress(data: bytes) -> tuple[str, bytes]:
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd entry but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def _load(codec: str, data: bytes) -> ExtractedContent:
+    return ExtractedContent.model_validate_json(_decompress(codec, data))
+
+
+def cache_ttls(settings: Settings) -> dict[ContentType, float]:
+    """Seconds an extraction of each content type stays fresh."""
+    ttls = dict.fromkeys(ContentType, settings.extraction_cache_article_ttl_seconds)
+    ttls[ContentType.VIDEO] = settings.extraction_cache_video_ttl_seconds
+    ttls[ContentType.PDF] = settings.extraction_cache_pdf_ttl_seconds
+    return ttls
+
+
+@dataclass
+class CacheStats:
+    """Counters for /metrics."""
+
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    revalidated: int = 0  # expired entries a 304 confirmed and made fresh again
+    writes: int = 0
+    evictions: int = 0
+    errors: int = 0
+
+
+class ExtractionCache:
+    """SQLite-backed, size-bounded LRU of compressed ExtractedContent."""
+
+    def __init__(
+        self,
+        ttls: Mapping[ContentType, float],
+        max_bytes: int,
+        filename: str = _CACHE_DB_FILENAME,
+    ) -> None:
+        self._ttls = ttls
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(filename)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                content_type TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                url TEXT
+            );
+            CREATE INDEX IF NOT EXISTS extractions_lru ON extractions (accessed_at);
+            """
+        )
+        # Cache files written before revalidation existed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(extractions)")}
+        for column in ("etag", "last_modified", "url"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE extractions ADD COLUMN {column} TEXT")
+        # Expired entries are only worth keeping if they can be revalidated
+        self._conn.execute(
+            "DELETE FROM extractions WHERE expires_at < ? "
+            "AND etag IS NULL AND last_modified IS NULL",
+            (time.time(),),
+        )
+        self.stats = CacheStats()
+
+    def get(self, url: str) -> ExtractedContent | None:
+        """Fresh cached extraction of the resource at `url` (with `url` as its url), or None."""
+        key = dedup_key(url)
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT codec, data, expires_at, etag, last_modified "
+                    "FROM extractions WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and row[2] < now:
+                    self.stats.expired += 1
+                    if row[3] is None and row[4] is None:
+                        self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                    row = None
+                if row is None:
+                    self.stats.misses += 1
+                    return None
+                self._conn.execute(
+                    "UPDATE extractions SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            content = _load(row[0], row[1])
+        except (sqlite3.Error, ValueError, ValidationError, zlib.error):
+            self.stats.errors += 1
+            logger.warning("Ignoring unreadable extraction cache entry for %s", url, exc_info=True)
+            return None
+        self.stats.hits += 1
+        return content.model_copy(update={"url": url})
+
+    def get_stale(self, url: str) -> tuple[ExtractedContent, Validators] | None:
+        """Expired extraction of `url` and the validators to revalidate it with, or None.
+
+        Only an entry fetched from `url` itself qualifies; its validators mean
+        nothing to the server of another URL form.
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT codec, data, etag, last_modified FROM extractions "
+                    "WHERE key = ? AND url = ? AND expires_at < ? "
+                    "AND (etag IS NOT NULL OR last_modified IS NOT NULL)",
+                    (dedup_key(url), url, time.time()),
+                ).fetchone()
+            if row is None:
+                return None
+            content = _load(row[0], row[1])
+        except (sqlite3.Error, ValueError, ValidationError, zlib.error):
+            self.stats.errors += 1
+            logger.warning("Ignoring unreadable extraction cache entry for %s", url, exc_info=True)
+            return None
+        validators = Validators(etag=row[2], last_modified=row[3])
+        return content.model_copy(update={"url": url}), validators
+
+    def refresh(self, url: str, content_type: ContentType) -> None:
+        """Make the entry for `url` fresh for another TTL after a 304."""
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE extractions SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                    (now + self._ttls.get(content_type, 0.0), now, dedup_key(url)),
+                )
+        except sqlite3.Error:
+            self.stats.errors += 1
+            logger.warning("Failed to refresh extraction cache entry for %s", url, exc_info=True)
+            return
+        self.stats.revalidated += 1
+
+    def put(
+        self, url: str, content: ExtractedContent, validators: Validators | None = None
+    ) -> None:
+        """Store a usable extraction of `url`, then evict down to the size budget.
+
+        `validators` are those of the response it was extracted from, i.e.
+        of `url`; without them the entry is dropped when it expires rather
+        than revalidated.
+        """
+        ttl = self._ttls.get(content.content_type, 0.0)
+        if content.extraction_status not in _CACHEABLE or ttl <= 0:
+            return
+        try:
+            codec, data = _compress(content.model_dump_json(exclude={"user_note"}).encode())
+            if len(data) > self._max_bytes:
+                return
+            now = time.time()
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO extractions (key, content_type, codec, data, size, "
+                    "expires_at, accessed_at, etag, last_modified, url) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET content_type = excluded.content_type, "
+                    "codec = excluded.codec, data = excluded.data, size = excluded.size, "
+                    "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at, "
+                    "etag = excluded.etag, last_modified = excluded.last_modified, "
+                    "url = excluded.url",
+                    (
+                        dedup_key(url),
+                        content.content_type.value,
+                        codec,
+                        data,
+                        len(data),
+                        now + ttl,
+                        now,
+                        validators.etag if validators else None,
+                        validators.last_modified if validators else None,
+                        url,
+                    ),
+                )
+                self.stats.writes += 1
+                self._evict()
+        except sqlite3.Error:
+            self.stats.errors += 1
+            logger.warning("Failed to cache extraction of %s", url, exc_info=True)
+
+    def _evict(self) -> None:
+        """Drop least recently read entries until the total fits the budget (lock held)."""
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()
+        if total <= self._max_bytes:
+            return
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM extractions ORDER BY accessed_at"
+        ):
+            victims.append((key,))
+            total -= size
+            if total <= self._max_bytes:
+                break
+        self._conn.executemany("DELETE FROM extractions WHERE key = ?", victims)
+        self.stats.evictions += len(victims)
+
+    def snapshot(self) -> dict:
+        """Hit/miss counters, entries, and stored bytes for /metrics."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions"
+            ).fetchone()
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            **asdict(self.stats),
+            "hit_ratio": round(self.stats.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self._max_bytes,
+            "codec": "zstd" if zstandard is not None else "zlib",
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: ExtractionCache | None = None
+
+
+def get_extraction_cache() -> ExtractionCache | None:
+    """Return the cached extraction cache, or None when it is disabled (max size 0)."""
+    global _cache
+    settings = get_settings()
+    if settings.extraction_cache_max_mb <= 0:
+        return None
+    if _cache is None:
+        _cache = ExtractionCache(
+            cache_ttls(settings), max_bytes=settings.extraction_cache_max_mb * 1024 * 1024
+        )
+    return _cache
+
+
+def extraction_cache_stats() -> dict:
+    """Snapshot of the extraction cache for /metrics."""
+    cache = get_extraction_cache()
+    return cache.snapshot() if cache is not None else {"enabled": False}
+
+
+def reset_extraction_cache() -> None:
+    """Close and reset the cached extraction cache. Used for testing."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = None
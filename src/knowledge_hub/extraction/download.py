@@ -0,0 +1,257 @@
+"""Streamed, size-capped downloads of documents for the extractors.
+
+A body is read from the shared HTTP client chunk by chunk and abandoned as
+soon as it passes the cap for its kind, so an unexpectedly large page costs
+at most the cap in memory and bandwidth, and an extraction timeout can
+cancel the download at any chunk.
+
+Compressed bodies are inflated here rather than by httpx: each raw chunk is
+decompressed with the output bounded by the room left under the cap, so a
+small gzip "bomb" that would expand to gigabytes is rejected after the cap's
+worth of output. Only gzip and deflate are requested for these downloads,
+since brotli and zstd have no bounded incremental decoder.
+
+The kind of a body ("html" or "pdf") comes from its Content-Type, or from
+sniffing the first bytes when the type is missing or generic. Callers pass
+the kinds they accept with a cap for each; anything else (images, video,
+archives, ...) is refused before its body is read.
+
+fetch_document() returns the body in memory. download_to_file() writes it
+chunk by chunk to a file instead, so a large PDF never has to be held in
+memory whole.
+"""
+
+import zlib
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from typing import BinaryIO
+
+import httpx
+
+from knowledge_hub.extraction import revalidation
+from knowledge_hub.extraction.fetch_cache import FetchedResponse
+from knowledge_hub.http_client import get_http_client
+
+HTML = "html"
+PDF = "pdf"
+
+HTML_CONTENT_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+
+# Types servers send when they do not know better; decided by sniffing
+_GENERIC_CONTENT_TYPES = frozenset({"", "application/octet-stream", "binary/octet-stream"})
+_SNIFFED_CONTENT_TYPES = _GENERIC_CONTENT_TYPES | {"text/plain"}
+
+# Only encodings _BoundedDecoder can inflate incrementally
+REQUEST_HEADERS = {"Accept-Encoding": "gzip, deflate"}
+
+_RAW_CHUNK_BYTES = 64 * 1024
+_SNIFF_BYTES = 1024
+
+
+class DownloadError(Exception):
+    """A response was refused instead of read in full."""
+
+
+class UnsupportedContent(DownloadError):
+    """The response is not a kind (or encoding) the caller accepts."""
+
+    def __init__(self, message: str, media: str | None = None) -> None:
+        super().__init__(message)
+        self.media = media  # the refused media type; None for an unknown encoding
+
+
+class BodyTooLarge(DownloadError):
+    """The body (after decompression) exceeds the cap for its kind."""
+
+    def __init__(self, kind: str, limit: int) -> None:
+        super().__init__(f"{kind.upper()} too large: over {limit} bytes")
+        self.kind = kind
+        self.limit = limit
+
+
+def media_type(content_type: str) -> str:
+    """Media type without parameters, lowercased (e.g. "text/html")."""
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def sniff_kind(head: bytes) -> str | None:
+    """Kind of a body from its first bytes: "pdf", "html", or None (binary/unknown)."""
+    if head.startswith(b"%PDF-"):
+        return PDF
+    start = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if start.startswith((b"<!doctype html", b"<html", b"<head", b"<body", b"<!--")):
+        return HTML
+    return None
+
+
+def classify(content_type: str, head: bytes) -> str | None:
+    """Kind of a body from its Content-Type, sniffing `head` when the type is generic.
+
+    A PDF served as text/html (common on misconfigured hosts) is recognised
+    by its signature.
+    """
+    media = media_type(content_type)
+    if media == "application/pdf" or head.startswith(b"%PDF-"):
+        return PDF
+    if media in HTML_CONTENT_TYPES:
+        return HTML
+    if media in _SNIFFED_CONTENT_TYPES:
+        return sniff_kind(head)
+    return None
+
+
+class _BoundedDecoder:
+    """Incremental Content-Encoding decoder that never outputs more than allowed."""
+
+    def __init__(self, encoding: str) -> None:
+        self._encoding = encoding
+        if encoding == "gzip":
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._zlib = zlib.decompressobj()
+        elif encoding in ("", "identity"):
+            self._zlib = None
+        else:
+            raise UnsupportedContent(f"Unsupported content encoding: {encoding}")
+        self._first = True
+
+    def decode(self, data: bytes, room: int) -> bytes | None:
+        """Decoded bytes of `data`, or None if they would exceed `room`."""
+        if self._zlib is None:
+            return data if len(data) <= room else None
+        try:
+            out = self._zlib.decompress(data, room + 1)
+        except zlib.error:
+            if not (self._encoding == "deflate" and self._first):
+                raise httpx.DecodingError("Invalid compressed body") from None
+            # Some servers send raw deflate without the zlib header
+            self._zlib = zlib.decompressobj(-zlib.MAX_WBITS)
+            out = self._zlib.decompress(data, room + 1)
+        self._first = False
+        return out if len(out) <= room else None
+
+
+def _settle(content_type: str, head: bytes, caps: Mapping[str, int]) -> str:
+    """Kind of the body once its first bytes are known; raises if not accepted."""
+    kind = classify(content_type, head)
+    if kind not in caps:
+        raise _unsupported(content_type)
+    return kind
+
+
+def _unsupported(content_type: str) -> UnsupportedContent:
+    media = media_type(content_type)
+    return UnsupportedContent(f"Unsupported content type: {media or 'unknown'}", media)
+
+
+async def _once(content: bytes) -> AsyncIterator[bytes]:
+    yield content
+
+
+async def _body_chunks(response: httpx.Response, caps: Mapping[str, int]) -> AsyncIterator[bytes]:
+    """Decoded chunks of an open streamed response whose kind is in `caps`, within its cap.
+
+    Raises UnsupportedContent for other kinds (and unknown encodings) and
+    BodyTooLarge past the cap, at the latest once the offending chunk is
+    read. Chunks before a kind is refused may already have been yielded.
+    """
+    content_type = response.headers.get("content-type", "")
+    media = media_type(content_type)
+    declared = classify(content_type, b"")
+    # A body labelled HTML may still turn out to be a PDF, so it is sniffed too
+    if declared not in caps and declared != HTML and media not in _SNIFFED_CONTENT_TYPES:
+        raise _unsupported(content_type)
+
+    # Until the first bytes settle the kind, the largest cap applies
+    kind: str | None = None
+    limit = max(caps.values())
+    try:
+        length = int(response.headers.get("content-length", ""))
+    except ValueError:
+        length = None
+    if length is not None and length > limit:
+        raise BodyTooLarge(declared or "response", limit)
+
+    if response.is_stream_consumed:
+        # Buffered and decoded already (transports that read bodies eagerly)
+        decoder, raw_chunks = _BoundedDecoder(""), _once(response.content)
+    else:
+        encoding = response.headers.get("content-encoding", "").strip().lower()
+        decoder, raw_chunks = _BoundedDecoder(encoding), response.aiter_raw(_RAW_CHUNK_BYTES)
+    head = b""
+    size = 0
+    async for raw in raw_chunks:
+        chunk = decoder.decode(raw, limit - size)
+        # The raw count also bounds bodies that decode to little or nothing
+        if chunk is None or response.num_bytes_downloaded > limit:
+            raise BodyTooLarge(kind or declared or "response", limit)
+        size += len(chunk)
+        if kind is None:
+            head = (head + chunk)[:_SNIFF_BYTES]
+            if size >= _SNIFF_BYTES:
+                kind = _settle(content_type, head, caps)
+                limit = caps[kind]
+                if size > limit:
+                    raise BodyTooLarge(kind, limit)
+        yield chunk
+
+    if kind is None:
+        _settle(content_type, head, caps)
+
+
+async def read_body(response: httpx.Response, caps: Mapping[str, int]) -> FetchedResponse:
+    """Read an open streamed response whose kind is in `caps`, within that kind's cap.
+
+    Raises UnsupportedContent for other kinds (and unknown encodings) and
+    BodyTooLarge past the cap. Network and decoding errors propagate as
+    httpx.HTTPError.
+    """
+    chunks = [chunk async for chunk in _body_chunks(response, caps)]
+    return FetchedResponse(
+        url=str(response.url), headers=dict(response.headers), content=b"".join(chunks)
+    )
+
+
+@asynccontextmanager
+async def _open(
+    url: str, extra_headers: Mapping[str, str] | None = None
+) -> AsyncIterator[httpx.Response]:
+    """Stream a GET of `url` through the shared client, conditional if it is being revalidated."""
+    conditional = revalidation.conditional_headers(url)
+    headers = {**REQUEST_HEADERS, **(extra_headers or {}), **conditional}
+    async with get_http_client().stream("GET", url, headers=headers) as response:
+        if conditional and response.status_code == 304:
+            raise revalidation.NotModified(url)
+        response.raise_for_status()
+        yield response
+
+
+async def fetch_document(url: str, caps: Mapping[str, int]) -> FetchedResponse:
+    """Download `url` through the shared client if it is a kind in `caps`.
+
+    The request is conditional when `url` is being revalidated, and a 304
+    raises revalidation.NotModified without reading a body. Raises
+    httpx.HTTPStatusError for other non-2xx answers, plus whatever
+    read_body() raises.
+    """
+    async with _open(url) as response:
+        return await read_body(response, caps)
+
+
+async def download_to_file(
+    url: str,
+    caps: Mapping[str, int],
+    file: BinaryIO,
+    extra_headers: Mapping[str, str] | None = None,
+) -> dict[str, str]:
+    """Stream `url` into `file` if it is a kind in `caps`; returns the response headers.
+
+    Like fetch_document(), but the body is written to `file` as it arrives
+    and never held in memory whole. On an error, `file` may hold part of the
+    body. `extra_headers` are added to the request (e.g. an Authorization
+    header for private files).
+    """
+    async with _open(url, extra_headers) as response:
+        async for chunk in _body_chunks(response, caps):
+            file.write(chunk)
+        return dict(response.headers)
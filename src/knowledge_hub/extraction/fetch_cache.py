@@ -0,0 +1,157 @@
+"""Per-message cache of responses downloaded before extraction.
+
+Resolving a shortener link already ends in a GET of the destination page. When
+that happens inside fetch_scope(), the resolver keeps the final response's
+bytes, headers, and URL here, and the extractors (extract_article,
+extract_pdf, the YouTube metadata lookup) parse them instead of downloading
+the page a second time.
+
+The cache lives in a ContextVar set once per message (or per imported URL),
+so tasks spawned for that message share it and nothing outlives it. Entries
+are taken, not read: a body is handed to exactly one extractor and then
+dropped, which keeps memory bounded by the URLs still waiting to be
+extracted. Outside a scope remember() is a no-op and take() returns None, so
+extractors fall back to fetching themselves.
+"""
+
+import codecs
+import re
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+try:
+    import charset_normalizer
+except ImportError:  # optional (normally installed with httpx/requests); guesses cp1252 without it
+    charset_normalizer = None
+
+# Bodies larger than this are not kept (matches the PDF extraction cap)
+MAX_CACHED_BODY_BYTES = 20 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FetchedResponse:
+    """A successful response downloaded ahead of extraction."""
+
+    url: str  # final URL after redirects
+    headers: dict[str, str]
+    content: bytes
+
+    @property
+    def content_type(self) -> str:
+        """Media type without parameters, lowercased (e.g. "text/html")."""
+        return self.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+
+    @property
+    def is_html(self) -> bool:
+        return self.content_type in ("text/html", "application/xhtml+xml")
+
+    @property
+    def text(self) -> str:
+        """Body decoded with the detected charset (see detect_charset)."""
+        return self.content.decode(detect_charset(self.content, self.headers), errors="replace")
+
+
+_META_CHARSET = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9._:-]+)""", re.IGNORECASE
+)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _known(charset: str | None) -> str | None:
+    if not charset:
+        return None
+    try:
+        return codecs.lookup(charset.strip().strip("\"'")).name
+    except LookupError:
+        return None
+
+
+def detect_charset(content: bytes, headers: Mapping[str, str]) -> str:
+    """Charset of a text body.
+
+    In order: the Content-Type charset, a byte-order mark, a <meta charset>
+    or http-equiv declaration in the first 4KB, valid UTF-8, and finally
+    charset_normalizer's guess (windows-1252 on a tie, or when it is not
+    installed). Unknown names are skipped; UTF-8 is the last resort.
+    """
+    for param in headers.get("content-type", "").split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset" and (charset := _known(value)):
+            return charset
+    for bom, charset in _BOMS:
+        if content.startswith(bom):
+            return charset
+    match = _META_CHARSET.search(content[:4096])
+    if match and (charset := _known(match.group(1).decode("ascii"))):
+        return charset
+    try:
+        content.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if charset_normalizer is None:
+        # Browsers' default for unlabeled pages that are not UTF-8
+        return "cp1252"
+    matches = charset_normalizer.from_bytes(content[:65536])
+    best = matches.best()
+    if best is None:
+        return "utf-8"
+    # Short Western text fits several single-byte code pages equally well;
+    # windows-1252 is the browsers' default for unlabeled pages
+    if any(m.encoding == "cp1252" and m.chaos <= best.chaos for m in matches):
+        return "cp1252"
+    return _known(best.encoding) or "utf-8"
+
+
+class FetchCache:
+    """Responses for one message, keyed by final URL."""
+
+    def __init__(self) -> None:
+        self._responses: dict[str, FetchedResponse] = {}
+
+    def put(self, response: FetchedResponse) -> None:
+        self._responses[response.url] = response
+
+    def pop(self, url: str) -> FetchedResponse | None:
+        return self._responses.pop(url, None)
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+
+_current: ContextVar[FetchCache | None] = ContextVar("fetch_cache", default=None)
+
+
+@contextmanager
+def fetch_scope() -> Iterator[FetchCache]:
+    """Give the enclosed code (and tasks it starts) a fresh fetch cache."""
+    cache = FetchCache()
+    token = _current.set(cache)
+    try:
+        yield cache
+    finally:
+        _current.reset(token)
+
+
+def in_scope() -> bool:
+    """True if responses remembered now will reach an extractor."""
+    return _current.get() is not None
+
+
+def remember(response: FetchedResponse) -> None:
+    """Keep `response` for the extractor of its URL (no-op outside fetch_scope)."""
+    cache = _current.get()
+    if cache is not None:
+        cache.put(response)
+
+
+def take(url: str) -> FetchedResponse | None:
+    """Remove and return the response downloaded for `url`, if any."""
+    cache = _current.get()
+    return cache.pop(url) if cache is not None else None
@@ -0,0 +1,375 @@
+"""Process pool for CPU-bound parsing (trafilatura, pypdf, YouTube page scans).
+
+Parsing a large PDF or a heavy page holds the GIL for seconds. Run in a
+thread, it still stalls the event loop, and with it Slack's 3-second webhook
+acks. Parsing therefore runs in worker processes, which also lets concurrent
+ingestion use every core on larger instances.
+
+- Workers are kept warm: they fork from a forkserver that has already
+  imported trafilatura and pypdf, so neither a new worker nor its first task
+  pays the import cost. The lifespan starts all of them at startup.
+- Workers are recycled after settings.parse_max_tasks_per_child tasks, which
+  bounds the memory that parser caches and fragmentation can accumulate.
+- Parse functions are top-level functions of the extractor modules. They take
+  bytes or str and return plain tuples and dicts, so only the document goes
+  in and only the extracted fields come out (never parser objects).
+- Parses can be killed. Each task owns one worker process until it finishes,
+  so when the caller is cancelled (extract_with_timeout's deadline, a job
+  interrupted at shutdown) that process is killed and replaced. A hung
+  parse gives back its CPU, memory, and pool slot at the deadline instead of
+  running on unobserved; /metrics counts these kills. Killed workers are
+  reaped by polling from the event loop, never by a blocking join.
+- Documents (often several MB) are pickled and written to the worker's pipe
+  on a sender thread, so a large send never blocks the event loop; results
+  are read once the pipe is readable.
+
+settings.parse_executor = "thread" runs the same functions on a dedicated
+thread pool instead (tests, or instances where a second process does not fit
+in memory). Threads cannot be killed: a timed-out parse there keeps running
+to completion. settings.parse_workers = 0 sizes the pool to the CPUs this
+process may use (affinity and the cgroup CPU quota, so a 1 vCPU container
+gets one worker), further capped so the workers' memory fits in a share of
+settings.memory_budget_mb. Each worker holds about WORKER_RSS_MB of
+preloaded parsers, which admission control counts against the process RSS
+(see parse_worker_pids).
+
+Either way at most settings.parse_queue_size parses wait for a worker; more
+fail with executors.ExecutorSaturated. Queue wait and utilization are
+reported with the other executors' (see knowledge_hub.executors).
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import signal
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing.connection import Connection
+from typing import Any
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.executors import BoundedExecutor, BoundedSlots
+
+logger = logging.getLogger(__name__)
+
+# Imported once by the forkserver; every worker forks with them loaded
+PRELOADED_MODULES = [
+    "trafilatura",
+    "pypdf",
+    "knowledge_hub.extraction.article",
+    "knowledge_hub.extraction.pdf",
+    "knowledge_hub.extraction.youtube",
+]
+
+# Resident memory of an idle worker with the preloaded modules
+WORKER_RSS_MB = 50
+
+# Default-sized workers may take up to this share of settings.memory_budget_mb
+_WORKER_MEMORY_SHARE = 4
+
+_CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+# How often killed workers are polled until they have exited and can be reaped
+_REAP_INTERVAL_SECONDS = 0.1
+
+
+def _cgroup_cpu_limit() -> int | None:
+    """CPUs allowed by the cgroup v2 CPU quota, rounded up; None if unlimited or unknown."""
+    try:
+        with open(_CGROUP_CPU_MAX) as f:
+            quota, period = f.read().split()[:2]
+        if quota == "max":
+            return None
+        return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on: its affinity, capped by the cgroup CPU quota."""
+    if hasattr(os, "process_cpu_count"):  # Python 3.13+
+        cpus = os.process_cpu_count() or 1
+    elif hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0)) or 1
+    else:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    return min(cpus, limit) if limit is not None else cpus
+
+
+def default_workers(memory_budget_mb: int) -> int:
+    """Pool size for settings.parse_workers = 0: one per CPU, within the memory budget."""
+    fits = memory_budget_mb // (_WORKER_MEMORY_SHARE * WORKER_RSS_MB)
+    return max(1, min(available_cpus(), fits))
+
+
+class WorkerCrashed(Exception):
+    """A parse worker exited (e.g. killed for memory) before returning a result."""
+
+
+@dataclass
+class ParseStats:
+    """Counters for /metrics, on top of the slot counters."""
+
+    failed: int = 0
+    killed: int = 0  # cancelled mid-parse (timeouts); the worker was killed
+    crashed: int = 0
+    workers_started: int = 0
+
+
+def _serve(conn: Connection) -> None:
+    """Worker process loop: run (fn, args) messages until told to stop."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent handles Ctrl-C
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        fn, args = message
+        try:
+            reply = (True, fn(*args))
+        except Exception as exc:
+            reply = (False, exc)
+        try:
+            conn.send(reply)
+        except Exception as exc:  # result or exception not picklable
+            conn.send((False, RuntimeError(f"{type(exc).__name__}: {exc}")))
+
+
+class _Worker:
+    """One worker process and the pipe used to hand it tasks."""
+
+    def __init__(self, context: multiprocessing.context.BaseContext) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.tasks = 0
+        self._sending: Future | None = None
+
+    async def call(self, fn: Callable, args: tuple, sender: ThreadPoolExecutor) -> Any:
+        """Run `fn(*args)` in the worker; the task is pickled and sent on `sender`."""
+        self._sending = sender.submit(self.conn.send, (fn, args))
+        try:
+            await asyncio.wrap_future(self._sending)
+        except OSError as exc:  # died while idle
+            raise WorkerCrashed(f"parse worker exited with {self.process.exitcode}") from exc
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = self.conn.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+        try:
+            ok, value = self.conn.recv()
+        except (EOFError, OSError) as exc:
+            raise WorkerCrashed(f"parse worker exited with {self.process.exitcode}") from exc
+        self.tasks += 1
+        if not ok:
+            raise value
+        return value
+
+    def stop(self) -> None:
+        """Ask an idle worker to exit."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+    def kill(self) -> None:
+        """Kill the worker now, whatever it is doing. It is reaped later (see exited)."""
+        self.process.kill()
+        if self._sending is not None and not self._sending.done():
+            # The sender thread fails on the dead pipe; close it once that write returns
+            self._sending.add_done_callback(lambda _: self.conn.close())
+        else:
+            self.conn.close()
+
+    def exited(self) -> bool:
+        """True once the process has exited and been reaped (polls, never blocks)."""
+        return self.process.exitcode is not None
+
+
+class ParsePool:
+    """Runs parse functions in warm, recycled, killable worker processes (or threads)."""
+
+    def __init__(
+        self, *, mode: str, workers: int, max_tasks_per_child: int, queue_size: int = 32
+    ) -> None:
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Unknown parse executor: {mode!r}")
+        self.mode = mode
+        self.workers = workers or available_cpus()
+        self._max_tasks_per_child = max_tasks_per_child
+        self._threads: BoundedExecutor | None = None
+        if mode == "thread":
+            self._threads = BoundedExecutor("parse", self.workers, queue_size)
+            self.slots = self._threads.slots
+        else:
+            self.slots = BoundedSlots("parse", self.workers, queue_size)
+        self._idle: list[_Worker] = []
+        self._busy: set[_Worker] = set()
+        self._killed: list[_Worker] = []  # until reaped
+        # One in-flight send per busy worker
+        self._sender: ThreadPoolExecutor | None = None
+        self._context: multiprocessing.context.BaseContext | None = None
+        self.stats = ParseStats()
+
+    def _spawn(self) -> _Worker:
+        if self._context is None:
+            methods = multiprocessing.get_all_start_methods()
+            self._context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            if self._context.get_start_method() == "forkserver":
+                self._context.set_forkserver_preload(PRELOADED_MODULES)
+        if self._sender is None:
+            self._sender = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="kh-parse-send"
+            )
+        self.stats.workers_started += 1
+        return _Worker(self._context)
+
+    async def start(self) -> None:
+        """Start every worker now rather than on the first parse."""
+        if self.mode != "process":
+            return
+        while len(self._idle) + len(self._busy) < self.workers:
+            self._idle.append(self._spawn())
+
+    async def run[T](self, fn: Callable[..., T], *args: Any) -> T:
+        """Run `fn(*args)` in a worker and return its result.
+
+        `fn` must be a module-level function and its arguments and result
+        picklable. Exceptions raised by `fn` are re-raised here. If the caller
+        is cancelled while `fn` runs, the worker is killed. WorkerCrashed is
+        raised if the worker dies on its own.
+        """
+        try:
+            if self._threads is not None:
+                return await self._threads.run(fn, *args)
+            async with self.slots.slot():
+                return await self._run_in_worker(fn, args)
+        except BaseException:
+            self.stats.failed += 1
+            raise
+
+    async def _run_in_worker(self, fn: Callable, args: tuple) -> Any:
+        worker = self._idle.pop() if self._idle else self._spawn()
+        self._busy.add(worker)
+        try:
+            result = await worker.call(fn, args, self._sender)
+        except asyncio.CancelledError:
+            self.stats.killed += 1
+            logger.warning("Killing parse worker %s: %s cancelled", worker.process.pid, fn.__name__)
+            self._kill(worker)
+            raise
+        except WorkerCrashed:
+            self.stats.crashed += 1
+            logger.error("Parse worker %s died running %s", worker.process.pid, fn.__name__)
+            self._kill(worker)
+            raise
+        except BaseException:
+            self._release(worker)  # fn raised; the worker itself is fine
+            raise
+        finally:
+            self._busy.discard(worker)
+        self._release(worker)
+        return result
+
+    def _kill(self, worker: _Worker) -> None:
+        worker.kill()
+        self._killed.append(worker)
+        if len(self._killed) == 1:
+            asyncio.get_running_loop().call_later(_REAP_INTERVAL_SECONDS, self._reap)
+
+    def _reap(self) -> None:
+        """Reap killed workers that have exited; poll again while any have not."""
+        self._killed = [worker for worker in self._killed if not worker.exited()]
+        if self._killed:
+            asyncio.get_running_loop().call_later(_REAP_INTERVAL_SECONDS, self._reap)
+
+    def _release(self, worker: _Worker) -> None:
+        if self._max_tasks_per_child and worker.tasks >= self._max_tasks_per_child:
+            worker.stop()
+        else:
+            self._idle.append(worker)
+
+    def worker_pids(self) -> list[int]:
+        """Process IDs of the live workers (none in thread mode)."""
+        return [
+            worker.process.pid
+            for worker in (*self._idle, *self._busy)
+            if worker.process.pid is not None
+        ]
+
+    def shutdown(self) -> None:
+        """Stop idle workers and kill busy ones."""
+        if self._threads is not None:
+            self._threads.shutdown()
+        for worker in self._idle:
+            worker.stop()
+        for worker in self._busy:
+            worker.process.kill()
+        self._idle.clear()
+        if self._sender is not None:
+            self._sender.shutdown(wait=False, cancel_futures=True)
+            self._sender = None
+
+    def snapshot(self) -> dict:
+        """Mode, size, and counters for /metrics."""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_tasks_per_child": self._max_tasks_per_child,
+            **self.slots.snapshot(),
+            **asdict(self.stats),
+        }
+
+
+_pool: ParsePool | None = None
+
+
+def get_parse_pool() -> ParsePool:
+    """Return the process-wide parse pool, created from settings on first call."""
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = ParsePool(
+            mode=settings.parse_executor,
+            workers=settings.parse_workers or default_workers(settings.memory_budget_mb),
+            max_tasks_per_child=settings.parse_max_tasks_per_child,
+            queue_size=settings.parse_queue_size,
+        )
+    return _pool
+
+
+def parse_worker_pids() -> list[int]:
+    """Process IDs of the shared pool's workers, without creating the pool."""
+    return _pool.worker_pids() if _pool is not None else []
+
+
+async def run_parser[T](fn: Callable[..., T], *args: Any) -> T:
+    """Run a parse function on the shared pool."""
+    return await get_parse_pool().run(fn, *args)
+
+
+def shutdown_parse_pool() -> None:
+    """Stop the shared pool's workers (app shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+    _pool = None
+
+
+def reset_parse_pool() -> None:
+    """Drop the shared pool, stopping any workers. Used for testing."""
+    shutdown_parse_pool()
@@ -1,98 +1,103 @@
 """PDF download and text extraction using pypdf."""
 
 import asyncio
-from io import BytesIO
-from urllib.parse import urlparse
+import tempfile
+from collections import deque
+from itertools import islice
+from typing import IO
+from urllib.parse import unquote, urlparse
 
 import httpx
 from pypdf import PdfReader
 
+from knowledge_hub.config import get_settings
+from knowledge_hub.extraction import download, fetch_cache, revalidation
+from knowledge_hub.extraction.parse_pool import get_parse_pool, run_parser
 from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
 
 MAX_PDF_SIZE_BYTES = 20 * 1024 * 1024  # 20MB
 
+_ACCEPTED = {download.PDF: MAX_PDF_SIZE_BYTES}
+
 
 async def extract_pdf(url: str) -> ExtractedContent:
     """Download and extract text content from a PDF URL.
 
-    Checks Content-Length before download (HEAD request) and enforces 20MB cap.
-    Uses pypdf PdfReader with BytesIO for in-memory processing.
-    All sync pypdf calls wrapped in asyncio.to_thread().
+    The PDF is streamed through the shared client into a temporary file,
+    which pypdf then opens by path in a parse worker, so the download is
+    never held in memory whole. A Content-Length over MAX_PDF_SIZE_BYTES is
+    refused before the body is read, and a body that grows past it (whatever
+    the server declared) is abandoned at that chunk. A PDF already downloaded
+    while resolving the URL is taken from the fetch cache instead. A
+    revalidated PDF that is unchanged raises revalidation.NotModified.
 
     Returns ExtractedContent with:
     - FULL: text extracted from PDF pages
     - METADATA_ONLY: no text extracted (scanned/image PDF) or PDF exceeds size cap
-    - FAILED: download failed or PDF parsing error
+    - FAILED: download failed, the response is not a PDF, or PDF parsing error
     """
     source_domain = urlparse(url).hostname
 
-    try:
-        async with httpx.AsyncClient(
-            timeout=httpx.Timeout(25.0), follow_redirects=True
-        ) as client:
-            # Optimization: check Content-Length header first
-            try:
-                head_resp = await client.head(url)
-                content_length_str = head_resp.headers.get("content-length", "0")
-                content_length = int(content_length_str)
-                if content_length > MAX_PDF_SIZE_BYTES:
-                    return ExtractedContent(
-                        url=url,
-                        content_type=ContentType.PDF,
-                        source_domain=source_domain,
-                        extraction_method="pypdf",
-                        extraction_status=ExtractionStatus.METADATA_ONLY,
-                        description=f"PDF too large: {content_length} bytes (limit: {MAX_PDF_SIZE_BYTES})",
-                    )
-            except (httpx.HTTPError, ValueError):
-                pass  # HEAD failed or no Content-Length -- proceed with GET
-
-            response = await client.get(url)
-            response.raise_for_status()
-
-        # Check actual download size
-        if len(response.content) > MAX_PDF_SIZE_BYTES:
-            return ExtractedContent(
-                url=url,
-                content_type=ContentType.PDF,
-                source_domain=source_domain,
-                extraction_method="pypdf",
-                extraction_status=ExtractionStatus.METADATA_ONLY,
-                description=f"PDF too large: {len(response.content)} bytes (limit: {MAX_PDF_SIZE_BYTES})",
-            )
-
-        # pypdf is synchronous -- run in thread
-        reader = await asyncio.to_thread(PdfReader, BytesIO(response.content))
-
-        # Extract text from all pages
-        pages_text = []
-        for page in reader.pages:
-            page_text = await asyncio.to_thread(page.extract_text)
-            if page_text:
-                pages_text.append(page_text)
-        text = "\n".join(pages_text).strip() or None
-
-        # Extract metadata
-        meta = reader.metadata
-        title = meta.title if meta else None
-        author = meta.author if meta else None
-        word_count = len(text.split()) if text else None
-
-        extraction_status = ExtractionStatus.FULL if text else ExtractionStatus.METADATA_ONLY
-
+    def result(status: ExtractionStatus, description: str | None = None) -> ExtractedContent:
         return ExtractedContent(
             url=url,
             content_type=ContentType.PDF,
-            title=title,
-            author=author,
             source_domain=source_domain,
-            text=text,
-            word_count=word_count,
             extraction_method="pypdf",
-            extraction_status=extraction_status,
+            extraction_status=status,
+            description=description,
         )
 
+    cached = fetch_cache.take(url)
+    if cached is not None and cached.content_type == "application/pdf":
+        revalidation.observe(url, cached.headers)
+        return await extract_pdf_bytes(cached.content, url)
+
+    try:
+        with _pdf_spool() as spool:
+            headers = await download.download_to_file(url, _ACCEPTED, spool)
+            revalidation.observe(url, headers)
+            spool.flush()
+            return await parse_pdf(spool.name, url, source_domain)
+    except revalidation.NotModified:
+        raise
+    except download.BodyTooLarge as exc:
+        return result(ExtractionStatus.METADATA_ONLY, str(exc))
+    except download.DownloadError as exc:
+        return result(ExtractionStatus.FAILED, str(exc))
     except httpx.HTTPError:
+        return result(ExtractionStatus.FAILED)
+    except Exception:
+        # Catch pypdf parsing errors and other unexpected errors
+        return result(ExtractionStatus.FAILED)
+
+
+def _pdf_spool() -> IO[bytes]:
+    """A named temporary file to download (or write) a PDF into; removed when closed.
+
+    Named, so that parse_pdf() hands the parse workers a path rather than the
+    PDF's bytes. It is created in settings.pdf_spool_dir (the system temp
+    directory by default). Where that is a tmpfs, as /tmp is on Cloud Run,
+    the file is held in memory after all.
+    """
+    return tempfile.NamedTemporaryFile(
+        prefix="kh-", suffix=".pdf", dir=get_settings().pdf_spool_dir or None
+    )
+
+
+async def extract_pdf_bytes(content: bytes, url: str) -> ExtractedContent:
+    """Extract a PDF that is already downloaded; parsing errors give FAILED.
+
+    The bytes are spooled once, like a download, so that the info call and
+    every page range send the workers a path instead of a copy of the PDF.
+    """
+    source_domain = urlparse(url).hostname
+    try:
+        with _pdf_spool() as spool:
+            spool.write(content)
+            spool.flush()
+            return await parse_pdf(spool.name, url, source_domain)
+    except Exception:
         return ExtractedContent(
             url=url,
             content_type=ContentType.PDF,
@@ -100,12 +105,159 @@ async def extract_pdf(url: str) -> ExtractedContent:
             extraction_method="pypdf",
             extraction_status=ExtractionStatus.FAILED,
         )
-    except Exception:
-        # Catch pypdf parsing errors and other unexpected errors
+
+
+def pdf_info(path: str) -> tuple[int, str | None, str | None]:
+    """Page count, title, and author of the PDF at `path`.
+
+    Executed in a parse worker; only the document structure is read, not
+    the page contents. Parsing errors propagate to the caller.
+    """
+    with open(path, "rb") as stream:
+        reader = PdfReader(stream)
+        meta = reader.metadata
+        return len(reader.pages), meta.title if meta else None, meta.author if meta else None
+
+
+def read_pdf_pages(path: str, start: int, stop: int) -> list[str]:
+    """Text of pages [start, stop) of the PDF at `path` ("" for pages without text).
+
+    Executed in a parse worker. Parsing errors propagate to the caller.
+    """
+    with open(path, "rb") as stream:
+        reader = PdfReader(stream)
+        return [page.extract_text() or "" for page in reader.pages[start:stop]]
+
+
+async def _read_pages(path: str, page_count: int, word_budget: int) -> list[str]:
+    """Texts of the PDF's first pages, in order, until `word_budget` words are read.
+
+    Pages are read settings.pdf_pages_per_task at a time, with one range in
+    flight per parse worker; a range is started only while the pages read so
+    far are under the budget. A budget of 0 reads every page. Ranges still
+    running once the budget is met are cancelled (in process mode their
+    workers are killed), and their errors are ignored: only a range whose
+    pages are used can fail the PDF.
+    """
+    per_task = max(1, get_settings().pdf_pages_per_task)
+    ranges = iter(
+        (start, min(start + per_task, page_count)) for start in range(0, page_count, per_task)
+    )
+    pages: list[str] = []
+    words = 0
+
+    def budget_left() -> bool:
+        return not word_budget or words < word_budget
+
+    pending = deque(
+        asyncio.create_task(run_parser(read_pdf_pages, path, start, stop))
+        for start, stop in islice(ranges, get_parse_pool().workers)
+    )
+    try:
+        while pending and budget_left():
+            for text in await pending.popleft():
+                if not budget_left():
+                    break
+                pages.append(text)
+                words += len(text.split())
+            if budget_left() and (next_range := next(ranges, None)) is not None:
+                task = run_parser(read_pdf_pages, path, *next_range)
+                pending.append(asyncio.create_task(task))
+    finally:
+        # Past the budget (or after a failed range): not needed, whatever their outcome
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return pages
+
+
+async def parse_pdf(path: str, url: str, source_domain: str | None) -> ExtractedContent:
+    """Extract text and metadata from the PDF file at `path`.
+
+    pypdf runs in parse workers (extraction.parse_pool), and only the path
+    crosses to them. Page ranges are extracted in parallel
+    and extraction stops once settings.pdf_word_budget words are read, so a
+    long report costs time in proportion to the budget rather than its
+    length. A PDF cut short is marked truncated; its opening pages (contents,
+    introduction) are always read, and its last
+    settings.pdf_sample_tail_pages pages (conclusion) are read as well.
+    Parsing errors propagate to the caller.
+    """
+    settings = get_settings()
+    page_count, title, author = await run_parser(pdf_info, path)
+    pages = await _read_pages(path, page_count, settings.pdf_word_budget)
+    parts = [page for page in pages if page]
+    truncated = len(pages) < page_count
+    tail_start = max(len(pages), page_count - settings.pdf_sample_tail_pages)
+    if truncated and tail_start < page_count:
+        tail = await run_parser(read_pdf_pages, path, tail_start, page_count)
+        if len(pages) < tail_start:  # the budget stopped before the tail, not inside it
+            parts.append(f"[Pages {len(pages) + 1}-{tail_start} of {page_count} not extracted]")
+        parts.extend(page for page in tail if page)
+    text = "\n".join(parts).strip() or None
+    word_count = len(text.split()) if text else None
+
+    extraction_status = ExtractionStatus.FULL if text else ExtractionStatus.METADATA_ONLY
+
+    return ExtractedContent(
+        url=url,
+        content_type=ContentType.PDF,
+        title=title,
+        author=author,
+        source_domain=source_domain,
+        text=text,
+        word_count=word_count,
+        page_count=page_count,
+        truncated=truncated,
+        extraction_method="pypdf",
+        extraction_status=extraction_status,
+    )
+
+
+async def extract_slack_pdf(url: str) -> ExtractedContent:
+    """Download a PDF uploaded to Slack and extract its text.
+
+    The private file URL is fetched with the bot token (requires the
+    files:read scope) and downloaded like extract_pdf() does, with the same
+    size cap and type sniffing. The file name stands in for a missing PDF
+    title.
+    """
+    source_domain = urlparse(url).hostname
+    headers = {"Authorization": f"Bearer {get_settings().slack_bot_token}"}
+
+    def result(status: ExtractionStatus, description: str | None = None) -> ExtractedContent:
         return ExtractedContent(
             url=url,
             content_type=ContentType.PDF,
             source_domain=source_domain,
             extraction_method="pypdf",
-            extraction_status=ExtractionStatus.FAILED,
+            extraction_status=status,
+            description=description,
         )
+
+    try:
+        with _pdf_spool() as spool:
+            await download.download_to_file(url, _ACCEPTED, spool, headers)
+            spool.flush()
+            content = await parse_pdf(spool.name, url, source_domain)
+    except download.BodyTooLarge as exc:
+        return result(ExtractionStatus.METADATA_ONLY, str(exc))
+    except download.UnsupportedContent as exc:
+        if exc.media in download.HTML_CONTENT_TYPES:
+            # Slack serves its sign-in page instead of the file without files:read
+            return result(
+                ExtractionStatus.FAILED,
+                "Slack returned a sign-in page; the bot needs the files:read scope",
+            )
+        return result(ExtractionStatus.FAILED, str(exc))
+    except download.DownloadError as exc:
+        return result(ExtractionStatus.FAILED, str(exc))
+    except httpx.HTTPError:
+        return result(ExtractionStatus.FAILED)
+    except Exception:
+        # Catch pypdf parsing errors and other unexpected errors
+        return result(ExtractionStatus.FAILED)
+
+    if not content.title:
+        content.title = unquote(urlparse(url).path.rsplit("/", 1)[-1]) or None
+    return content
@@ -0,0 +1,95 @@
+"""Conditional revalidation of cached extractions (ETag / Last-Modified).
+
+When a cached article or PDF extraction expires, extract_with_timeout()
+does not simply extract it again. It opens a revalidation scope with the
+validators stored alongside the entry. The document download
+(download.fetch_document, or extract_pdf's GET) then sends them as
+If-None-Match / If-Modified-Since. A 304 answer raises NotModified
+before any body is read, and extract_with_timeout() reuses the cached
+result, so neither the body transfer nor trafilatura or pypdf runs again.
+Weekly reprocessing and re-imports mostly revisit unchanged pages, which
+makes this the common case.
+
+The extractors report the validators of the responses they parse
+(observe()), so they are stored with the new cache entry. Like the fetch
+cache, the scope lives in a ContextVar. It applies only to the URL being
+extracted, and outside a scope the functions here are no-ops.
+"""
+
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+
+class NotModified(Exception):
+    """The server confirmed the cached copy of the document is still current (304)."""
+
+    def __init__(self, url: str) -> None:
+        super().__init__(f"Not modified: {url}")
+        self.url = url
+
+
+@dataclass(frozen=True)
+class Validators:
+    """A response's cache validators."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @classmethod
+    def from_headers(cls, headers: Mapping[str, str]) -> "Validators | None":
+        """Validators in `headers`, or None if the response has neither."""
+        lowered = {name.lower(): value for name, value in headers.items()}
+        etag = lowered.get("etag") or None
+        last_modified = lowered.get("last-modified") or None
+        if etag is None and last_modified is None:
+            return None
+        return cls(etag=etag, last_modified=last_modified)
+
+    def request_headers(self) -> dict[str, str]:
+        """Conditional request headers that revalidate against these validators."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class RevalidationScope:
+    """Validators sent for, and received from, the document at `url`."""
+
+    url: str
+    sent: Validators | None = None
+    received: Validators | None = None
+
+
+_current: ContextVar[RevalidationScope | None] = ContextVar("revalidation", default=None)
+
+
+@contextmanager
+def revalidation_scope(url: str, validators: Validators | None) -> Iterator[RevalidationScope]:
+    """Revalidate the download of `url` in the enclosed code against `validators`."""
+    scope = RevalidationScope(url=url, sent=validators)
+    token = _current.set(scope)
+    try:
+        yield scope
+    finally:
+        _current.reset(token)
+
+
+def conditional_headers(url: str) -> dict[str, str]:
+    """Headers that make a request for `url` conditional, if it is being revalidated."""
+    scope = _current.get()
+    if scope is None or scope.url != url or scope.sent is None:
+        return {}
+    return scope.sent.request_headers()
+
+
+def observe(url: str, headers: Mapping[str, str]) -> None:
+    """Record the validators of the response parsed for `url`."""
+    scope = _current.get()
+    if scope is not None and scope.url == url:
+        scope.received = Validators.from_headers(headers)
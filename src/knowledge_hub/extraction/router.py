@@ -11,13 +11,20 @@ YOUTUBE_PATTERN = re.compile(
 PDF_PATTERN = re.compile(r"\.pdf(?:\?.*)?$", re.IGNORECASE)
 SUBSTACK_PATTERN = re.compile(r"\.substack\.com/")
 MEDIUM_PATTERN = re.compile(r"(?:^https?://medium\.com/|\.medium\.com/)")
+# Private URLs of files uploaded to Slack; only PDF uploads are ingested
+SLACK_FILE_PATTERN = re.compile(r"^https://files\.slack\.com/")
+
+
+def is_slack_file_url(url: str) -> bool:
+    """True for a Slack-hosted upload, which must be fetched with the bot token."""
+    return bool(SLACK_FILE_PATTERN.search(url))
 
 
 def detect_content_type(url: str) -> ContentType:
     """Detect content type from URL patterns. Unknown URLs default to ARTICLE."""
     if YOUTUBE_PATTERN.search(url):
         return ContentType.VIDEO
-    if PDF_PATTERN.search(url):
+    if PDF_PATTERN.search(url) or is_slack_file_url(url):
         return ContentType.PDF
     if SUBSTACK_PATTERN.search(url):
         return ContentType.NEWSLETTER
@@ -7,8 +7,10 @@ import time
 import httpx
 
 from knowledge_hub.extraction.article import extract_article
-from knowledge_hub.extraction.pdf import extract_pdf
-from knowledge_hub.extraction.router import detect_content_type
+from knowledge_hub.extraction.cache import get_extraction_cache
+from knowledge_hub.extraction.pdf import extract_pdf, extract_slack_pdf
+from knowledge_hub.extraction.revalidation import NotModified, revalidation_scope
+from knowledge_hub.extraction.router import detect_content_type, is_slack_file_url
 from knowledge_hub.extraction.youtube import extract_youtube
 from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
 
@@ -23,13 +25,31 @@ async def extract_with_timeout(
 ) -> ExtractedContent:
     """Extract content from a URL within a wall-clock timeout budget.
 
+    A cached extraction of the same resource is returned without dispatching;
+    usable results are cached for next time (see extraction.cache). An
+    expired entry with stored validators is revalidated: the download is made
+    conditional, and if the server answers 304 the cached result is reused
+    without parsing the document again (see extraction.revalidation).
+
     Wraps the full extraction pipeline in asyncio.timeout(). If the pipeline
     exceeds the budget, returns ExtractedContent with FAILED status instead
     of raising an exception.
     """
+    cache = get_extraction_cache()
+    stale = None
+    if cache is not None:
+        if (cached := cache.get(url)) is not None:
+            logger.info("Extraction cache hit: %s", url)
+            return cached
+        stale = cache.get_stale(url)
     try:
-        async with asyncio.timeout(timeout_seconds):
-            return await _extract_pipeline(url, timeout_seconds)
+        with revalidation_scope(url, stale[1] if stale else None) as scope:
+            async with asyncio.timeout(timeout_seconds):
+                content = await _extract_pipeline(url, timeout_seconds)
+    except NotModified:
+        logger.info("Extraction cache revalidated (304): %s", url)
+        cache.refresh(url, stale[0].content_type)
+        return stale[0]
     except TimeoutError:
         logger.warning("Extraction timed out after %.1fs: %s", timeout_seconds, url)
         return ExtractedContent(
@@ -38,6 +58,9 @@ async def extract_with_timeout(
             extraction_status=ExtractionStatus.FAILED,
             extraction_method="timeout",
         )
+    if cache is not None:
+        cache.put(url, content, scope.received)
+    return content
 
 
 async def _extract_pipeline(url: str, timeout_seconds: float) -> ExtractedContent:
@@ -92,6 +115,8 @@ async def _dispatch(url: str, content_type: ContentType) -> ExtractedContent:
     if content_type == ContentType.VIDEO:
         return await extract_youtube(url)
     if content_type == ContentType.PDF:
+        if is_slack_file_url(url):
+            return await extract_slack_pdf(url)
         return await extract_pdf(url)
     # ARTICLE, NEWSLETTER, and any other type use the article extractor
     return await extract_article(url)
@@ -1,13 +1,8 @@
 """YouTube transcript extraction using youtube-transcript-api."""
 
-import asyncio
 import logging
 import re
 
-import httpx
-
-logger = logging.getLogger(__name__)
-
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
     InvalidVideoId,
@@ -18,8 +13,14 @@ from youtube_transcript_api._errors import (
 from youtube_transcript_api.proxies import GenericProxyConfig
 
 from knowledge_hub.config import get_settings
+from knowledge_hub.executors import TRANSCRIPT, get_executor
+from knowledge_hub.extraction import fetch_cache
+from knowledge_hub.extraction.parse_pool import run_parser
+from knowledge_hub.http_client import get_http_client
 from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
 
+logger = logging.getLogger(__name__)
+
 # Comprehensive regex for all YouTube URL formats
 VIDEO_ID_PATTERN = re.compile(
     r"(?:youtube\.com/(?:watch\?.*v=|shorts/|embed/)|youtu\.be/)([a-zA-Z0-9_-]{11})"
@@ -40,7 +41,7 @@ async def extract_youtube(url: str) -> ExtractedContent:
     """Extract YouTube transcript and metadata.
 
     Uses YouTubeTranscriptApi instance fetch() method (not deprecated static methods).
-    All sync calls wrapped in asyncio.to_thread().
+    The sync transcript request runs on the "transcript" executor.
 
     Returns ExtractedContent with:
     - FULL: transcript extracted successfully
@@ -64,10 +65,8 @@ async def extract_youtube(url: str) -> ExtractedContent:
     proxy_config = GenericProxyConfig(https_url=proxy_url) if proxy_url else None
     ytt_api = YouTubeTranscriptApi(proxy_config=proxy_config)
     try:
-        # Sync call wrapped in to_thread
-        transcript = await asyncio.to_thread(
-            ytt_api.fetch, video_id, languages=["en"]
-        )
+        # Sync call, run on the transcript executor
+        transcript = await get_executor(TRANSCRIPT).run(ytt_api.fetch, video_id, languages=["en"])
         text = " ".join(snippet.text for snippet in transcript)
         word_count = len(text.split()) if text else None
 
@@ -120,51 +119,63 @@ async def extract_youtube(url: str) -> ExtractedContent:
         )
 
 
+def scan_metadata(html: str) -> tuple[str | None, str | None, str | None]:
+    """Title, author, and description from a YouTube watch page. Executed in a parse worker.
+
+    Tries multiple selectors for each field since YouTube's HTML changes frequently.
+    """
+    title = None
+    author = None
+    description = None
+
+    # Title: og:title is most reliable
+    m = re.search(r'<meta property="og:title" content="([^"]*)"', html)
+    if m:
+        title = m.group(1)
+
+    # Author: try multiple patterns (YouTube HTML changes frequently)
+    # JSON patterns first — unambiguously refer to the channel.
+    # itemprop="name" is last resort since first match is often the video title.
+    author_patterns = [
+        r'"ownerChannelName":"([^"]*)"',
+        r'"author":"([^"]*)"',
+        r'"channelName":"([^"]*)"',
+        r'<meta name="author" content="([^"]*)"',
+        r'<link itemprop="name" content="([^"]*)"',
+    ]
+    for pattern in author_patterns:
+        m = re.search(pattern, html)
+        if m and m.group(1):
+            author = m.group(1)
+            break
+
+    # Description: og:description
+    m = re.search(r'<meta property="og:description" content="([^"]*)"', html)
+    if m:
+        description = m.group(1)
+
+    return title, author, description
+
+
 async def _fetch_youtube_metadata(url: str) -> tuple[str | None, str | None, str | None]:
     """Fetch title, author, and description from YouTube page HTML.
 
-    Tries multiple selectors for each field since YouTube's HTML changes frequently.
+    The page is scanned in a parse worker (see scan_metadata). A page already
+    downloaded while resolving the URL is taken from the fetch cache.
 
     Returns:
         Tuple of (title, author, description). Any field may be None.
     """
     try:
-        async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
-            resp = await client.get(url)
+        cached = fetch_cache.take(url)
+        if cached is not None and cached.is_html:
+            html = cached.text
+        else:
+            resp = await get_http_client().get(url, timeout=10.0)
             resp.raise_for_status()
             html = resp.text
 
-        title = None
-        author = None
-        description = None
-
-        # Title: og:title is most reliable
-        m = re.search(r'<meta property="og:title" content="([^"]*)"', html)
-        if m:
-            title = m.group(1)
-
-        # Author: try multiple patterns (YouTube HTML changes frequently)
-        # JSON patterns first — unambiguously refer to the channel.
-        # itemprop="name" is last resort since first match is often the video title.
-        author_patterns = [
-            r'"ownerChannelName":"([^"]*)"',
-            r'"author":"([^"]*)"',
-            r'"channelName":"([^"]*)"',
-            r'<meta name="author" content="([^"]*)"',
-            r'<link itemprop="name" content="([^"]*)"',
-        ]
-        for pattern in author_patterns:
-            m = re.search(pattern, html)
-            if m and m.group(1):
-                author = m.group(1)
-                break
-
-        # Description: og:description
-        m = re.search(r'<meta property="og:description" content="([^"]*)"', html)
-        if m:
-            description = m.group(1)
-
-        return title, author, description
+        return await run_parser(scan_metadata, html)
     except Exception:
         logger.debug("Failed to fetch YouTube page metadata for %s", url, exc_info=True)
         return None, None, None
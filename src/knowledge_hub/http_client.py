@@ -0,0 +1,375 @@
+"""The shared outbound HTTP client used by URL resolution and every extractor.
+
+One httpx.AsyncClient serves the whole process, so connections to a site are
+kept alive and reused across URLs, messages, and stages (resolve, article,
+PDF, YouTube metadata). The lifespan opens it at startup and closes it on
+shutdown; the CLI closes it when an import finishes.
+
+On top of httpx's pool limits (settings.http_max_connections and
+http_max_keepalive_connections) the transport adds:
+
+- Per-host caps: at most settings.http_max_connections_per_host requests to
+  one host at a time, so a bulk import cannot monopolize the pool or hammer
+  a single site.
+- A DNS cache: host lookups are kept for settings.http_dns_cache_ttl_seconds
+  instead of being repeated for every new connection. Lookups that do run
+  use the "network" executor (knowledge_hub.executors).
+- HTTP/2 when settings.http2_enabled and the optional `h2` package is
+  installed; brotli and zstd response decoding when `brotli` and `zstandard`
+  are installed (httpx advertises whatever decoders are available). All
+  three come with `pip install 'httpx[http2,brotli,zstd]'`.
+
+http_stats() reports requests, connections opened, and DNS cache hits for
+/metrics; requests minus connections opened is the number of requests that
+reused a kept-alive connection (or shared an HTTP/2 connection).
+"""
+
+import asyncio
+import importlib.util
+import ipaddress
+import socket
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+import httpcore
+import httpx
+from cachetools import TTLCache
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.executors import NETWORK, ExecutorSaturated, get_executor
+
+USER_AGENT = (
+    "Mozilla/5.0 (compatible; knowledge-hub/0.1; +https://github.com/Ninety2UA/knowledge-hub)"
+)
+
+_DEFAULT_TIMEOUT = httpx.Timeout(25.0)
+_MAX_REDIRECTS = 10
+
+
+@dataclass
+class HttpStats:
+    """Counters for the shared client since it was opened."""
+
+    requests: int = 0
+    connections_opened: int = 0
+    dns_cache_hits: int = 0
+    dns_lookups: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        """Requests served without opening a new connection."""
+        return max(0, self.requests - self.connections_opened)
+
+
+class _CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that resolves hostnames through a TTL cache.
+
+    Connections are made to the cached address; TLS still verifies and sends
+    SNI for the original hostname, which httpcore passes separately.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, ttl: float, stats: HttpStats):
+        self._backend = backend
+        self._cache: TTLCache = TTLCache(maxsize=1024, ttl=ttl)
+        self._stats = stats
+
+    async def _address(self, host: str, port: int) -> str:
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        cached = self._cache.get((host, port))
+        if cached is not None:
+            self._stats.dns_cache_hits += 1
+            return cached
+
+        self._stats.dns_lookups += 1
+        try:
+            infos = await get_executor(NETWORK).run(
+                socket.getaddrinfo, host, port, type=socket.SOCK_STREAM
+            )
+        except (OSError, ExecutorSaturated) as exc:
+            raise httpcore.ConnectError(f"DNS lookup failed for {host}: {exc}") from exc
+        # Prefer IPv4: many hosting environments have no IPv6 egress
+        infos.sort(key=lambda info: info[0] != socket.AF_INET)
+        address = infos[0][4][0]
+        self._cache[(host, port)] = address
+        return address
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        address = await self._address(host, port)
+        stream = await self._backend.connect_tcp(
+            address,
+            port,
+            timeout=timeout,
+            local_address=local_address,
+            socket_options=socket_options,
+        )
+        self._stats.connections_opened += 1
+        return stream
+
+    async def connect_unix_socket(
+        self, path: str, timeout: float | None = None, socket_options=None
+    ):
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# httpcore errors and the httpx errors callers catch, most specific first
+_HTTPX_ERRORS: tuple[tuple[type[Exception], type[httpx.TransportError]], ...] = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+
+@contextmanager
+def _httpx_errors() -> Iterator[None]:
+    """Re-raise httpcore errors as their httpx equivalents."""
+    try:
+        yield
+    except Exception as exc:
+        for httpcore_error, httpx_error in _HTTPX_ERRORS:
+            if isinstance(exc, httpcore_error):
+                raise httpx_error(str(exc)) from exc
+        raise
+
+
+class _PoolStream(httpx.AsyncByteStream):
+    """Response body read from an httpcore connection."""
+
+    def __init__(self, stream: AsyncIterable[bytes]) -> None:
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _httpx_errors():
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class _PoolTransport(httpx.AsyncBaseTransport):
+    """httpx transport on an httpcore connection pool configured here.
+
+    httpx.AsyncHTTPTransport builds its own pool and takes no network
+    backend, so it cannot cache DNS or count connections. This transport
+    does its request and response conversion on a pool that can.
+    """
+
+    def __init__(self, pool: httpcore.AsyncConnectionPool) -> None:
+        self._pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors():
+            response = await self._pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_PoolStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its per-host slot once closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]) -> None:
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+@dataclass
+class _HostSlots:
+    semaphore: asyncio.Semaphore
+    users: int = 0
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """httpx transport with per-host request caps, DNS caching, and counters."""
+
+    def __init__(
+        self,
+        *,
+        limits: httpx.Limits,
+        per_host: int,
+        dns_cache_ttl: float,
+        http2: bool,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.stats = HttpStats()
+        if transport is None:
+            pool = httpcore.AsyncConnectionPool(
+                ssl_context=httpx.create_ssl_context(),
+                max_connections=limits.max_connections,
+                max_keepalive_connections=limits.max_keepalive_connections,
+                keepalive_expiry=limits.keepalive_expiry,
+                http2=http2,
+                network_backend=_CachingDNSBackend(
+                    httpcore.AnyIOBackend(), dns_cache_ttl, self.stats
+                ),
+            )
+            transport = _PoolTransport(pool)
+        self._transport = transport
+        self._per_host = per_host
+        # Only hosts with requests in flight or waiting have an entry
+        self._hosts: dict[str, _HostSlots] = {}
+
+    @classmethod
+    def from_settings(cls, transport: httpx.AsyncBaseTransport | None = None) -> "SharedTransport":
+        """Transport sized from settings. `transport` replaces the network layer (tests)."""
+        settings = get_settings()
+        return cls(
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            ),
+            per_host=settings.http_max_connections_per_host,
+            dns_cache_ttl=settings.http_dns_cache_ttl_seconds,
+            http2=settings.http2_enabled and http2_available(),
+            transport=transport,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slots = self._hosts.get(host)
+        if slots is None:
+            slots = self._hosts[host] = _HostSlots(asyncio.Semaphore(self._per_host))
+        slots.users += 1
+
+        def release() -> None:
+            slots.semaphore.release()
+            self._leave(host, slots)
+
+        try:
+            await slots.semaphore.acquire()
+        except BaseException:
+            self._leave(host, slots)
+            raise
+        try:
+            self.stats.requests += 1
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        if response.is_closed:
+            release()  # body already in memory; no connection is held
+        else:
+            response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    def _leave(self, host: str, slots: _HostSlots) -> None:
+        slots.users -= 1
+        if slots.users == 0:
+            del self._hosts[host]
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def http2_available() -> bool:
+    """True if the optional h2 package (HTTP/2 support) is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_http_client(transport: SharedTransport) -> httpx.AsyncClient:
+    """Create a client on `transport` with the app's redirect, timeout, and header defaults."""
+    return httpx.AsyncClient(
+        transport=transport,
+        follow_redirects=True,
+        max_redirects=_MAX_REDIRECTS,
+        timeout=_DEFAULT_TIMEOUT,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+_transport: SharedTransport | None = None
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first call."""
+    global _transport, _client
+    if _client is None or _client.is_closed:
+        _transport = SharedTransport.from_settings()
+        _client = build_http_client(_transport)
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its connection pool (app shutdown)."""
+    global _transport, _client
+    if _client is not None:
+        await _client.aclose()
+    _transport = _client = None
+
+
+def http_stats() -> dict:
+    """Counters and settings of the shared client for /metrics."""
+    stats = _transport.stats if _transport is not None else HttpStats()
+    return {
+        **asdict(stats),
+        "connections_reused": stats.connections_reused,
+        "http2": get_settings().http2_enabled and http2_available(),
+    }
+
+
+def reset_http_client() -> None:
+    """Drop the shared client without closing it. Used for testing."""
+    global _transport, _client
+    _transport = _client = None
@@ -0,0 +1,37 @@
+"""Bulk import of existing reading lists (Pocket, Raindrop, CSV, plain text).
+
+Public API:
+    read_items(path, fmt="auto") -> list[ImportItem]
+        URLs (and notes) from an export file.
+    run_import(items, source, journal, concurrency=...) -> ImportStats
+        Runs the URLs through extraction, Gemini, and Notion in the bulk lane,
+        recording each outcome in the journal so a rerun resumes.
+
+Run from the command line as `knowledge-hub import FILE`.
+"""
+
+from knowledge_hub.importer.journal import DUPLICATE, FAILED, SAVED, ImportJournal
+from knowledge_hub.importer.runner import (
+    ImportStats,
+    ProgressLine,
+    import_url,
+    pending_items,
+    run_import,
+)
+from knowledge_hub.importer.sources import FORMATS, ImportItem, detect_format, read_items
+
+__all__ = [
+    "DUPLICATE",
+    "FAILED",
+    "FORMATS",
+    "ImportItem",
+    "ImportJournal",
+    "ImportStats",
+    "ProgressLine",
+    "SAVED",
+    "detect_format",
+    "import_url",
+    "pending_items",
+    "read_items",
+    "run_import",
+]
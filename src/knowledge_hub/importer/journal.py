@@ -0,0 +1,82 @@
+"""Import journal: the recorded outcome of every URL, so an import can resume.
+
+Rows are keyed by (source, url), where source is the export file's absolute
+path. A rerun of the same file skips URLs already saved or found to be
+duplicates, and skips failures unless asked to retry them.
+"""
+
+import threading
+import time
+
+from knowledge_hub.storage import open_sqlite
+
+_JOURNAL_DB_FILENAME = "imports.db"
+
+SAVED = "saved"
+DUPLICATE = "duplicate"
+FAILED = "failed"
+
+
+class ImportJournal:
+    """SQLite table of per-URL import outcomes under settings.data_dir."""
+
+    def __init__(self, filename: str = _JOURNAL_DB_FILENAME) -> None:
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(filename)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS import_items (
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                page_url TEXT,
+                cost_usd REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (source, url)
+            )
+            """
+        )
+
+    def outcomes(self, source: str) -> dict[str, str]:
+        """Status of every URL recorded for `source`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, status FROM import_items WHERE source = ?", (source,)
+            ).fetchall()
+        return dict(rows)
+
+    def cost_usd(self, source: str) -> float:
+        """Total Gemini cost recorded for `source` across all runs."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(cost_usd), 0) FROM import_items WHERE source = ?",
+                (source,),
+            ).fetchone()
+        return row[0]
+
+    def record(
+        self,
+        source: str,
+        url: str,
+        status: str,
+        *,
+        page_url: str | None = None,
+        cost_usd: float = 0.0,
+        error: str | None = None,
+    ) -> None:
+        """Record a URL's outcome, replacing any earlier attempt but keeping its cost."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO import_items "
+                "(source, url, status, page_url, cost_usd, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, url) DO UPDATE SET status = excluded.status, "
+                "page_url = excluded.page_url, cost_usd = cost_usd + excluded.cost_usd, "
+                "error = excluded.error, updated_at = excluded.updated_at",
+                (source, url, status, page_url, cost_usd, error, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
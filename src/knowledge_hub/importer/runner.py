@@ -0,0 +1,189 @@
+"""Run an export file's URLs through extraction, Gemini, and Notion.
+
+Each URL goes through the same stages as a link posted in Slack -- redirect
+resolution, extract_content, process_content, create_notion_page -- under the
+shared stage limits in the bulk lane, with `concurrency` URLs in flight.
+Outcomes are written to the ImportJournal as each URL finishes, so an
+interrupted import loses at most the URLs that were in flight.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import TextIO
+
+from google import genai
+
+from knowledge_hub.extraction.fetch_cache import fetch_scope
+from knowledge_hub.importer.journal import DUPLICATE, FAILED, SAVED, ImportJournal
+from knowledge_hub.importer.sources import ImportItem
+from knowledge_hub.llm import get_gemini_client
+from knowledge_hub.notion.models import DuplicateResult
+from knowledge_hub.pipeline import (
+    BULK,
+    StageLimits,
+    current_lane,
+    get_inflight_registry,
+    get_stage_limits,
+    run_stages,
+)
+from knowledge_hub.slack.urls import resolve_url
+
+logger = logging.getLogger(__name__)
+
+# Without a terminal, print a progress line every this many URLs
+_PROGRESS_EVERY = 50
+
+
+@dataclass
+class ImportStats:
+    """Running totals for one import run."""
+
+    total: int
+    skipped: int = 0
+    saved: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    cost_usd: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def processed(self) -> int:
+        """URLs finished in this run."""
+        return self.saved + self.duplicates + self.failed
+
+    @property
+    def done(self) -> int:
+        """URLs finished in this run or skipped from an earlier one."""
+        return self.skipped + self.processed
+
+    def rate(self) -> float:
+        """URLs finished per second in this run."""
+        elapsed = time.monotonic() - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+class ProgressLine:
+    """Single-line progress report: counts, throughput, cost, and ETA.
+
+    On a terminal the line is redrawn in place; otherwise a line is printed
+    every _PROGRESS_EVERY URLs and at the end.
+    """
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self._stream = stream or sys.stderr
+        self._tty = self._stream.isatty()
+
+    def render(self, stats: ImportStats) -> str:
+        rate = stats.rate()
+        remaining = stats.total - stats.done
+        eta = _format_duration(remaining / rate) if rate > 0 else "--"
+        percent = 100 * stats.done / stats.total if stats.total else 100
+        return (
+            f"{stats.done}/{stats.total} ({percent:.0f}%)  {rate:.2f} URL/s  "
+            f"saved {stats.saved}  dup {stats.duplicates}  failed {stats.failed}  "
+            f"${stats.cost_usd:.4f}  ETA {eta}"
+        )
+
+    def update(self, stats: ImportStats) -> None:
+        if self._tty:
+            self._stream.write("\r\x1b[K" + self.render(stats))
+            self._stream.flush()
+        elif stats.processed % _PROGRESS_EVERY == 0:
+            self.finish(stats)
+
+    def finish(self, stats: ImportStats) -> None:
+        if self._tty:
+            self._stream.write("\r\x1b[K")
+        self._stream.write(self.render(stats) + "\n")
+        self._stream.flush()
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    return f"{minutes}m{secs:02d}s" if minutes else f"{secs}s"
+
+
+def pending_items(
+    items: list[ImportItem], outcomes: dict[str, str], retry_failed: bool = False
+) -> list[ImportItem]:
+    """Items the journal has no final outcome for (failures count only if not retried)."""
+    finished = {SAVED, DUPLICATE} if retry_failed else {SAVED, DUPLICATE, FAILED}
+    return [item for item in items if outcomes.get(item.url) not in finished]
+
+
+async def run_import(
+    items: list[ImportItem],
+    source: str,
+    journal: ImportJournal,
+    *,
+    concurrency: int,
+    retry_failed: bool = False,
+    progress: ProgressLine | None = None,
+) -> ImportStats:
+    """Import every item the journal has not finished. Returns this run's totals."""
+    pending = pending_items(items, journal.outcomes(source), retry_failed)
+    stats = ImportStats(
+        total=len(items),
+        skipped=len(items) - len(pending),
+        cost_usd=journal.cost_usd(source),
+    )
+    current_lane.set(BULK)
+    gemini_client = get_gemini_client()
+    limits = get_stage_limits()
+    todo = iter(pending)
+
+    async def worker() -> None:
+        for item in todo:
+            status, page_url, cost_usd, error = await import_url(gemini_client, limits, item)
+            journal.record(
+                source, item.url, status, page_url=page_url, cost_usd=cost_usd, error=error
+            )
+            stats.cost_usd += cost_usd
+            if status == SAVED:
+                stats.saved += 1
+            elif status == DUPLICATE:
+                stats.duplicates += 1
+            else:
+                stats.failed += 1
+                logger.warning("Import failed for %s: %s", item.url, error)
+            if progress is not None:
+                progress.update(stats)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(pending))))))
+    if progress is not None:
+        progress.finish(stats)
+    return stats
+
+
+async def import_url(
+    gemini_client: genai.Client, limits: StageLimits, item: ImportItem
+) -> tuple[str, str | None, float, str | None]:
+    """Run one URL through all stages. Returns (status, page_url, cost_usd, error).
+
+    A URL that another copy in this import is already processing (e.g. the
+    same article with different tracking parameters) reuses that result.
+    """
+    try:
+        with fetch_scope():
+            url = await resolve_url(item.url)
+            if url is None:
+                return FAILED, None, 0.0, "URL could not be resolved"
+            leader, outcome = await get_inflight_registry().run(
+                url, lambda: run_stages(gemini_client, limits, url, item.note)
+            )
+    except Exception as exc:
+        logger.debug("Import pipeline error for %s", item.url, exc_info=True)
+        return FAILED, None, 0.0, str(exc) or type(exc).__name__
+
+    if outcome is None:
+        return FAILED, None, 0.0, "Content could not be extracted"
+    result, cost_usd = outcome
+    if not leader or isinstance(result, DuplicateResult):
+        return DUPLICATE, result.page_url, cost_usd if leader else 0.0, None
+    return SAVED, result.page_url, cost_usd, None
@@ -0,0 +1,108 @@
+"""Readers for URL export files: HTML bookmarks, CSV, and plain text.
+
+Covers the common reading-list exports:
+- Pocket: ril_export.html (HTML) or part_000000.csv (title,url,...)
+- Raindrop.io: bookmarks HTML, or CSV with url and note columns
+- Browser bookmark exports (Netscape HTML)
+- Plain text: one URL per line (anything after the URL becomes the note)
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+
+HTML = "html"
+CSV = "csv"
+TEXT = "text"
+FORMATS = (HTML, CSV, TEXT)
+
+_EXTENSION_FORMATS = {".html": HTML, ".htm": HTML, ".csv": CSV}
+
+# CSV column holding the user's own annotation (Raindrop: "note")
+_NOTE_COLUMNS = ("note", "notes", "description")
+
+
+@dataclass(frozen=True)
+class ImportItem:
+    """One URL to import, with the note to pass to the LLM prompt."""
+
+    url: str
+    note: str | None = None
+
+
+def detect_format(path: Path) -> str:
+    """Guess the export format from the file extension (default: plain text)."""
+    return _EXTENSION_FORMATS.get(path.suffix.lower(), TEXT)
+
+
+def read_items(path: Path, fmt: str = "auto") -> list[ImportItem]:
+    """Read the http(s) URLs in an export file, in file order, without repeats."""
+    if fmt == "auto":
+        fmt = detect_format(path)
+    text = path.read_text(encoding="utf-8-sig", errors="replace")
+    if fmt == HTML:
+        items = _read_html(text)
+    elif fmt == CSV:
+        items = _read_csv(text)
+    elif fmt == TEXT:
+        items = _read_text(text)
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+    seen: set[str] = set()
+    unique = []
+    for item in items:
+        if _is_web_url(item.url) and item.url not in seen:
+            seen.add(item.url)
+            unique.append(item)
+    return unique
+
+
+def _is_web_url(url: str) -> bool:
+    return url.startswith(("http://", "https://"))
+
+
+class _LinkCollector(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.urls: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.urls.append(href.strip())
+
+
+def _read_html(text: str) -> list[ImportItem]:
+    collector = _LinkCollector()
+    collector.feed(text)
+    return [ImportItem(url) for url in collector.urls]
+
+
+def _read_csv(text: str) -> list[ImportItem]:
+    # Quoted fields may span lines (multi-line notes), so the reader splits rows itself
+    reader = csv.DictReader(io.StringIO(text, newline=""))
+    columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+    url_column = columns.get("url") or columns.get("link")
+    if url_column is None:
+        raise ValueError("CSV export has no 'url' column")
+    note_column = next((columns[c] for c in _NOTE_COLUMNS if c in columns), None)
+
+    items = []
+    for row in reader:
+        url = (row.get(url_column) or "").strip()
+        note = (row.get(note_column) or "").strip() if note_column else ""
+        items.append(ImportItem(url, note or None))
+    return items
+
+
+def _read_text(text: str) -> list[ImportItem]:
+    items = []
+    for line in text.splitlines():
+        url, _, note = line.strip().partition(" ")
+        if url and not url.startswith("#"):
+            items.append(ImportItem(url, note.strip() or None))
+    return items
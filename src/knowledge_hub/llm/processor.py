@@ -26,6 +26,7 @@ from knowledge_hub.llm.schemas import LLMResponse
 from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
 from knowledge_hub.models.knowledge import KnowledgeEntry, Priority, Status
 from knowledge_hub.models.notion import KeyLearning, NotionPage, ToolMention
+from knowledge_hub.shared_state import get_shared_state
 
 logger = logging.getLogger(__name__)
 
@@ -86,7 +87,7 @@ def build_notion_page(llm_result: LLMResponse, content: ExtractedContent) -> Not
     """Combine LLM-generated fields with extraction-derived fields into a NotionPage.
 
     LLM provides: title, category, priority, tags, summary, body sections.
-    Extraction provides: content_type, source URL, author.
+    Extraction provides: content_type, source URL (the page's canonical URL if declared), author.
     Processor sets: date_added (now), status (NEW).
 
     Args:
@@ -100,7 +101,7 @@ def build_notion_page(llm_result: LLMResponse, content: ExtractedContent) -> Not
         title=llm_result.title,
         category=llm_result.category,
         content_type=content.content_type,
-        source=content.url,
+        source=content.canonical_url or content.url,
         author=content.author or llm_result.author,
         date_added=datetime.now(timezone.utc),
         status=Status.NEW,
@@ -263,7 +264,7 @@ async def process_content(
     if transcription_usage:
         usage = merge_usage(transcription_usage, usage)
 
-    log_usage(content.url, usage)
+    await get_shared_state().run(log_usage, content.url, usage)
 
     # Post-processing: override priority for partial/metadata-only extractions (LLM-09)
     # Skip override for Gemini video fallback (transcription provides full content)
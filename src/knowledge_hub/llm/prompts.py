@@ -222,6 +222,9 @@ def build_user_content(content: ExtractedContent) -> list | str:
         metadata_parts.append(f"Source: {content.source_domain}")
     if content.user_note:
         metadata_parts.append(f"User Note: {content.user_note}")
+    if content.truncated:
+        pages = f"{content.page_count}-page " if content.page_count else ""
+        metadata_parts.append(f"Note: Only part of this {pages}document was extracted")
 
     # If YouTube video has no transcript, pass the URL directly to Gemini
     # for native video processing (e.g., when transcript API is IP-blocked)
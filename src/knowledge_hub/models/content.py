@@ -30,6 +30,7 @@ class ExtractedContent(BaseModel):
     """Content extracted from a URL. Single model with optional fields for all content types."""
 
     url: str  # Original URL (always present)
+    canonical_url: str | None = None  # Canonical URL declared by the page (rel=canonical/og:url)
     content_type: ContentType  # Detected content type (always present)
     title: str | None = None
     author: str | None = None
@@ -40,6 +41,8 @@ class ExtractedContent(BaseModel):
     published_date: str | None = None  # Formats vary, kept as string
     word_count: int | None = None
     duration_seconds: int | None = None  # Video duration (None for articles)
+    page_count: int | None = None  # PDF pages (None for other types)
+    truncated: bool = False  # Text stops at the extraction word budget (long PDFs)
     extraction_method: str | None = None  # e.g., "trafilatura", "youtube-transcript-api"
     extraction_status: ExtractionStatus = ExtractionStatus.FULL
     user_note: str | None = None
@@ -2,12 +2,15 @@
 
 Creates a cached AsyncClient instance configured with the API key from
 application settings. Discovers the data_source_id from the database on
-first use (required by Notion API 2025-09-03).
+first use (required by Notion API 2025-09-03) and shares it with other
+workers and instances through shared state. The client itself holds
+connections and stays per-process.
 """
 
 from notion_client import AsyncClient
 
 from knowledge_hub.config import get_settings
+from knowledge_hub.shared_state import get_shared_state
 
 _client: AsyncClient | None = None
 _data_source_id: str | None = None
@@ -30,12 +33,19 @@ async def get_data_source_id() -> str:
     """Discover and cache the data_source_id from the configured database.
 
     Uses databases.retrieve() to find the data_source_id array, then caches
-    the first entry. Raises RuntimeError if no data sources are found.
+    the first entry in this process and in shared state. Raises RuntimeError
+    if no data sources are found.
     """
     global _data_source_id
+    if _data_source_id is not None:
+        return _data_source_id
+
+    settings = get_settings()
+    state = get_shared_state()
+    shared_key = f"notion:data_source_id:{settings.notion_database_id}"
+    _data_source_id = await state.run(state.get, shared_key)
     if _data_source_id is None:
         client = await get_notion_client()
-        settings = get_settings()
         db = await client.databases.retrieve(database_id=settings.notion_database_id)
         data_sources = db.get("data_sources", [])
         if not data_sources:
@@ -44,6 +54,7 @@ async def get_data_source_id() -> str:
                 "Ensure the database exists and has at least one data source."
             )
         _data_source_id = data_sources[0]["id"]
+        await state.run(state.set, shared_key, _data_source_id)
     return _data_source_id
 
 
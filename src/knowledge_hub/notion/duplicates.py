@@ -1,59 +1,88 @@
 """URL normalization and duplicate detection against the Notion database.
 
-Normalizes URLs by stripping utm_* tracking parameters and applying
-protocol/trailing-slash normalization before querying Notion's
-data_sources.query endpoint for exact matches on the Source property.
+URLs are stored in canonical form (knowledge_hub.canonical: tracking
+parameters, mobile/AMP variants, and per-site forms folded together). A
+duplicate check queries Notion's data_sources.query endpoint for any page
+whose Source is the canonical or the pre-canonicalization form of the URL
+(or of the canonical URL the page itself declares), or -- for sites with
+stable ids such as YouTube and arXiv -- any page about the same resource.
 """
 
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 from url_normalize import url_normalize
 
+from knowledge_hub.canonical import canonicalize_url, identity_key
 from knowledge_hub.notion.client import get_data_source_id, get_notion_client
 from knowledge_hub.notion.models import DuplicateResult
 
 
 def normalize_url(raw_url: str) -> str:
-    """Normalize a URL for duplicate comparison.
+    """Normalize a URL for storage and duplicate comparison (see canonicalize_url)."""
+    return canonicalize_url(raw_url)
 
-    Strips utm_* tracking parameters, then applies protocol normalization
-    (http -> https), trailing slash removal, and other standard normalizations
-    via the url-normalize library.
 
-    We manually strip utm_* params rather than using url-normalize's
-    filter_params=True which removes ALL query params.
-    """
-    # Parse and strip utm_* params
+def _legacy_normalize(raw_url: str) -> str:
+    """The form Source URLs were stored in before canonicalization: only utm_* stripped."""
     parsed = urlparse(raw_url)
     params = parse_qs(parsed.query, keep_blank_values=True)
     filtered = {k: v for k, v in params.items() if not k.startswith("utm_")}
     clean_query = urlencode(filtered, doseq=True)
-    cleaned = urlunparse(parsed._replace(query=clean_query))
-
-    # Apply standard normalization (protocol, trailing slash, encoding)
-    return url_normalize(cleaned)
+    return url_normalize(urlunparse(parsed._replace(query=clean_query)))
 
 
-async def check_duplicate(raw_url: str) -> DuplicateResult | None:
-    """Query Notion for an existing page with the same normalized URL.
+def _source_filters(urls: list[str]) -> tuple[list[dict], set[str], set[str]]:
+    """Notion filters matching any stored form of `urls`, plus the values they match on.
 
-    Returns DuplicateResult with page info if found, None otherwise.
-    Uses data_sources.query with a URL property filter for exact match.
+    Returns (filters, exact_urls, identities). Identity filters use `contains`
+    on the resource id, so their results must be confirmed against identities.
+    """
+    exact: set[str] = set()
+    identities: set[str] = set()
+    for url in urls:
+        exact.update((canonicalize_url(url), _legacy_normalize(url)))
+        key = identity_key(url)
+        if key is not None:
+            identities.add(key)
+
+    filters = [{"property": "Source", "url": {"equals": value}} for value in sorted(exact)]
+    filters += [
+        {"property": "Source", "url": {"contains": key.split(":", 1)[1]}}
+        for key in sorted(identities)
+    ]
+    return filters, exact, identities
+
+
+async def check_duplicate(raw_url: str, *alternates: str | None) -> DuplicateResult | None:
+    """Query Notion for an existing page for the same URL or resource.
+
+    `alternates` are other URLs known for the same page, such as the
+    canonical URL it declares. Returns DuplicateResult with page info if
+    found, None otherwise.
     """
     client = await get_notion_client()
     ds_id = await get_data_source_id()
-    normalized = normalize_url(raw_url)
+    urls = [raw_url, *(url for url in alternates if url)]
+    filters, exact, identities = _source_filters(urls)
 
     response = await client.data_sources.query(
         data_source_id=ds_id,
-        filter={"property": "Source", "url": {"equals": normalized}},
-        page_size=1,
+        filter=filters[0] if len(filters) == 1 else {"or": filters},
+        page_size=10 if identities else 1,
     )
 
-    if not response["results"]:
+    results = response["results"]
+    if identities:
+        # `contains` can match an id inside an unrelated URL; keep real matches only
+        results = [
+            page
+            for page in results
+            if _stored_source(page) in exact or identity_key(_stored_source(page)) in identities
+        ]
+    if not results:
         return None
 
-    page = response["results"][0]
+    page = results[0]
     title_prop = page.get("properties", {}).get("Title", {}).get("title", [])
     title = title_prop[0]["plain_text"] if title_prop else "Untitled"
 
@@ -62,3 +91,7 @@ async def check_duplicate(raw_url: str) -> DuplicateResult | None:
         page_url=page["url"],
         title=title,
     )
+
+
+def _stored_source(page: dict) -> str:
+    return page.get("properties", {}).get("Source", {}).get("url") or ""
@@ -1,16 +1,21 @@
 """Tag validation with TTL cache against the Notion database schema.
 
 Fetches valid tag names from the Tags multi_select property in Notion
-and caches them with a 5-minute TTL. LLM-suggested tags not in the
-Notion schema are silently dropped per user decision.
+and caches them with a 5-minute TTL in shared state, so every worker and
+instance reuses one fetch; a 1-minute per-process tier in front avoids
+repeat lookups. LLM-suggested tags not in the Notion schema are silently
+dropped per user decision.
 """
 
 from cachetools import TTLCache
 
 from knowledge_hub.notion.client import get_data_source_id, get_notion_client
+from knowledge_hub.shared_state import get_shared_state
 
-_tag_cache: TTLCache = TTLCache(maxsize=1, ttl=300)  # 5-minute TTL
+_tag_cache: TTLCache = TTLCache(maxsize=1, ttl=60)  # per-process tier
 _TAG_CACHE_KEY = "valid_tags"
+_SHARED_TAG_KEY = "notion:valid_tags"
+_SHARED_TAG_TTL_SECONDS = 300  # 5-minute TTL
 
 
 async def get_valid_tags() -> set[str]:
@@ -22,12 +27,20 @@ async def get_valid_tags() -> set[str]:
     if cached is not None:
         return cached
 
+    state = get_shared_state()
+    shared = await state.run(state.get, _SHARED_TAG_KEY)
+    if shared is not None:
+        valid = set(shared)
+        _tag_cache[_TAG_CACHE_KEY] = valid
+        return valid
+
     client = await get_notion_client()
     ds_id = await get_data_source_id()
     ds = await client.data_sources.retrieve(data_source_id=ds_id)
 
     options = ds["properties"]["Tags"]["multi_select"]["options"]
     valid = {opt["name"] for opt in options}
+    await state.run(state.set, _SHARED_TAG_KEY, sorted(valid), _SHARED_TAG_TTL_SECONDS)
     _tag_cache[_TAG_CACHE_KEY] = valid
     return valid
 
@@ -41,5 +54,6 @@ def filter_tags(suggested: list[str], valid: set[str]) -> list[str]:
 
 
 def invalidate_tag_cache() -> None:
-    """Clear the tag cache. Used for testing."""
+    """Clear the tag cache in this process and in shared state (e.g. after a schema change)."""
     _tag_cache.clear()
+    get_shared_state().delete(_SHARED_TAG_KEY)
@@ -0,0 +1,98 @@
+"""Pipeline scheduling: durable job queue, worker pool, stage limits, and admission control.
+
+Public API:
+    get_job_queue() -> JobQueue
+        Cached queue for the configured backend (SQLite or in-memory).
+    WorkerPool(queue, handlers, concurrency=..., visibility_timeout=...)
+        Drains the queue with bounded concurrency; started by the app lifespan.
+    get_stage_limits() -> StageLimits
+        Process-wide semaphores for the extract, LLM, and Notion stages.
+    get_admission_controller() -> AdmissionController
+        Sheds or defers new work based on queue depth and memory pressure.
+    INTERACTIVE, BULK
+        Priority lanes; workers and stage limiters share capacity by lane weight.
+    get_checkpoint_store() -> CheckpointStore
+        Per-URL stage checkpoints so interrupted jobs resume from the last stage.
+    get_inflight_registry() -> InFlightRegistry
+        Coalesces concurrent runs of the same normalized URL into one.
+    run_stages(gemini_client, limits, url, user_note, ...)
+        Extract, analyze, and save one URL; shared by Slack jobs and imports.
+"""
+
+from knowledge_hub.pipeline.admission import (
+    AdmissionController,
+    Decision,
+    get_admission_controller,
+    reset_admission_controller,
+)
+from knowledge_hub.pipeline.checkpoints import (
+    Checkpoint,
+    CheckpointStore,
+    Stage,
+    checkpoint_key,
+    get_checkpoint_store,
+    reset_checkpoint_store,
+)
+from knowledge_hub.pipeline.inflight import (
+    InFlightRegistry,
+    get_inflight_registry,
+    reset_inflight_registry,
+)
+from knowledge_hub.pipeline.lanes import (
+    BULK,
+    INTERACTIVE,
+    current_lane,
+    estimate_content_cost,
+    estimate_urls_cost,
+    lane_weights,
+)
+from knowledge_hub.pipeline.limits import (
+    FairLimiter,
+    StageLimits,
+    get_stage_limits,
+    reset_stage_limits,
+)
+from knowledge_hub.pipeline.queue import (
+    Job,
+    JobQueue,
+    MemoryJobQueue,
+    SQLiteJobQueue,
+    get_job_queue,
+    reset_queue,
+)
+from knowledge_hub.pipeline.stages import run_stages
+from knowledge_hub.pipeline.worker import WorkerPool
+
+__all__ = [
+    "AdmissionController",
+    "BULK",
+    "Checkpoint",
+    "checkpoint_key",
+    "CheckpointStore",
+    "current_lane",
+    "Decision",
+    "estimate_content_cost",
+    "estimate_urls_cost",
+    "FairLimiter",
+    "get_admission_controller",
+    "get_checkpoint_store",
+    "get_inflight_registry",
+    "get_job_queue",
+    "get_stage_limits",
+    "InFlightRegistry",
+    "INTERACTIVE",
+    "Job",
+    "JobQueue",
+    "lane_weights",
+    "MemoryJobQueue",
+    "reset_admission_controller",
+    "reset_checkpoint_store",
+    "reset_inflight_registry",
+    "reset_queue",
+    "reset_stage_limits",
+    "run_stages",
+    "SQLiteJobQueue",
+    "Stage",
+    "StageLimits",
+    "WorkerPool",
+]
@@ -0,0 +1,207 @@
+"""Admission control and backpressure for the ingestion pipeline.
+
+Two checkpoints keep a 512Mi / 1 vCPU instance from being overrun:
+
+- Ack path (check_enqueue): when the job queue is already at
+  settings.max_queue_depth, new messages are shed with a Slack thread notice
+  instead of being queued; otherwise they are admitted (workers idle) or
+  deferred (queued behind running work).
+- Worker path (wait_for_capacity / reserve): a worker only leases another job
+  while the estimated memory of in-flight pipelines is under
+  settings.memory_budget_mb and the RSS of the process and its parse workers
+  is under settings.memory_high_watermark_mb. Excess work waits in the queue.
+
+snapshot() exposes the current pressure for the /metrics endpoint and logs.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import asdict, dataclass
+from enum import Enum
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.extraction.parse_pool import parse_worker_pids
+from knowledge_hub.extraction.router import detect_content_type
+from knowledge_hub.models.content import ContentType
+from knowledge_hub.pipeline.queue import JobQueue, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+# Rough peak working set per URL by content type. PDFs dominate: a 20MB file
+# is held as bytes, parsed by pypdf, and its text copied out.
+_ESTIMATED_MB: dict[ContentType, int] = {
+    ContentType.PDF: 64,
+    ContentType.VIDEO: 16,
+}
+_DEFAULT_ESTIMATED_MB = 8
+
+_CAPACITY_POLL_SECONDS = 0.5
+
+
+class Decision(str, Enum):
+    """Outcome of an admission check on the ack path."""
+
+    ADMIT = "admit"  # workers have capacity; runs promptly
+    DEFER = "defer"  # queued behind in-flight work
+    SHED = "shed"  # rejected; user is told to repost later
+
+
+@dataclass
+class AdmissionSnapshot:
+    """Point-in-time pipeline pressure, exposed to operators."""
+
+    in_flight_jobs: int
+    max_in_flight_jobs: int
+    in_flight_urls: int
+    queued_jobs: int
+    max_queue_depth: int
+    reserved_memory_mb: int
+    memory_budget_mb: int
+    rss_mb: int | None
+    memory_high_watermark_mb: int
+    admitted_total: int
+    deferred_total: int
+    shed_total: int
+
+
+def estimate_memory_mb(urls: list[str]) -> int:
+    """Estimate the peak memory needed to run a batch of URLs."""
+    return sum(_ESTIMATED_MB.get(detect_content_type(url), _DEFAULT_ESTIMATED_MB) for url in urls)
+
+
+def _rss_mb(pid: int | str = "self") -> int | None:
+    """Resident set size of a process in MB (Linux only; None elsewhere or once it exits)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+
+
+def _current_rss_mb() -> int | None:
+    """Resident set size of this process plus its parse workers in MB (None if unknown)."""
+    rss = _rss_mb()
+    if rss is None:
+        return None
+    return rss + sum(_rss_mb(pid) or 0 for pid in parse_worker_pids())
+
+
+class AdmissionController:
+    """Tracks in-flight work and decides whether new work may start."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        *,
+        max_in_flight_jobs: int,
+        max_queue_depth: int,
+        memory_budget_mb: int,
+        memory_high_watermark_mb: int,
+    ) -> None:
+        self._queue = queue
+        self.max_in_flight_jobs = max_in_flight_jobs
+        self.max_queue_depth = max_queue_depth
+        self.memory_budget_mb = memory_budget_mb
+        self.memory_high_watermark_mb = memory_high_watermark_mb
+        self._in_flight_jobs = 0
+        self._in_flight_urls = 0
+        self._reserved_mb = 0
+        self._admitted = 0
+        self._deferred = 0
+        self._shed = 0
+
+    def check_enqueue(self) -> Decision:
+        """Decide what to do with a new message on the ack path."""
+        queued = self._queue.depth()
+        if queued >= self.max_queue_depth:
+            self._shed += 1
+            return Decision.SHED
+        waiting = queued - self._in_flight_jobs
+        if (
+            waiting > 0
+            or self._in_flight_jobs >= self.max_in_flight_jobs
+            or not self.has_capacity()
+        ):
+            self._deferred += 1
+            return Decision.DEFER
+        self._admitted += 1
+        return Decision.ADMIT
+
+    def has_capacity(self) -> bool:
+        """True if a worker may start another job now.
+
+        An idle pipeline always has capacity, so one oversized job cannot
+        starve the queue.
+        """
+        if self._in_flight_jobs == 0:
+            return True
+        if self._reserved_mb >= self.memory_budget_mb:
+            return False
+        rss = _current_rss_mb()
+        return rss is None or rss < self.memory_high_watermark_mb
+
+    async def wait_for_capacity(self) -> None:
+        """Block a worker until has_capacity() allows it to lease another job."""
+        while not self.has_capacity():
+            await asyncio.sleep(_CAPACITY_POLL_SECONDS)
+
+    def reserve(self, urls: list[str]) -> int:
+        """Account for a job starting. Returns the reservation to pass to release()."""
+        estimate = estimate_memory_mb(urls)
+        self._in_flight_jobs += 1
+        self._in_flight_urls += len(urls)
+        self._reserved_mb += estimate
+        return estimate
+
+    def release(self, urls: list[str], reservation: int) -> None:
+        """Account for a job finishing (successfully or not)."""
+        self._in_flight_jobs -= 1
+        self._in_flight_urls -= len(urls)
+        self._reserved_mb -= reservation
+
+    def snapshot(self) -> AdmissionSnapshot:
+        """Return current counters and limits."""
+        return AdmissionSnapshot(
+            in_flight_jobs=self._in_flight_jobs,
+            max_in_flight_jobs=self.max_in_flight_jobs,
+            in_flight_urls=self._in_flight_urls,
+            queued_jobs=self._queue.depth(),
+            max_queue_depth=self.max_queue_depth,
+            reserved_memory_mb=self._reserved_mb,
+            memory_budget_mb=self.memory_budget_mb,
+            rss_mb=_current_rss_mb(),
+            memory_high_watermark_mb=self.memory_high_watermark_mb,
+            admitted_total=self._admitted,
+            deferred_total=self._deferred,
+            shed_total=self._shed,
+        )
+
+    def snapshot_dict(self) -> dict:
+        """Return snapshot() as a JSON-serializable dict."""
+        return asdict(self.snapshot())
+
+
+_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the cached admission controller, created from settings on first call."""
+    global _controller
+    if _controller is None:
+        settings = get_settings()
+        _controller = AdmissionController(
+            get_job_queue(),
+            max_in_flight_jobs=settings.queue_workers,
+            max_queue_depth=settings.max_queue_depth,
+            memory_budget_mb=settings.memory_budget_mb,
+            memory_high_watermark_mb=settings.memory_high_watermark_mb,
+        )
+    return _controller
+
+
+def reset_admission_controller() -> None:
+    """Reset the cached admission controller. Used for testing."""
+    global _controller
+    _controller = None
@@ -0,0 +1,162 @@
+"""Per-URL stage checkpoints so interrupted pipelines resume instead of restarting.
+
+After each stage of a URL's pipeline finishes, its output is written here,
+keyed by (channel, message ts, url):
+
+- EXTRACTED: the ExtractedContent, so a retry skips the download and parsing
+- ANALYZED: the content plus the Gemini-built NotionPage and its cost, so a
+  retry skips the (paid) LLM call
+- SAVED: the Notion page exists, so a retry skips the URL entirely
+
+When an instance is drained or killed mid-message, the job's lease is released
+and the next worker -- on this or any instance sharing settings.data_dir --
+picks up each URL from its last finished stage. Checkpoints are cleared once
+the batch completes; rows left behind by jobs that never finish expire after
+settings.checkpoint_ttl_seconds.
+
+Checkpointing is best-effort: a failed write is logged and the URL continues.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+from pydantic import ValidationError
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.models.content import ExtractedContent
+from knowledge_hub.models.notion import NotionPage
+from knowledge_hub.storage import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+_CHECKPOINT_DB_FILENAME = "checkpoints.db"
+
+
+class Stage(str, Enum):
+    """Last pipeline stage that finished for a URL."""
+
+    EXTRACTED = "extracted"
+    ANALYZED = "analyzed"
+    SAVED = "saved"
+
+
+@dataclass
+class Checkpoint:
+    """Saved output of the stages completed so far."""
+
+    stage: Stage
+    content: ExtractedContent | None = None
+    page: NotionPage | None = None
+    cost_usd: float | None = None
+
+
+def checkpoint_key(channel_id: str, timestamp: str, url: str) -> str:
+    """Key a URL's checkpoint to the message it was posted in."""
+    return f"{channel_id}:{timestamp}:{url}"
+
+
+class CheckpointStore:
+    """SQLite-backed checkpoint table under settings.data_dir."""
+
+    def __init__(
+        self, filename: str = _CHECKPOINT_DB_FILENAME, ttl_seconds: float = 86400.0
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(filename)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                key TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.execute(
+            "DELETE FROM checkpoints WHERE updated_at < ?", (time.time() - ttl_seconds,)
+        )
+
+    def get(self, key: str) -> Checkpoint | None:
+        """Return the checkpoint for `key`, or None if absent, expired, or unreadable."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, data FROM checkpoints WHERE key = ? AND updated_at >= ?",
+                (key, time.time() - self._ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            data = json.loads(row[1])
+            return Checkpoint(
+                stage=Stage(row[0]),
+                content=(
+                    ExtractedContent.model_validate(data["content"]) if data["content"] else None
+                ),
+                page=NotionPage.model_validate(data["page"]) if data["page"] else None,
+                cost_usd=data["cost_usd"],
+            )
+        except (KeyError, ValueError, ValidationError):
+            logger.warning("Ignoring unreadable checkpoint for %s", key, exc_info=True)
+            return None
+
+    def save(self, key: str, checkpoint: Checkpoint) -> None:
+        """Record that `checkpoint.stage` finished. Failures are logged, not raised."""
+        try:
+            data = json.dumps(
+                {
+                    "content": checkpoint.content.model_dump(mode="json")
+                    if checkpoint.content
+                    else None,
+                    "page": checkpoint.page.model_dump(mode="json") if checkpoint.page else None,
+                    "cost_usd": checkpoint.cost_usd,
+                }
+            )
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO checkpoints (key, stage, data, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET stage = excluded.stage, "
+                    "data = excluded.data, updated_at = excluded.updated_at",
+                    (key, checkpoint.stage.value, data, time.time()),
+                )
+        except (sqlite3.Error, TypeError, ValueError, AttributeError):
+            logger.warning(
+                "Failed to checkpoint %s after %s stage", key, checkpoint.stage.value,
+                exc_info=True,
+            )
+
+    def clear(self, keys: list[str]) -> None:
+        """Drop checkpoints for URLs whose batch has finished."""
+        if not keys:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM checkpoints WHERE key = ?", [(k,) for k in keys])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: CheckpointStore | None = None
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Return the cached checkpoint store, created from settings on first call."""
+    global _store
+    if _store is None:
+        _store = CheckpointStore(ttl_seconds=get_settings().checkpoint_ttl_seconds)
+    return _store
+
+
+def reset_checkpoint_store() -> None:
+    """Close and reset the cached checkpoint store. Used for testing."""
+    global _store
+    if _store is not None:
+        _store.close()
+    _store = None
@@ -0,0 +1,83 @@
+"""In-flight request coalescing for identical URLs.
+
+When the same article is posted twice in quick succession, or twice in one
+message, only the first copy runs extraction, Gemini, and the Notion write.
+Later copies find the first one in the registry (keyed by
+canonical.dedup_key, so youtu.be and youtube.com links to one video meet),
+await its result, and report it as a duplicate -- so the same Gemini call is
+never paid for twice.
+
+Only successful results are shared. If the first copy fails or is cancelled,
+waiting copies run the work themselves, one at a time.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from knowledge_hub.canonical import dedup_key
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class InFlightRegistry:
+    """Maps normalized URLs to the future of the run currently processing them."""
+
+    def __init__(self) -> None:
+        self._running: dict[str, asyncio.Future] = {}
+        self.coalesced_total = 0
+
+    def key(self, url: str) -> str:
+        """Registry key for `url` (falls back to the raw URL if it cannot be canonicalized)."""
+        try:
+            return dedup_key(url)
+        except Exception:
+            return url
+
+    async def run(self, url: str, work: Callable[[], Awaitable[T | None]]) -> tuple[bool, T | None]:
+        """Run `work` unless the same URL is already in flight.
+
+        Returns (leader, result): leader is True if this call ran `work`,
+        False if it reused the result of a concurrent run. `work` returning
+        None or raising marks the run as failed; its result is not shared.
+        """
+        key = self.key(url)
+        while (running := self._running.get(key)) is not None:
+            result = await asyncio.shield(running)
+            if result is not None:
+                self.coalesced_total += 1
+                logger.info("Reusing in-flight result for %s", url)
+                return False, result
+
+        future = asyncio.get_running_loop().create_future()
+        self._running[key] = future
+        result = None
+        try:
+            result = await work()
+            return True, result
+        finally:
+            del self._running[key]
+            future.set_result(result)
+
+    def __len__(self) -> int:
+        return len(self._running)
+
+
+_registry: InFlightRegistry | None = None
+
+
+def get_inflight_registry() -> InFlightRegistry:
+    """Return the process-wide in-flight registry."""
+    global _registry
+    if _registry is None:
+        _registry = InFlightRegistry()
+    return _registry
+
+
+def reset_inflight_registry() -> None:
+    """Reset the in-flight registry. Used for testing."""
+    global _registry
+    _registry = None
@@ -0,0 +1,97 @@
+"""Priority lanes and cost estimates for pipeline scheduling.
+
+Every job belongs to a lane:
+- INTERACTIVE: links posted in Slack (the first batch of each message)
+- BULK: follow-up batches of long messages, imports, backfills, reprocessing
+
+Workers lease across lanes by weighted fair share (settings.*_lane_weight) and
+the Gemini/Notion stage limiters split their capacity the same way, so a
+300-link import gets its share without ever queueing ahead of a single posted
+link. Within a lane, work is ordered shortest-job-first by estimated cost,
+measured in words of text sent to Gemini.
+
+The lane of the job a coroutine is serving is carried in the current_lane
+context variable, set by the worker before it runs the job handler.
+"""
+
+from contextvars import ContextVar
+
+from knowledge_hub.config import Settings
+from knowledge_hub.extraction.router import detect_content_type
+from knowledge_hub.models.content import ContentType, ExtractedContent
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+current_lane: ContextVar[str] = ContextVar("pipeline_lane", default=INTERACTIVE)
+
+# Typical size of content whose length is not known yet, in words
+_DEFAULT_WORDS: dict[ContentType, int] = {
+    ContentType.PDF: 8000,
+    ContentType.VIDEO: 2000,
+    ContentType.PODCAST: 2000,
+}
+_DEFAULT_WORDS_FALLBACK = 1500
+
+# Speaking rate used to size a video or podcast from its duration
+_SPOKEN_WORDS_PER_SECOND = 2.5
+
+
+def lane_weights(settings: Settings) -> dict[str, int]:
+    """Relative share of workers and stage capacity each lane gets under contention."""
+    return {
+        INTERACTIVE: max(1, settings.interactive_lane_weight),
+        BULK: max(1, settings.bulk_lane_weight),
+    }
+
+
+def estimate_cost(
+    content_type: ContentType,
+    word_count: int | None = None,
+    duration_seconds: int | None = None,
+) -> float:
+    """Estimated processing cost in words, from whatever is known about the content."""
+    if word_count:
+        return float(word_count)
+    if duration_seconds:
+        return duration_seconds * _SPOKEN_WORDS_PER_SECOND
+    return float(_DEFAULT_WORDS.get(content_type, _DEFAULT_WORDS_FALLBACK))
+
+
+def estimate_content_cost(content: ExtractedContent) -> float:
+    """Estimated Gemini cost of extracted content (word count, else video duration)."""
+    return estimate_cost(content.content_type, content.word_count, content.duration_seconds)
+
+
+def estimate_urls_cost(urls: list[str]) -> float:
+    """Estimated cost of a job before extraction, from the URLs' content types."""
+    return sum(estimate_cost(detect_content_type(url)) for url in urls)
+
+
+class FairShare:
+    """Start-time fair queueing across weighted lanes.
+
+    Each lane has a virtual finish time that advances by units/weight every
+    time it is served; the lane with the earliest start time goes next. A lane
+    returning from idle starts at the current virtual clock, so it cannot
+    claim credit for the time it had no work.
+    """
+
+    def __init__(self, weights: dict[str, int]) -> None:
+        self._weights = weights
+        self._finish: dict[str, float] = {}
+        self._clock = 0.0
+
+    def _start(self, lane: str) -> float:
+        return max(self._finish.get(lane, 0.0), self._clock)
+
+    def order(self, lanes: list[str]) -> list[str]:
+        """Return lanes in the order they should be served."""
+        return sorted(lanes, key=self._start)
+
+    def charge(self, lane: str, units: float = 1.0) -> None:
+        """Record that `lane` was served."""
+        start = self._start(lane)
+        self._clock = start
+        self._finish[lane] = start + units / self._weights.get(lane, 1)
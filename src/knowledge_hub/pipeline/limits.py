@@ -0,0 +1,141 @@
+"""Per-stage concurrency limits shared by every pipeline run in the process.
+
+process_message_urls fans a message's URLs out concurrently, but each stage
+has its own ceiling so that, for example, eight extractions can download in
+parallel while at most three Gemini calls and two Notion writes run at once
+(Notion's API allows ~3 requests/second per integration).
+
+The Gemini and Notion limits are FairLimiters: when callers queue for a slot,
+freed slots go to lanes by weighted fair share (see pipeline.lanes) and, within
+a lane, to the cheapest waiting item first.
+"""
+
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.pipeline.lanes import FairShare, current_lane, lane_weights
+
+
+class FairLimiter:
+    """Semaphore-like limiter granting slots by lane fair share, then lowest cost.
+
+    `async with limiter:` takes a slot for the current lane at zero cost;
+    `async with limiter.slot(cost):` orders the wait by estimated cost.
+    """
+
+    def __init__(self, capacity: int, weights: dict[str, int]) -> None:
+        self.capacity = capacity
+        self._in_use = 0
+        self._share = FairShare(weights)
+        self._waiters: dict[str, list[tuple[float, int, asyncio.Future]]] = {}
+        self._seq = itertools.count()
+        self._granted: dict[str, int] = {}
+
+    async def acquire(self, cost: float = 0.0, lane: str | None = None) -> None:
+        """Wait for a slot. Uncontended acquires never queue."""
+        lane = lane or current_lane.get()
+        if self._in_use < self.capacity and not any(self._waiters.values()):
+            self._grant(lane)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (cost, next(self._seq), future)
+        heapq.heappush(self._waiters.setdefault(lane, []), entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot on
+                self.release()
+            elif entry in self._waiters[lane]:
+                self._waiters[lane].remove(entry)
+                heapq.heapify(self._waiters[lane])
+            raise
+
+    def release(self) -> None:
+        """Return a slot and hand it to the next waiter, if any."""
+        self._in_use -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, cost: float = 0.0):
+        """Hold a slot for the duration of the block, queueing by `cost`."""
+        await self.acquire(cost)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+    def _grant(self, lane: str) -> None:
+        self._in_use += 1
+        self._share.charge(lane)
+        self._granted[lane] = self._granted.get(lane, 0) + 1
+
+    def _wake(self) -> None:
+        while self._in_use < self.capacity:
+            backlogged = [lane for lane, heap in self._waiters.items() if heap]
+            if not backlogged:
+                return
+            lane = self._share.order(backlogged)[0]
+            _, _, future = heapq.heappop(self._waiters[lane])
+            if future.done():
+                continue  # cancelled while queued; its acquire() is unwinding
+            self._grant(lane)
+            future.set_result(None)
+
+    def snapshot(self) -> dict:
+        """Slots in use and per-lane waiting/granted counts."""
+        return {
+            "capacity": self.capacity,
+            "in_use": self._in_use,
+            "waiting": {lane: len(heap) for lane, heap in self._waiters.items()},
+            "granted": dict(self._granted),
+        }
+
+
+@dataclass
+class StageLimits:
+    """Limiters bounding each pipeline stage, plus the per-message URL fan-out."""
+
+    url_concurrency: int
+    extract: asyncio.Semaphore
+    llm: FairLimiter
+    notion: FairLimiter
+
+    def snapshot(self) -> dict:
+        """Per-stage limiter state for the /metrics endpoint."""
+        return {"llm": self.llm.snapshot(), "notion": self.notion.snapshot()}
+
+
+_limits: StageLimits | None = None
+
+
+def get_stage_limits() -> StageLimits:
+    """Return the cached stage limits, created from settings on first call."""
+    global _limits
+    if _limits is None:
+        settings = get_settings()
+        weights = lane_weights(settings)
+        _limits = StageLimits(
+            url_concurrency=max(1, settings.url_concurrency),
+            extract=asyncio.Semaphore(max(1, settings.extract_concurrency)),
+            llm=FairLimiter(max(1, settings.llm_concurrency), weights),
+            notion=FairLimiter(max(1, settings.notion_concurrency), weights),
+        )
+    return _limits
+
+
+def reset_stage_limits() -> None:
+    """Reset the cached stage limits. Used for testing."""
+    global _limits
+    _limits = None
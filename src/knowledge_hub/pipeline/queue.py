@@ -0,0 +1,421 @@
+"""Durable job queue with enqueue/lease/ack semantics.
+
+Jobs survive instance restarts: the webhook ack path performs a single insert,
+and workers lease jobs with a visibility timeout. A job whose worker dies
+(OOM, deploy, instance recycle) becomes visible again once its lease expires
+and is picked up by the next worker. Jobs that keep failing are moved to a
+dead state after settings.queue_max_attempts leases. That includes jobs whose
+worker keeps dying: a job whose last allowed lease expired is buried by the
+next lease() instead of being handed out again, so a document that crashes
+the instance cannot take it down forever.
+
+Each job carries a lane (see pipeline.lanes) and an estimated cost. lease()
+takes one lane at a time and returns its cheapest visible job first, aged by
+_AGING_WORDS_PER_SECOND so that an expensive job is not starved by a steady
+stream of cheap ones.
+
+Two backends share the JobQueue interface:
+- SQLiteJobQueue: WAL-mode SQLite file under settings.data_dir (default)
+- MemoryJobQueue: process-local, non-durable (tests and local development)
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.pipeline.lanes import INTERACTIVE
+from knowledge_hub.storage import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+_QUEUE_DB_FILENAME = "queue.db"
+
+# Each second spent waiting discounts a job's estimated cost by this many words
+_AGING_WORDS_PER_SECOND = 50.0
+
+
+@dataclass
+class Job:
+    """A leased unit of work. lease_id fences ack/nack against expired leases."""
+
+    id: str
+    kind: str
+    payload: dict
+    attempts: int
+    lease_id: str
+    lane: str = INTERACTIVE
+
+
+class JobQueue(ABC):
+    """Interface shared by all queue backends."""
+
+    def __init__(self, max_attempts: int = 3) -> None:
+        self.max_attempts = max_attempts
+        self._listeners: list[Callable[[], None]] = []
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """Register a callback invoked after every enqueue (wakes idle workers)."""
+        self._listeners.append(callback)
+
+    def _notify(self) -> None:
+        for callback in self._listeners:
+            callback()
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict,
+        delay: float = 0.0,
+        *,
+        lane: str = INTERACTIVE,
+        cost: float = 0.0,
+    ) -> str:
+        """Persist a new job and return its ID. Visible after `delay` seconds."""
+        job_id = uuid.uuid4().hex
+        self._insert(job_id, kind, json.dumps(payload), time.time() + delay, lane, cost)
+        self._notify()
+        return job_id
+
+    @abstractmethod
+    def _insert(
+        self, job_id: str, kind: str, payload: str, available_at: float, lane: str, cost: float
+    ) -> None: ...
+
+    @abstractmethod
+    def lease(self, visibility_timeout: float, lane: str | None = None) -> Job | None:
+        """Lease the next visible job, hiding it for visibility_timeout seconds.
+
+        With `lane`, only that lane's jobs are considered. Jobs are ordered
+        cheapest first, aged by time spent waiting.
+        """
+
+    @abstractmethod
+    def extend(self, job: Job, visibility_timeout: float) -> bool:
+        """Push the lease deadline out. Returns False if the lease was lost."""
+
+    @abstractmethod
+    def ack(self, job: Job) -> None:
+        """Delete a completed job."""
+
+    @abstractmethod
+    def nack(self, job: Job, delay: float = 0.0) -> None:
+        """Release a failed job for retry after `delay`, or bury it if out of attempts."""
+
+    @abstractmethod
+    def release(self, job: Job) -> None:
+        """Return an interrupted job to the queue now, without counting the attempt."""
+
+    @abstractmethod
+    def depth(self) -> int:
+        """Number of pending (ready, delayed, or leased) jobs."""
+
+    @abstractmethod
+    def depth_by_lane(self) -> dict[str, int]:
+        """Number of pending jobs in each non-empty lane."""
+
+    def close(self) -> None:
+        """Release backend resources."""
+
+
+class SQLiteJobQueue(JobQueue):
+    """Job queue stored in a WAL-mode SQLite database.
+
+    Leasing is a single UPDATE ... RETURNING statement, so it is atomic across
+    threads, workers, and processes sharing the same file.
+    """
+
+    def __init__(self, filename: str = _QUEUE_DB_FILENAME, max_attempts: int = 3) -> None:
+        super().__init__(max_attempts=max_attempts)
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(filename)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                lease_id TEXT,
+                created_at REAL NOT NULL,
+                lane TEXT NOT NULL DEFAULT 'interactive',
+                cost REAL NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+            """
+        )
+        # Queue files written before lanes existed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "lane" not in columns:
+            self._conn.execute(
+                "ALTER TABLE jobs ADD COLUMN lane TEXT NOT NULL DEFAULT 'interactive'"
+            )
+        if "cost" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN cost REAL NOT NULL DEFAULT 0")
+
+    def _insert(
+        self, job_id: str, kind: str, payload: str, available_at: float, lane: str, cost: float
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, available_at, created_at, lane, cost) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, payload, available_at, time.time(), lane, cost),
+            )
+
+    def lease(self, visibility_timeout: float, lane: str | None = None) -> Job | None:
+        now = time.time()
+        lease_id = uuid.uuid4().hex
+        with self._lock:
+            # Out of attempts with the last lease expired: its worker died with it
+            buried = self._conn.execute(
+                "UPDATE jobs SET status = 'dead', lease_id = NULL "
+                "WHERE status = 'pending' AND available_at <= ? AND attempts >= ? "
+                "RETURNING id, kind, attempts",
+                (now, self.max_attempts),
+            ).fetchall()
+            for job_id, kind, attempts in buried:
+                _log_expired(job_id, kind, attempts)
+            # cost - (now - created_at) * rate orders the same as cost + created_at * rate
+            row = self._conn.execute(
+                """
+                UPDATE jobs
+                SET available_at = ?, attempts = attempts + 1, lease_id = ?
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = 'pending' AND available_at <= ?
+                      AND (? IS NULL OR lane = ?)
+                    ORDER BY cost + created_at * ?, created_at
+                    LIMIT 1
+                )
+                RETURNING id, kind, payload, attempts, lane
+                """,
+                (now + visibility_timeout, lease_id, now, lane, lane, _AGING_WORDS_PER_SECOND),
+            ).fetchone()
+        if row is None:
+            return None
+        return Job(
+            id=row[0],
+            kind=row[1],
+            payload=json.loads(row[2]),
+            attempts=row[3],
+            lease_id=lease_id,
+            lane=row[4],
+        )
+
+    def extend(self, job: Job, visibility_timeout: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET available_at = ? WHERE id = ? AND lease_id = ?",
+                (time.time() + visibility_timeout, job.id, job.lease_id),
+            )
+        return cursor.rowcount == 1
+
+    def ack(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE id = ? AND lease_id = ?", (job.id, job.lease_id)
+            )
+
+    def nack(self, job: Job, delay: float = 0.0) -> None:
+        with self._lock:
+            if job.attempts >= self.max_attempts:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'dead', lease_id = NULL "
+                    "WHERE id = ? AND lease_id = ?",
+                    (job.id, job.lease_id),
+                )
+                logger.error("Job %s (%s) moved to dead state after %d attempts",
+                             job.id, job.kind, job.attempts)
+                return
+            self._conn.execute(
+                "UPDATE jobs SET available_at = ?, lease_id = NULL WHERE id = ? AND lease_id = ?",
+                (time.time() + delay, job.id, job.lease_id),
+            )
+        self._notify()
+
+    def release(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET available_at = ?, attempts = attempts - 1, lease_id = NULL "
+                "WHERE id = ? AND lease_id = ?",
+                (time.time(), job.id, job.lease_id),
+            )
+        self._notify()
+
+    def depth(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'pending'"
+            ).fetchone()
+        return row[0]
+
+    def depth_by_lane(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT lane, COUNT(*) FROM jobs WHERE status = 'pending' GROUP BY lane"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _log_expired(job_id: str, kind: str, attempts: int) -> None:
+    logger.error(
+        "Job %s (%s) moved to dead state: its last of %d leases expired unfinished",
+        job_id,
+        kind,
+        attempts,
+    )
+
+
+@dataclass
+class _MemoryRecord:
+    kind: str
+    payload: str
+    available_at: float
+    created_at: float
+    lane: str = INTERACTIVE
+    cost: float = 0.0
+    attempts: int = 0
+    lease_id: str | None = None
+    dead: bool = False
+
+
+class MemoryJobQueue(JobQueue):
+    """Process-local job queue with the same semantics as SQLiteJobQueue (not durable)."""
+
+    def __init__(self, max_attempts: int = 3) -> None:
+        super().__init__(max_attempts=max_attempts)
+        self._jobs: dict[str, _MemoryRecord] = {}
+
+    def _insert(
+        self, job_id: str, kind: str, payload: str, available_at: float, lane: str, cost: float
+    ) -> None:
+        self._jobs[job_id] = _MemoryRecord(
+            kind=kind,
+            payload=payload,
+            available_at=available_at,
+            created_at=time.time(),
+            lane=lane,
+            cost=cost,
+        )
+
+    def lease(self, visibility_timeout: float, lane: str | None = None) -> Job | None:
+        now = time.time()
+        for job_id, rec in self._jobs.items():
+            if not rec.dead and rec.available_at <= now and rec.attempts >= self.max_attempts:
+                # Out of attempts with the last lease expired: its worker died with it
+                rec.dead = True
+                rec.lease_id = None
+                _log_expired(job_id, rec.kind, rec.attempts)
+        ready = [
+            (job_id, rec)
+            for job_id, rec in self._jobs.items()
+            if not rec.dead and rec.available_at <= now and lane in (None, rec.lane)
+        ]
+        if not ready:
+            return None
+        job_id, rec = min(
+            ready,
+            key=lambda item: (
+                item[1].cost + item[1].created_at * _AGING_WORDS_PER_SECOND,
+                item[1].created_at,
+            ),
+        )
+        rec.attempts += 1
+        rec.available_at = now + visibility_timeout
+        rec.lease_id = uuid.uuid4().hex
+        return Job(
+            id=job_id,
+            kind=rec.kind,
+            payload=json.loads(rec.payload),
+            attempts=rec.attempts,
+            lease_id=rec.lease_id,
+            lane=rec.lane,
+        )
+
+    def _owned(self, job: Job) -> _MemoryRecord | None:
+        rec = self._jobs.get(job.id)
+        if rec is None or rec.lease_id != job.lease_id:
+            return None
+        return rec
+
+    def extend(self, job: Job, visibility_timeout: float) -> bool:
+        rec = self._owned(job)
+        if rec is None:
+            return False
+        rec.available_at = time.time() + visibility_timeout
+        return True
+
+    def ack(self, job: Job) -> None:
+        if self._owned(job) is not None:
+            del self._jobs[job.id]
+
+    def nack(self, job: Job, delay: float = 0.0) -> None:
+        rec = self._owned(job)
+        if rec is None:
+            return
+        rec.lease_id = None
+        if job.attempts >= self.max_attempts:
+            rec.dead = True
+            logger.error("Job %s (%s) moved to dead state after %d attempts",
+                         job.id, job.kind, job.attempts)
+            return
+        rec.available_at = time.time() + delay
+        self._notify()
+
+    def release(self, job: Job) -> None:
+        rec = self._owned(job)
+        if rec is None:
+            return
+        rec.lease_id = None
+        rec.attempts -= 1
+        rec.available_at = time.time()
+        self._notify()
+
+    def depth(self) -> int:
+        return sum(1 for rec in self._jobs.values() if not rec.dead)
+
+    def depth_by_lane(self) -> dict[str, int]:
+        depths: dict[str, int] = {}
+        for rec in self._jobs.values():
+            if not rec.dead:
+                depths[rec.lane] = depths.get(rec.lane, 0) + 1
+        return depths
+
+
+_queue: JobQueue | None = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the cached job queue for the configured backend.
+
+    Creates the queue on first call using queue_backend from settings.
+    Subsequent calls return the cached instance.
+    """
+    global _queue
+    if _queue is None:
+        settings = get_settings()
+        if settings.queue_backend == "memory":
+            _queue = MemoryJobQueue(max_attempts=settings.queue_max_attempts)
+        else:
+            _queue = SQLiteJobQueue(max_attempts=settings.queue_max_attempts)
+    return _queue
+
+
+def reset_queue() -> None:
+    """Close and reset the cached queue instance. Used for testing."""
+    global _queue
+    if _queue is not None:
+        _queue.close()
+    _queue = None
@@ -0,0 +1,77 @@
+"""The stages one URL goes through: extract, duplicate check, Gemini, Notion.
+
+Slack messages and imports run the same stages under the shared stage
+limits; they differ only in what they do around them. The Slack handler
+checkpoints each finished stage so a retried job resumes after it, which
+is what the `checkpoint` / `save_checkpoint` hooks are for. The importer
+journals outcomes instead and passes neither.
+"""
+
+from collections.abc import Callable
+
+from google import genai
+
+from knowledge_hub.extraction import extract_content
+from knowledge_hub.llm import process_content
+from knowledge_hub.models.content import ExtractionStatus
+from knowledge_hub.notion import check_duplicate, create_notion_page
+from knowledge_hub.notion.models import DuplicateResult, PageResult
+from knowledge_hub.pipeline.checkpoints import Checkpoint, Stage
+from knowledge_hub.pipeline.lanes import estimate_content_cost
+from knowledge_hub.pipeline.limits import StageLimits
+
+
+async def run_stages(
+    gemini_client: genai.Client,
+    limits: StageLimits,
+    url: str,
+    user_note: str | None,
+    checkpoint: Checkpoint | None = None,
+    save_checkpoint: Callable[[Checkpoint], None] | None = None,
+) -> tuple[PageResult | DuplicateResult, float] | None:
+    """Extract, analyze, and save one URL, resuming after `checkpoint` if given.
+
+    `save_checkpoint` is called with each stage's output as it finishes.
+    Returns the Notion result and the Gemini cost (0.0 when Gemini was
+    skipped for an already saved page), or None if extraction failed.
+    """
+
+    def save(checkpoint: Checkpoint) -> None:
+        if save_checkpoint is not None:
+            save_checkpoint(checkpoint)
+
+    # Stage 1: Extract content
+    if checkpoint is None:
+        async with limits.extract:
+            content = await extract_content(url)
+        if content.extraction_status == ExtractionStatus.FAILED:
+            return None
+
+        # Pass user_note through to content for LLM prompt
+        content.user_note = user_note
+        checkpoint = Checkpoint(Stage.EXTRACTED, content=content)
+        save(checkpoint)
+    content = checkpoint.content
+
+    # Stage 2: LLM processing (shortest content first when Gemini is contended)
+    if checkpoint.stage == Stage.EXTRACTED:
+        # Another URL form of this page may already be saved; then skip Gemini
+        async with limits.notion:
+            duplicate = await check_duplicate(content.url, content.canonical_url)
+        if duplicate is not None:
+            save(Checkpoint(Stage.SAVED))
+            return duplicate, 0.0
+
+        async with limits.llm.slot(estimate_content_cost(content)):
+            notion_page, cost_usd = await process_content(gemini_client, content)
+        checkpoint = Checkpoint(
+            Stage.ANALYZED, content=content, page=notion_page, cost_usd=cost_usd
+        )
+        save(checkpoint)
+    notion_page, cost_usd = checkpoint.page, checkpoint.cost_usd or 0.0
+
+    # Stage 3: Notion page creation
+    async with limits.notion:
+        result = await create_notion_page(notion_page)
+    save(Checkpoint(Stage.SAVED))
+    return result, cost_usd
@@ -0,0 +1,176 @@
+"""Worker pool draining the job queue with bounded concurrency.
+
+The pool runs a fixed number of worker coroutines, so a burst of enqueued
+messages is processed at most `concurrency` at a time instead of piling up as
+unbounded background coroutines. With an AdmissionController attached,
+workers also hold off leasing while the memory budget is exhausted, leaving
+excess work in the queue. Each running job's lease is extended by a
+heartbeat so long pipelines (e.g. Gemini video transcription) are not handed
+to a second worker while still in progress.
+
+Workers pick the lane to lease from by weighted fair share, falling through
+to the next lane when one is empty. Non-interactive lanes may never occupy the
+last `reserved_interactive` workers, so a posted link always finds a free
+worker even while a large import is running.
+
+On shutdown, drain() stops leasing, gives running jobs a grace period to
+finish, then cancels the rest and releases their leases so another instance
+can resume them (from their per-URL checkpoints) without waiting out the
+visibility timeout.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from knowledge_hub.pipeline.admission import AdmissionController
+from knowledge_hub.pipeline.lanes import INTERACTIVE, FairShare, current_lane
+from knowledge_hub.pipeline.queue import Job, JobQueue
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+# Retry delay after a handler failure: base * 2^(attempt - 1), capped
+_RETRY_BASE_DELAY = 30.0
+_RETRY_MAX_DELAY = 900.0
+
+
+class WorkerPool:
+    """Lease jobs from a queue and dispatch them to handlers by job kind."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: dict[str, JobHandler],
+        *,
+        concurrency: int,
+        visibility_timeout: float,
+        poll_interval: float = 1.0,
+        admission: AdmissionController | None = None,
+        lane_weights: dict[str, int] | None = None,
+        reserved_interactive: int = 0,
+    ) -> None:
+        self._queue = queue
+        self._handlers = handlers
+        self._concurrency = concurrency
+        self._visibility_timeout = visibility_timeout
+        self._poll_interval = poll_interval
+        self._admission = admission
+        self._lane_weights = lane_weights or {INTERACTIVE: 1}
+        self._share = FairShare(self._lane_weights)
+        # With a single worker there is nothing to reserve
+        self._background_capacity = max(1, concurrency - reserved_interactive)
+        self._running: dict[str, int] = {}
+        self._draining = False
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        queue.subscribe(self._wakeup.set)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Spawn the worker coroutines on the running event loop."""
+        for n in range(self._concurrency):
+            self._tasks.append(asyncio.create_task(self._worker_loop(), name=f"job-worker-{n}"))
+        logger.info("Started %d job worker(s)", self._concurrency)
+
+    async def drain(self, grace_period: float) -> None:
+        """Stop leasing and wait up to grace_period for running jobs, then cancel them.
+
+        Cancelled jobs are released back to the queue immediately.
+        """
+        self._draining = True
+        self._wakeup.set()
+        if self._tasks:
+            _, unfinished = await asyncio.wait(self._tasks, timeout=grace_period)
+            if unfinished:
+                logger.warning(
+                    "Shutdown grace period of %.0fs expired, interrupting %d job(s)",
+                    grace_period,
+                    len(unfinished),
+                )
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def stop(self) -> None:
+        """Cancel all workers immediately. Interrupted jobs are released for retry."""
+        await self.drain(grace_period=0)
+
+    async def _worker_loop(self) -> None:
+        while not self._draining:
+            if self._admission is not None:
+                await self._admission.wait_for_capacity()
+                if self._draining:
+                    return
+            job = self._lease()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+                except TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    def _lease(self) -> Job | None:
+        """Lease from the lane whose fair share is furthest behind, if it has work."""
+        background = sum(n for lane, n in self._running.items() if lane != INTERACTIVE)
+        for lane in self._share.order(list(self._lane_weights)):
+            if lane != INTERACTIVE and background >= self._background_capacity:
+                continue
+            job = self._queue.lease(self._visibility_timeout, lane=lane)
+            if job is not None:
+                self._share.charge(lane)
+                return job
+        return None
+
+    async def _run(self, job: Job) -> None:
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            logger.error("No handler registered for job kind %r, dropping job %s", job.kind, job.id)
+            self._queue.ack(job)
+            return
+
+        urls = job.payload.get("urls", [])
+        reservation = self._admission.reserve(urls) if self._admission is not None else 0
+        self._running[job.lane] = self._running.get(job.lane, 0) + 1
+        lane_token = current_lane.set(job.lane)
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await handler(job.payload)
+        except asyncio.CancelledError:
+            logger.info("Job %s (%s) interrupted, releasing it for retry", job.id, job.kind)
+            self._queue.release(job)
+            raise
+        except Exception:
+            delay = min(_RETRY_BASE_DELAY * 2 ** (job.attempts - 1), _RETRY_MAX_DELAY)
+            logger.error(
+                "Job %s (%s) failed on attempt %d, retrying in %.0fs",
+                job.id,
+                job.kind,
+                job.attempts,
+                delay,
+                exc_info=True,
+            )
+            self._queue.nack(job, delay=delay)
+        else:
+            self._queue.ack(job)
+        finally:
+            heartbeat.cancel()
+            current_lane.reset(lane_token)
+            self._running[job.lane] -= 1
+            if self._admission is not None:
+                self._admission.release(urls, reservation)
+
+    async def _heartbeat(self, job: Job) -> None:
+        """Extend the job's lease every third of the visibility timeout."""
+        while True:
+            await asyncio.sleep(self._visibility_timeout / 3)
+            if not self._queue.extend(job, self._visibility_timeout):
+                logger.warning("Lost lease on job %s (%s)", job.id, job.kind)
+                return
@@ -0,0 +1,309 @@
+"""Shared state that every worker process and instance must agree on.
+
+Cost accumulators, Slack dedup keys, and Notion schema caches used to live in
+module globals, so with several uvicorn workers or Cloud Run instances each
+process counted its own costs and warmed its own caches. They now go through
+a SharedState backend chosen by settings.shared_state_backend:
+
+- "sqlite" (default): state.db under settings.data_dir (WAL mode). Shared by
+  every process on the host, or on a shared volume.
+- "memory": per-process dict (tests, single-process runs).
+- "redis": a Redis server at settings.shared_state_url, shared by every
+  instance. Requires the optional `redis` package.
+
+Further backends can be added with register_backend(). Every operation is
+atomic in each backend: counters are incremented in place and claims are
+all-or-nothing, so scaling out does not change results.
+
+Values are JSON-serializable; keys are plain strings namespaced by caller
+(e.g. "cost:daily", "notion:valid_tags").
+
+Operations are synchronous. Async code calls them through
+`await state.run(fn, *args)`: the local backends answer inline, while the
+Redis backend runs the call in the network executor so a round trip to the
+server never blocks the event loop (the Slack ack path claims dedup keys).
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import Any
+
+from knowledge_hub.config import Settings, get_settings
+from knowledge_hub.executors import NETWORK, get_executor
+from knowledge_hub.storage import open_sqlite
+
+_STATE_DB_FILENAME = "state.db"
+
+# Purge expired rows from the SQLite backend every N writes
+_PURGE_EVERY = 500
+
+
+class SharedState(ABC):
+    """Key-value store with atomic counters and all-or-nothing claims."""
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        """Return the value stored at `key`, or None if absent or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store `value` at `key`, expiring after `ttl` seconds if given."""
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        """Remove keys (missing keys are ignored)."""
+
+    @abstractmethod
+    def incr(self, key: str, amount: float = 1.0, ttl: float | None = None) -> float:
+        """Atomically add `amount` to the number at `key` (0 if absent). Returns the total.
+
+        `ttl` applies when the counter is created; later increments keep its expiry.
+        """
+
+    @abstractmethod
+    def claim(self, keys: list[str], ttl: float) -> bool:
+        """Set every key for `ttl` seconds only if none is already set. Returns True if set."""
+
+    async def run[T](self, fn: Callable[..., T], *args: Any) -> T:
+        """Call `fn(*args)` (this backend's operations) from async code.
+
+        Local backends answer in microseconds, so the call runs inline.
+        """
+        return fn(*args)
+
+    def close(self) -> None:
+        """Release connections held by the backend."""
+
+
+class MemorySharedState(SharedState):
+    """Per-process backend: a dict of (value, expires_at)."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[Any, float | None]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str, now: float) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > now)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            return self._data[key][0] if self._live(key, time.time()) else None
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (json.loads(json.dumps(value)), expires_at)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def incr(self, key: str, amount: float = 1.0, ttl: float | None = None) -> float:
+        with self._lock:
+            now = time.time()
+            if self._live(key, now):
+                current, expires_at = self._data[key]
+            else:
+                current, expires_at = 0, now + ttl if ttl is not None else None
+            total = current + amount
+            self._data[key] = (total, expires_at)
+            return total
+
+    def claim(self, keys: list[str], ttl: float) -> bool:
+        with self._lock:
+            now = time.time()
+            if any(self._live(key, now) for key in keys):
+                return False
+            for key in keys:
+                self._data[key] = (True, now + ttl)
+            return True
+
+
+class SQLiteSharedState(SharedState):
+    """Host-wide backend: one table in state.db under settings.data_dir."""
+
+    def __init__(self, filename: str = _STATE_DB_FILENAME) -> None:
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = open_sqlite(filename)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            self._wrote()
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM state WHERE key = ?", [(key,) for key in keys])
+
+    def incr(self, key: str, amount: float = 1.0, ttl: float | None = None) -> float:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            # One statement, so concurrent processes never lose an increment
+            row = self._conn.execute(
+                "INSERT INTO state (key, value, expires_at) VALUES (:key, :amount, :expires_at) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "value = CASE WHEN state.expires_at <= :now THEN excluded.value "
+                "ELSE CAST(state.value AS REAL) + excluded.value END, "
+                "expires_at = CASE WHEN state.expires_at <= :now THEN excluded.expires_at "
+                "ELSE state.expires_at END "
+                "RETURNING value",
+                {"key": key, "amount": amount, "expires_at": expires_at, "now": now},
+            ).fetchone()
+        return float(row[0])
+
+    def claim(self, keys: list[str], ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key in keys:
+                    # Inserts a new key or revives an expired one; a live key is left alone
+                    cursor = self._conn.execute(
+                        "INSERT INTO state (key, value, expires_at) VALUES (?, 'true', ?) "
+                        "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                        "expires_at = excluded.expires_at "
+                        "WHERE state.expires_at IS NOT NULL AND state.expires_at <= ?",
+                        (key, now + ttl, now),
+                    )
+                    if cursor.rowcount == 0:
+                        self._conn.execute("ROLLBACK")
+                        return False
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._wrote()
+        return True
+
+    def _wrote(self) -> None:
+        self._writes += 1
+        if self._writes % _PURGE_EVERY == 0:
+            self._conn.execute("DELETE FROM state WHERE expires_at <= ?", (time.time(),))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# KEYS are claimed only if none exists; ARGV[1] is the TTL in milliseconds
+_REDIS_CLAIM_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then return 0 end
+end
+for _, key in ipairs(KEYS) do
+    redis.call('SET', key, 'true', 'PX', ARGV[1])
+end
+return 1
+"""
+
+# A new counter gets its TTL (ARGV[2] milliseconds) before the first increment;
+# INCRBYFLOAT keeps an existing key's TTL
+_REDIS_INCR_SCRIPT = """
+redis.call('SET', KEYS[1], 0, 'PX', ARGV[2], 'NX')
+return redis.call('INCRBYFLOAT', KEYS[1], ARGV[1])
+"""
+
+
+class RedisSharedState(SharedState):
+    """Cross-instance backend on a Redis server (optional `redis` dependency)."""
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "SHARED_STATE_BACKEND=redis requires the 'redis' package (pip install redis)"
+            ) from exc
+        if not url:
+            raise RuntimeError("SHARED_STATE_BACKEND=redis requires SHARED_STATE_URL")
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._claim = self._redis.register_script(_REDIS_CLAIM_SCRIPT)
+        self._incr = self._redis.register_script(_REDIS_INCR_SCRIPT)
+
+    def get(self, key: str) -> Any | None:
+        value = self._redis.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        px = max(1, int(ttl * 1000)) if ttl is not None else None
+        self._redis.set(key, json.dumps(value), px=px)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._redis.delete(*keys)
+
+    def incr(self, key: str, amount: float = 1.0, ttl: float | None = None) -> float:
+        if ttl is None:
+            return float(self._redis.incrbyfloat(key, amount))
+        return float(self._incr(keys=[key], args=[amount, max(1, int(ttl * 1000))]))
+
+    def claim(self, keys: list[str], ttl: float) -> bool:
+        return bool(self._claim(keys=keys, args=[max(1, int(ttl * 1000))]))
+
+    async def run[T](self, fn: Callable[..., T], *args: Any) -> T:
+        """Call `fn(*args)` in the network executor; each operation is a server round trip."""
+        return await get_executor(NETWORK).run(fn, *args)
+
+    def close(self) -> None:
+        self._redis.close()
+
+
+_BACKENDS: dict[str, Callable[[Settings], SharedState]] = {
+    "sqlite": lambda settings: SQLiteSharedState(),
+    "memory": lambda settings: MemorySharedState(),
+    "redis": lambda settings: RedisSharedState(settings.shared_state_url),
+}
+
+
+def register_backend(name: str, factory: Callable[[Settings], SharedState]) -> None:
+    """Make a SharedState implementation selectable as SHARED_STATE_BACKEND=name."""
+    _BACKENDS[name] = factory
+
+
+_state: SharedState | None = None
+
+
+def get_shared_state() -> SharedState:
+    """Return the cached shared state for the configured backend."""
+    global _state
+    if _state is None:
+        settings = get_settings()
+        factory = _BACKENDS.get(settings.shared_state_backend)
+        if factory is None:
+            raise RuntimeError(
+                f"Unknown SHARED_STATE_BACKEND {settings.shared_state_backend!r}; "
+                f"expected one of {', '.join(sorted(_BACKENDS))}"
+            )
+        _state = factory(settings)
+    return _state
+
+
+def reset_shared_state() -> None:
+    """Close and reset the cached shared state. Used for testing."""
+    global _state
+    if _state is not None:
+        _state.close()
+    _state = None
@@ -0,0 +1,280 @@
+"""Channel history backfill: ingest links shared before the bot joined.
+
+A backfill pages through conversations.history one page per queued job
+(BACKFILL_PAGE_JOB, bulk lane). Each page job:
+
+1. Backs off (re-enqueues itself with a delay) while the bulk lane already
+   holds settings.backfill_max_queued_jobs jobs, so the backfill feeds the
+   pipeline at the rate the workers drain it.
+2. Applies the live message filters (is_user_message) and the same URL and
+   note extraction as the webhook path.
+3. Skips known work: messages already claimed in the event dedup store
+   (processed live, or by an earlier run) and URLs that already have a
+   Notion page.
+4. Queues each remaining message in the bulk lane, persists the next cursor,
+   and queues the next page.
+
+The cursor lives in backfill.db under settings.data_dir, so POST /backfill
+resumes an interrupted backfill where it stopped. Every start gets a new
+run_id; page jobs from a superseded run stop at their next page.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.notion.duplicates import check_duplicate
+from knowledge_hub.pipeline import BULK, get_job_queue, get_stage_limits
+from knowledge_hub.shared_state import get_shared_state
+from knowledge_hub.slack.client import get_slack_client
+from knowledge_hub.slack.dedup import get_event_deduplicator
+from knowledge_hub.slack.files import pdf_files
+from knowledge_hub.slack.handlers import claim_pdf_uploads, enqueue_message, is_user_message
+from knowledge_hub.slack.urls import extract_urls, extract_user_note
+from knowledge_hub.storage import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_PAGE_JOB = "backfill_page"
+
+_BACKFILL_DB_FILENAME = "backfill.db"
+
+RUNNING = "running"
+DONE = "done"
+
+
+@dataclass
+class BackfillState:
+    """Progress of a channel's backfill, persisted after every page."""
+
+    channel_id: str
+    run_id: str
+    status: str = RUNNING
+    cursor: str | None = None
+    pages: int = 0
+    messages_queued: int = 0
+    urls_queued: int = 0
+    urls_known: int = 0
+    updated_at: float = 0.0
+
+
+class BackfillStore:
+    """SQLite table of backfill states, one row per channel."""
+
+    def __init__(self, filename: str = _BACKFILL_DB_FILENAME) -> None:
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(filename)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS backfills (
+                channel_id TEXT PRIMARY KEY,
+                run_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                cursor TEXT,
+                pages INTEGER NOT NULL,
+                messages_queued INTEGER NOT NULL,
+                urls_queued INTEGER NOT NULL,
+                urls_known INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, channel_id: str) -> BackfillState | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT channel_id, run_id, status, cursor, pages, messages_queued, "
+                "urls_queued, urls_known, updated_at FROM backfills WHERE channel_id = ?",
+                (channel_id,),
+            ).fetchone()
+        return BackfillState(*row) if row else None
+
+    def save(self, state: BackfillState) -> None:
+        state.updated_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO backfills (channel_id, run_id, status, cursor, pages, "
+                "messages_queued, urls_queued, urls_known, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    state.channel_id,
+                    state.run_id,
+                    state.status,
+                    state.cursor,
+                    state.pages,
+                    state.messages_queued,
+                    state.urls_queued,
+                    state.urls_known,
+                    state.updated_at,
+                ),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: BackfillStore | None = None
+
+
+def get_backfill_store() -> BackfillStore:
+    """Return the cached backfill store."""
+    global _store
+    if _store is None:
+        _store = BackfillStore()
+    return _store
+
+
+def reset_backfill_store() -> None:
+    """Close and reset the cached backfill store. Used for testing."""
+    global _store
+    if _store is not None:
+        _store.close()
+    _store = None
+
+
+def start_backfill(channel_id: str, restart: bool = False) -> dict:
+    """Start a channel backfill, or resume it from its saved cursor.
+
+    A finished backfill is only run again with restart=True, which also
+    discards the saved cursor.
+    """
+    store = get_backfill_store()
+    state = store.get(channel_id)
+    if state is not None and state.status == DONE and not restart:
+        return asdict(state)
+
+    run_id = uuid.uuid4().hex
+    if state is None or restart:
+        state = BackfillState(channel_id=channel_id, run_id=run_id)
+    else:
+        state.run_id = run_id
+        logger.info("Resuming backfill of %s after %d page(s)", channel_id, state.pages)
+    store.save(state)
+
+    get_job_queue().enqueue(
+        BACKFILL_PAGE_JOB, {"channel_id": channel_id, "run_id": run_id}, lane=BULK
+    )
+    return asdict(state)
+
+
+async def run_backfill_page(payload: dict) -> None:
+    """Job handler for BACKFILL_PAGE_JOB: queue one page of channel history."""
+    settings = get_settings()
+    store = get_backfill_store()
+    queue = get_job_queue()
+    channel_id = payload["channel_id"]
+
+    state = store.get(channel_id)
+    if state is None or state.run_id != payload["run_id"] or state.status == DONE:
+        return  # superseded by a newer run, or already finished
+
+    if queue.depth_by_lane().get(BULK, 0) >= settings.backfill_max_queued_jobs:
+        queue.enqueue(
+            BACKFILL_PAGE_JOB, payload, delay=settings.backfill_backoff_seconds, lane=BULK
+        )
+        return
+
+    client = await get_slack_client()
+    response = await client.conversations_history(
+        channel=channel_id, cursor=state.cursor, limit=settings.backfill_page_size
+    )
+
+    candidates = []
+    for message in response.get("messages", []):
+        if not is_user_message(message, settings.allowed_user_id):
+            continue
+        text = message.get("text", "")
+        files = pdf_files(message.get("files", []))
+        urls = extract_urls(text)
+        if urls or files:
+            candidates.append((message, text, urls, files))
+
+    known = await _known_urls([url for _, _, urls, _ in candidates for url in urls])
+
+    # Shielded, so a cancelled job still queues every message it claimed
+    await asyncio.shield(_queue_candidates(state, candidates, known))
+
+    state.pages += 1
+    state.cursor = (response.get("response_metadata") or {}).get("next_cursor") or None
+    if state.cursor is None:
+        state.status = DONE
+    store.save(state)
+
+    logger.info(
+        "Backfill of %s: page %d, %d message(s) queued so far%s",
+        channel_id,
+        state.pages,
+        state.messages_queued,
+        "" if state.cursor else " (done)",
+    )
+    if state.cursor is not None:
+        queue.enqueue(BACKFILL_PAGE_JOB, payload, lane=BULK)
+
+
+async def _queue_candidates(
+    state: BackfillState,
+    candidates: list[tuple[dict, str, list[str], list[dict]]],
+    known: set[str],
+) -> None:
+    """Claim candidate messages and their uploads, then queue the claimed ones.
+
+    The claims are one shared-state call (off the event loop for a remote
+    backend); a message already claimed was processed live or by an earlier run.
+    """
+    claims = await get_shared_state().run(_claim_candidates, state.channel_id, candidates)
+    for (message, text, urls, _), uploads in zip(candidates, claims, strict=True):
+        if uploads is None:
+            continue
+        new_urls = [url for url in urls if url not in known]
+        state.urls_known += len(urls) - len(new_urls)
+        new_urls += uploads
+        if not new_urls:
+            continue
+        enqueue_message(
+            {
+                "channel_id": state.channel_id,
+                "timestamp": message["ts"],
+                "user_id": message["user"],
+                "text": text,
+                "user_note": extract_user_note(text),
+            },
+            new_urls,
+            lane=BULK,
+        )
+        state.messages_queued += 1
+        state.urls_queued += len(new_urls)
+
+
+def _claim_candidates(
+    channel_id: str, candidates: list[tuple[dict, str, list[str], list[dict]]]
+) -> list[list[str] | None]:
+    """Per candidate: None if the message was already claimed, else its claimed upload URLs."""
+    deduplicator = get_event_deduplicator()
+    claims: list[list[str] | None] = []
+    for message, _, _, files in candidates:
+        if deduplicator.claim([f"msg:{channel_id}:{message['ts']}"]):
+            claims.append(claim_pdf_uploads(files))
+        else:
+            claims.append(None)
+    return claims
+
+
+async def _known_urls(urls: list[str]) -> set[str]:
+    """URLs that already have a Notion page, checked under the Notion stage limit.
+
+    A failed lookup counts as unknown; the pipeline's own duplicate check
+    still catches it before a page is created.
+    """
+    limits = get_stage_limits()
+
+    async def lookup(url: str) -> bool:
+        async with limits.notion:
+            return await check_duplicate(url) is not None
+
+    results = await asyncio.gather(*(lookup(url) for url in urls), return_exceptions=True)
+    return {url for url, known in zip(urls, results, strict=True) if known is True}
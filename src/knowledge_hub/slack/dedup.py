@@ -0,0 +1,121 @@
+"""Slack event deduplication keyed on event_id and (channel, ts).
+
+Slack redelivers an event (with X-Slack-Retry-Num) when the first delivery was
+not acknowledged within 3 seconds. A retry must be processed if the original
+never arrived, and ignored if it did -- on this instance or any other.
+
+Two tiers, both O(1) per key:
+- In-memory TTL/LRU cache: answers repeat checks without touching disk.
+- Shared state (knowledge_hub.shared_state): seen by every worker process and,
+  with a remote backend, every instance. A claim sets all of its keys or none,
+  atomically, so two processes racing on the same event cannot both win.
+
+Async code uses aclaim()/arelease(), which reach the shared tier through
+SharedState.run() so a remote backend is not called on the event loop.
+"""
+
+import threading
+
+from cachetools import TTLCache
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.shared_state import SharedState, get_shared_state
+
+_KEY_PREFIX = "dedup:"
+
+
+def event_keys(payload: dict) -> list[str]:
+    """Build dedup keys for an event_callback payload.
+
+    Returns an empty list for payloads that carry no identifying fields
+    (e.g. url_verification), which are never deduplicated.
+    """
+    keys = []
+    event_id = payload.get("event_id")
+    if event_id:
+        keys.append(f"event:{event_id}")
+    event = payload.get("event", {})
+    channel = event.get("channel")
+    ts = event.get("ts")
+    if channel and ts:
+        keys.append(f"msg:{channel}:{ts}")
+    return keys
+
+
+class EventDeduplicator:
+    """Two-tier seen-set with claim/release semantics."""
+
+    def __init__(
+        self,
+        state: SharedState | None = None,
+        ttl_seconds: float = 86400.0,
+        cache_size: int = 10_000,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._recent: TTLCache = TTLCache(maxsize=cache_size, ttl=ttl_seconds)
+        self._state = state or get_shared_state()
+        # claim() may run on a network executor thread (see SharedState.run)
+        self._lock = threading.Lock()
+
+    def claim(self, keys: list[str]) -> bool:
+        """Record keys as seen. Returns True only if none of them was seen before."""
+        if self._seen(keys):
+            return False
+        claimed = self._state.claim([_KEY_PREFIX + key for key in keys], self._ttl)
+        self._remember(keys)
+        return claimed
+
+    async def aclaim(self, keys: list[str]) -> bool:
+        """claim() for async code."""
+        if self._seen(keys):
+            return False
+        claimed = await self._state.run(
+            self._state.claim, [_KEY_PREFIX + key for key in keys], self._ttl
+        )
+        self._remember(keys)
+        return claimed
+
+    def release(self, keys: list[str]) -> None:
+        """Forget keys so a later retry is processed (used when handling fails)."""
+        self._forget(keys)
+        self._state.delete(*(_KEY_PREFIX + key for key in keys))
+
+    async def arelease(self, keys: list[str]) -> None:
+        """release() for async code."""
+        self._forget(keys)
+        await self._state.run(self._state.delete, *(_KEY_PREFIX + key for key in keys))
+
+    def _seen(self, keys: list[str]) -> bool:
+        with self._lock:
+            return any(key in self._recent for key in keys)
+
+    def _remember(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._recent[key] = True
+
+    def _forget(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._recent.pop(key, None)
+
+
+_deduplicator: EventDeduplicator | None = None
+
+
+def get_event_deduplicator() -> EventDeduplicator:
+    """Return the cached deduplicator, created from settings on first call."""
+    global _deduplicator
+    if _deduplicator is None:
+        settings = get_settings()
+        _deduplicator = EventDeduplicator(
+            ttl_seconds=settings.dedup_ttl_seconds,
+            cache_size=settings.dedup_cache_size,
+        )
+    return _deduplicator
+
+
+def reset_deduplicator() -> None:
+    """Reset the cached deduplicator. Used for testing."""
+    global _deduplicator
+    _deduplicator = None
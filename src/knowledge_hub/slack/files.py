@@ -0,0 +1,56 @@
+"""PDF uploads shared in Slack: attachment filtering and file_shared lookups.
+
+A PDF uploaded with a message arrives twice: as `files` on the message event
+(subtype file_share) and as a separate file_shared event. Both paths claim
+file_key(file_id) in the event dedup store so each upload is processed once;
+the message path claims at ack time and the file_shared path only after a
+delay, so the message (which carries the user's note) wins when both arrive.
+
+The upload's private URL stands in for a link: extraction fetches it with the
+bot token (see extraction.pdf.extract_slack_pdf).
+"""
+
+import logging
+
+from slack_sdk.errors import SlackApiError
+
+from knowledge_hub.slack.client import get_slack_client
+
+logger = logging.getLogger(__name__)
+
+
+def file_key(file_id: str) -> str:
+    """Dedup key shared by both delivery paths of one upload."""
+    return f"file:{file_id}"
+
+
+def is_pdf_file(file: dict) -> bool:
+    """True if a Slack file object is a PDF with a downloadable private URL."""
+    is_pdf = file.get("filetype") == "pdf" or file.get("mimetype") == "application/pdf"
+    return is_pdf and bool(file.get("url_private"))
+
+
+def pdf_files(files: list[dict]) -> list[dict]:
+    """Keep only the PDF uploads from a message's `files` list."""
+    return [file for file in files if is_pdf_file(file)]
+
+
+def share_timestamp(file: dict, channel_id: str) -> str | None:
+    """Timestamp of the message that shared `file` in `channel_id`, if any."""
+    shares = file.get("shares", {})
+    for scope in ("public", "private"):
+        channel_shares = shares.get(scope, {}).get(channel_id)
+        if channel_shares:
+            return channel_shares[0].get("ts")
+    return None
+
+
+async def fetch_file_info(file_id: str) -> dict | None:
+    """Look up a file object with files.info. Returns None if Slack refuses."""
+    try:
+        client = await get_slack_client()
+        response = await client.files_info(file=file_id)
+    except SlackApiError:
+        logger.warning("files.info failed for %s", file_id, exc_info=True)
+        return None
+    return response["file"]
@@ -1,32 +1,66 @@
 """Slack event dispatch and message filtering logic."""
 
+import asyncio
 import logging
 
-from fastapi import BackgroundTasks
 from fastapi.responses import JSONResponse
+from google import genai
 
 from knowledge_hub.config import get_settings
-from knowledge_hub.extraction import extract_content
-from knowledge_hub.llm import get_gemini_client, process_content
-from knowledge_hub.models.content import ExtractionStatus
-from knowledge_hub.notion import create_notion_page
+from knowledge_hub.extraction.fetch_cache import fetch_scope
+from knowledge_hub.llm import get_gemini_client
 from knowledge_hub.notion.models import DuplicateResult
+from knowledge_hub.pipeline import (
+    BULK,
+    INTERACTIVE,
+    Checkpoint,
+    Decision,
+    Stage,
+    StageLimits,
+    checkpoint_key,
+    estimate_urls_cost,
+    get_admission_controller,
+    get_checkpoint_store,
+    get_inflight_registry,
+    get_job_queue,
+    get_stage_limits,
+    run_stages,
+)
+from knowledge_hub.slack.dedup import get_event_deduplicator
+from knowledge_hub.slack.files import (
+    fetch_file_info,
+    file_key,
+    is_pdf_file,
+    pdf_files,
+    share_timestamp,
+)
 from knowledge_hub.slack.notifier import (
     add_reaction,
+    notify_batch_progress,
     notify_duplicate,
     notify_error,
+    notify_shed,
     notify_success,
+    send_in_background,
 )
 from knowledge_hub.slack.urls import extract_urls, extract_user_note, resolve_urls
 
 logger = logging.getLogger(__name__)
 
+# Job kinds for queued message processing (see run_process_message_job) and
+# uploads announced only by file_shared (see run_file_share_job)
+PROCESS_MESSAGE_JOB = "process_message"
+PROCESS_FILE_SHARE_JOB = "process_file_share"
+
+# Give the upload's message event time to claim the file before file_shared does
+_FILE_SHARED_DELAY_SECONDS = 30.0
 
-def handle_slack_event(payload: dict, background_tasks: BackgroundTasks) -> JSONResponse:
+
+async def handle_slack_event(payload: dict) -> JSONResponse:
     """Dispatch a Slack event based on its type.
 
     - url_verification: return the challenge token
-    - event_callback: process the contained event
+    - event_callback: process the contained event (file_shared or message)
     - anything else: acknowledge with 200
     """
     if payload.get("type") == "url_verification":
@@ -34,74 +68,240 @@ def handle_slack_event(payload: dict, background_tasks: BackgroundTasks) -> JSON
 
     if payload.get("type") == "event_callback":
         event = payload.get("event", {})
-        handle_message_event(event, background_tasks)
+        if event.get("type") == "file_shared":
+            handle_file_shared_event(event)
+        else:
+            await handle_message_event(event)
         return JSONResponse({"ok": True})
 
     return JSONResponse({"ok": True})
 
 
-def handle_message_event(event: dict, background_tasks: BackgroundTasks) -> None:
-    """Apply message filters and dispatch URL processing to background.
+async def handle_message_event(event: dict) -> None:
+    """Apply message filters and enqueue URL processing on the durable job queue.
 
     Filters are applied in order (most common rejections first):
-    1. Not a message event -> skip
-    2. Has subtype (edits, bot_message, joins, etc.) -> skip
-    3. Has bot_id -> skip (belt-and-suspenders bot filter)
-    4. Wrong user -> skip
-    5. Thread reply -> skip
-    6. No URLs -> skip
+    1-5. Not a top-level message by the allowed user -> skip (see is_user_message)
+    6. No URLs and no PDF uploads -> skip
+
+    PDF uploads are queued by their private URL alongside the message's links.
     """
     settings = get_settings()
 
-    # Filter 1: Not a message
-    if event.get("type") != "message":
+    if not is_user_message(event, settings.allowed_user_id):
+        return
+
+    text = event.get("text", "")
+
+    # Filter 6: No URLs or PDF uploads in message
+    urls = extract_urls(text)
+    uploads = pdf_files(event.get("files", []))
+    if not urls and not uploads:
         return
 
-    # Filter 2: Has subtype (edits, bot_message, channel_join, etc.)
-    if event.get("subtype") is not None:
+    user_note = extract_user_note(text)
+
+    decision = get_admission_controller().check_enqueue()
+    if decision == Decision.SHED:
+        # Uploads are left unclaimed, so their file_shared job can still pick them up
+        shed = len(urls) + len(uploads)
+        logger.warning(
+            "Shedding %d URL(s) from message %s: job queue full",
+            shed,
+            event.get("ts"),
+            extra={"admission": get_admission_controller().snapshot_dict()},
+        )
+        send_in_background(notify_shed(event["channel"], event["ts"], shed))
         return
 
+    deduplicator = get_event_deduplicator()
+    urls += [
+        file["url_private"] for file in uploads if await deduplicator.aclaim([file_key(file["id"])])
+    ]
+    if not urls:
+        return  # every upload was already claimed via file_shared
+
+    logger.info(
+        "Dispatching %d URL(s) from user %s in channel %s (%s)",
+        len(urls),
+        event.get("user"),
+        event.get("channel"),
+        decision.value,
+    )
+
+    # Single cheap insert on the ack path; workers drain the queue at a bounded rate
+    enqueue_message(
+        {
+            "channel_id": event["channel"],
+            "timestamp": event["ts"],
+            "user_id": event["user"],
+            "text": text,
+            "user_note": user_note,
+        },
+        urls,
+    )
+
+
+def is_user_message(event: dict, allowed_user_id: str) -> bool:
+    """True for a top-level message posted by the allowed user."""
+    # Filter 1: Not a message
+    if event.get("type") != "message":
+        return False
+
+    # Filter 2: Has subtype (edits, bot_message, channel_join, etc.); uploads are allowed
+    if event.get("subtype") not in (None, "file_share"):
+        return False
+
     # Filter 3: Bot messages (belt-and-suspenders)
     if event.get("bot_id"):
-        return
+        return False
 
     # Filter 4: Wrong user
-    if event.get("user") != settings.allowed_user_id:
-        return
+    if event.get("user") != allowed_user_id:
+        return False
 
     # Filter 5: Thread replies (not top-level messages)
-    if event.get("thread_ts"):
+    return not event.get("thread_ts")
+
+
+def claim_pdf_uploads(uploads: list[dict]) -> list[str]:
+    """Private URLs of the PDF uploads (see pdf_files) not already claimed via file_shared.
+
+    Synchronous, for callers already off the event loop (see backfill).
+    """
+    deduplicator = get_event_deduplicator()
+    return [file["url_private"] for file in uploads if deduplicator.claim([file_key(file["id"])])]
+
+
+def enqueue_message(message: dict, urls: list[str], *, lane: str = INTERACTIVE) -> int:
+    """Queue a message's URLs for processing, split into batches. Returns the batch count.
+
+    `message` holds channel_id, timestamp, user_id, text, and user_note.
+    """
+    batch_size = get_settings().message_batch_size
+    total_batches = -(-len(urls) // batch_size)
+    _enqueue_batch(
+        message, urls, batch_size, batch=1, total_batches=total_batches, failed=0, lane=lane
+    )
+    return total_batches
+
+
+def handle_file_shared_event(event: dict) -> None:
+    """Queue a delayed lookup for an upload announced by a file_shared event.
+
+    The delay lets the upload's message event, which carries the user's note,
+    claim the file first; run_file_share_job then finds it claimed and stops.
+    """
+    settings = get_settings()
+    if event.get("user_id") != settings.allowed_user_id or not event.get("file_id"):
         return
 
-    text = event.get("text", "")
+    get_job_queue().enqueue(
+        PROCESS_FILE_SHARE_JOB,
+        {
+            "file_id": event["file_id"],
+            "channel_id": event.get("channel_id"),
+            "user_id": event["user_id"],
+        },
+        delay=_FILE_SHARED_DELAY_SECONDS,
+    )
 
-    # Filter 6: No URLs in message
-    urls = extract_urls(text)
-    if not urls:
+
+async def run_file_share_job(payload: dict) -> None:
+    """Job handler for PROCESS_FILE_SHARE_JOB: ingest a PDF upload no message claimed."""
+    file_id, channel_id = payload["file_id"], payload["channel_id"]
+    if not await get_event_deduplicator().aclaim([file_key(file_id)]):
         return
 
-    # Cap URLs at 10 per message
-    urls = urls[:10]
+    file = await fetch_file_info(file_id)
+    if file is None or not is_pdf_file(file):
+        return
+    timestamp = share_timestamp(file, channel_id)
+    if timestamp is None:
+        logger.info("File %s has no share in channel %s, skipping", file_id, channel_id)
+        return
 
-    user_note = extract_user_note(text)
+    await process_message_urls(
+        channel_id, timestamp, payload["user_id"], "", [file["url_private"]], None
+    )
 
-    logger.info(
-        "Dispatching %d URL(s) from user %s in channel %s",
-        len(urls),
-        event.get("user"),
-        event.get("channel"),
+
+def _enqueue_batch(
+    message: dict,
+    urls: list[str],
+    batch_size: int,
+    *,
+    batch: int,
+    total_batches: int,
+    failed: int,
+    lane: str = INTERACTIVE,
+) -> None:
+    """Enqueue the next batch_size URLs of a message, carrying the rest in the payload.
+
+    Single-batch messages keep the plain process_message_urls payload. The
+    first batch runs in `lane` (interactive for posted links); follow-up
+    batches run in the bulk lane so a long reading list cannot delay links
+    posted after it.
+    """
+    batch_urls = urls[:batch_size]
+    payload = {**message, "urls": batch_urls}
+    if total_batches > 1:
+        payload.update(
+            remaining_urls=urls[batch_size:],
+            batch=batch,
+            total_batches=total_batches,
+            failed=failed,
+        )
+    get_job_queue().enqueue(
+        PROCESS_MESSAGE_JOB,
+        payload,
+        lane=lane if batch == 1 else BULK,
+        cost=estimate_urls_cost(batch_urls),
     )
 
-    background_tasks.add_task(
-        process_message_urls,
-        channel_id=event["channel"],
-        timestamp=event["ts"],
-        user_id=event["user"],
-        text=text,
-        urls=urls,
-        user_note=user_note,
+
+async def run_process_message_job(payload: dict) -> None:
+    """Job handler for PROCESS_MESSAGE_JOB: run the pipeline for a queued message.
+
+    Messages with more than settings.message_batch_size URLs are processed one
+    batch per job. Each batch posts a progress reply and then enqueues the next
+    batch behind any work already queued, so a long reading list shares the
+    workers and stage limits with other messages instead of monopolizing them.
+    Follow-up batches skip admission control: shedding them would drop links
+    the user was already told are being processed. The last batch adds the
+    message reaction, reflecting failures in any batch.
+    """
+    job = dict(payload)
+    remaining = job.pop("remaining_urls", None)
+    if remaining is None:
+        await process_message_urls(**job)
+        return
+
+    batch = job.pop("batch")
+    total_batches = job.pop("total_batches")
+    failed = job.pop("failed")
+    channel_id, timestamp, urls = job["channel_id"], job["timestamp"], job.pop("urls")
+
+    results = await _process_batch(channel_id, timestamp, urls, job["user_note"])
+    failed += results.count(False)
+    await notify_batch_progress(
+        channel_id, timestamp, batch, total_batches, results.count(True), len(urls)
     )
 
+    if remaining:
+        _enqueue_batch(
+            job,
+            remaining,
+            get_settings().message_batch_size,
+            batch=batch + 1,
+            total_batches=total_batches,
+            failed=failed,
+        )
+        return
+
+    emoji = "white_check_mark" if failed == 0 else "x"
+    await add_reaction(channel_id, timestamp, emoji)
+
 
 async def process_message_urls(
     channel_id: str,
@@ -111,12 +311,36 @@ async def process_message_urls(
     urls: list[str],
     user_note: str | None,
 ) -> None:
-    """Resolve URLs and process each through the full pipeline.
+    """Resolve URLs and process them concurrently through the full pipeline.
 
     For each URL: extract content -> LLM analysis -> Notion page creation -> Slack notification.
+    URLs run concurrently (up to settings.url_concurrency per message) and each
+    stage is bounded by the process-wide limits from get_stage_limits().
     Each URL is processed independently -- one failure does not abort others.
     A single emoji reaction is added to the original message after all URLs are processed.
     """
+    results = await _process_batch(channel_id, timestamp, urls, user_note)
+
+    # One reaction per message (not per URL) -- checkmark if all succeeded, X if any failed
+    emoji = "white_check_mark" if all(results) else "x"
+    await add_reaction(channel_id, timestamp, emoji)
+
+
+async def _process_batch(
+    channel_id: str, timestamp: str, urls: list[str], user_note: str | None
+) -> list[bool]:
+    """Resolve and process a list of URLs concurrently. Returns one success flag per URL.
+
+    URLs that fail to resolve count as failures. Pages downloaded while
+    resolving are reused by extraction (fetch_scope).
+    """
+    with fetch_scope():
+        return await _resolve_and_process(channel_id, timestamp, urls, user_note)
+
+
+async def _resolve_and_process(
+    channel_id: str, timestamp: str, urls: list[str], user_note: str | None
+) -> list[bool]:
     resolved = await resolve_urls(urls)
 
     logger.info(
@@ -127,46 +351,84 @@ async def process_message_urls(
     )
 
     gemini_client = get_gemini_client()
-    all_succeeded = True
-
-    for url in resolved:
-        try:
-            # Stage 1: Extract content
-            content = await extract_content(url)
-            if content.extraction_status == ExtractionStatus.FAILED:
-                await notify_error(
-                    channel_id, timestamp, url, "extraction",
-                    "Content could not be extracted",
-                )
-                all_succeeded = False
-                continue
-
-            # Pass user_note through to content for LLM prompt
-            content.user_note = user_note
-
-            # Stage 2: LLM processing
-            notion_page, cost_usd = await process_content(gemini_client, content)
-
-            # Stage 3: Notion page creation
-            result = await create_notion_page(notion_page)
-
-            if isinstance(result, DuplicateResult):
-                await notify_duplicate(channel_id, timestamp, url, result)
-                continue  # Duplicate is not a failure
-
-            # Success
-            await notify_success(channel_id, timestamp, result, cost_usd=cost_usd)
-            logger.info("Pipeline complete for %s -> %s", url, result.page_url)
-
-        except Exception as exc:
-            logger.error("Pipeline failed for %s: %s", url, exc, exc_info=True)
-            stage = _classify_stage(exc)
-            await notify_error(channel_id, timestamp, url, stage, str(exc))
-            all_succeeded = False
+    limits = get_stage_limits()
+    url_slots = asyncio.Semaphore(limits.url_concurrency)
 
-    # One reaction per message (not per URL) -- checkmark if all succeeded, X if any failed
-    emoji = "white_check_mark" if all_succeeded else "x"
-    await add_reaction(channel_id, timestamp, emoji)
+    async def run(url: str) -> bool:
+        async with url_slots:
+            return await _process_url(gemini_client, limits, channel_id, timestamp, url, user_note)
+
+    # Aggregate only after every URL has finished, so completion order is irrelevant
+    results = await asyncio.gather(*(run(url) for url in resolved), return_exceptions=True)
+
+    # Every URL reached a final outcome; an interrupted batch never gets here
+    get_checkpoint_store().clear([checkpoint_key(channel_id, timestamp, url) for url in resolved])
+    # Links dropped by resolution never reached the pipeline, but still failed
+    unresolved = len(urls) - len(resolved)
+    return [result is True for result in results] + [False] * unresolved
+
+
+async def _process_url(
+    gemini_client: genai.Client,
+    limits: StageLimits,
+    channel_id: str,
+    timestamp: str,
+    url: str,
+    user_note: str | None,
+) -> bool:
+    """Run one URL through all stages. Returns True on success or duplicate, False on failure.
+
+    Each finished stage is checkpointed; a retried job resumes after the last one.
+    If the same URL is already being processed elsewhere in this process, its
+    result is awaited and reported as a duplicate instead.
+    """
+    checkpoints = get_checkpoint_store()
+    key = checkpoint_key(channel_id, timestamp, url)
+    checkpoint = checkpoints.get(key)
+    if checkpoint is not None:
+        logger.info("Resuming %s after %s stage", url, checkpoint.stage.value)
+        if checkpoint.stage == Stage.SAVED:
+            return True
+
+    try:
+        leader, outcome = await get_inflight_registry().run(
+            url,
+            lambda: run_stages(
+                gemini_client,
+                limits,
+                url,
+                user_note,
+                checkpoint,
+                save_checkpoint=lambda done: checkpoints.save(key, done),
+            ),
+        )
+    except Exception as exc:
+        logger.error("Pipeline failed for %s: %s", url, exc, exc_info=True)
+        stage = _classify_stage(exc)
+        await notify_error(channel_id, timestamp, url, stage, str(exc))
+        return False
+
+    if outcome is None:
+        await notify_error(
+            channel_id, timestamp, url, "extraction", "Content could not be extracted"
+        )
+        return False
+
+    result, cost_usd = outcome
+    if not leader:
+        # Another copy of this URL created (or found) the page
+        checkpoints.save(key, Checkpoint(Stage.SAVED))
+        await notify_duplicate(channel_id, timestamp, url, DuplicateResult(**result.model_dump()))
+        return True
+
+    if isinstance(result, DuplicateResult):
+        await notify_duplicate(channel_id, timestamp, url, result)
+        return True  # Duplicate is not a failure
+
+    # Success
+    await notify_success(channel_id, timestamp, result, cost_usd=cost_usd)
+    logger.info("Pipeline complete for %s -> %s", url, result.page_url)
+    return True
 
 
 def _classify_stage(exc: Exception) -> str:
@@ -5,7 +5,9 @@ ensuring notification failures cannot crash the pipeline or prevent other URLs
 from processing.
 """
 
+import asyncio
 import logging
+from collections.abc import Coroutine
 
 from slack_sdk.errors import SlackApiError
 
@@ -14,6 +16,27 @@ from knowledge_hub.slack.client import get_slack_client
 
 logger = logging.getLogger(__name__)
 
+# Strong references to notifications scheduled from the sync ack path
+_pending: set[asyncio.Task] = set()
+
+
+def send_in_background(notification: Coroutine) -> None:
+    """Schedule a notification on the running loop without awaiting it.
+
+    Used on the webhook ack path, which must return to Slack immediately.
+    Called outside a running loop (sync callers, benchmarks), the
+    notification is dropped with a warning rather than raising.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning("No running event loop; dropping %s", notification.__qualname__)
+        notification.close()
+        return
+    task = loop.create_task(notification)
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
 
 async def notify_success(
     channel_id: str,
@@ -94,6 +117,60 @@ async def notify_duplicate(
         )
 
 
+async def notify_batch_progress(
+    channel_id: str,
+    timestamp: str,
+    batch: int,
+    total_batches: int,
+    succeeded: int,
+    attempted: int,
+) -> None:
+    """Post a thread reply reporting progress through a multi-batch message.
+
+    Args:
+        channel_id: Slack channel ID.
+        timestamp: Original message timestamp (thread parent).
+        batch: 1-based number of the batch that just finished.
+        total_batches: Number of batches the message was split into.
+        succeeded: Links in this batch that were saved or already existed.
+        attempted: Links in this batch.
+    """
+    try:
+        client = await get_slack_client()
+        await client.chat_postMessage(
+            channel=channel_id,
+            thread_ts=timestamp,
+            text=f"Batch {batch}/{total_batches} done: {succeeded}/{attempted} link(s) processed",
+        )
+    except SlackApiError:
+        logger.warning(
+            "Failed to send batch progress for %s (%d/%d)",
+            timestamp, batch, total_batches, exc_info=True,
+        )
+
+
+async def notify_shed(channel_id: str, timestamp: str, url_count: int) -> None:
+    """Post a thread reply saying the message was not queued because the service is overloaded.
+
+    Args:
+        channel_id: Slack channel ID.
+        timestamp: Original message timestamp (thread parent).
+        url_count: Number of URLs in the rejected message.
+    """
+    try:
+        client = await get_slack_client()
+        await client.chat_postMessage(
+            channel=channel_id,
+            thread_ts=timestamp,
+            text=(
+                f"Too much work queued right now -- {url_count} link(s) were not saved. "
+                "Please repost this message in a few minutes."
+            ),
+        )
+    except SlackApiError:
+        logger.warning("Failed to send overload notification for %s", timestamp, exc_info=True)
+
+
 async def add_reaction(channel_id: str, timestamp: str, emoji: str) -> None:
     """Add an emoji reaction to the original message.
 
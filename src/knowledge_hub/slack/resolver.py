@@ -0,0 +1,163 @@
+"""Redirect resolution for shortened links, with a TTL cache.
+
+Only links on known redirector hosts (bit.ly, t.co, lnkd.in, ...) are
+resolved over the network; every other URL already points at its content and
+is returned unchanged, since the extractors follow any remaining redirects
+themselves. Shortener links are resolved with a streamed GET that is closed as
+soon as the final response's headers arrive. (GET rather than HEAD: some
+shorteners reject HEAD.)
+
+Inside extraction.fetch_cache.fetch_scope(), the body of a successful final
+response the extractors can parse (HTML up to extract_article's page cap, PDF
+up to the cache size cap) is read instead of discarded (with the same caps and
+decompression limits as extraction.download) and handed to the extractor
+through the fetch cache, so the destination page is downloaded once rather
+than twice.
+
+Requests go through the shared HTTP client (knowledge_hub.http_client), so a
+shortener's connection is reused across messages. Resolved URLs are cached for
+settings.resolver_cache_ttl_seconds.
+"""
+
+import logging
+from urllib.parse import urlsplit
+
+import httpx
+from cachetools import TTLCache
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.extraction import download, fetch_cache
+from knowledge_hub.extraction.article import MAX_PAGE_BYTES
+from knowledge_hub.extraction.router import is_slack_file_url
+from knowledge_hub.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Hosts whose links only redirect elsewhere (add more via RESOLVER_EXTRA_HOSTS)
+SHORTENER_HOSTS = frozenset(
+    {
+        "amzn.to",
+        "apple.co",
+        "bit.do",
+        "bit.ly",
+        "buff.ly",
+        "cutt.ly",
+        "dlvr.it",
+        "fb.me",
+        "feedproxy.google.com",
+        "goo.gl",
+        "hubs.ly",
+        "is.gd",
+        "l.facebook.com",
+        "link.medium.com",
+        "lnkd.in",
+        "mailchi.mp",
+        "ow.ly",
+        "rb.gy",
+        "rebrand.ly",
+        "s.id",
+        "shorturl.at",
+        "spoti.fi",
+        "t.co",
+        "t.ly",
+        "tiny.cc",
+        "tinyurl.com",
+        "trib.al",
+        "wp.me",
+    }
+)
+
+_TIMEOUT = httpx.Timeout(10.0)
+
+# Bodies kept for the extractors, by kind, with their size caps (HTML past
+# extract_article's cap would only be refused there)
+_CACHED_KINDS = {
+    download.HTML: MAX_PAGE_BYTES,
+    download.PDF: fetch_cache.MAX_CACHED_BODY_BYTES,
+}
+
+
+class UrlResolver:
+    """Resolves shortener links through the shared client, caching the results."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        *,
+        extra_hosts: frozenset[str] = frozenset(),
+        cache_ttl_seconds: float = 3600.0,
+        cache_size: int = 2048,
+    ) -> None:
+        self._client = client  # None: the shared client, looked up per call
+        self._hosts = SHORTENER_HOSTS | extra_hosts
+        self._cache: TTLCache = TTLCache(maxsize=cache_size, ttl=cache_ttl_seconds)
+
+    def needs_resolution(self, url: str) -> bool:
+        """True if `url` is on a known redirector host."""
+        host = (urlsplit(url).hostname or "").lower()
+        return host.removeprefix("www.") in self._hosts
+
+    async def resolve(self, url: str) -> str | None:
+        """Return the final destination of `url`, or None if it cannot be resolved.
+
+        Slack-hosted files are returned as-is: fetched anonymously they
+        redirect to the sign-in page.
+        """
+        if is_slack_file_url(url) or not self.needs_resolution(url):
+            return url
+        cached = self._cache.get(url)
+        if cached is not None:
+            return cached
+
+        try:
+            client = self._client or get_http_client()
+            async with client.stream(
+                "GET", url, headers=download.REQUEST_HEADERS, timeout=_TIMEOUT
+            ) as response:
+                final = str(response.url)
+                if fetch_cache.in_scope():
+                    await _keep_body(response)
+        except (httpx.HTTPError, httpx.TooManyRedirects):
+            logger.warning("Failed to resolve URL: %s", url)
+            return None
+
+        self._cache[url] = final
+        return final
+
+
+async def _keep_body(response: httpx.Response) -> None:
+    """Read a parseable final response into the fetch cache (within the size cap)."""
+    if response.status_code != 200:
+        return
+    try:
+        fetched = await download.read_body(response, _CACHED_KINDS)
+    except download.DownloadError:
+        return  # not parseable or too large; the extractor decides what to do
+    except httpx.HTTPError:
+        # The final URL is known; the extractor downloads the body itself
+        logger.debug("Failed to read body of %s", response.url, exc_info=True)
+        return
+    fetch_cache.remember(fetched)
+
+
+_resolver: UrlResolver | None = None
+
+
+def get_url_resolver() -> UrlResolver:
+    """Return the app-wide resolver, created from settings on first call."""
+    global _resolver
+    if _resolver is None:
+        settings = get_settings()
+        extra = {h.strip().lower() for h in settings.resolver_extra_hosts.split(",") if h.strip()}
+        _resolver = UrlResolver(
+            extra_hosts=frozenset(extra),
+            cache_ttl_seconds=settings.resolver_cache_ttl_seconds,
+            cache_size=settings.resolver_cache_size,
+        )
+    return _resolver
+
+
+def reset_url_resolver() -> None:
+    """Drop the cached resolver without closing it. Used for testing."""
+    global _resolver
+    _resolver = None
@@ -1,27 +1,45 @@
-"""Slack webhook router with signature verification."""
+"""Slack webhook router with signature verification and event deduplication."""
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request
+import logging
+
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
 
+from knowledge_hub.slack.dedup import event_keys, get_event_deduplicator
 from knowledge_hub.slack.handlers import handle_slack_event
 from knowledge_hub.slack.verification import verify_slack_request
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="", tags=["slack"])
 
 
 @router.post("/slack/events")
 async def slack_events(
     request: Request,
-    background_tasks: BackgroundTasks,
     payload: dict = Depends(verify_slack_request),
 ) -> JSONResponse:
     """Receive Slack webhook events.
 
-    Slack retries (X-Slack-Retry-Num header) are acknowledged immediately
-    to prevent duplicate processing.
+    Every delivery is checked against the dedup store by event_id and
+    (channel, ts). A Slack retry (X-Slack-Retry-Num header) is processed only
+    if the original delivery was never seen; otherwise it is acknowledged
+    without processing.
     """
-    # Dedup: if Slack is retrying, acknowledge immediately
-    if request.headers.get("X-Slack-Retry-Num"):
+    keys = event_keys(payload)
+    deduplicator = get_event_deduplicator()
+    if keys and not await deduplicator.aclaim(keys):
+        logger.info(
+            "Ignoring duplicate Slack delivery %s (retry=%s, reason=%s)",
+            payload.get("event_id"),
+            request.headers.get("X-Slack-Retry-Num"),
+            request.headers.get("X-Slack-Retry-Reason"),
+        )
         return JSONResponse({"ok": True})
 
-    return handle_slack_event(payload, background_tasks)
+    try:
+        return await handle_slack_event(payload)
+    except Exception:
+        # Let Slack's retry be processed instead of being rejected as a duplicate
+        await deduplicator.arelease(keys)
+        raise
@@ -4,7 +4,7 @@ import asyncio
 import logging
 import re
 
-import httpx
+from knowledge_hub.slack.resolver import get_url_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -35,20 +35,10 @@ def extract_user_note(text: str) -> str | None:
 async def resolve_url(url: str) -> str | None:
     """Resolve a single URL through redirects to its final destination.
 
-    Uses GET (not HEAD -- some shorteners reject HEAD requests).
-    Returns the final URL string on success, None on any error.
+    Only shortener links are fetched (see slack.resolver); other URLs are
+    returned unchanged. Returns None if a shortener link cannot be resolved.
     """
-    try:
-        async with httpx.AsyncClient(
-            follow_redirects=True,
-            max_redirects=5,
-            timeout=httpx.Timeout(10.0),
-        ) as client:
-            response = await client.get(url)
-            return str(response.url)
-    except (httpx.HTTPError, httpx.TooManyRedirects):
-        logger.warning("Failed to resolve URL: %s", url)
-        return None
+    return await get_url_resolver().resolve(url)
 
 
 async def resolve_urls(urls: list[str]) -> list[str]:
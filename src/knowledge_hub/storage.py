@@ -0,0 +1,39 @@
+"""SQLite connection helper for local persistent state.
+
+All on-disk stores (job queue, pipeline state) live under settings.data_dir
+and share the same connection setup: WAL journal so readers never block the
+single writer, and a busy timeout so concurrent processes wait instead of
+failing with "database is locked".
+"""
+
+import sqlite3
+from pathlib import Path
+
+from knowledge_hub.config import get_settings
+
+_BUSY_TIMEOUT_SECONDS = 5.0
+
+
+def open_sqlite(filename: str) -> sqlite3.Connection:
+    """Open a WAL-mode SQLite connection for a file under settings.data_dir.
+
+    Passing ":memory:" returns a private in-memory database (used in tests).
+    The connection runs in autocommit mode; callers issue single atomic
+    statements or explicit BEGIN IMMEDIATE transactions.
+    """
+    if filename == ":memory:":
+        path = filename
+    else:
+        data_dir = Path(get_settings().data_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        path = str(data_dir / filename)
+
+    conn = sqlite3.connect(
+        path,
+        timeout=_BUSY_TIMEOUT_SECONDS,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
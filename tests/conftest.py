@@ -4,6 +4,58 @@ import pytest
 from fastapi.testclient import TestClient
 
 from knowledge_hub.app import app
+from knowledge_hub.config import get_settings
+from knowledge_hub.executors import reset_executors
+from knowledge_hub.extraction.cache import reset_extraction_cache
+from knowledge_hub.extraction.parse_pool import reset_parse_pool
+from knowledge_hub.http_client import reset_http_client
+from knowledge_hub.pipeline import (
+    reset_admission_controller,
+    reset_checkpoint_store,
+    reset_inflight_registry,
+    reset_queue,
+    reset_stage_limits,
+)
+from knowledge_hub.shared_state import reset_shared_state
+from knowledge_hub.slack.backfill import reset_backfill_store
+from knowledge_hub.slack.dedup import reset_deduplicator
+from knowledge_hub.slack.resolver import reset_url_resolver
+
+# Process-wide singletons that hold pipeline state between calls
+_SINGLETON_RESETS = (
+    reset_queue,
+    reset_stage_limits,
+    reset_deduplicator,
+    reset_admission_controller,
+    reset_checkpoint_store,
+    reset_backfill_store,
+    reset_inflight_registry,
+    reset_shared_state,
+    reset_url_resolver,
+    reset_http_client,
+    reset_parse_pool,
+    reset_executors,
+    reset_extraction_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_pipeline_state(tmp_path, monkeypatch):
+    """Keep pipeline state per-test: in-memory queue, tmp data dir, no background workers.
+
+    Parsing runs in threads so that tests can patch the parsers.
+    """
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("QUEUE_BACKEND", "memory")
+    monkeypatch.setenv("QUEUE_WORKERS", "0")
+    monkeypatch.setenv("PARSE_EXECUTOR", "thread")
+    get_settings.cache_clear()
+    for reset in _SINGLETON_RESETS:
+        reset()
+    yield
+    for reset in _SINGLETON_RESETS:
+        reset()
+    get_settings.cache_clear()
 
 
 @pytest.fixture(scope="session")
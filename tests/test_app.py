@@ -14,6 +14,17 @@ def client():
     return TestClient(app)
 
 
+def test_metrics_endpoint_reports_admission_state(client: TestClient):
+    """GET /metrics exposes queue depth and in-flight pressure without auth."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    admission = response.json()["admission"]
+    assert admission["queued_jobs"] == 0
+    assert admission["in_flight_jobs"] == 0
+    assert "memory_budget_mb" in admission
+    assert response.json()["stages"]["llm"]["in_use"] == 0
+
+
 def test_digest_endpoint_requires_auth(client: TestClient):
     """POST /digest without scheduler secret returns 403."""
     response = client.post("/digest")
@@ -28,6 +39,27 @@ def test_cost_check_endpoint_requires_auth(client: TestClient):
     assert "Invalid scheduler secret" in response.json()["detail"]
 
 
+def test_backfill_endpoint_requires_auth(client: TestClient):
+    """POST /backfill without scheduler secret returns 403."""
+    response = client.post("/backfill", json={"channel_id": "C1"})
+    assert response.status_code == 403
+
+
+def test_backfill_endpoint_starts_backfill(client: TestClient):
+    """POST /backfill with correct secret queues the first page and returns progress."""
+    with patch("knowledge_hub.app.get_settings") as mock_settings:
+        mock_settings.return_value.scheduler_secret = "test-secret"
+        response = client.post(
+            "/backfill",
+            json={"channel_id": "C1"},
+            headers={"X-Scheduler-Secret": "test-secret"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["channel_id"] == "C1"
+    assert response.json()["status"] == "running"
+
+
 def test_digest_endpoint_wrong_secret(client: TestClient):
     """POST /digest with wrong scheduler secret returns 403."""
     with patch("knowledge_hub.app.get_settings") as mock_settings:
@@ -0,0 +1,20 @@
+"""Smoke tests: the benchmarks still run end to end."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).parent.parent / "benchmarks"
+
+
+def test_ack_path_benchmark_runs_past_the_queue_depth_limit():
+    """More iterations than the default MAX_QUEUE_DEPTH, so nothing is shed."""
+    result = subprocess.run(
+        [sys.executable, str(BENCHMARKS / "ack_path.py"), "--iterations", "250"],
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "never awaited" not in result.stderr
+    assert "full ack request" in result.stdout
@@ -0,0 +1,102 @@
+"""Tests for URL canonicalization, identity keys, and declared canonical URLs."""
+
+import pytest
+
+from knowledge_hub.canonical import (
+    canonical_from_html,
+    canonicalize_url,
+    dedup_key,
+    identity_key,
+    is_tracking_param,
+)
+from knowledge_hub.config import get_settings
+
+VIDEO = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("https://example.com/a?utm_source=x&fbclid=1&id=5", "https://example.com/a?id=5"),
+        ("https://example.com/a?gclid=1&mc_cid=2&mc_eid=3&ref=hn", "https://example.com/a"),
+        ("https://example.com/a#comments", "https://example.com/a"),
+        ("https://m.example.com/a", "https://example.com/a"),
+        ("https://en.m.wikipedia.org/wiki/URL", "https://en.wikipedia.org/wiki/URL"),
+        ("https://news.example.com/story/amp/", "https://news.example.com/story/"),
+        ("https://example.com/amp/story?amp=1", "https://example.com/story"),
+        ("https://amp.dev/documentation", "https://amp.dev/documentation"),
+        ("http://example.com/page/", "http://example.com/page/"),
+    ],
+)
+def test_canonicalize_url(raw, expected):
+    assert canonicalize_url(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "https://youtu.be/dQw4w9WgXcQ?si=share",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=42&list=PL1",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    ],
+)
+def test_youtube_forms_share_canonical_url_and_identity(raw):
+    assert canonicalize_url(raw) == VIDEO
+    assert identity_key(raw) == "youtube:dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "https://arxiv.org/abs/2401.00001",
+        "https://arxiv.org/abs/2401.00001v3",
+        "https://arxiv.org/pdf/2401.00001v2.pdf",
+        "http://export.arxiv.org/pdf/2401.00001",
+    ],
+)
+def test_arxiv_forms_share_canonical_url_and_identity(raw):
+    assert canonicalize_url(raw) == "https://arxiv.org/abs/2401.00001"
+    assert identity_key(raw) == "arxiv:2401.00001"
+
+
+def test_identity_key_absent_for_ordinary_pages():
+    assert identity_key("https://example.com/a") is None
+    assert dedup_key("https://example.com/a?fbclid=1") == "https://example.com/a"
+    assert dedup_key("https://youtu.be/dQw4w9WgXcQ") == "youtube:dQw4w9WgXcQ"
+
+
+def test_tracking_params_from_settings(monkeypatch):
+    monkeypatch.setenv("URL_TRACKING_PARAMS", "cid, pk_*")
+    get_settings.cache_clear()
+
+    assert is_tracking_param("cid")
+    assert is_tracking_param("pk_campaign")
+    assert canonicalize_url("https://example.com/a?cid=1&pk_kwd=2&q=3") == (
+        "https://example.com/a?q=3"
+    )
+
+
+def test_canonical_from_html_prefers_link_rel_canonical():
+    html = (
+        "<html><head>"
+        '<meta property="og:url" content="https://example.com/og">'
+        '<link href="/story?id=1&amp;p=2" rel="canonical">'
+        "</head><body></body></html>"
+    )
+    assert canonical_from_html(html, "https://example.com/story/amp?fbclid=x") == (
+        "https://example.com/story?id=1&p=2"
+    )
+
+
+def test_canonical_from_html_falls_back_to_og_url():
+    html = '<head><meta content="https://example.com/a" property="og:url"></head>'
+    assert canonical_from_html(html, "https://m.example.com/a") == "https://example.com/a"
+
+
+def test_canonical_from_html_ignores_unusable_declarations():
+    home = '<head><link rel="canonical" href="https://example.com/"></head>'
+    assert canonical_from_html(home, "https://example.com/deep/article") is None
+    assert canonical_from_html("<head></head><body>", "https://example.com/a") is None
+    in_body = '<head></head><body><link rel="canonical" href="https://x.com/a"></body>'
+    assert canonical_from_html(in_body, "https://example.com/a") is None
@@ -0,0 +1,34 @@
+"""Tests for the knowledge-hub command-line entry point."""
+
+from unittest.mock import AsyncMock, patch
+
+from knowledge_hub.cli import main
+from knowledge_hub.importer import SAVED, ImportJournal, ImportStats
+
+
+def test_import_dry_run_lists_pending_urls(tmp_path, capsys):
+    """--dry-run prints the URLs the journal has not finished, without importing."""
+    export = tmp_path / "links.txt"
+    export.write_text("https://a.example/1\nhttps://a.example/2\n")
+    journal = ImportJournal()
+    journal.record(str(export.resolve()), "https://a.example/1", SAVED)
+    journal.close()
+
+    assert main(["import", str(export), "--dry-run"]) == 0
+    assert capsys.readouterr().out.splitlines() == ["https://a.example/2"]
+
+
+def test_import_exit_code_reflects_failures(tmp_path):
+    """The command exits non-zero when any URL failed."""
+    export = tmp_path / "links.txt"
+    export.write_text("https://a.example/1\n")
+    stats = ImportStats(total=1, failed=1)
+    with patch("knowledge_hub.cli.run_import", AsyncMock(return_value=stats)) as run:
+        assert main(["import", str(export), "--concurrency", "2"]) == 1
+    assert run.call_args.kwargs["concurrency"] == 2
+
+
+def test_import_missing_file_is_a_usage_error(tmp_path, capsys):
+    """An unreadable export file is reported without a traceback."""
+    assert main(["import", str(tmp_path / "missing.csv")]) == 2
+    assert "missing.csv" in capsys.readouterr().err
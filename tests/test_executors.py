@@ -0,0 +1,82 @@
+"""Tests for the named, bounded executors."""
+
+import asyncio
+import threading
+
+import pytest
+
+from knowledge_hub.executors import (
+    NETWORK,
+    TRANSCRIPT,
+    BoundedExecutor,
+    BoundedSlots,
+    ExecutorSaturated,
+    get_executor,
+)
+
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor("test", threads=1, queue_size=1)
+    yield executor
+    executor.shutdown()
+
+
+async def test_runs_on_its_own_named_threads(executor):
+    name = await executor.run(lambda: threading.current_thread().name)
+    assert name.startswith("kh-test")
+    assert await executor.run(int, "7") == 7
+
+
+async def test_full_queue_rejects_immediately(executor):
+    gate = threading.Event()
+    running = asyncio.create_task(executor.run(gate.wait))
+    await asyncio.sleep(0.05)
+    queued = asyncio.create_task(executor.run(gate.wait))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(ExecutorSaturated, match="test executor saturated"):
+        await executor.run(gate.wait)
+
+    stats = executor.slots.snapshot()
+    assert (stats["running"], stats["queued"], stats["rejected"]) == (1, 1, 1)
+    gate.set()
+    await asyncio.gather(running, queued)
+    stats = executor.slots.snapshot()
+    assert (stats["running"], stats["queued"], stats["completed"]) == (0, 0, 2)
+    assert stats["max_queue_wait_seconds"] > 0
+
+
+async def test_cancelled_call_keeps_its_slot_until_the_thread_finishes(executor):
+    gate = threading.Event()
+    task = asyncio.create_task(executor.run(gate.wait))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert executor.slots.snapshot()["running"] == 1
+    gate.set()
+    assert await executor.run(lambda: "next") == "next"
+    assert executor.slots.snapshot()["running"] == 0
+
+
+async def test_utilization_tracks_busy_time():
+    slots = BoundedSlots("test", workers=2, queue_size=0)
+    async with slots.slot():
+        await asyncio.sleep(0.1)
+    utilization = slots.snapshot()["utilization"]
+    assert 0.2 < utilization <= 0.5  # one of two workers busy for most of the time
+
+
+def test_sizes_come_from_settings(monkeypatch):
+    monkeypatch.setenv("TRANSCRIPT_EXECUTOR_THREADS", "3")
+    monkeypatch.setenv("TRANSCRIPT_EXECUTOR_QUEUE", "5")
+    slots = get_executor(TRANSCRIPT).slots
+    assert (slots.workers, slots.queue_size) == (3, 5)
+
+
+def test_metrics_report_executors(client):
+    executors = client.get("/metrics").json()["executors"]
+    assert set(executors) == {NETWORK, TRANSCRIPT}
+    assert {"utilization", "queue_wait_seconds", "rejected"} <= set(executors[NETWORK])
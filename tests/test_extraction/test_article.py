@@ -1,14 +1,23 @@
 """Tests for article extraction using trafilatura (mocked)."""
 
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from knowledge_hub.executors import ExecutorSaturated
 from knowledge_hub.extraction.article import extract_article
+from knowledge_hub.extraction.fetch_cache import FetchedResponse
+from knowledge_hub.extraction.parse_pool import WorkerCrashed
 from knowledge_hub.models.content import ContentType, ExtractionStatus
 
 
+def _page(html: str, url: str = "https://example.com/article") -> FetchedResponse:
+    return FetchedResponse(
+        url=url, headers={"content-type": "text/html; charset=utf-8"}, content=html.encode()
+    )
+
+
 @pytest.mark.asyncio
 async def test_extract_article_success():
     """Successful extraction maps trafilatura fields to ExtractedContent."""
@@ -22,7 +31,7 @@ async def test_extract_article_success():
         description="A test article description.",
     )
     with (
-        patch("knowledge_hub.extraction.article.fetch_url", return_value="<html>ok</html>"),
+        patch("knowledge_hub.extraction.article.fetch_url", return_value=_page("<html>ok</html>")),
         patch("knowledge_hub.extraction.article.bare_extraction", return_value=fake_doc),
     ):
         result = await extract_article("https://example.com/article")
@@ -51,7 +60,7 @@ async def test_extract_article_fetch_fails():
 async def test_extract_article_extraction_fails():
     """bare_extraction returning None results in METADATA_ONLY status."""
     with (
-        patch("knowledge_hub.extraction.article.fetch_url", return_value="<html>ok</html>"),
+        patch("knowledge_hub.extraction.article.fetch_url", return_value=_page("<html>ok</html>")),
         patch("knowledge_hub.extraction.article.bare_extraction", return_value=None),
     ):
         result = await extract_article("https://example.com/empty")
@@ -72,7 +81,7 @@ async def test_extract_article_word_count():
         description=None,
     )
     with (
-        patch("knowledge_hub.extraction.article.fetch_url", return_value="<html>ok</html>"),
+        patch("knowledge_hub.extraction.article.fetch_url", return_value=_page("<html>ok</html>")),
         patch("knowledge_hub.extraction.article.bare_extraction", return_value=fake_doc),
     ):
         result = await extract_article("https://example.com/short")
@@ -94,10 +103,49 @@ async def test_extract_article_paywalled_domain():
         description=None,
     )
     with (
-        patch("knowledge_hub.extraction.article.fetch_url", return_value="<html>ok</html>"),
+        patch("knowledge_hub.extraction.article.fetch_url", return_value=_page("<html>ok</html>")),
         patch("knowledge_hub.extraction.article.bare_extraction", return_value=fake_doc),
         patch("knowledge_hub.extraction.article.is_paywalled_domain", return_value=True),
     ):
         result = await extract_article("https://www.nytimes.com/article")
 
     assert result.extraction_status == ExtractionStatus.PARTIAL
+
+
+@pytest.mark.asyncio
+async def test_extract_article_reads_declared_canonical_url():
+    """The page's rel=canonical is kept for duplicate detection."""
+    html = '<html><head><link rel="canonical" href="https://example.com/story"></head></html>'
+    fake_doc = SimpleNamespace(
+        text="Body",
+        title="T",
+        author=None,
+        date=None,
+        sitename=None,
+        hostname="example.com",
+        description=None,
+    )
+    with (
+        patch("knowledge_hub.extraction.article.fetch_url", return_value=_page(html)),
+        patch("knowledge_hub.extraction.article.bare_extraction", return_value=fake_doc),
+    ):
+        result = await extract_article("https://example.com/story/amp?fbclid=1")
+
+    assert result.url == "https://example.com/story/amp?fbclid=1"
+    assert result.canonical_url == "https://example.com/story"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error", [ExecutorSaturated("parse"), WorkerCrashed("parse worker exited with -9")]
+)
+async def test_extract_article_without_a_parse_worker_fails(error):
+    """A saturated pool or crashed worker gives FAILED rather than an exception."""
+    with (
+        patch("knowledge_hub.extraction.article.fetch_url", return_value=_page("<html>ok</html>")),
+        patch("knowledge_hub.extraction.article.run_parser", AsyncMock(side_effect=error)),
+    ):
+        result = await extract_article("https://example.com/article")
+
+    assert result.extraction_status == ExtractionStatus.FAILED
+    assert result.description == str(error)
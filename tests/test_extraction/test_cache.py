@@ -0,0 +1,114 @@
+"""Tests for the persistent extraction cache."""
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from knowledge_hub.extraction import cache as cache_module
+from knowledge_hub.extraction.cache import ExtractionCache, get_extraction_cache
+from knowledge_hub.extraction.timeout import extract_with_timeout
+from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
+
+ARTICLE_URL = "https://example.com/post?utm_source=slack"
+TTLS = {ContentType.ARTICLE: 3600.0, ContentType.VIDEO: 3600.0, ContentType.PDF: 0.0}
+
+
+def _content(url: str, content_type=ContentType.ARTICLE, text="Body text " * 50, **kwargs):
+    return ExtractedContent(url=url, content_type=content_type, text=text, **kwargs)
+
+
+@pytest.fixture
+def cache():
+    cache = ExtractionCache(TTLS, max_bytes=1024 * 1024)
+    yield cache
+    cache.close()
+
+
+def test_every_url_form_of_a_resource_shares_an_entry(cache):
+    cache.put("https://youtu.be/dQw4w9WgXcQ", _content("x", ContentType.VIDEO, transcript="hi"))
+
+    hit = cache.get("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42")
+    assert hit.transcript == "hi"
+    assert hit.url == "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42"
+    assert cache.get("https://example.com/other") is None
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.writes) == (1, 1, 1)
+
+
+def test_only_usable_results_of_cached_types_are_stored(cache):
+    cache.put("https://example.com/a", _content("a", extraction_status=ExtractionStatus.FAILED))
+    cache.put("https://example.com/b", _content("b", ContentType.PDF))  # TTL 0
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_entries_expire_after_their_ttl(cache, monkeypatch):
+    cache.put(ARTICLE_URL, _content(ARTICLE_URL))
+    later = time.time() + 3601
+    monkeypatch.setattr(cache_module.time, "time", lambda: later)
+
+    assert cache.get(ARTICLE_URL) is None
+    assert (cache.stats.expired, cache.snapshot()["entries"]) == (1, 0)
+
+
+def test_least_recently_read_entries_are_evicted(monkeypatch):
+    clock = iter(range(1_000_000, 2_000_000))
+    monkeypatch.setattr(cache_module.time, "time", lambda: float(next(clock)))
+    # Three entries of similar compressed size; the budget fits two and a half
+    texts = [bytes(range(i, i + 200)).hex() * 3 for i in range(3)]
+    sizes = [
+        len(cache_module._compress(_content("u", text=t).model_dump_json().encode())[1])
+        for t in texts
+    ]
+    cache = ExtractionCache(TTLS, max_bytes=sizes[0] + sizes[1] + sizes[2] // 2)
+    try:
+        cache.put("https://example.com/0", _content("u", text=texts[0]))
+        cache.put("https://example.com/1", _content("u", text=texts[1]))
+        assert cache.get("https://example.com/0") is not None  # 1 is now least recent
+        cache.put("https://example.com/2", _content("u", text=texts[2]))
+
+        assert cache.get("https://example.com/1") is None
+        assert cache.get("https://example.com/0").text == texts[0]
+        assert cache.snapshot()["evictions"] == 1
+    finally:
+        cache.close()
+
+
+def test_entries_written_with_another_codec_are_read(cache, monkeypatch):
+    monkeypatch.setattr(cache_module, "zstandard", None)
+    cache.put(ARTICLE_URL, _content(ARTICLE_URL))
+    assert cache.snapshot()["codec"] == "zlib"
+    assert cache.get(ARTICLE_URL).text.startswith("Body text")
+
+
+async def test_extract_with_timeout_consults_the_cache_first():
+    extracted = _content("https://example.com/post", extraction_method="trafilatura")
+    with patch(
+        "knowledge_hub.extraction.timeout.extract_article", AsyncMock(return_value=extracted)
+    ) as extract:
+        first = await extract_with_timeout("https://example.com/post")
+        second = await extract_with_timeout(ARTICLE_URL)
+
+    assert extract.await_count == 1
+    assert second.text == first.text
+    assert second.url == ARTICLE_URL
+    assert get_extraction_cache().snapshot()["hit_ratio"] == 0.5
+
+
+async def test_failed_extractions_are_retried():
+    failed = _content("https://example.com/post", extraction_status=ExtractionStatus.FAILED)
+    with patch(
+        "knowledge_hub.extraction.timeout.extract_article", AsyncMock(return_value=failed)
+    ) as extract:
+        await extract_with_timeout(ARTICLE_URL)
+        await extract_with_timeout(ARTICLE_URL)
+    assert extract.await_count == 2
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("EXTRACTION_CACHE_MAX_MB", "0")
+    assert get_extraction_cache() is None
+
+
+def test_metrics_report_extraction_cache(client):
+    stats = client.get("/metrics").json()["extraction_cache"]
+    assert {"hits", "misses", "hit_ratio", "bytes", "evictions"} <= set(stats)
@@ -0,0 +1,136 @@
+"""Tests for streamed, size-capped document downloads."""
+
+import gzip
+import zlib
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from knowledge_hub.extraction import download
+from knowledge_hub.extraction.article import extract_article
+from knowledge_hub.extraction.download import BodyTooLarge, UnsupportedContent, fetch_document
+from knowledge_hub.models.content import ContentType, ExtractionStatus
+
+URL = "https://example.com/page"
+CAPS = {download.HTML: 64 * 1024, download.PDF: 256 * 1024}
+PAGE = b"<!DOCTYPE html><html><head><title>T</title></head><body>" + b"x" * 2000 + b"</body>"
+
+
+def _stream(body: bytes, chunk: int = 4096):
+    async def chunks():
+        for i in range(0, len(body), chunk):
+            yield body[i : i + chunk]
+
+    return chunks()
+
+
+def _serve(monkeypatch, body, headers: dict[str, str]) -> list[str]:
+    """Serve `body` (bytes or an async iterable) for every request; returns sent encodings."""
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.headers.get("accept-encoding"))
+        content = _stream(body) if isinstance(body, bytes) else body
+        return httpx.Response(200, headers=headers, content=content)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(download, "get_http_client", lambda: client)
+    return sent
+
+
+async def test_gzip_body_is_inflated_and_only_gzip_deflate_requested(monkeypatch):
+    sent = _serve(
+        monkeypatch, gzip.compress(PAGE), {"Content-Type": "text/html", "Content-Encoding": "gzip"}
+    )
+    page = await fetch_document(URL, CAPS)
+    assert page.content == PAGE
+    assert sent == ["gzip, deflate"]
+
+
+async def test_raw_deflate_body_is_inflated(monkeypatch):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    body = compressor.compress(PAGE) + compressor.flush()
+    _serve(monkeypatch, body, {"Content-Type": "text/html", "Content-Encoding": "deflate"})
+    assert (await fetch_document(URL, CAPS)).content == PAGE
+
+
+async def test_decompression_bomb_stops_at_the_cap(monkeypatch):
+    """50MB of zeros compresses to ~50KB; inflation stops after the 64KB HTML cap."""
+    bomb = gzip.compress(b"<html>" + bytes(50 * 1024 * 1024))
+    _serve(monkeypatch, bomb, {"Content-Type": "text/html", "Content-Encoding": "gzip"})
+    with pytest.raises(BodyTooLarge, match="HTML too large"):
+        await fetch_document(URL, CAPS)
+
+
+async def test_uncompressed_body_over_cap_is_abandoned(monkeypatch):
+    _serve(monkeypatch, PAGE * 100, {"Content-Type": "text/html"})
+    with pytest.raises(BodyTooLarge):
+        await fetch_document(URL, CAPS)
+
+
+async def test_declared_length_over_cap_is_refused_unread(monkeypatch):
+    async def never():
+        raise AssertionError("body read")
+        yield b""
+
+    _serve(monkeypatch, never(), {"Content-Type": "application/pdf", "Content-Length": "9999999"})
+    with pytest.raises(BodyTooLarge):
+        await fetch_document(URL, CAPS)
+
+
+@pytest.mark.parametrize("content_type", ["image/png", "video/mp4", "application/zip"])
+async def test_binary_types_are_refused_before_the_body(monkeypatch, content_type):
+    async def never():
+        raise AssertionError("body read")
+        yield b""
+
+    _serve(monkeypatch, never(), {"Content-Type": content_type})
+    with pytest.raises(UnsupportedContent, match=content_type):
+        await fetch_document(URL, CAPS)
+
+
+async def test_unknown_encoding_is_refused(monkeypatch):
+    _serve(monkeypatch, b"\x1b\x00", {"Content-Type": "text/html", "Content-Encoding": "br"})
+    with pytest.raises(UnsupportedContent, match="encoding: br"):
+        await fetch_document(URL, CAPS)
+
+
+async def test_generic_type_is_sniffed(monkeypatch):
+    _serve(monkeypatch, PAGE, {"Content-Type": "application/octet-stream"})
+    assert (await fetch_document(URL, CAPS)).content == PAGE
+
+    _serve(monkeypatch, b"PK\x03\x04" + bytes(4096), {"Content-Type": "application/octet-stream"})
+    with pytest.raises(UnsupportedContent):
+        await fetch_document(URL, CAPS)
+
+
+async def test_pdf_mislabelled_as_html_gets_the_pdf_cap(monkeypatch):
+    pdf = b"%PDF-1.7\n" + bytes(100 * 1024)  # over the HTML cap, under the PDF cap
+    _serve(monkeypatch, pdf, {"Content-Type": "text/html"})
+    page = await fetch_document(URL, CAPS)
+    assert download.classify(page.headers["content-type"], page.content) == download.PDF
+
+
+async def test_article_url_serving_a_pdf_is_parsed_as_pdf(monkeypatch):
+    _serve(monkeypatch, b"%PDF-1.7\n...", {"Content-Type": "application/pdf"})
+    parsed = AsyncMock(return_value="pdf-result")
+    with patch("knowledge_hub.extraction.article.extract_pdf_bytes", parsed):
+        assert await extract_article(URL) == "pdf-result"
+    assert parsed.call_args.args == (b"%PDF-1.7\n...", URL)
+
+
+async def test_article_too_large_or_binary(monkeypatch):
+    monkeypatch.setattr(
+        "knowledge_hub.extraction.article._ACCEPTED", {download.HTML: 1024, download.PDF: 1024}
+    )
+    _serve(monkeypatch, PAGE, {"Content-Type": "text/html"})
+    result = await extract_article(URL)
+    assert result.extraction_status == ExtractionStatus.METADATA_ONLY
+    assert result.content_type == ContentType.ARTICLE
+    assert "too large" in result.description
+
+    _serve(monkeypatch, b"\x89PNG", {"Content-Type": "image/png"})
+    result = await extract_article(URL)
+    assert result.extraction_status == ExtractionStatus.FAILED
+    assert result.description == "Unsupported content type: image/png"
@@ -0,0 +1,159 @@
+"""Tests for the per-message fetch cache shared by the resolver and extractors."""
+
+import codecs
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from knowledge_hub.extraction import fetch_cache
+from knowledge_hub.extraction.article import MAX_PAGE_BYTES, extract_article
+from knowledge_hub.extraction.fetch_cache import FetchedResponse, fetch_scope
+from knowledge_hub.extraction.pdf import extract_pdf
+from knowledge_hub.extraction.youtube import _fetch_youtube_metadata
+from knowledge_hub.models.content import ExtractionStatus
+from knowledge_hub.slack.resolver import UrlResolver
+
+ARTICLE_HTML = b"<html><head><title>Article</title></head><body>Body</body></html>"
+
+
+def _resolver(final_body: bytes, content_type: str = "text/html; charset=utf-8") -> UrlResolver:
+    """Resolver where t.co/abc redirects to https://example.com/article."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "t.co":
+            return httpx.Response(301, headers={"Location": "https://example.com/article"})
+        return httpx.Response(200, content=final_body, headers={"Content-Type": content_type})
+
+    return UrlResolver(
+        httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+    )
+
+
+def _response(content: bytes, content_type: str = "text/html", url: str = "https://a.com/x"):
+    return FetchedResponse(url=url, headers={"content-type": content_type}, content=content)
+
+
+def test_take_returns_each_response_once():
+    with fetch_scope() as cache:
+        fetch_cache.remember(_response(b"<html></html>"))
+        assert len(cache) == 1
+        assert fetch_cache.take("https://a.com/x").content == b"<html></html>"
+        assert fetch_cache.take("https://a.com/x") is None
+
+
+def test_outside_scope_nothing_is_kept():
+    fetch_cache.remember(_response(b"<html></html>"))
+    assert fetch_cache.in_scope() is False
+    assert fetch_cache.take("https://a.com/x") is None
+
+
+def test_text_uses_declared_charset():
+    body = "café".encode("latin-1")
+    assert _response(body, "text/html; charset=ISO-8859-1").text == "café"
+
+
+def test_text_detects_undeclared_charset():
+    meta = '<meta charset="windows-1251"><p>Привет</p>'.encode("cp1251")
+    assert _response(meta).text.endswith("Привет</p>")
+    bom = codecs.BOM_UTF16_LE + "<p>hi</p>".encode("utf-16-le")
+    assert _response(bom).text.endswith("<p>hi</p>")
+    # A bogus declared charset is skipped; the bytes are not UTF-8, so they are guessed
+    prose = "<p>Les élèves étaient très contents. Ils ont mangé des crêpes et bu du café.</p>" * 20
+    assert _response(prose.encode("cp1252"), "text/html; charset=bogus").text == prose
+
+
+def test_undeclared_charset_without_charset_normalizer(monkeypatch):
+    monkeypatch.setattr(fetch_cache, "charset_normalizer", None)
+    assert _response("<p>crêpes</p>".encode("cp1252")).text == "<p>crêpes</p>"
+    assert _response("<p>crêpes</p>".encode()).text == "<p>crêpes</p>"
+
+
+async def test_resolver_keeps_final_page_for_extraction():
+    """The page fetched while following a shortener is parsed without a second download."""
+    resolver = _resolver(ARTICLE_HTML)
+    fake_doc = SimpleNamespace(
+        text="Body text",
+        title="Article",
+        author=None,
+        date=None,
+        sitename="example.com",
+        hostname="example.com",
+        description=None,
+    )
+    fetch_url = MagicMock(side_effect=AssertionError("page downloaded twice"))
+    with (
+        fetch_scope(),
+        patch("knowledge_hub.extraction.article.fetch_url", fetch_url),
+        patch("knowledge_hub.extraction.article.bare_extraction", return_value=fake_doc) as bare,
+    ):
+        url = await resolver.resolve("https://t.co/abc")
+        result = await extract_article(url)
+
+    assert url == "https://example.com/article"
+    assert bare.call_args.args[0] == ARTICLE_HTML.decode()
+    assert result.extraction_status == ExtractionStatus.FULL
+
+
+async def test_resolver_skips_body_outside_scope_and_for_other_types():
+    await _resolver(ARTICLE_HTML).resolve("https://t.co/abc")
+    with fetch_scope() as cache:
+        await _resolver(b"\x89PNG", "image/png").resolve("https://t.co/abc")
+        assert len(cache) == 0
+
+
+async def test_resolver_does_not_keep_html_over_the_page_cap():
+    with fetch_scope() as cache:
+        await _resolver(b"<html>" + b"x" * MAX_PAGE_BYTES).resolve("https://t.co/abc")
+        assert len(cache) == 0
+
+
+async def test_extract_article_refuses_cached_html_over_the_page_cap():
+    """HTML cached under a larger cap gets the same answer as a download past MAX_PAGE_BYTES."""
+    url = "https://example.com/huge"
+    with (
+        fetch_scope(),
+        patch("knowledge_hub.extraction.article.fetch_url") as fetch,
+        patch("knowledge_hub.extraction.article.run_parser") as parse,
+    ):
+        fetch_cache.remember(_response(b"<html>" + b"x" * MAX_PAGE_BYTES, url=url))
+        result = await extract_article(url)
+
+    fetch.assert_not_called()
+    parse.assert_not_called()
+    assert result.extraction_status == ExtractionStatus.METADATA_ONLY
+    assert result.description == f"HTML too large: over {MAX_PAGE_BYTES} bytes"
+
+
+async def test_extract_pdf_uses_cached_download():
+    reader = SimpleNamespace(
+        pages=[SimpleNamespace(extract_text=lambda: "PDF words here")],
+        metadata=SimpleNamespace(title="Paper", author=None),
+    )
+    with (
+        fetch_scope(),
+        patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader),
+        patch("knowledge_hub.extraction.download.get_http_client") as client,
+    ):
+        fetch_cache.remember(
+            _response(b"%PDF-1.7", "application/pdf", url="https://example.com/paper.pdf")
+        )
+        result = await extract_pdf("https://example.com/paper.pdf")
+
+    client.assert_not_called()
+    assert result.extraction_status == ExtractionStatus.FULL
+    assert result.title == "Paper"
+
+
+async def test_youtube_metadata_uses_cached_page():
+    html = b'<meta property="og:title" content="Talk"><meta name="author" content="Chan">'
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    with (
+        fetch_scope(),
+        patch("knowledge_hub.extraction.youtube.get_http_client") as client,
+    ):
+        fetch_cache.remember(_response(html, url=url))
+        title, author, _ = await _fetch_youtube_metadata(url)
+
+    client.assert_not_called()
+    assert (title, author) == ("Talk", "Chan")
@@ -0,0 +1,204 @@
+"""Tests for the parse worker pool (real worker processes)."""
+
+import asyncio
+import os
+import threading
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from pypdf import PdfWriter
+
+from knowledge_hub.config import get_settings
+from knowledge_hub.extraction import article, parse_pool
+from knowledge_hub.extraction.article import parse_html
+from knowledge_hub.extraction.fetch_cache import FetchedResponse
+from knowledge_hub.extraction.parse_pool import (
+    ParsePool,
+    WorkerCrashed,
+    available_cpus,
+    default_workers,
+    get_parse_pool,
+)
+from knowledge_hub.extraction.pdf import pdf_info, read_pdf_pages
+from knowledge_hub.extraction.timeout import extract_with_timeout
+from knowledge_hub.models.content import ExtractionStatus
+from knowledge_hub.pipeline import admission
+
+URL = "https://example.com/a"
+
+PAGE = (
+    "<html><body><article><p>"
+    + "Parsing happens in a worker process. " * 20
+    + "</p></article></body></html>"
+)
+
+
+@pytest.fixture
+async def pool():
+    pool = ParsePool(mode="process", workers=1, max_tasks_per_child=2)
+    yield pool
+    pool.shutdown()
+
+
+async def test_workers_are_recycled_after_max_tasks(pool):
+    pids = [await pool.run(os.getpid) for _ in range(3)]
+
+    assert pids[0] == pids[1] != pids[2]
+    assert os.getpid() not in pids
+    assert pool.snapshot()["completed"] == 3
+
+
+async def test_parsers_return_plain_results_across_processes(pool, tmp_path):
+    doc = await pool.run(parse_html, PAGE, URL)
+    assert doc["text"].startswith("Parsing happens in a worker process.")
+    assert set(doc) >= {"title", "author", "date", "sitename", "description"}
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    writer.add_metadata({"/Title": "Blank"})
+    path = str(tmp_path / "blank.pdf")
+    writer.write(path)
+    assert await pool.run(pdf_info, path) == (1, "Blank", None)
+    assert await pool.run(read_pdf_pages, path, 0, 1) == [""]
+
+
+async def test_parse_errors_propagate_and_keep_the_worker(pool):
+    pid = await pool.run(os.getpid)
+    with pytest.raises(ValueError):
+        await pool.run(int, "not a number")
+    assert pool.snapshot()["workers_started"] == 1
+    assert await pool.run(os.getpid) != pid  # recycled after two tasks, not killed
+
+
+async def test_timed_out_parse_kills_its_worker(pool):
+    """Cancelling a hung parse kills the process and frees its slot for the next parse."""
+    task = asyncio.create_task(pool.run(time.sleep, 60))
+    await asyncio.sleep(0.2)
+    (hung,) = [worker.process for worker in pool._busy]
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.3):
+            await task
+    assert time.monotonic() - started < 5
+
+    await _reaped(pool)
+    assert not hung.is_alive()
+    assert await pool.run(os.getpid) != hung.pid
+    stats = pool.snapshot()
+    assert (stats["killed"], stats["running"], stats["workers_started"]) == (1, 0, 2)
+
+
+async def _reaped(pool: ParsePool) -> None:
+    """Wait for killed workers to be reaped (asynchronously, by polling)."""
+    async with asyncio.timeout(5):
+        while pool._killed:
+            await asyncio.sleep(0.05)
+
+
+async def test_documents_are_sent_off_the_event_loop(pool):
+    """Pickling and writing a (multi-MB) document to the worker's pipe happens on another thread."""
+    await pool.start()
+    (worker,) = pool._idle
+    senders = []
+    send = worker.conn.send
+
+    def recording_send(message):
+        senders.append(threading.get_ident())
+        send(message)
+
+    worker.conn.send = recording_send
+    document = os.urandom(8 * 1024 * 1024)
+    assert await pool.run(len, document) == len(document)
+    assert senders and threading.get_ident() not in senders
+
+
+async def test_killing_a_worker_does_not_block_on_its_exit(pool, monkeypatch):
+    """A killed worker is reaped by polling, never by a blocking join."""
+    task = asyncio.create_task(pool.run(time.sleep, 60))
+    await asyncio.sleep(0.2)
+    (hung,) = [worker.process for worker in pool._busy]
+    monkeypatch.setattr(hung, "join", lambda timeout=None: pytest.fail("joined on the loop"))
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await _reaped(pool)
+    assert hung.exitcode is not None
+
+
+async def test_dead_worker_is_replaced(pool):
+    with pytest.raises(WorkerCrashed):
+        await pool.run(os._exit, 1)
+
+    assert isinstance(await pool.run(os.getpid), int)
+    stats = pool.snapshot()
+    assert (stats["crashed"], stats["failed"], stats["running"]) == (1, 1, 0)
+
+
+async def test_start_warms_every_worker():
+    pool = ParsePool(mode="process", workers=2, max_tasks_per_child=0)
+    try:
+        await pool.start()
+        assert [worker.process.is_alive() for worker in pool._idle] == [True, True]
+    finally:
+        pool.shutdown()
+
+
+def _hang(html: str, url: str) -> None:
+    time.sleep(60)
+
+
+async def test_extraction_timeout_kills_the_hung_parse(monkeypatch):
+    monkeypatch.setenv("PARSE_EXECUTOR", "process")
+    monkeypatch.setenv("PARSE_WORKERS", "1")
+    get_settings.cache_clear()
+    page = FetchedResponse(url=URL, headers={"content-type": "text/html"}, content=b"<html>")
+    monkeypatch.setattr(article, "fetch_url", AsyncMock(return_value=page))
+    monkeypatch.setattr(article, "parse_html", _hang)
+
+    result = await extract_with_timeout(URL, timeout_seconds=1.0)
+
+    assert result.extraction_status == ExtractionStatus.FAILED
+    assert result.extraction_method == "timeout"
+    stats = get_parse_pool().snapshot()
+    assert (stats["killed"], stats["running"]) == (1, 0)
+
+
+@pytest.mark.parametrize(("cpu_max", "expected"), [("150000 100000\n", 2), ("max 100000\n", 8)])
+def test_cpus_are_capped_by_the_cgroup_quota(monkeypatch, tmp_path, cpu_max, expected):
+    (tmp_path / "cpu.max").write_text(cpu_max)
+    monkeypatch.setattr(parse_pool, "_CGROUP_CPU_MAX", str(tmp_path / "cpu.max"))
+    monkeypatch.setattr(os, "process_cpu_count", lambda: 8, raising=False)
+    assert available_cpus() == expected
+
+
+def test_default_workers_fit_the_memory_budget(monkeypatch):
+    monkeypatch.setattr(parse_pool, "available_cpus", lambda: 8)
+    assert default_workers(256) == 1  # the default 512Mi instance
+    assert default_workers(1024) == 5
+    assert default_workers(8192) == 8
+
+
+async def test_worker_memory_counts_toward_admission_rss(monkeypatch):
+    own = admission._rss_mb()
+    pool = ParsePool(mode="process", workers=1, max_tasks_per_child=0)
+    monkeypatch.setattr(parse_pool, "_pool", pool)
+    try:
+        await pool.start()
+        (pid,) = pool.worker_pids()
+        worker = admission._rss_mb(pid)
+        assert worker > 0
+        assert admission._current_rss_mb() >= own + worker - 1
+    finally:
+        pool.shutdown()
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="parse executor"):
+        ParsePool(mode="fiber", workers=1, max_tasks_per_child=1)
+
+
+def test_metrics_report_parse_pool(client):
+    assert client.get("/metrics").json()["parse"]["mode"] == "thread"
@@ -1,56 +1,63 @@
-"""Tests for PDF extraction (mocked httpx + pypdf)."""
+"""Tests for PDF extraction (mocked HTTP client + pypdf)."""
 
+import asyncio
+import os
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 import httpx
 import pytest
 
-from knowledge_hub.extraction.pdf import MAX_PDF_SIZE_BYTES, extract_pdf
+from knowledge_hub.extraction.pdf import (
+    MAX_PDF_SIZE_BYTES,
+    _read_pages,
+    extract_pdf,
+    extract_pdf_bytes,
+    extract_slack_pdf,
+)
 from knowledge_hub.models.content import ContentType, ExtractionStatus
 
 
-def _mock_client(head_headers=None, get_content=b"", head_error=False):
-    """Build a mocked httpx.AsyncClient context manager."""
-    client = AsyncMock()
+def _serve(body, headers=None, error: Exception | None = None):
+    """Patch the shared client to answer every request with `body` (bytes or async chunks)."""
+    requests = []
 
-    if head_error:
-        client.head.side_effect = httpx.HTTPError("HEAD failed")
-    else:
-        head_resp = MagicMock()
-        head_resp.headers = head_headers or {}
-        client.head.return_value = head_resp
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if error is not None:
+            raise error
+        return httpx.Response(
+            200, headers={"content-type": "application/pdf", **(headers or {})}, content=body
+        )
 
-    get_resp = MagicMock()
-    get_resp.content = get_content
-    get_resp.raise_for_status = MagicMock()
-    client.get.return_value = get_resp
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    patcher = patch("knowledge_hub.extraction.download.get_http_client", return_value=client)
+    return patcher, requests
 
-    ctx = AsyncMock()
-    ctx.__aenter__ = AsyncMock(return_value=client)
-    ctx.__aexit__ = AsyncMock(return_value=False)
-    return ctx, client
+
+def _reader(text: str, metadata=None):
+    page = MagicMock()
+    page.extract_text.return_value = text
+    reader = MagicMock()
+    reader.pages = [page]
+    reader.metadata = metadata
+    return reader
 
 
 @pytest.mark.asyncio
 async def test_extract_pdf_success():
     """Successful PDF extraction returns FULL with text and metadata."""
-    mock_ctx, mock_client = _mock_client(
-        head_headers={"content-length": "1000"},
-        get_content=b"%PDF-fake-content",
+    served, requests = _serve(b"%PDF-fake-content", {"content-length": "17"})
+    reader = _reader(
+        "Page one text content here.", SimpleNamespace(title="Test PDF", author="Test Author")
     )
+    opened = []
 
-    # Mock PdfReader
-    page = MagicMock()
-    page.extract_text.return_value = "Page one text content here."
-    reader = MagicMock()
-    reader.pages = [page]
-    reader.metadata = SimpleNamespace(title="Test PDF", author="Test Author")
+    def pdf_reader(stream):
+        opened.append((stream.name, stream.read()))
+        return reader
 
-    with (
-        patch("knowledge_hub.extraction.pdf.httpx.AsyncClient", return_value=mock_ctx),
-        patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader),
-    ):
+    with served, patch("knowledge_hub.extraction.pdf.PdfReader", side_effect=pdf_reader):
         result = await extract_pdf("https://example.com/doc.pdf")
 
     assert result.extraction_status == ExtractionStatus.FULL
@@ -60,58 +67,91 @@ async def test_extract_pdf_success():
     assert result.author == "Test Author"
     assert result.word_count == 5
     assert result.extraction_method == "pypdf"
+    # One GET, no HEAD; pypdf read the download from a file on disk
+    assert [r.method for r in requests] == ["GET"]
+    ((name, content),) = set(opened)  # once for the page count, once for the pages
+    assert name.endswith(".pdf") and content == b"%PDF-fake-content"
+    assert not os.path.exists(name)  # removed after parsing
 
 
 @pytest.mark.asyncio
-async def test_extract_pdf_too_large_head():
-    """HEAD Content-Length exceeding 20MB returns METADATA_ONLY without GET."""
-    big_size = str(MAX_PDF_SIZE_BYTES + 1)
-    mock_ctx, mock_client = _mock_client(
-        head_headers={"content-length": big_size},
-    )
+async def test_extract_pdf_spools_into_the_configured_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv("PDF_SPOOL_DIR", str(tmp_path))
+    served, _ = _serve(b"%PDF-fake-content")
+    opened = []
+
+    def pdf_reader(stream):
+        opened.append(stream.name)
+        return _reader("Text.")
+
+    with served, patch("knowledge_hub.extraction.pdf.PdfReader", side_effect=pdf_reader):
+        result = await extract_pdf("https://example.com/doc.pdf")
+
+    assert result.extraction_status == ExtractionStatus.FULL
+    assert os.path.dirname(opened[0]) == str(tmp_path)
+
 
-    with patch("knowledge_hub.extraction.pdf.httpx.AsyncClient", return_value=mock_ctx):
+@pytest.mark.asyncio
+async def test_pdf_bytes_are_spooled_once(monkeypatch, tmp_path):
+    """A PDF already in memory is written to one spool file; the workers get its path."""
+    monkeypatch.setenv("PDF_SPOOL_DIR", str(tmp_path))
+    opened = []
+
+    def pdf_reader(stream):
+        opened.append((stream.name, stream.read()))
+        return _reader("In memory.")
+
+    with patch("knowledge_hub.extraction.pdf.PdfReader", side_effect=pdf_reader):
+        result = await extract_pdf_bytes(b"%PDF-in-memory", "https://example.com/a.pdf")
+
+    assert result.text == "In memory."
+    ((name, content),) = set(opened)  # the info call and the page range, one file
+    assert os.path.dirname(name) == str(tmp_path) and content == b"%PDF-in-memory"
+    assert not os.path.exists(name)
+
+
+@pytest.mark.asyncio
+async def test_extract_pdf_too_large_declared():
+    """Content-Length over 20MB returns METADATA_ONLY without reading the body."""
+
+    async def never():
+        raise AssertionError("body read")
+        yield b""
+
+    served, _ = _serve(never(), {"content-length": str(MAX_PDF_SIZE_BYTES + 1)})
+    with served:
         result = await extract_pdf("https://example.com/huge.pdf")
 
     assert result.extraction_status == ExtractionStatus.METADATA_ONLY
     assert "too large" in (result.description or "").lower()
-    # GET should not have been called
-    mock_client.get.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_extract_pdf_too_large_body():
-    """GET body exceeding 20MB returns METADATA_ONLY."""
-    oversized_body = b"x" * (MAX_PDF_SIZE_BYTES + 1)
-    mock_ctx, _ = _mock_client(
-        head_error=True,  # HEAD fails, falls through to GET
-        get_content=oversized_body,
-    )
-
-    with patch("knowledge_hub.extraction.pdf.httpx.AsyncClient", return_value=mock_ctx):
+async def test_extract_pdf_too_large_body_stops_mid_stream():
+    """A body that grows past 20MB without declaring its length is abandoned at the cap."""
+    sent = 0
+
+    async def endless():
+        nonlocal sent
+        chunk = b"%PDF-" + bytes(1024 * 1024 - 5)
+        while True:
+            sent += len(chunk)
+            yield chunk
+
+    served, _ = _serve(endless())
+    with served:
         result = await extract_pdf("https://example.com/big.pdf")
 
     assert result.extraction_status == ExtractionStatus.METADATA_ONLY
+    assert sent <= MAX_PDF_SIZE_BYTES + 2 * 1024 * 1024
 
 
 @pytest.mark.asyncio
 async def test_extract_pdf_no_text():
     """PDF with empty pages (scanned/image) returns METADATA_ONLY."""
-    mock_ctx, _ = _mock_client(
-        head_headers={"content-length": "1000"},
-        get_content=b"%PDF-fake",
-    )
+    served, _ = _serve(b"%PDF-fake")
 
-    page = MagicMock()
-    page.extract_text.return_value = ""
-    reader = MagicMock()
-    reader.pages = [page]
-    reader.metadata = None
-
-    with (
-        patch("knowledge_hub.extraction.pdf.httpx.AsyncClient", return_value=mock_ctx),
-        patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader),
-    ):
+    with served, patch("knowledge_hub.extraction.pdf.PdfReader", return_value=_reader("")):
         result = await extract_pdf("https://example.com/scanned.pdf")
 
     assert result.extraction_status == ExtractionStatus.METADATA_ONLY
@@ -121,21 +161,10 @@ async def test_extract_pdf_no_text():
 @pytest.mark.asyncio
 async def test_extract_pdf_metadata():
     """PDF metadata (title, author) maps to ExtractedContent fields."""
-    mock_ctx, _ = _mock_client(
-        head_headers={"content-length": "500"},
-        get_content=b"%PDF-data",
-    )
+    served, _ = _serve(b"%PDF-data")
+    reader = _reader("Some text.", SimpleNamespace(title="My Paper", author="Dr. Smith"))
 
-    page = MagicMock()
-    page.extract_text.return_value = "Some text."
-    reader = MagicMock()
-    reader.pages = [page]
-    reader.metadata = SimpleNamespace(title="My Paper", author="Dr. Smith")
-
-    with (
-        patch("knowledge_hub.extraction.pdf.httpx.AsyncClient", return_value=mock_ctx),
-        patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader),
-    ):
+    with served, patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader):
         result = await extract_pdf("https://example.com/paper.pdf")
 
     assert result.title == "My Paper"
@@ -145,10 +174,233 @@ async def test_extract_pdf_metadata():
 @pytest.mark.asyncio
 async def test_extract_pdf_download_error():
     """httpx error during download results in FAILED."""
-    mock_ctx, mock_client = _mock_client(head_error=True)
-    mock_client.get.side_effect = httpx.HTTPError("Connection refused")
+    served, _ = _serve(b"", error=httpx.ConnectError("Connection refused"))
 
-    with patch("knowledge_hub.extraction.pdf.httpx.AsyncClient", return_value=mock_ctx):
+    with served:
         result = await extract_pdf("https://example.com/broken.pdf")
 
     assert result.extraction_status == ExtractionStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_extract_pdf_not_a_pdf():
+    """An HTML page behind a PDF link fails without being handed to pypdf."""
+    served, _ = _serve(b"<!DOCTYPE html><html>" + bytes(2048), {"content-type": "text/html"})
+
+    with served:
+        result = await extract_pdf("https://example.com/paper.pdf")
+
+    assert result.extraction_status == ExtractionStatus.FAILED
+    assert result.description == "Unsupported content type: text/html"
+
+
+# -- Long PDFs (page ranges in parallel, word budget) --
+
+
+def _long_pdf(pages: int, words_per_page: int = 100):
+    """A mocked PdfReader of numbered pages; returns it and the list of pages extracted."""
+    extracted = []
+
+    def page(number):
+        mock = MagicMock()
+
+        def extract_text():
+            extracted.append(number)
+            return f"p{number} " * words_per_page
+
+        mock.extract_text.side_effect = extract_text
+        return mock
+
+    reader = MagicMock()
+    reader.pages = [page(n) for n in range(1, pages + 1)]
+    reader.metadata = None
+    return reader, extracted
+
+
+@pytest.mark.asyncio
+async def test_long_pdf_stops_at_the_word_budget(monkeypatch):
+    monkeypatch.setenv("PARSE_WORKERS", "2")
+    monkeypatch.setenv("PDF_WORD_BUDGET", "1000")
+    monkeypatch.setenv("PDF_PAGES_PER_TASK", "4")
+    monkeypatch.setenv("PDF_SAMPLE_TAIL_PAGES", "2")
+    reader, extracted = _long_pdf(400)
+    served, _ = _serve(b"%PDF-long")
+
+    with served, patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader):
+        result = await extract_pdf("https://example.com/report.pdf")
+
+    assert result.extraction_status == ExtractionStatus.FULL
+    assert (result.page_count, result.truncated) == (400, True)
+    paragraphs = result.text.split("\n")
+    assert [p.split()[0] for p in paragraphs] == [f"p{n}" for n in range(1, 11)] + [
+        "[Pages",
+        "p399",
+        "p400",
+    ]
+    assert "[Pages 11-398 of 400 not extracted]" in result.text
+    # Pages read: the budget's ten, the range running alongside, and the tail
+    assert len(extracted) <= 16 + 2
+    assert sorted(extracted)[-2:] == [399, 400]
+
+
+@pytest.mark.asyncio
+async def test_budget_stopping_inside_the_tail_skips_no_pages(monkeypatch):
+    """The tail picks up right after the budget's last page, with no skipped-pages marker."""
+    monkeypatch.setenv("PARSE_WORKERS", "1")
+    monkeypatch.setenv("PDF_WORD_BUDGET", "1000")
+    monkeypatch.setenv("PDF_PAGES_PER_TASK", "5")
+    monkeypatch.setenv("PDF_SAMPLE_TAIL_PAGES", "3")
+    reader, _ = _long_pdf(12)
+    served, _ = _serve(b"%PDF-long")
+
+    with served, patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader):
+        result = await extract_pdf("https://example.com/report.pdf")
+
+    assert "not extracted" not in result.text
+    paragraphs = result.text.split("\n")
+    assert [p.split()[0] for p in paragraphs] == [f"p{n}" for n in range(1, 13)]
+
+
+@pytest.mark.asyncio
+async def test_errors_in_pages_past_the_budget_are_ignored(monkeypatch):
+    monkeypatch.setenv("PARSE_WORKERS", "2")
+    monkeypatch.setenv("PDF_WORD_BUDGET", "1000")
+    monkeypatch.setenv("PDF_PAGES_PER_TASK", "4")
+    monkeypatch.setenv("PDF_SAMPLE_TAIL_PAGES", "2")
+    reader, _ = _long_pdf(400)
+    for page in reader.pages[12:398]:
+        page.extract_text.side_effect = ValueError("corrupt page")
+    served, _ = _serve(b"%PDF-long")
+
+    with served, patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader):
+        result = await extract_pdf("https://example.com/report.pdf")
+
+    assert result.extraction_status == ExtractionStatus.FULL
+    assert (result.page_count, result.truncated) == (400, True)
+
+
+@pytest.mark.asyncio
+async def test_error_in_a_page_within_the_budget_fails_the_pdf(monkeypatch):
+    monkeypatch.setenv("PDF_PAGES_PER_TASK", "4")
+    reader, _ = _long_pdf(10, words_per_page=5)
+    reader.pages[5].extract_text.side_effect = ValueError("corrupt page")
+    served, _ = _serve(b"%PDF-short")
+
+    with served, patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader):
+        result = await extract_pdf("https://example.com/short.pdf")
+
+    assert result.extraction_status == ExtractionStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_ranges_past_the_budget_are_cancelled(monkeypatch):
+    monkeypatch.setenv("PARSE_WORKERS", "2")
+    monkeypatch.setenv("PDF_PAGES_PER_TASK", "1")
+    cancelled = []
+
+    async def run_parser(fn, source, start, stop):
+        try:
+            await asyncio.sleep(0 if start == 0 else 60)
+        except asyncio.CancelledError:
+            cancelled.append(start)
+            raise
+        return ["word " * 10]
+
+    with patch("knowledge_hub.extraction.pdf.run_parser", run_parser):
+        pages = await _read_pages("doc.pdf", page_count=4, word_budget=10)
+
+    assert pages == ["word " * 10]
+    assert cancelled == [1]
+
+
+@pytest.mark.asyncio
+async def test_pdf_within_budget_is_read_whole(monkeypatch):
+    monkeypatch.setenv("PDF_WORD_BUDGET", "0")
+    monkeypatch.setenv("PDF_PAGES_PER_TASK", "3")
+    reader, extracted = _long_pdf(10, words_per_page=5)
+    served, _ = _serve(b"%PDF-short")
+
+    with served, patch("knowledge_hub.extraction.pdf.PdfReader", return_value=reader):
+        result = await extract_pdf("https://example.com/short.pdf")
+
+    assert (result.page_count, result.truncated, result.word_count) == (10, False, 50)
+    assert sorted(extracted) == list(range(1, 11))
+    assert result.text.split()[::5] == [f"p{n}" for n in range(1, 11)]
+
+
+# -- Slack uploads (streamed, authenticated) --
+
+SLACK_FILE_URL = "https://files.slack.com/files-pri/T1-F1/board%20deck.pdf"
+
+
+def _slack_client(body: bytes, content_type: str = "application/pdf", seen: dict | None = None):
+    """A real AsyncClient backed by a mock transport, standing in for the shared client."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if seen is not None:
+            seen["authorization"] = request.headers.get("authorization")
+        return httpx.Response(200, content=body, headers={"content-type": content_type})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+
+
+@pytest.mark.asyncio
+async def test_extract_slack_pdf_streams_with_bot_token(monkeypatch):
+    """The upload is fetched with the bot token and parsed from the spooled file."""
+    monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-test")
+    from knowledge_hub.config import get_settings
+
+    get_settings.cache_clear()
+    seen: dict = {}
+    parsed: dict = {}
+
+    def fake_reader(stream):
+        parsed["bytes"] = stream.read()
+        page = MagicMock()
+        page.extract_text.return_value = "Deck text."
+        return SimpleNamespace(pages=[page], metadata=None)
+
+    with (
+        patch(
+            "knowledge_hub.extraction.download.get_http_client",
+            return_value=_slack_client(b"%PDF-" + b"x" * 200_000, seen=seen),
+        ),
+        patch("knowledge_hub.extraction.pdf.PdfReader", side_effect=fake_reader),
+    ):
+        result = await extract_slack_pdf(SLACK_FILE_URL)
+
+    assert seen["authorization"] == "Bearer xoxb-test"
+    assert parsed["bytes"] == b"%PDF-" + b"x" * 200_000
+    assert result.extraction_status == ExtractionStatus.FULL
+    assert result.text == "Deck text."
+    assert result.title == "board deck.pdf"  # file name stands in for missing metadata
+
+
+@pytest.mark.asyncio
+async def test_extract_slack_pdf_stops_at_size_cap():
+    """A download past MAX_PDF_SIZE_BYTES is abandoned without parsing."""
+    with (
+        patch(
+            "knowledge_hub.extraction.download.get_http_client",
+            return_value=_slack_client(b"x" * (MAX_PDF_SIZE_BYTES + 1)),
+        ),
+        patch("knowledge_hub.extraction.pdf.PdfReader") as mock_reader,
+    ):
+        result = await extract_slack_pdf(SLACK_FILE_URL)
+
+    assert result.extraction_status == ExtractionStatus.METADATA_ONLY
+    assert "too large" in result.description
+    mock_reader.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_extract_slack_pdf_sign_in_page_fails():
+    """An HTML sign-in page (missing files:read scope) is reported as a failure."""
+    with patch(
+        "knowledge_hub.extraction.download.get_http_client",
+        return_value=_slack_client(b"<html>", content_type="text/html; charset=utf-8"),
+    ):
+        result = await extract_slack_pdf(SLACK_FILE_URL)
+
+    assert result.extraction_status == ExtractionStatus.FAILED
+    assert "files:read" in result.description
@@ -0,0 +1,140 @@
+"""Tests for ETag/Last-Modified revalidation of cached extractions."""
+
+import time
+
+import httpx
+import pytest
+
+from knowledge_hub.extraction import article, cache, download, pdf
+from knowledge_hub.extraction.cache import get_extraction_cache
+from knowledge_hub.extraction.revalidation import NotModified, Validators, revalidation_scope
+from knowledge_hub.extraction.timeout import extract_with_timeout
+from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
+
+URL = "https://example.com/post"
+PAGE = (
+    "<html><head><title>Post</title></head><body><article><p>"
+    + "Unchanged pages are revalidated, not parsed again. " * 20
+    + "</p></article></body></html>"
+).encode()
+
+
+class _Site:
+    """Serves PAGE with an ETag, answering 304 to a matching If-None-Match."""
+
+    def __init__(self, etag: str = '"v1"') -> None:
+        self.etag = etag
+        self.conditions: list[str | None] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        condition = request.headers.get("if-none-match")
+        self.conditions.append(condition)
+        if condition == self.etag:
+            return httpx.Response(304, headers={"ETag": self.etag})
+        headers = {"Content-Type": "text/html", "ETag": self.etag}
+        return httpx.Response(200, headers=headers, content=PAGE)
+
+
+@pytest.fixture
+def site(monkeypatch):
+    site = _Site()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(site))
+    monkeypatch.setattr(download, "get_http_client", lambda: client)
+    return site
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    parse_html = article.parse_html
+
+    def counting_parse(html, url):
+        calls.append(url)
+        return parse_html(html, url)
+
+    monkeypatch.setattr(article, "parse_html", counting_parse)
+    return calls
+
+
+def _expire(monkeypatch, seconds: float = 2 * 86400) -> None:
+    later = time.time() + seconds
+    monkeypatch.setattr(cache.time, "time", lambda: later)
+
+
+async def test_unchanged_page_reuses_the_cached_result(site, parses, monkeypatch):
+    first = await extract_with_timeout(URL)
+    assert first.extraction_status == ExtractionStatus.FULL
+    _expire(monkeypatch)
+
+    second = await extract_with_timeout(URL)
+
+    assert site.conditions == [None, '"v1"']
+    assert len(parses) == 1
+    assert second.text == first.text
+    stats = get_extraction_cache().snapshot()
+    assert (stats["expired"], stats["revalidated"]) == (1, 1)
+
+    await extract_with_timeout(URL)  # fresh again: no request at all
+    assert len(site.conditions) == 2
+
+
+async def test_changed_page_is_extracted_again(site, parses, monkeypatch):
+    await extract_with_timeout(URL)
+    site.etag = '"v2"'
+    _expire(monkeypatch)
+
+    await extract_with_timeout(URL)
+    assert site.conditions == [None, '"v1"']
+    assert len(parses) == 2
+
+    _expire(monkeypatch, 4 * 86400)
+    await extract_with_timeout(URL)
+    assert site.conditions[-1] == '"v2"'  # the new validators were stored
+    assert len(parses) == 2
+
+
+async def test_pages_without_validators_are_dropped_at_expiry(site, monkeypatch):
+    site.etag = ""
+    await extract_with_timeout(URL)
+    _expire(monkeypatch)
+    assert get_extraction_cache().get_stale(URL) is None
+    assert get_extraction_cache().snapshot()["entries"] == 1
+    assert get_extraction_cache().get(URL) is None
+    assert get_extraction_cache().snapshot()["entries"] == 0
+
+
+def test_validators_are_only_sent_to_the_url_they_came_from(monkeypatch):
+    cache = get_extraction_cache()
+    abstract = "https://arxiv.org/abs/2401.00001"
+    content = ExtractedContent(url=abstract, content_type=ContentType.PDF, text="Paper " * 50)
+    cache.put(abstract, content, Validators(etag='"abs"'))
+    _expire(monkeypatch, 90 * 86400)
+
+    assert cache.get_stale(abstract)[1] == Validators(etag='"abs"')
+    assert cache.get_stale("https://arxiv.org/pdf/2401.00001") is None
+
+
+async def test_pdf_download_is_revalidated(monkeypatch):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append((request.method, request.headers.get("if-modified-since")))
+        return httpx.Response(304)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(download, "get_http_client", lambda: client)
+    since = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+    with revalidation_scope("https://example.com/a.pdf", Validators(last_modified=since)):
+        with pytest.raises(NotModified):
+            await pdf.extract_pdf("https://example.com/a.pdf")
+    assert sent == [("GET", since)]
+
+
+def test_validators_from_headers():
+    assert Validators.from_headers({"Content-Type": "text/html"}) is None
+    validators = Validators.from_headers({"ETag": 'W/"x"', "Last-Modified": "yesterday"})
+    assert validators.request_headers() == {
+        "If-None-Match": 'W/"x"',
+        "If-Modified-Since": "yesterday",
+    }
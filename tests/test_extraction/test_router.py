@@ -4,6 +4,12 @@ from knowledge_hub.extraction.router import detect_content_type
 from knowledge_hub.models.content import ContentType
 
 
+def test_slack_upload_is_pdf():
+    """Slack-hosted uploads route to the PDF extractor even without a .pdf suffix."""
+    url = "https://files.slack.com/files-pri/T1-F1/quarterly_report"
+    assert detect_content_type(url) == ContentType.PDF
+
+
 def test_youtube_watch_url():
     assert detect_content_type("https://www.youtube.com/watch?v=dQw4w9WgXcQ") == ContentType.VIDEO
 
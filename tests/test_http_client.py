@@ -0,0 +1,170 @@
+"""Tests for the shared HTTP client: per-host caps, DNS cache, and reuse counters."""
+
+import asyncio
+
+import httpcore
+import httpx
+import pytest
+
+from knowledge_hub.extraction.article import fetch_url
+from knowledge_hub.http_client import (
+    HttpStats,
+    SharedTransport,
+    _CachingDNSBackend,
+    build_http_client,
+    close_http_client,
+    get_http_client,
+    http_stats,
+)
+
+
+def _client(handler, per_host: int = 6) -> tuple[httpx.AsyncClient, SharedTransport]:
+    transport = SharedTransport(
+        limits=httpx.Limits(),
+        per_host=per_host,
+        dns_cache_ttl=60,
+        http2=False,
+        transport=httpx.MockTransport(handler),
+    )
+    return build_http_client(transport), transport
+
+
+async def test_requests_per_host_are_capped():
+    """No more than `per_host` requests to one host run at once; other hosts are not held up."""
+    running: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        running[host] = running.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), running[host])
+        await asyncio.sleep(0.01)
+        running[host] -= 1
+        return httpx.Response(200, text="ok")
+
+    client, transport = _client(handler, per_host=2)
+    urls = [f"https://a.example/{n}" for n in range(6)] + ["https://b.example/"]
+    responses = await asyncio.gather(*(client.get(url) for url in urls))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert peak == {"a.example": 2, "b.example": 1}
+    assert transport.stats.requests == 7
+    assert transport._hosts == {}  # idle hosts hold no state
+
+
+async def test_streamed_response_holds_its_slot_until_closed():
+    async def body():
+        yield b"ok"
+
+    client, transport = _client(lambda request: httpx.Response(200, content=body()), per_host=1)
+
+    async with client.stream("GET", "https://a.example/1"):
+        second = asyncio.create_task(client.get("https://a.example/2"))
+        await asyncio.sleep(0.01)
+        assert not second.done()
+
+    assert (await second).status_code == 200
+    assert transport._hosts == {}
+
+
+class _RecordingBackend(httpcore.AsyncNetworkBackend):
+    def __init__(self) -> None:
+        self.connected: list[str] = []
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.connected.append(host)
+        return httpcore.AsyncMockStream([])
+
+    async def sleep(self, seconds: float) -> None:
+        pass
+
+
+async def test_dns_lookups_are_cached(monkeypatch):
+    lookups = []
+
+    def getaddrinfo(host, port, **kwargs):
+        lookups.append(host)
+        return [(10, 1, 6, "", ("2001:db8::1", port, 0, 0)), (2, 1, 6, "", ("192.0.2.7", port))]
+
+    monkeypatch.setattr("knowledge_hub.http_client.socket.getaddrinfo", getaddrinfo)
+    inner = _RecordingBackend()
+    stats = HttpStats()
+    backend = _CachingDNSBackend(inner, ttl=60, stats=stats)
+
+    await backend.connect_tcp("example.com", 443)
+    await backend.connect_tcp("example.com", 443)
+    await backend.connect_tcp("192.0.2.9", 443)
+
+    assert lookups == ["example.com"]
+    assert inner.connected == ["192.0.2.7", "192.0.2.7", "192.0.2.9"]  # IPv4 preferred
+    assert (stats.dns_lookups, stats.dns_cache_hits, stats.connections_opened) == (1, 1, 3)
+
+
+async def test_failed_lookup_is_a_connect_error(monkeypatch):
+    def getaddrinfo(host, port, **kwargs):
+        raise OSError("Name or service not known")
+
+    monkeypatch.setattr("knowledge_hub.http_client.socket.getaddrinfo", getaddrinfo)
+    backend = _CachingDNSBackend(_RecordingBackend(), ttl=60, stats=HttpStats())
+
+    with pytest.raises(httpcore.ConnectError):
+        await backend.connect_tcp("nonexistent.invalid", 443)
+
+
+async def test_keep_alive_connection_is_reused():
+    """Against a real socket, three requests to one host open one connection."""
+
+    async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        client = get_http_client()
+        for _ in range(3):
+            assert (await client.get(f"http://localhost:{port}/")).text == "ok"
+        stats = http_stats()
+    finally:
+        await close_http_client()
+        server.close()
+
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 2
+    assert stats["dns_lookups"] == 1
+
+
+async def test_connection_errors_are_httpx_errors():
+    """Errors from the connection pool reach callers as the httpx errors they catch."""
+    server = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    server.close()
+    await server.wait_closed()
+    try:
+        with pytest.raises(httpx.ConnectError):
+            await get_http_client().get(f"http://127.0.0.1:{port}/")
+    finally:
+        await close_http_client()
+
+
+async def test_article_fetch_url_uses_shared_client(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/missing":
+            return httpx.Response(404, text="not found")
+        if request.url.path == "/down":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, html="<html>page</html>")
+
+    client, _ = _client(handler)
+    monkeypatch.setattr("knowledge_hub.extraction.download.get_http_client", lambda: client)
+
+    assert (await fetch_url("https://example.com/page")).text == "<html>page</html>"
+    assert await fetch_url("https://example.com/missing") is None
+    assert await fetch_url("https://example.com/down") is None
+
+
+def test_metrics_report_http_counters(client):
+    body = client.get("/metrics").json()
+    assert set(body["http"]) >= {"requests", "connections_opened", "connections_reused", "http2"}
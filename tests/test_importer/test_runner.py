@@ -0,0 +1,138 @@
+"""Tests for the import runner: stage wiring, journaling, and resume."""
+
+import io
+from contextlib import ExitStack, contextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from knowledge_hub.importer import (
+    DUPLICATE,
+    FAILED,
+    SAVED,
+    ImportItem,
+    ImportJournal,
+    ImportStats,
+    ProgressLine,
+    run_import,
+)
+from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
+from knowledge_hub.notion.models import DuplicateResult, PageResult
+from knowledge_hub.pipeline import BULK, current_lane
+
+SOURCE = "/exports/pocket.html"
+_PATCH_PREFIX = "knowledge_hub.importer.runner"
+_STAGES = "knowledge_hub.pipeline.stages"
+
+
+def _content(url: str, status: ExtractionStatus = ExtractionStatus.FULL) -> ExtractedContent:
+    return ExtractedContent(
+        url=url,
+        content_type=ContentType.ARTICLE,
+        title="Test",
+        text="Body text " * 100,
+        word_count=200,
+        extraction_status=status,
+    )
+
+
+@contextmanager
+def _patched(extract_content: AsyncMock, create_notion_page: AsyncMock | None = None):
+    """Patch the pipeline stages; yields the lane each Gemini call ran in."""
+    lanes = []
+
+    async def process_content(client, content):
+        lanes.append(current_lane.get())
+        return MagicMock(), 0.002
+
+    create_notion_page = create_notion_page or AsyncMock(
+        return_value=PageResult(page_id="p", page_url="https://n/p", title="t")
+    )
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch(f"{_PATCH_PREFIX}.resolve_url", AsyncMock(side_effect=lambda url: url))
+        )
+        stack.enter_context(patch(f"{_STAGES}.extract_content", extract_content))
+        stack.enter_context(patch(f"{_STAGES}.check_duplicate", AsyncMock(return_value=None)))
+        stack.enter_context(patch(f"{_PATCH_PREFIX}.get_gemini_client", MagicMock()))
+        stack.enter_context(patch(f"{_STAGES}.process_content", process_content))
+        stack.enter_context(patch(f"{_STAGES}.create_notion_page", create_notion_page))
+        yield lanes
+
+
+async def test_import_records_each_outcome():
+    """Saved, duplicate, and failed URLs are journaled with their cost."""
+    items = [
+        ImportItem("https://a.example/new", "note"),
+        ImportItem("https://a.example/dup"),
+        ImportItem("https://a.example/broken"),
+    ]
+    extract = AsyncMock(
+        side_effect=lambda url: _content(
+            url, ExtractionStatus.FAILED if url.endswith("broken") else ExtractionStatus.FULL
+        )
+    )
+    create = AsyncMock(
+        side_effect=[
+            PageResult(page_id="p1", page_url="https://n/p1", title="New"),
+            DuplicateResult(page_id="p2", page_url="https://n/p2", title="Old"),
+        ]
+    )
+    journal = ImportJournal()
+    with _patched(extract, create) as lanes:
+        stats = await run_import(items, SOURCE, journal, concurrency=1)
+
+    assert (stats.saved, stats.duplicates, stats.failed) == (1, 1, 1)
+    assert stats.cost_usd == 0.004
+    assert lanes == [BULK, BULK]
+    assert journal.outcomes(SOURCE) == {
+        "https://a.example/new": SAVED,
+        "https://a.example/dup": DUPLICATE,
+        "https://a.example/broken": FAILED,
+    }
+
+
+async def test_import_resumes_from_journal():
+    """A rerun skips finished URLs and, unless asked, earlier failures."""
+    journal = ImportJournal()
+    journal.record(SOURCE, "https://a.example/1", SAVED, cost_usd=0.01)
+    journal.record(SOURCE, "https://a.example/2", FAILED, error="timeout")
+    items = [ImportItem(f"https://a.example/{i}") for i in range(1, 4)]
+
+    extract = AsyncMock(side_effect=_content)
+    with _patched(extract):
+        stats = await run_import(items, SOURCE, journal, concurrency=4)
+        assert [c.args[0] for c in extract.call_args_list] == ["https://a.example/3"]
+        assert stats.skipped == 2
+        assert stats.cost_usd == 0.012  # includes the earlier run
+
+        extract.reset_mock()
+        stats = await run_import(items, SOURCE, journal, concurrency=4, retry_failed=True)
+        assert [c.args[0] for c in extract.call_args_list] == ["https://a.example/2"]
+
+    assert set(journal.outcomes(SOURCE).values()) == {SAVED}
+
+
+async def test_import_pipeline_error_is_a_failure_not_a_crash():
+    """An exception in one URL is journaled and the rest continue."""
+    extract = AsyncMock(side_effect=[RuntimeError("boom"), _content("https://a.example/2")])
+    journal = ImportJournal()
+    with _patched(extract):
+        stats = await run_import(
+            [ImportItem("https://a.example/1"), ImportItem("https://a.example/2")],
+            SOURCE,
+            journal,
+            concurrency=1,
+        )
+
+    assert (stats.saved, stats.failed) == (1, 1)
+    assert journal.outcomes(SOURCE)["https://a.example/1"] == FAILED
+
+
+def test_progress_line_reports_throughput_and_cost():
+    """The progress line carries counts, rate, cost, and an ETA."""
+    stats = ImportStats(total=10, skipped=2, saved=3, failed=1, cost_usd=0.25, started_at=0.0)
+    line = ProgressLine(io.StringIO()).render(stats)
+    assert line.startswith("6/10 (60%)")
+    assert "URL/s" in line
+    assert "failed 1" in line
+    assert "$0.2500" in line
+    assert "ETA" in line
@@ -0,0 +1,86 @@
+"""Tests for reading URL export files."""
+
+from pathlib import Path
+
+import pytest
+
+from knowledge_hub.importer import ImportItem, detect_format, read_items
+
+
+def _write(tmp_path: Path, name: str, text: str) -> Path:
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def test_detect_format_from_extension():
+    """HTML and CSV exports are recognized by extension; anything else is plain text."""
+    assert detect_format(Path("ril_export.html")) == "html"
+    assert detect_format(Path("raindrop.CSV")) == "csv"
+    assert detect_format(Path("links.txt")) == "text"
+
+
+def test_pocket_html_export(tmp_path):
+    """Every anchor's href is read, in document order."""
+    path = _write(
+        tmp_path,
+        "ril_export.html",
+        '<ul><li><a href="https://a.example/1" time_added="1">One</a></li>'
+        '<li><a href="https://b.example/2" tags="x">Two</a></li></ul>',
+    )
+    assert read_items(path) == [
+        ImportItem("https://a.example/1"),
+        ImportItem("https://b.example/2"),
+    ]
+
+
+def test_raindrop_csv_export_keeps_notes(tmp_path):
+    """The url column is read and the note column becomes the user note."""
+    path = _write(
+        tmp_path,
+        "export.csv",
+        "id,title,note,excerpt,url,folder\n"
+        '1,First,"must read",,https://a.example/1,Unsorted\n'
+        "2,Second,,,https://b.example/2,Unsorted\n",
+    )
+    assert read_items(path) == [
+        ImportItem("https://a.example/1", "must read"),
+        ImportItem("https://b.example/2"),
+    ]
+
+
+def test_csv_multi_line_note_keeps_its_line_breaks(tmp_path):
+    path = _write(
+        tmp_path,
+        "export.csv",
+        'url,note\nhttps://a.example/1,"line one\nline two"\nhttps://b.example/2,\n',
+    )
+    assert read_items(path) == [
+        ImportItem("https://a.example/1", "line one\nline two"),
+        ImportItem("https://b.example/2"),
+    ]
+
+
+def test_csv_without_url_column_is_rejected(tmp_path):
+    """A CSV we cannot map is an error, not an empty import."""
+    path = _write(tmp_path, "export.csv", "title,link_text\nx,y\n")
+    with pytest.raises(ValueError, match="url"):
+        read_items(path)
+
+
+def test_plain_text_skips_comments_repeats_and_non_web_urls(tmp_path):
+    """One URL per line; trailing text is the note; duplicates are read once."""
+    path = _write(
+        tmp_path,
+        "links.txt",
+        "# reading list\n"
+        "https://a.example/1 great intro\n"
+        "\n"
+        "mailto:someone@example.com\n"
+        "https://a.example/1\n"
+        "https://b.example/2\n",
+    )
+    assert read_items(path) == [
+        ImportItem("https://a.example/1", "great intro"),
+        ImportItem("https://b.example/2"),
+    ]
@@ -164,3 +164,11 @@ def test_build_user_content_without_user_note():
     content = _make_content(user_note=None)
     result = build_user_content(content)
     assert "User Note" not in result
+
+
+def test_build_user_content_notes_truncated_pdf():
+    """A PDF cut at the word budget is flagged so the analysis can say so."""
+    content = _make_content(content_type=ContentType.PDF, page_count=400, truncated=True)
+    result = build_user_content(content)
+    assert "Note: Only part of this 400-page document was extracted" in result
+    assert "Note:" not in build_user_content(_make_content())
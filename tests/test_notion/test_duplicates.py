@@ -45,8 +45,8 @@ def test_normalize_combined():
 
 def test_normalize_preserves_non_utm_params():
     """Non-utm query params preserved, utm removed."""
-    result = normalize_url("https://example.com/page?ref=abc&utm_campaign=x")
-    assert "ref=abc" in result
+    result = normalize_url("https://example.com/page?page=2&utm_campaign=x")
+    assert "page=2" in result
     assert "utm_campaign" not in result
 
 
@@ -117,3 +117,53 @@ async def test_check_duplicate_no_title_fallback(mock_get_client, mock_get_ds_id
     result = await check_duplicate("https://example.com/no-title")
     assert isinstance(result, DuplicateResult)
     assert result.title == "Untitled"
+
+
+@patch("knowledge_hub.notion.duplicates.get_data_source_id", new_callable=AsyncMock)
+@patch("knowledge_hub.notion.duplicates.get_notion_client", new_callable=AsyncMock)
+async def test_check_duplicate_queries_every_stored_form(mock_get_client, mock_get_ds_id):
+    """Canonical, pre-canonicalization, and declared canonical forms are all matched."""
+    mock_client = AsyncMock()
+    mock_get_client.return_value = mock_client
+    mock_client.data_sources.query.return_value = {"results": []}
+
+    await check_duplicate("https://m.example.com/a?fbclid=1", "https://example.com/a-canonical")
+
+    query = mock_client.data_sources.query.call_args.kwargs["filter"]
+    urls = {f["url"]["equals"] for f in query["or"]}
+    assert urls == {
+        "https://example.com/a",
+        "https://m.example.com/a?fbclid=1",
+        "https://example.com/a-canonical",
+    }
+
+
+@patch("knowledge_hub.notion.duplicates.get_data_source_id", new_callable=AsyncMock)
+@patch("knowledge_hub.notion.duplicates.get_notion_client", new_callable=AsyncMock)
+async def test_check_duplicate_matches_resource_identity(mock_get_client, mock_get_ds_id):
+    """A youtu.be link finds the video saved under a different URL form."""
+    mock_client = AsyncMock()
+    mock_get_client.return_value = mock_client
+
+    def page(page_id: str, source: str) -> dict:
+        return {
+            "id": page_id,
+            "url": f"https://notion.so/{page_id}",
+            "properties": {
+                "Title": {"title": [{"plain_text": page_id}]},
+                "Source": {"url": source},
+            },
+        }
+
+    mock_client.data_sources.query.return_value = {
+        "results": [
+            page("unrelated", "https://example.com/?q=dQw4w9WgXcQ"),
+            page("video", "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10"),
+        ]
+    }
+
+    result = await check_duplicate("https://youtu.be/dQw4w9WgXcQ")
+
+    query = mock_client.data_sources.query.call_args.kwargs["filter"]
+    assert {"property": "Source", "url": {"contains": "dQw4w9WgXcQ"}} in query["or"]
+    assert result.page_id == "video"
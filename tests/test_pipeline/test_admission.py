@@ -0,0 +1,80 @@
+"""Tests for admission control and backpressure."""
+
+from unittest.mock import patch
+
+from knowledge_hub.pipeline.admission import AdmissionController, Decision, estimate_memory_mb
+from knowledge_hub.pipeline.queue import MemoryJobQueue
+
+
+def _controller(queue: MemoryJobQueue, **overrides: int) -> AdmissionController:
+    limits = {
+        "max_in_flight_jobs": 2,
+        "max_queue_depth": 3,
+        "memory_budget_mb": 100,
+        "memory_high_watermark_mb": 400,
+    }
+    limits.update(overrides)
+    return AdmissionController(queue, **limits)
+
+
+def test_estimate_memory_weights_pdfs_heavier():
+    """PDF links reserve more memory than articles."""
+    assert estimate_memory_mb(["https://a.com/report.pdf"]) > estimate_memory_mb(
+        ["https://a.com/post"]
+    )
+
+
+def test_idle_pipeline_admits():
+    """With nothing queued or running, new work is admitted."""
+    assert _controller(MemoryJobQueue()).check_enqueue() == Decision.ADMIT
+
+
+def test_waiting_jobs_defer():
+    """New work behind jobs that have not started yet is deferred."""
+    queue = MemoryJobQueue()
+    queue.enqueue("k", {})
+    assert _controller(queue).check_enqueue() == Decision.DEFER
+
+
+def test_full_queue_sheds():
+    """Once the queue reaches max_queue_depth, new work is shed."""
+    queue = MemoryJobQueue()
+    for _ in range(3):
+        queue.enqueue("k", {})
+    controller = _controller(queue)
+    assert controller.check_enqueue() == Decision.SHED
+    assert controller.snapshot().shed_total == 1
+
+
+def test_memory_budget_blocks_new_jobs():
+    """Reservations past the memory budget stop workers from leasing more."""
+    controller = _controller(MemoryJobQueue(), memory_budget_mb=64)
+    assert controller.has_capacity() is True
+    controller.reserve(["https://a.com/big.pdf"])
+    assert controller.has_capacity() is False
+
+
+def test_idle_pipeline_always_has_capacity():
+    """A single oversized job can still start when nothing else is running."""
+    controller = _controller(MemoryJobQueue(), memory_budget_mb=1)
+    assert controller.has_capacity() is True
+
+
+def test_rss_high_watermark_blocks_new_jobs():
+    """Process RSS above the high watermark stops new jobs while others run."""
+    controller = _controller(MemoryJobQueue())
+    controller.reserve(["https://a.com/post"])
+    with patch("knowledge_hub.pipeline.admission._current_rss_mb", return_value=450):
+        assert controller.has_capacity() is False
+
+
+def test_release_restores_capacity():
+    """Releasing a reservation returns its memory and in-flight slot."""
+    controller = _controller(MemoryJobQueue(), memory_budget_mb=64)
+    urls = ["https://a.com/big.pdf"]
+    reservation = controller.reserve(urls)
+    controller.release(urls, reservation)
+    snapshot = controller.snapshot()
+    assert snapshot.in_flight_jobs == 0
+    assert snapshot.reserved_memory_mb == 0
+    assert controller.has_capacity() is True
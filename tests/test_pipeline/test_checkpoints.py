@@ -0,0 +1,122 @@
+"""Tests for per-URL stage checkpoints."""
+
+import time
+from datetime import datetime
+
+from knowledge_hub.models.content import ContentType, ExtractedContent
+from knowledge_hub.models.knowledge import Category, KnowledgeEntry, Priority
+from knowledge_hub.models.notion import KeyLearning, NotionPage
+from knowledge_hub.pipeline.checkpoints import (
+    Checkpoint,
+    CheckpointStore,
+    Stage,
+    checkpoint_key,
+)
+
+KEY = checkpoint_key("C1", "111.222", "https://example.com/a")
+
+
+def _make_content() -> ExtractedContent:
+    return ExtractedContent(
+        url="https://example.com/a",
+        content_type=ContentType.ARTICLE,
+        title="Test",
+        text="Body text",
+        word_count=2,
+        user_note="read later",
+    )
+
+
+def _make_page() -> NotionPage:
+    entry = KnowledgeEntry(
+        title="Test Article",
+        category=Category.AI_ML,
+        content_type=ContentType.ARTICLE,
+        source="https://example.com/a",
+        author="Test Author",
+        date_added=datetime(2026, 2, 20),
+        priority=Priority.HIGH,
+        tags=["AI"],
+        summary="A test summary.",
+    )
+    return NotionPage(
+        entry=entry,
+        summary_section="Executive summary.",
+        key_points=["Point 1"],
+        key_learnings=[
+            KeyLearning(
+                title="Lesson",
+                what="What",
+                why_it_matters="Why",
+                how_to_apply=["Do it"],
+                resources_needed="None",
+                estimated_time="5 minutes",
+            )
+        ],
+        detailed_notes="Notes.",
+    )
+
+
+def test_missing_checkpoint_is_none():
+    """A URL with no finished stage has no checkpoint."""
+    store = CheckpointStore()
+    assert store.get(KEY) is None
+    store.close()
+
+
+def test_extracted_checkpoint_round_trips_content():
+    """The extracted content, including the user note, is restored."""
+    store = CheckpointStore()
+    store.save(KEY, Checkpoint(Stage.EXTRACTED, content=_make_content()))
+    checkpoint = store.get(KEY)
+    store.close()
+    assert checkpoint.stage == Stage.EXTRACTED
+    assert checkpoint.content == _make_content()
+    assert checkpoint.page is None
+
+
+def test_analyzed_checkpoint_round_trips_page_and_cost():
+    """A later stage replaces the earlier one and restores the Gemini output."""
+    store = CheckpointStore()
+    store.save(KEY, Checkpoint(Stage.EXTRACTED, content=_make_content()))
+    store.save(
+        KEY, Checkpoint(Stage.ANALYZED, content=_make_content(), page=_make_page(), cost_usd=0.01)
+    )
+    checkpoint = store.get(KEY)
+    store.close()
+    assert checkpoint.stage == Stage.ANALYZED
+    assert checkpoint.page == _make_page()
+    assert checkpoint.cost_usd == 0.01
+
+
+def test_checkpoints_are_shared_through_the_data_dir():
+    """A second store on the same data directory (another instance) sees the checkpoint."""
+    first = CheckpointStore()
+    first.save(KEY, Checkpoint(Stage.SAVED))
+    first.close()
+    second = CheckpointStore()
+    assert second.get(KEY).stage == Stage.SAVED
+    second.close()
+
+
+def test_clear_and_expiry(monkeypatch):
+    """Cleared keys are gone, and stale checkpoints are ignored after the TTL."""
+    store = CheckpointStore(ttl_seconds=60)
+    other = checkpoint_key("C1", "111.222", "https://example.com/b")
+    store.save(KEY, Checkpoint(Stage.SAVED))
+    store.save(other, Checkpoint(Stage.SAVED))
+    store.clear([KEY])
+    assert store.get(KEY) is None
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert store.get(other) is None
+    store.close()
+
+
+def test_unserializable_checkpoint_is_not_fatal():
+    """A checkpoint that cannot be written is logged and skipped."""
+    store = CheckpointStore()
+    store.save(KEY, Checkpoint(Stage.ANALYZED, content=_make_content(), page=object()))
+    assert store.get(KEY) is None
+    store.close()
@@ -0,0 +1,96 @@
+"""Tests for in-flight coalescing of identical URLs."""
+
+import asyncio
+
+import pytest
+
+from knowledge_hub.pipeline import InFlightRegistry
+
+
+async def test_concurrent_runs_of_same_url_share_one_result():
+    """Only the first caller runs the work; the rest reuse its result."""
+    registry = InFlightRegistry()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "page"
+
+    results = await asyncio.gather(
+        registry.run("https://example.com/a", work),
+        registry.run("https://example.com/a?utm_source=x", work),
+        registry.run("https://m.example.com/a?utm_medium=email&fbclid=y", work),
+    )
+
+    assert calls == 1
+    assert results == [(True, "page"), (False, "page"), (False, "page")]
+    assert registry.coalesced_total == 2
+    assert len(registry) == 0
+
+
+def test_key_uses_resource_identity():
+    """Every URL form of one YouTube video shares a registry key."""
+    registry = InFlightRegistry()
+    assert registry.key("https://youtu.be/dQw4w9WgXcQ") == registry.key(
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30"
+    )
+
+
+async def test_different_urls_run_independently():
+    """Distinct normalized URLs never wait on each other."""
+    registry = InFlightRegistry()
+
+    async def work():
+        return "page"
+
+    results = await asyncio.gather(
+        registry.run("https://example.com/a", work),
+        registry.run("https://example.com/b", work),
+    )
+    assert results == [(True, "page"), (True, "page")]
+
+
+async def test_failed_run_is_retried_by_a_waiter():
+    """When the first run fails, one waiter runs the work itself."""
+    registry = InFlightRegistry()
+    attempts = []
+
+    async def failing():
+        attempts.append("first")
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def succeeding():
+        attempts.append("second")
+        return "page"
+
+    first = asyncio.create_task(registry.run("https://example.com/a", failing))
+    await asyncio.sleep(0)
+    second = await registry.run("https://example.com/a", succeeding)
+
+    with pytest.raises(RuntimeError):
+        await first
+    assert second == (True, "page")
+    assert attempts == ["first", "second"]
+
+
+async def test_cancelled_run_releases_waiters():
+    """A leader cancelled mid-run (e.g. on drain) does not strand its waiters."""
+    registry = InFlightRegistry()
+
+    async def slow():
+        await asyncio.sleep(10)
+        return "never"
+
+    async def fast():
+        return "page"
+
+    leader = asyncio.create_task(registry.run("https://example.com/a", slow))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(registry.run("https://example.com/a", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == (True, "page")
@@ -0,0 +1,131 @@
+"""Tests for lane cost estimates, fair sharing, and the fair stage limiter."""
+
+import asyncio
+
+from knowledge_hub.models.content import ContentType
+from knowledge_hub.pipeline.lanes import FairShare, estimate_cost, estimate_urls_cost
+from knowledge_hub.pipeline.limits import FairLimiter
+
+
+def test_estimate_cost_prefers_word_count():
+    """A known word count is the cost, regardless of content type."""
+    assert estimate_cost(ContentType.VIDEO, word_count=900, duration_seconds=3600) == 900
+
+
+def test_estimate_cost_uses_video_duration():
+    """A video without a transcript is sized from its duration."""
+    assert estimate_cost(ContentType.VIDEO, duration_seconds=7200) > estimate_cost(
+        ContentType.VIDEO, duration_seconds=300
+    )
+
+
+def test_estimate_urls_cost_weights_pdfs():
+    """Before extraction, PDFs are estimated as larger than articles."""
+    assert estimate_urls_cost(["https://a.com/paper.pdf"]) > estimate_urls_cost(
+        ["https://a.com/post"]
+    )
+
+
+def test_fair_share_serves_lanes_by_weight():
+    """With both lanes backlogged, a 3:1 weight serves the heavy lane three times as often."""
+    share = FairShare({"interactive": 3, "bulk": 1})
+    served = []
+    for _ in range(8):
+        lane = share.order(["interactive", "bulk"])[0]
+        share.charge(lane)
+        served.append(lane)
+    assert served.count("interactive") == 6
+    assert served.count("bulk") == 2
+
+
+def test_fair_share_idle_lane_does_not_bank_credit():
+    """A lane returning from idle does not get a burst for the time it was absent."""
+    share = FairShare({"interactive": 1, "bulk": 1})
+    for _ in range(10):
+        share.charge("interactive")
+    served = []
+    for _ in range(4):
+        lane = share.order(["interactive", "bulk"])[0]
+        share.charge(lane)
+        served.append(lane)
+    assert served.count("bulk") == 2
+
+
+async def _hold(limiter: FairLimiter, lane: str, cost: float, order: list, gate: asyncio.Event):
+    await limiter.acquire(cost, lane=lane)
+    order.append((lane, cost))
+    await gate.wait()
+    limiter.release()
+
+
+async def test_fair_limiter_grants_cheapest_waiter_in_lane():
+    """Queued waiters in one lane are granted shortest-job-first."""
+    limiter = FairLimiter(1, {"interactive": 1})
+    gate = asyncio.Event()
+    order: list = []
+    await limiter.acquire(lane="interactive")
+    tasks = [
+        asyncio.create_task(_hold(limiter, "interactive", cost, order, gate))
+        for cost in (5000, 100, 800)
+    ]
+    await asyncio.sleep(0)
+    gate.set()
+    limiter.release()
+    await asyncio.gather(*tasks)
+    assert [cost for _, cost in order] == [100, 800, 5000]
+
+
+async def test_fair_limiter_does_not_starve_light_lane():
+    """An interactive waiter is granted ahead of a long bulk backlog."""
+    limiter = FairLimiter(1, {"interactive": 4, "bulk": 1})
+    gate = asyncio.Event()
+    order: list = []
+    await limiter.acquire(lane="bulk")
+    tasks = [asyncio.create_task(_hold(limiter, "bulk", 0, order, gate)) for _ in range(5)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(_hold(limiter, "interactive", 0, order, gate)))
+    await asyncio.sleep(0)
+    gate.set()
+    limiter.release()
+    await asyncio.gather(*tasks)
+    assert order[0][0] == "interactive"
+
+
+async def test_fair_limiter_cancelled_waiter_frees_its_place():
+    """Cancelling a queued acquire removes it without leaking a slot."""
+    limiter = FairLimiter(1, {"interactive": 1})
+    await limiter.acquire(lane="interactive")
+    waiter = asyncio.create_task(limiter.acquire(lane="interactive"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    limiter.release()
+    assert limiter.snapshot()["in_use"] == 0
+    async with asyncio.timeout(1):
+        await limiter.acquire(lane="interactive")
+
+
+async def test_fair_limiter_skips_waiter_cancelled_before_its_turn():
+    """A slot freed right after a queued acquire is cancelled goes to the next waiter."""
+    limiter = FairLimiter(1, {"interactive": 1})
+    await limiter.acquire(lane="interactive")
+    cancelled = asyncio.create_task(limiter.acquire(lane="interactive"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    limiter.release()  # before the cancelled acquire has unwound
+    assert limiter.snapshot()["in_use"] == 0
+    await asyncio.gather(cancelled, return_exceptions=True)
+    async with asyncio.timeout(1):
+        await limiter.acquire(lane="interactive")
+    assert limiter.snapshot()["in_use"] == 1
+
+
+async def test_fair_limiter_waiter_cancelled_after_its_grant_returns_the_slot():
+    limiter = FairLimiter(1, {"interactive": 1})
+    await limiter.acquire(lane="interactive")
+    waiter = asyncio.create_task(limiter.acquire(lane="interactive"))
+    await asyncio.sleep(0)
+    limiter.release()  # granted to the waiter, which has not resumed yet
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert limiter.snapshot()["in_use"] == 0
@@ -0,0 +1,201 @@
+"""Tests for the durable job queue (SQLite and in-memory backends)."""
+
+import time
+
+import pytest
+
+from knowledge_hub.pipeline.queue import MemoryJobQueue, SQLiteJobQueue
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def queue(request):
+    """Yield each queue backend with max_attempts=2."""
+    if request.param == "sqlite":
+        q = SQLiteJobQueue(max_attempts=2)
+    else:
+        q = MemoryJobQueue(max_attempts=2)
+    yield q
+    q.close()
+
+
+def test_enqueue_then_lease_returns_payload(queue):
+    """A leased job carries the enqueued kind and payload."""
+    job_id = queue.enqueue("process_message", {"urls": ["https://a.com"]})
+    job = queue.lease(visibility_timeout=60)
+    assert job is not None
+    assert job.id == job_id
+    assert job.kind == "process_message"
+    assert job.payload == {"urls": ["https://a.com"]}
+    assert job.attempts == 1
+
+
+def test_leased_job_is_invisible(queue):
+    """A job cannot be leased twice while its lease is active."""
+    queue.enqueue("k", {})
+    assert queue.lease(visibility_timeout=60) is not None
+    assert queue.lease(visibility_timeout=60) is None
+
+
+def test_expired_lease_becomes_visible_again(queue):
+    """A job whose worker died is re-leased after the visibility timeout."""
+    queue.enqueue("k", {})
+    first = queue.lease(visibility_timeout=0.01)
+    time.sleep(0.02)
+    second = queue.lease(visibility_timeout=60)
+    assert second is not None
+    assert second.id == first.id
+    assert second.attempts == 2
+
+
+def test_ack_removes_job(queue):
+    """Acked jobs are deleted and no longer counted."""
+    queue.enqueue("k", {})
+    job = queue.lease(visibility_timeout=60)
+    queue.ack(job)
+    assert queue.depth() == 0
+
+
+def test_ack_with_stale_lease_is_ignored(queue):
+    """A worker whose lease expired cannot ack the re-leased job."""
+    queue.enqueue("k", {})
+    stale = queue.lease(visibility_timeout=0.01)
+    time.sleep(0.02)
+    queue.lease(visibility_timeout=60)
+    queue.ack(stale)
+    assert queue.depth() == 1
+
+
+def test_lease_is_fifo(queue):
+    """Jobs are leased in enqueue order."""
+    queue.enqueue("k", {"n": 1})
+    queue.enqueue("k", {"n": 2})
+    assert queue.lease(visibility_timeout=60).payload == {"n": 1}
+    assert queue.lease(visibility_timeout=60).payload == {"n": 2}
+
+
+def test_delayed_job_not_visible_until_due(queue):
+    """enqueue(delay=...) hides the job until the delay elapses."""
+    queue.enqueue("k", {}, delay=60)
+    assert queue.lease(visibility_timeout=60) is None
+    assert queue.depth() == 1
+
+
+def test_nack_releases_for_retry(queue):
+    """nack with no delay makes the job immediately leasable again."""
+    queue.enqueue("k", {})
+    job = queue.lease(visibility_timeout=60)
+    queue.nack(job)
+    retry = queue.lease(visibility_timeout=60)
+    assert retry is not None
+    assert retry.attempts == 2
+
+
+def test_nack_after_max_attempts_buries_job(queue):
+    """A job out of attempts is moved to the dead state and not re-leased."""
+    queue.enqueue("k", {})
+    queue.nack(queue.lease(visibility_timeout=60))
+    queue.nack(queue.lease(visibility_timeout=60))
+    assert queue.lease(visibility_timeout=60) is None
+    assert queue.depth() == 0
+
+
+def test_expired_leases_past_max_attempts_bury_job(queue):
+    """A job whose worker keeps dying is buried instead of being leased forever."""
+    queue.enqueue("k", {})
+    leases = []
+    for _ in range(4):
+        job = queue.lease(visibility_timeout=0.01)
+        if job is None:
+            break
+        leases.append(job.attempts)
+        time.sleep(0.02)
+    assert leases == [1, 2]
+    assert queue.depth() == 0
+
+
+def test_extend_keeps_lease(queue):
+    """extend() pushes the deadline out for the current lease holder only."""
+    queue.enqueue("k", {})
+    job = queue.lease(visibility_timeout=0.01)
+    assert queue.extend(job, visibility_timeout=60) is True
+    time.sleep(0.02)
+    assert queue.lease(visibility_timeout=60) is None
+
+
+def test_enqueue_notifies_subscribers(queue):
+    """Subscribers are called on enqueue (used to wake idle workers)."""
+    calls = []
+    queue.subscribe(lambda: calls.append(1))
+    queue.enqueue("k", {})
+    assert calls == [1]
+
+
+def test_sqlite_queue_survives_reopen():
+    """Jobs persist across queue instances sharing the same file."""
+    q1 = SQLiteJobQueue(filename="durable.db")
+    q1.enqueue("k", {"n": 1})
+    q1.close()
+
+    q2 = SQLiteJobQueue(filename="durable.db")
+    job = q2.lease(visibility_timeout=60)
+    q2.close()
+    assert job is not None
+    assert job.payload == {"n": 1}
+
+
+def test_lease_filters_by_lane(queue):
+    """A lane-specific lease only returns that lane's jobs."""
+    queue.enqueue("k", {"n": 1}, lane="bulk")
+    assert queue.lease(visibility_timeout=60, lane="interactive") is None
+    job = queue.lease(visibility_timeout=60, lane="bulk")
+    assert job.lane == "bulk"
+    assert queue.depth_by_lane() == {"bulk": 1}
+
+
+def test_lease_orders_cheapest_first(queue):
+    """Within a lane, the job with the lowest estimated cost is leased first."""
+    queue.enqueue("k", {"n": "video"}, cost=20_000)
+    queue.enqueue("k", {"n": "article"}, cost=1_500)
+    assert queue.lease(visibility_timeout=60).payload == {"n": "article"}
+
+
+def test_waiting_time_ages_expensive_jobs(queue, monkeypatch):
+    """An expensive job that has waited long enough beats a fresh cheap one."""
+    queue.enqueue("k", {"n": "old"}, cost=5_000)
+    later = time.time() + 600  # ten minutes of aging outweighs the cost gap
+    monkeypatch.setattr(time, "time", lambda: later)
+    queue.enqueue("k", {"n": "new"}, cost=100)
+    assert queue.lease(visibility_timeout=60).payload == {"n": "old"}
+
+
+def test_sqlite_queue_migrates_pre_lane_schema(tmp_path):
+    """A queue file created before lanes existed gains lane and cost columns."""
+    from knowledge_hub.storage import open_sqlite
+
+    conn = open_sqlite("old.db")
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+        "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+        "available_at REAL NOT NULL, lease_id TEXT, created_at REAL NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO jobs (id, kind, payload, available_at, created_at) "
+        "VALUES ('old', 'k', '{}', 0, 0)"
+    )
+    conn.close()
+
+    queue = SQLiteJobQueue("old.db")
+    job = queue.lease(visibility_timeout=60)
+    queue.close()
+    assert job.id == "old"
+    assert job.lane == "interactive"
+
+
+def test_release_makes_job_visible_without_counting_attempt(queue):
+    """An interrupted job is immediately re-leasable with its attempt refunded."""
+    queue.enqueue("k", {})
+    job = queue.lease(visibility_timeout=60)
+    queue.release(job)
+    again = queue.lease(visibility_timeout=60)
+    assert again.id == job.id
+    assert again.attempts == 1
@@ -0,0 +1,170 @@
+"""Tests for the queue worker pool."""
+
+import asyncio
+
+from knowledge_hub.pipeline.queue import MemoryJobQueue
+from knowledge_hub.pipeline.worker import WorkerPool
+
+
+async def _drain(queue: MemoryJobQueue, timeout: float = 2.0) -> None:
+    """Wait until the queue has no pending jobs."""
+    async with asyncio.timeout(timeout):
+        while queue.depth():
+            await asyncio.sleep(0.01)
+
+
+async def test_pool_runs_handler_and_acks():
+    """Enqueued jobs are dispatched to their handler and acked."""
+    queue = MemoryJobQueue()
+    seen = []
+
+    async def handler(payload: dict) -> None:
+        seen.append(payload["n"])
+
+    pool = WorkerPool(queue, {"k": handler}, concurrency=1, visibility_timeout=60)
+    pool.start()
+    queue.enqueue("k", {"n": 1})
+    queue.enqueue("k", {"n": 2})
+    await _drain(queue)
+    await pool.stop()
+
+    assert seen == [1, 2]
+
+
+async def test_pool_bounds_concurrency():
+    """No more than `concurrency` handlers run at once."""
+    queue = MemoryJobQueue()
+    running = 0
+    peak = 0
+
+    async def handler(payload: dict) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    pool = WorkerPool(queue, {"k": handler}, concurrency=2, visibility_timeout=60)
+    pool.start()
+    for n in range(6):
+        queue.enqueue("k", {"n": n})
+    await _drain(queue)
+    await pool.stop()
+
+    assert peak == 2
+
+
+async def test_pool_nacks_failed_job_for_retry():
+    """A handler exception leaves the job queued for a delayed retry."""
+    queue = MemoryJobQueue()
+    attempts = 0
+
+    async def handler(payload: dict) -> None:
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("boom")
+
+    pool = WorkerPool(queue, {"k": handler}, concurrency=1, visibility_timeout=60)
+    pool.start()
+    queue.enqueue("k", {})
+    async with asyncio.timeout(2):
+        while attempts == 0:
+            await asyncio.sleep(0.01)
+    await pool.stop()
+
+    assert attempts == 1
+    assert queue.depth() == 1
+    assert queue.lease(visibility_timeout=60) is None  # retry is delayed
+
+
+async def test_pool_drops_unknown_job_kind():
+    """Jobs without a registered handler are dropped rather than retried forever."""
+    queue = MemoryJobQueue()
+    pool = WorkerPool(queue, {}, concurrency=1, visibility_timeout=60)
+    pool.start()
+    queue.enqueue("unknown", {})
+    await _drain(queue)
+    await pool.stop()
+
+    assert queue.depth() == 0
+
+
+async def test_bulk_jobs_leave_a_worker_for_interactive_jobs():
+    """Bulk work never occupies the reserved interactive worker."""
+    queue = MemoryJobQueue()
+    release = asyncio.Event()
+    running: list[str] = []
+    interactive_done = asyncio.Event()
+
+    async def handler(payload: dict) -> None:
+        running.append(payload["lane"])
+        if payload["lane"] == "interactive":
+            interactive_done.set()
+            return
+        await release.wait()
+
+    pool = WorkerPool(
+        queue,
+        {"k": handler},
+        concurrency=2,
+        visibility_timeout=60,
+        lane_weights={"interactive": 4, "bulk": 1},
+        reserved_interactive=1,
+    )
+    pool.start()
+    for _ in range(3):
+        queue.enqueue("k", {"lane": "bulk"}, lane="bulk")
+    await asyncio.sleep(0.05)
+    assert running == ["bulk"]
+
+    queue.enqueue("k", {"lane": "interactive"})
+    async with asyncio.timeout(2):
+        await interactive_done.wait()
+    release.set()
+    await _drain(queue)
+    await pool.stop()
+
+    assert running.count("bulk") == 3
+
+
+async def test_drain_lets_running_job_finish_within_grace_period():
+    """A job that completes inside the grace period is acked, and no new job is leased."""
+    queue = MemoryJobQueue()
+    started = asyncio.Event()
+    finished = []
+
+    async def handler(payload: dict) -> None:
+        started.set()
+        await asyncio.sleep(0.05)
+        finished.append(payload["n"])
+
+    pool = WorkerPool(queue, {"k": handler}, concurrency=1, visibility_timeout=60)
+    pool.start()
+    queue.enqueue("k", {"n": 1})
+    await started.wait()
+    queue.enqueue("k", {"n": 2})
+    await pool.drain(grace_period=2)
+
+    assert finished == [1]
+    assert queue.depth() == 1
+    assert not pool.running
+
+
+async def test_drain_releases_jobs_still_running_after_grace_period():
+    """A job interrupted at the end of the grace period is released for another worker."""
+    queue = MemoryJobQueue(max_attempts=1)
+    started = asyncio.Event()
+
+    async def handler(payload: dict) -> None:
+        started.set()
+        await asyncio.sleep(60)
+
+    pool = WorkerPool(queue, {"k": handler}, concurrency=1, visibility_timeout=60)
+    pool.start()
+    queue.enqueue("k", {})
+    await started.wait()
+    await pool.drain(grace_period=0.01)
+
+    job = queue.lease(visibility_timeout=60)
+    assert job is not None  # visible now, not after the visibility timeout
+    assert job.attempts == 1  # interruption did not use up the only attempt
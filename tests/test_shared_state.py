@@ -0,0 +1,162 @@
+"""Tests for the shared state backends and their use by costs and caches."""
+
+import importlib.util
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from knowledge_hub import shared_state
+from knowledge_hub.config import get_settings
+from knowledge_hub.cost import add_cost, get_daily_cost, get_weekly_cost, reset_weekly_cost
+from knowledge_hub.notion.tags import _tag_cache, get_valid_tags, invalidate_tag_cache
+from knowledge_hub.shared_state import (
+    MemorySharedState,
+    RedisSharedState,
+    SQLiteSharedState,
+    get_shared_state,
+    register_backend,
+    reset_shared_state,
+)
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def state(request):
+    backend = SQLiteSharedState() if request.param == "sqlite" else MemorySharedState()
+    yield backend
+    backend.close()
+
+
+def test_get_set_and_expiry(state):
+    """Values round-trip as JSON and disappear after their TTL."""
+    state.set("a", {"x": [1, 2]})
+    state.set("b", "soon gone", ttl=0.01)
+    assert state.get("a") == {"x": [1, 2]}
+    time.sleep(0.02)
+    assert state.get("b") is None
+    state.delete("a", "missing")
+    assert state.get("a") is None
+
+
+def test_incr_accumulates_and_ttl_applies_on_create(state):
+    """Counters start at zero; an expired counter starts over."""
+    assert state.incr("n", 1.5) == 1.5
+    assert state.incr("n", 2) == 3.5
+    assert state.get("n") == 3.5
+
+    state.incr("daily", 1.0, ttl=0.01)
+    time.sleep(0.02)
+    assert state.get("daily") is None
+    assert state.incr("daily", 2.0, ttl=10) == 2.0
+
+
+def test_claim_is_all_or_nothing(state):
+    """A claim overlapping a live key sets none of its keys."""
+    assert state.claim(["k1"], ttl=60) is True
+    assert state.claim(["k2", "k1"], ttl=60) is False
+    assert state.claim(["k2"], ttl=60) is True
+
+
+def test_expired_claim_can_be_reclaimed(state):
+    """Claims expire after their TTL."""
+    assert state.claim(["k"], ttl=0.01) is True
+    time.sleep(0.02)
+    assert state.claim(["k"], ttl=60) is True
+
+
+def test_sqlite_increments_are_not_lost_across_processes():
+    """Separate connections (as separate workers) incrementing concurrently add up."""
+    workers = [SQLiteSharedState() for _ in range(4)]
+
+    def add(backend):
+        for _ in range(50):
+            backend.incr("cost", 0.5)
+
+    threads = [threading.Thread(target=add, args=(backend,)) for backend in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert workers[0].get("cost") == 100.0
+    for backend in workers:
+        backend.close()
+
+
+def test_cost_accumulators_are_shared():
+    """Costs added by one worker are visible to another on the same backend."""
+    add_cost(0.25)
+    reset_shared_state()  # a second worker opens its own connection
+    add_cost(0.5)
+    assert get_daily_cost() == 0.75
+    assert get_weekly_cost() == 0.75
+    reset_weekly_cost()
+    assert get_weekly_cost() == 0.0
+    assert get_daily_cost() == 0.75
+
+
+@patch("knowledge_hub.notion.tags.get_data_source_id", new_callable=AsyncMock)
+@patch("knowledge_hub.notion.tags.get_notion_client", new_callable=AsyncMock)
+async def test_tag_cache_is_warm_for_other_workers(mock_get_client, mock_get_ds_id):
+    """A worker with a cold local cache reuses the schema another worker fetched."""
+    invalidate_tag_cache()
+    client = AsyncMock()
+    client.data_sources.retrieve.return_value = {
+        "properties": {"Tags": {"multi_select": {"options": [{"name": "AI"}]}}}
+    }
+    mock_get_client.return_value = client
+
+    assert await get_valid_tags() == {"AI"}
+    _tag_cache.clear()  # as in a different worker process
+    assert await get_valid_tags() == {"AI"}
+    client.data_sources.retrieve.assert_called_once()
+
+
+def test_backend_is_chosen_by_settings(monkeypatch):
+    """SHARED_STATE_BACKEND selects a built-in or registered backend."""
+    monkeypatch.setenv("SHARED_STATE_BACKEND", "memory")
+    get_settings.cache_clear()
+    reset_shared_state()
+    assert isinstance(get_shared_state(), MemorySharedState)
+
+    monkeypatch.setattr(shared_state, "_BACKENDS", dict(shared_state._BACKENDS))
+    custom = MemorySharedState()
+    register_backend("custom", lambda settings: custom)
+    monkeypatch.setenv("SHARED_STATE_BACKEND", "custom")
+    get_settings.cache_clear()
+    reset_shared_state()
+    assert get_shared_state() is custom
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    """A typo in SHARED_STATE_BACKEND fails loudly instead of falling back."""
+    monkeypatch.setenv("SHARED_STATE_BACKEND", "memcache")
+    get_settings.cache_clear()
+    reset_shared_state()
+    with pytest.raises(RuntimeError, match="memcache"):
+        get_shared_state()
+
+
+@pytest.mark.skipif(importlib.util.find_spec("redis") is not None, reason="redis installed")
+def test_redis_backend_requires_optional_package(monkeypatch):
+    """The redis backend explains how to install its optional dependency."""
+    monkeypatch.setenv("SHARED_STATE_BACKEND", "redis")
+    monkeypatch.setenv("SHARED_STATE_URL", "redis://localhost:6379/0")
+    get_settings.cache_clear()
+    reset_shared_state()
+    with pytest.raises(RuntimeError, match="pip install redis"):
+        get_shared_state()
+
+
+async def test_local_backends_run_operations_inline(state):
+    """Local backends answer on the calling thread."""
+    assert await state.run(threading.get_ident) == threading.get_ident()
+    await state.run(state.set, "k", 1, 60.0)
+    assert await state.run(state.get, "k") == 1
+
+
+async def test_redis_backend_runs_operations_off_the_event_loop():
+    """Each Redis round trip runs in the network executor, not on the loop."""
+    state = object.__new__(RedisSharedState)  # no server needed to check where calls run
+    assert await state.run(threading.get_ident) != threading.get_ident()
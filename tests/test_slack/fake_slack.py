@@ -0,0 +1,43 @@
+"""Offline stand-in for the Slack Web API client used in tests."""
+
+
+class FakeSlackClient:
+    """Serves a fixed channel history with cursor pagination and records writes.
+
+    `history` maps channel id to its messages, newest first (as Slack returns
+    them). Cursors are opaque strings holding the next page's offset.
+    """
+
+    def __init__(self, history: dict[str, list[dict]] | None = None) -> None:
+        self.history = history or {}
+        self.history_calls: list[dict] = []
+        self.posted: list[dict] = []
+        self.reactions: list[dict] = []
+        self.files: dict[str, dict] = {}
+
+    async def conversations_history(
+        self, channel: str, cursor: str | None = None, limit: int = 100, **kwargs
+    ) -> dict:
+        self.history_calls.append({"channel": channel, "cursor": cursor, "limit": limit})
+        messages = self.history.get(channel, [])
+        start = int(cursor) if cursor else 0
+        page = messages[start : start + limit]
+        next_start = start + limit
+        next_cursor = str(next_start) if next_start < len(messages) else ""
+        return {
+            "ok": True,
+            "messages": page,
+            "has_more": bool(next_cursor),
+            "response_metadata": {"next_cursor": next_cursor},
+        }
+
+    async def chat_postMessage(self, **kwargs) -> dict:  # noqa: N802 - Slack SDK name
+        self.posted.append(kwargs)
+        return {"ok": True, "ts": f"9{len(self.posted)}.000"}
+
+    async def reactions_add(self, **kwargs) -> dict:
+        self.reactions.append(kwargs)
+        return {"ok": True}
+
+    async def files_info(self, file: str, **kwargs) -> dict:
+        return {"ok": True, "file": self.files[file]}
@@ -0,0 +1,156 @@
+"""Tests for channel history backfill, run against the offline Slack stand-in."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from knowledge_hub.pipeline import BULK, get_job_queue
+from knowledge_hub.slack.backfill import (
+    BACKFILL_PAGE_JOB,
+    DONE,
+    get_backfill_store,
+    run_backfill_page,
+    start_backfill,
+)
+from knowledge_hub.slack.dedup import get_event_deduplicator
+from knowledge_hub.slack.handlers import PROCESS_MESSAGE_JOB
+from tests.test_slack.fake_slack import FakeSlackClient
+
+USER = "U_ALLOWED"
+
+
+def _message(ts: str, text: str, **extra) -> dict:
+    return {"type": "message", "user": USER, "ts": ts, "text": text, **extra}
+
+
+@pytest.fixture
+def slack(monkeypatch):
+    """Fake Slack with a five-message history, served two messages per page."""
+    monkeypatch.setenv("ALLOWED_USER_ID", USER)
+    monkeypatch.setenv("BACKFILL_PAGE_SIZE", "2")
+    fake = FakeSlackClient(
+        {
+            "C1": [
+                _message("5.0", "<https://example.com/five>"),
+                _message("4.0", "no links here"),
+                _message("3.0", "<https://example.com/three> great read"),
+                {"type": "message", "bot_id": "B1", "ts": "2.0", "text": "<https://bot.example>"},
+                _message("1.0", "<https://example.com/one>"),
+            ]
+        }
+    )
+    with (
+        patch("knowledge_hub.slack.backfill.get_slack_client", AsyncMock(return_value=fake)),
+        patch(
+            "knowledge_hub.slack.backfill.check_duplicate", AsyncMock(return_value=None)
+        ) as check,
+    ):
+        fake.check_duplicate = check
+        yield fake
+
+
+async def _run_pages(max_pages: int = 10) -> list[dict]:
+    """Run queued backfill page jobs; return the message job payloads they queued."""
+    queue = get_job_queue()
+    messages = []
+    for _ in range(max_pages * 10):
+        job = queue.lease(60)
+        if job is None:
+            break
+        if job.kind == BACKFILL_PAGE_JOB:
+            await run_backfill_page(job.payload)
+        else:
+            assert job.kind == PROCESS_MESSAGE_JOB
+            assert job.lane == BULK
+            messages.append(job.payload)
+        queue.ack(job)
+    return messages
+
+
+async def test_backfill_pages_to_done_and_queues_bulk_jobs(slack):
+    """Every page is fetched by cursor; user messages with links are queued in bulk."""
+    start_backfill("C1")
+    messages = await _run_pages()
+
+    assert [call["cursor"] for call in slack.history_calls] == [None, "2", "4"]
+    assert sorted(m["timestamp"] for m in messages) == ["1.0", "3.0", "5.0"]
+    three = next(m for m in messages if m["timestamp"] == "3.0")
+    assert three["urls"] == ["https://example.com/three"]
+    assert three["user_note"] == "great read"
+
+    state = get_backfill_store().get("C1")
+    assert state.status == DONE
+    assert state.pages == 3
+    assert state.messages_queued == 3
+
+
+async def test_backfill_skips_known_urls_and_claimed_messages(slack):
+    """URLs already in Notion and messages processed live are not queued again."""
+    get_event_deduplicator().claim(["msg:C1:5.0"])
+    slack.check_duplicate.side_effect = lambda url: (
+        {"page_id": "p"} if url == "https://example.com/one" else None
+    )
+
+    start_backfill("C1")
+    messages = await _run_pages()
+
+    assert [m["timestamp"] for m in messages] == ["3.0"]
+    assert get_backfill_store().get("C1").urls_known == 1
+
+
+async def test_backfill_resumes_from_saved_cursor(slack):
+    """A restarted instance continues from the last page it finished."""
+    start_backfill("C1")
+    queue = get_job_queue()
+    job = queue.lease(60)
+    await run_backfill_page(job.payload)
+    queue.ack(job)
+
+    # Simulate losing the queue: only the persisted cursor survives
+    while (job := queue.lease(60)) is not None:
+        queue.ack(job)
+    start_backfill("C1")
+    await _run_pages()
+
+    assert [call["cursor"] for call in slack.history_calls] == [None, "2", "4"]
+    assert get_backfill_store().get("C1").status == DONE
+
+
+async def test_finished_backfill_only_reruns_with_restart(slack):
+    """Starting a done backfill is a no-op unless restart is requested."""
+    start_backfill("C1")
+    await _run_pages()
+
+    assert start_backfill("C1")["status"] == DONE
+    assert get_job_queue().depth() == 0
+
+    assert start_backfill("C1", restart=True)["pages"] == 0
+    assert get_job_queue().depth() == 1
+
+
+async def test_superseded_run_stops(slack):
+    """Page jobs from an earlier run are dropped once a new run starts."""
+    start_backfill("C1")
+    queue = get_job_queue()
+    stale = queue.lease(60)
+    queue.ack(stale)
+    start_backfill("C1", restart=True)
+
+    await run_backfill_page(stale.payload)
+    assert slack.history_calls == []
+
+
+async def test_backfill_backs_off_while_bulk_lane_is_full(slack, monkeypatch):
+    """Paging waits for the pipeline to drain instead of flooding the queue."""
+    monkeypatch.setenv("BACKFILL_MAX_QUEUED_JOBS", "1")
+    start_backfill("C1")
+    queue = get_job_queue()
+    queue.enqueue(PROCESS_MESSAGE_JOB, {"urls": []}, lane=BULK)
+
+    job = queue.lease(60, lane=BULK)
+    assert job.kind == BACKFILL_PAGE_JOB
+    await run_backfill_page(job.payload)
+    queue.ack(job)
+
+    assert slack.history_calls == []
+    assert queue.depth_by_lane()[BULK] == 2  # the filler job plus the delayed retry
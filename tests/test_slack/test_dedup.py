@@ -0,0 +1,77 @@
+"""Tests for the two-tier Slack event deduplication store."""
+
+import time
+
+from knowledge_hub.slack.dedup import EventDeduplicator, event_keys
+
+
+def test_event_keys_for_message_event():
+    """Message events are keyed by event_id and by (channel, ts)."""
+    payload = {
+        "event_id": "Ev123",
+        "event": {"type": "message", "channel": "C1", "ts": "111.222"},
+    }
+    assert event_keys(payload) == ["event:Ev123", "msg:C1:111.222"]
+
+
+def test_event_keys_empty_for_url_verification():
+    """Payloads without identifying fields produce no keys."""
+    assert event_keys({"type": "url_verification", "challenge": "x"}) == []
+
+
+def test_first_claim_wins_second_loses():
+    """The first claim for a key succeeds; repeats are rejected."""
+    dedup = EventDeduplicator()
+    assert dedup.claim(["event:Ev1"]) is True
+    assert dedup.claim(["event:Ev1"]) is False
+
+
+def test_claim_rejected_if_any_key_seen():
+    """A claim overlapping any previously seen key is rejected."""
+    dedup = EventDeduplicator()
+    dedup.claim(["event:Ev1", "msg:C1:1.0"])
+    assert dedup.claim(["event:Ev2", "msg:C1:1.0"]) is False
+
+
+def test_rejected_claim_does_not_record_new_keys():
+    """Keys in a rejected claim are not persisted (the transaction is rolled back)."""
+    dedup = EventDeduplicator()
+    dedup.claim(["msg:C1:1.0"])
+    dedup.claim(["event:Ev2", "msg:C1:1.0"])
+
+    other_process = EventDeduplicator()  # fresh memory tier, same SQLite file
+    assert other_process.claim(["event:Ev2"]) is True
+
+
+def test_persistent_tier_shared_across_instances():
+    """A second deduplicator on the same data dir sees keys claimed by the first."""
+    first = EventDeduplicator()
+    second = EventDeduplicator()
+    assert first.claim(["event:Ev1"]) is True
+    assert second.claim(["event:Ev1"]) is False
+
+
+def test_release_allows_reprocessing():
+    """Released keys can be claimed again (used when handling fails)."""
+    dedup = EventDeduplicator()
+    dedup.claim(["event:Ev1"])
+    dedup.release(["event:Ev1"])
+    assert dedup.claim(["event:Ev1"]) is True
+
+
+def test_expired_keys_can_be_claimed_again():
+    """Keys older than the TTL no longer count as seen in either tier."""
+    dedup = EventDeduplicator(ttl_seconds=0.01)
+    dedup.claim(["event:Ev1"])
+    time.sleep(0.02)
+    assert dedup.claim(["event:Ev1"]) is True
+
+
+async def test_async_claim_and_release_share_both_tiers():
+    """aclaim()/arelease() see the same keys as claim()/release()."""
+    dedup = EventDeduplicator()
+    assert await dedup.aclaim(["event:Ev1"]) is True
+    assert dedup.claim(["event:Ev1"]) is False
+    assert await EventDeduplicator().aclaim(["event:Ev1"]) is False
+    await dedup.arelease(["event:Ev1"])
+    assert await dedup.aclaim(["event:Ev1"]) is True
@@ -0,0 +1,40 @@
+"""Tests for Slack PDF upload helpers."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from slack_sdk.errors import SlackApiError
+
+from knowledge_hub.slack.files import fetch_file_info, is_pdf_file, pdf_files, share_timestamp
+
+PDF = {
+    "id": "F1",
+    "filetype": "pdf",
+    "mimetype": "application/pdf",
+    "url_private": "https://files.slack.com/files-pri/T1-F1/report.pdf",
+}
+
+
+def test_pdf_files_keeps_only_pdfs():
+    """Images and other uploads are ignored."""
+    image = {"id": "F2", "filetype": "png", "url_private": "https://files.slack.com/x.png"}
+    assert pdf_files([PDF, image]) == [PDF]
+
+
+def test_pdf_without_private_url_is_skipped():
+    """A file we cannot download (e.g. external) is not treated as an upload."""
+    assert is_pdf_file({"id": "F3", "filetype": "pdf"}) is False
+
+
+def test_share_timestamp_finds_channel_share():
+    """The share in the requested channel gives the thread to reply in."""
+    file = {"shares": {"private": {"C1": [{"ts": "111.222"}]}}}
+    assert share_timestamp(file, "C1") == "111.222"
+    assert share_timestamp(file, "C2") is None
+
+
+async def test_fetch_file_info_returns_none_on_slack_error():
+    """files.info failures (e.g. missing files:read) are logged, not raised."""
+    client = AsyncMock()
+    client.files_info.side_effect = SlackApiError("nope", MagicMock())
+    with patch("knowledge_hub.slack.files.get_slack_client", AsyncMock(return_value=client)):
+        assert await fetch_file_info("F1") is None
@@ -1,8 +1,25 @@
 """Tests for Slack message filtering and dispatch logic."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from knowledge_hub.slack.handlers import handle_message_event
+from knowledge_hub.pipeline import Decision
+from knowledge_hub.slack.dedup import get_event_deduplicator
+from knowledge_hub.slack.files import file_key
+from knowledge_hub.slack.handlers import (
+    PROCESS_FILE_SHARE_JOB,
+    PROCESS_MESSAGE_JOB,
+    handle_file_shared_event,
+    handle_message_event,
+    run_file_share_job,
+    run_process_message_job,
+)
+
+PDF_UPLOAD = {
+    "id": "F1",
+    "filetype": "pdf",
+    "mimetype": "application/pdf",
+    "url_private": "https://files.slack.com/files-pri/T1-F1/report.pdf",
+}
 
 
 def _make_event(**overrides: object) -> dict:
@@ -22,116 +39,378 @@ def _mock_settings() -> MagicMock:
     """Create a mock Settings with allowed_user_id."""
     settings = MagicMock()
     settings.allowed_user_id = "U_ALLOWED"
+    settings.message_batch_size = 10
     return settings
 
 
 # -- Filter tests (INGEST-05, INGEST-06) --
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_ignores_non_message_type(mock_get_settings: MagicMock):
+async def test_ignores_non_message_type(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
     """Events with type != 'message' are not dispatched."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
-    handle_message_event({"type": "app_mention", "text": "<https://example.com>"}, bg)
-    bg.add_task.assert_not_called()
+    await handle_message_event({"type": "app_mention", "text": "<https://example.com>"})
+    mock_get_queue.return_value.enqueue.assert_not_called()
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_ignores_subtype_bot_message(mock_get_settings: MagicMock):
+async def test_ignores_subtype_bot_message(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
     """Bot messages (subtype: bot_message) are filtered out (INGEST-05)."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
     event = _make_event(subtype="bot_message")
-    handle_message_event(event, bg)
-    bg.add_task.assert_not_called()
+    await handle_message_event(event)
+    mock_get_queue.return_value.enqueue.assert_not_called()
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_ignores_subtype_message_changed(mock_get_settings: MagicMock):
+async def test_ignores_subtype_message_changed(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
     """Edited messages (subtype: message_changed) are filtered out."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
     event = _make_event(subtype="message_changed")
-    handle_message_event(event, bg)
-    bg.add_task.assert_not_called()
+    await handle_message_event(event)
+    mock_get_queue.return_value.enqueue.assert_not_called()
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_ignores_bot_id(mock_get_settings: MagicMock):
+async def test_ignores_bot_id(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
     """Messages with bot_id are filtered out (belt-and-suspenders)."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
     event = _make_event(bot_id="B123")
-    handle_message_event(event, bg)
-    bg.add_task.assert_not_called()
+    await handle_message_event(event)
+    mock_get_queue.return_value.enqueue.assert_not_called()
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_ignores_wrong_user(mock_get_settings: MagicMock):
+async def test_ignores_wrong_user(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
     """Messages from non-allowed users are filtered out."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
     event = _make_event(user="U_OTHER")
-    handle_message_event(event, bg)
-    bg.add_task.assert_not_called()
+    await handle_message_event(event)
+    mock_get_queue.return_value.enqueue.assert_not_called()
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_ignores_thread_reply(mock_get_settings: MagicMock):
+async def test_ignores_thread_reply(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
     """Thread replies (thread_ts present) are filtered out."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
     event = _make_event(thread_ts="123.456")
-    handle_message_event(event, bg)
-    bg.add_task.assert_not_called()
+    await handle_message_event(event)
+    mock_get_queue.return_value.enqueue.assert_not_called()
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_ignores_no_urls(mock_get_settings: MagicMock):
+async def test_ignores_no_urls(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
     """Messages with no URLs are filtered out (INGEST-06)."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
     event = _make_event(text="just a regular message, no links")
-    handle_message_event(event, bg)
-    bg.add_task.assert_not_called()
+    await handle_message_event(event)
+    mock_get_queue.return_value.enqueue.assert_not_called()
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_processes_valid_message(mock_get_settings: MagicMock):
+async def test_processes_valid_message(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
     """Valid message from allowed user with URL triggers dispatch."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
     event = _make_event()
-    handle_message_event(event, bg)
-    bg.add_task.assert_called_once()
+    await handle_message_event(event)
+    mock_get_queue.return_value.enqueue.assert_called_once()
 
 
 # -- Multi-URL tests (INGEST-07) --
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_multiple_urls_dispatched(mock_get_settings: MagicMock):
-    """Message with 3 URLs dispatches all 3 to background."""
+async def test_multiple_urls_dispatched(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
+    """Message with 3 URLs enqueues all 3 in a single job."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
     text = "<https://a.com> <https://b.com> <https://c.com>"
     event = _make_event(text=text)
-    handle_message_event(event, bg)
-    bg.add_task.assert_called_once()
-    call_kwargs = bg.add_task.call_args
-    # The urls kwarg should have 3 URLs
-    assert len(call_kwargs.kwargs["urls"]) == 3
+    await handle_message_event(event)
+    mock_get_queue.return_value.enqueue.assert_called_once()
+    kind, payload = mock_get_queue.return_value.enqueue.call_args.args
+    assert kind == PROCESS_MESSAGE_JOB
+    # The urls payload field should have 3 URLs
+    assert len(payload["urls"]) == 3
 
 
+@patch("knowledge_hub.slack.handlers.get_job_queue")
 @patch("knowledge_hub.slack.handlers.get_settings")
-def test_urls_capped_at_10(mock_get_settings: MagicMock):
-    """Message with 12 URLs only dispatches first 10."""
+async def test_urls_past_batch_size_spill_into_follow_up_batches(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
+    """Message with 25 URLs enqueues the first 10 and carries the other 15."""
     mock_get_settings.return_value = _mock_settings()
-    bg = MagicMock()
-    urls = " ".join(f"<https://example{i}.com>" for i in range(12))
+    urls = " ".join(f"<https://example{i}.com>" for i in range(25))
     event = _make_event(text=urls)
-    handle_message_event(event, bg)
-    bg.add_task.assert_called_once()
-    call_kwargs = bg.add_task.call_args
-    assert len(call_kwargs.kwargs["urls"]) == 10
+    await handle_message_event(event)
+    mock_get_queue.return_value.enqueue.assert_called_once()
+    _, payload = mock_get_queue.return_value.enqueue.call_args.args
+    assert len(payload["urls"]) == 10
+    assert len(payload["remaining_urls"]) == 15
+    assert payload["remaining_urls"][0] == "https://example10.com"
+    assert payload["batch"] == 1
+    assert payload["total_batches"] == 3
+    assert payload["failed"] == 0
+    assert mock_get_queue.return_value.enqueue.call_args.kwargs["lane"] == "interactive"
+
+
+@patch("knowledge_hub.slack.handlers.get_job_queue")
+@patch("knowledge_hub.slack.handlers.get_settings")
+async def test_single_batch_message_has_plain_payload(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
+    """Messages within the batch size carry no batch bookkeeping."""
+    mock_get_settings.return_value = _mock_settings()
+    event = _make_event(text=" ".join(f"<https://example{i}.com>" for i in range(10)))
+    await handle_message_event(event)
+    _, payload = mock_get_queue.return_value.enqueue.call_args.args
+    assert "remaining_urls" not in payload
+
+
+# -- PDF uploads --
+
+
+@patch("knowledge_hub.slack.handlers.get_job_queue")
+@patch("knowledge_hub.slack.handlers.get_settings")
+async def test_message_with_pdf_upload_enqueues_private_url(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
+    """A file_share message queues its PDF upload with the note from the text."""
+    mock_get_settings.return_value = _mock_settings()
+    image = {"id": "F2", "filetype": "png", "url_private": "https://files.slack.com/a.png"}
+    event = _make_event(subtype="file_share", text="Board deck", files=[PDF_UPLOAD, image])
+    await handle_message_event(event)
+    _, payload = mock_get_queue.return_value.enqueue.call_args.args
+    assert payload["urls"] == [PDF_UPLOAD["url_private"]]
+    assert payload["user_note"] == "Board deck"
+
+
+@patch("knowledge_hub.slack.handlers.get_job_queue")
+@patch("knowledge_hub.slack.handlers.get_settings")
+async def test_upload_already_claimed_is_not_requeued(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
+    """An upload already picked up via file_shared is not processed twice."""
+    mock_get_settings.return_value = _mock_settings()
+    get_event_deduplicator().claim([file_key("F1")])
+    await handle_message_event(_make_event(subtype="file_share", text="", files=[PDF_UPLOAD]))
+    mock_get_queue.return_value.enqueue.assert_not_called()
+
+
+@patch("knowledge_hub.slack.handlers.get_job_queue")
+@patch("knowledge_hub.slack.handlers.get_settings")
+def test_file_shared_event_enqueues_delayed_lookup(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+):
+    """file_shared defers to the message path by queueing its lookup with a delay."""
+    mock_get_settings.return_value = _mock_settings()
+    handle_file_shared_event(
+        {"type": "file_shared", "file_id": "F1", "user_id": "U_ALLOWED", "channel_id": "C1"}
+    )
+    call = mock_get_queue.return_value.enqueue.call_args
+    assert call.args == (
+        PROCESS_FILE_SHARE_JOB,
+        {"file_id": "F1", "channel_id": "C1", "user_id": "U_ALLOWED"},
+    )
+    assert call.kwargs["delay"] > 0
+
+
+@patch("knowledge_hub.slack.handlers.process_message_urls", new_callable=AsyncMock)
+@patch("knowledge_hub.slack.handlers.fetch_file_info", new_callable=AsyncMock)
+async def test_file_share_job_processes_unclaimed_upload(
+    mock_fetch: AsyncMock, mock_process: AsyncMock
+):
+    """An upload no message claimed is processed, replying in its share's thread."""
+    mock_fetch.return_value = {**PDF_UPLOAD, "shares": {"public": {"C1": [{"ts": "111.222"}]}}}
+    await run_file_share_job({"file_id": "F1", "channel_id": "C1", "user_id": "U_ALLOWED"})
+    mock_process.assert_awaited_once_with(
+        "C1", "111.222", "U_ALLOWED", "", [PDF_UPLOAD["url_private"]], None
+    )
+
+
+@patch("knowledge_hub.slack.handlers.process_message_urls", new_callable=AsyncMock)
+@patch("knowledge_hub.slack.handlers.fetch_file_info", new_callable=AsyncMock)
+async def test_file_share_job_skips_upload_claimed_by_message(
+    mock_fetch: AsyncMock, mock_process: AsyncMock
+):
+    """When the message event already queued the upload, the lookup does nothing."""
+    get_event_deduplicator().claim([file_key("F1")])
+    await run_file_share_job({"file_id": "F1", "channel_id": "C1", "user_id": "U_ALLOWED"})
+    mock_fetch.assert_not_awaited()
+    mock_process.assert_not_awaited()
+
+
+# -- Admission control --
+
+
+@patch("knowledge_hub.slack.handlers.send_in_background")
+@patch("knowledge_hub.slack.handlers.notify_shed", new_callable=MagicMock)
+@patch("knowledge_hub.slack.handlers.get_admission_controller")
+@patch("knowledge_hub.slack.handlers.get_job_queue")
+@patch("knowledge_hub.slack.handlers.get_settings")
+async def test_shed_message_is_not_enqueued(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+    mock_get_admission: MagicMock,
+    mock_notify_shed: MagicMock,
+    mock_send: MagicMock,
+):
+    """When admission sheds, nothing is enqueued and a thread notice is scheduled."""
+    mock_get_settings.return_value = _mock_settings()
+    mock_get_admission.return_value.check_enqueue.return_value = Decision.SHED
+    await handle_message_event(_make_event())
+    mock_get_queue.return_value.enqueue.assert_not_called()
+    mock_notify_shed.assert_called_once_with("C0AFQJHAVS6", "1234567890.123456", 1)
+    mock_send.assert_called_once_with(mock_notify_shed.return_value)
+
+
+@patch("knowledge_hub.slack.handlers.send_in_background")
+@patch("knowledge_hub.slack.handlers.notify_shed", new_callable=MagicMock)
+@patch("knowledge_hub.slack.handlers.get_admission_controller")
+@patch("knowledge_hub.slack.handlers.get_job_queue")
+@patch("knowledge_hub.slack.handlers.get_settings")
+async def test_shed_upload_stays_unclaimed(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+    mock_get_admission: MagicMock,
+    mock_notify_shed: MagicMock,
+    mock_send: MagicMock,
+):
+    """A shed upload is left for its file_shared job instead of being lost."""
+    mock_get_settings.return_value = _mock_settings()
+    mock_get_admission.return_value.check_enqueue.return_value = Decision.SHED
+    await handle_message_event(_make_event(subtype="file_share", files=[PDF_UPLOAD]))
+    mock_get_queue.return_value.enqueue.assert_not_called()
+    mock_notify_shed.assert_called_once_with("C0AFQJHAVS6", "1234567890.123456", 2)
+    assert get_event_deduplicator().claim([file_key("F1")])
+
+
+# -- Queue job handler --
+
+
+@patch("knowledge_hub.slack.handlers.process_message_urls", new_callable=AsyncMock)
+async def test_run_process_message_job_calls_pipeline(mock_process: AsyncMock):
+    """The queue job handler runs process_message_urls with the stored payload."""
+    payload = {
+        "channel_id": "C0AFQJHAVS6",
+        "timestamp": "1234567890.123456",
+        "user_id": "U_ALLOWED",
+        "text": "<https://example.com>",
+        "urls": ["https://example.com"],
+        "user_note": None,
+    }
+    await run_process_message_job(payload)
+    mock_process.assert_awaited_once_with(**payload)
+
+
+def _batch_payload(**overrides) -> dict:
+    payload = {
+        "channel_id": "C0AFQJHAVS6",
+        "timestamp": "1234567890.123456",
+        "user_id": "U_ALLOWED",
+        "text": "many links",
+        "urls": ["https://a.com", "https://b.com"],
+        "user_note": None,
+        "remaining_urls": ["https://c.com"],
+        "batch": 1,
+        "total_batches": 2,
+        "failed": 0,
+    }
+    payload.update(overrides)
+    return payload
+
+
+@patch("knowledge_hub.slack.handlers.add_reaction", new_callable=AsyncMock)
+@patch("knowledge_hub.slack.handlers.notify_batch_progress", new_callable=AsyncMock)
+@patch("knowledge_hub.slack.handlers._process_batch", new_callable=AsyncMock)
+@patch("knowledge_hub.slack.handlers.get_job_queue")
+@patch("knowledge_hub.slack.handlers.get_settings")
+async def test_batch_job_reports_progress_and_enqueues_next_batch(
+    mock_get_settings: MagicMock,
+    mock_get_queue: MagicMock,
+    mock_batch: AsyncMock,
+    mock_progress: AsyncMock,
+    mock_reaction: AsyncMock,
+):
+    """A non-final batch posts progress, enqueues the rest, and does not react yet."""
+    mock_get_settings.return_value = _mock_settings()
+    mock_batch.return_value = [True, False]
+
+    await run_process_message_job(_batch_payload())
+
+    mock_batch.assert_awaited_once_with(
+        "C0AFQJHAVS6", "1234567890.123456", ["https://a.com", "https://b.com"], None
+    )
+    mock_progress.assert_awaited_once_with("C0AFQJHAVS6", "1234567890.123456", 1, 2, 1, 2)
+    kind, payload = mock_get_queue.return_value.enqueue.call_args.args
+    assert kind == PROCESS_MESSAGE_JOB
+    assert payload["urls"] == ["https://c.com"]
+    assert payload["remaining_urls"] == []
+    assert payload["batch"] == 2
+    assert payload["failed"] == 1
+    assert mock_get_queue.return_value.enqueue.call_args.kwargs["lane"] == "bulk"
+    mock_reaction.assert_not_awaited()
+
+
+@patch("knowledge_hub.slack.handlers.add_reaction", new_callable=AsyncMock)
+@patch("knowledge_hub.slack.handlers.notify_batch_progress", new_callable=AsyncMock)
+@patch("knowledge_hub.slack.handlers._process_batch", new_callable=AsyncMock)
+@patch("knowledge_hub.slack.handlers.get_job_queue")
+async def test_last_batch_reacts_with_failures_from_earlier_batches(
+    mock_get_queue: MagicMock,
+    mock_batch: AsyncMock,
+    mock_progress: AsyncMock,
+    mock_reaction: AsyncMock,
+):
+    """The final batch adds one reaction reflecting failures in any batch."""
+    mock_batch.return_value = [True]
+
+    await run_process_message_job(
+        _batch_payload(urls=["https://c.com"], remaining_urls=[], batch=2, failed=1)
+    )
+
+    mock_progress.assert_awaited_once()
+    mock_get_queue.return_value.enqueue.assert_not_called()
+    mock_reaction.assert_awaited_once_with("C0AFQJHAVS6", "1234567890.123456", "x")
@@ -12,9 +12,12 @@ from slack_sdk.errors import SlackApiError
 from knowledge_hub.notion.models import DuplicateResult, PageResult
 from knowledge_hub.slack.notifier import (
     add_reaction,
+    notify_batch_progress,
     notify_duplicate,
     notify_error,
+    notify_shed,
     notify_success,
+    send_in_background,
 )
 
 CHANNEL = "C0AFQJHAVS6"
@@ -133,6 +136,47 @@ async def test_notify_duplicate_swallows_slack_error(mock_client: AsyncMock):
     await notify_duplicate(CHANNEL, TS, "https://example.com", dup)
 
 
+# -- notify_batch_progress tests --
+
+
+async def test_notify_batch_progress_reports_batch_counts(mock_client: AsyncMock):
+    """notify_batch_progress posts the batch number and per-batch success count."""
+    await notify_batch_progress(CHANNEL, TS, 2, 5, 9, 10)
+
+    kwargs = mock_client.chat_postMessage.call_args.kwargs
+    assert kwargs["thread_ts"] == TS
+    assert "Batch 2/5" in kwargs["text"]
+    assert "9/10" in kwargs["text"]
+
+
+async def test_notify_batch_progress_swallows_slack_error(mock_client: AsyncMock):
+    """SlackApiError from chat_postMessage does not propagate."""
+    mock_client.chat_postMessage.side_effect = _make_slack_api_error("not_in_channel")
+
+    await notify_batch_progress(CHANNEL, TS, 1, 2, 10, 10)
+
+
+# -- notify_shed tests --
+
+
+async def test_notify_shed_asks_user_to_repost(mock_client: AsyncMock):
+    """notify_shed replies in the thread with the number of links not saved."""
+    await notify_shed(CHANNEL, TS, 3)
+
+    mock_client.chat_postMessage.assert_called_once()
+    kwargs = mock_client.chat_postMessage.call_args.kwargs
+    assert kwargs["thread_ts"] == TS
+    assert "3 link(s)" in kwargs["text"]
+    assert "repost" in kwargs["text"]
+
+
+async def test_notify_shed_swallows_slack_error(mock_client: AsyncMock):
+    """SlackApiError from chat_postMessage does not propagate."""
+    mock_client.chat_postMessage.side_effect = _make_slack_api_error("not_in_channel")
+
+    await notify_shed(CHANNEL, TS, 1)
+
+
 # -- add_reaction tests --
 
 
@@ -157,3 +201,11 @@ async def test_add_reaction_handles_already_reacted(mock_client: AsyncMock):
     mock_client.reactions_add.side_effect = _make_slack_api_error("already_reacted")
 
     await add_reaction(CHANNEL, TS, "white_check_mark")
+
+
+def test_send_in_background_without_a_loop_drops_the_notification(caplog):
+    """A sync caller without a running loop gets a warning, not a RuntimeError."""
+    notification = notify_shed(CHANNEL, TS, 2)
+    send_in_background(notification)
+    assert notification.cr_frame is None  # closed, so never "never awaited"
+    assert "dropping notify_shed" in caplog.text
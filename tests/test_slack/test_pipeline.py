@@ -1,15 +1,25 @@
 """Tests for pipeline orchestration (process_message_urls) and stage classification.
 
-Verifies: success path, failed extraction, duplicate URL, LLM exception,
-Notion exception, multi-URL success, multi-URL partial failure,
-user_note propagation, and _classify_stage logic.
+Verifies: success path, failed extraction, duplicate URL, duplicate found
+before Gemini, LLM exception, Notion exception, multi-URL success, multi-URL
+partial failure, concurrent execution limits, user_note propagation,
+checkpoint resume, in-flight coalescing, and _classify_stage logic.
 """
 
+import asyncio
+from contextlib import ExitStack
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+
 from knowledge_hub.models.content import ContentType, ExtractedContent, ExtractionStatus
 from knowledge_hub.notion.models import DuplicateResult, PageResult
-from knowledge_hub.slack.handlers import _classify_stage, process_message_urls
+from knowledge_hub.pipeline import Checkpoint, Stage, checkpoint_key, get_checkpoint_store
+from knowledge_hub.slack.handlers import (
+    _classify_stage,
+    process_message_urls,
+    run_process_message_job,
+)
 
 CHANNEL = "C0AFQJHAVS6"
 TS = "1234567890.123456"
@@ -53,6 +63,22 @@ def _make_duplicate_result(url: str) -> DuplicateResult:
 # -- Pipeline patch targets --
 
 _PATCH_PREFIX = "knowledge_hub.slack.handlers"
+_STAGES = "knowledge_hub.pipeline.stages"
+_STAGE_CALLS = frozenset(
+    {"extract_content", "check_duplicate", "process_content", "create_notion_page"}
+)
+
+
+def _target(name: str) -> str:
+    """Patch target of a pipeline dependency: the stage runner's or the handler's."""
+    return f"{_STAGES if name in _STAGE_CALLS else _PATCH_PREFIX}.{name}"
+
+
+@pytest.fixture(autouse=True)
+def pre_llm_duplicate():
+    """The duplicate check before Gemini finds nothing unless a test says otherwise."""
+    with patch(f"{_STAGES}.check_duplicate", AsyncMock(return_value=None)) as check:
+        yield check
 
 
 def _pipeline_patches():
@@ -86,10 +112,10 @@ async def test_single_url_success_pipeline():
 
     with (
         patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
-        patch(f"{_PATCH_PREFIX}.extract_content", mocks["extract_content"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
         patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
-        patch(f"{_PATCH_PREFIX}.process_content", mocks["process_content"]),
-        patch(f"{_PATCH_PREFIX}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
         patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
         patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
         patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
@@ -117,10 +143,10 @@ async def test_single_url_failed_extraction():
 
     with (
         patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
-        patch(f"{_PATCH_PREFIX}.extract_content", mocks["extract_content"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
         patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
-        patch(f"{_PATCH_PREFIX}.process_content", mocks["process_content"]),
-        patch(f"{_PATCH_PREFIX}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
         patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
         patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
         patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
@@ -135,6 +161,50 @@ async def test_single_url_failed_extraction():
     mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "x")
 
 
+async def test_unresolvable_urls_count_as_failures():
+    """A message whose links all fail to resolve gets an X, not a checkmark."""
+    mocks = _pipeline_patches()
+    mocks["resolve_urls"] = AsyncMock(return_value=[])
+
+    with ExitStack() as stack:
+        for name, mock in mocks.items():
+            stack.enter_context(patch(_target(name), mock))
+        await process_message_urls(CHANNEL, TS, USER, TEXT, ["https://t.co/gone"], None)
+
+    mocks["extract_content"].assert_not_called()
+    mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "x")
+
+
+async def test_batch_progress_counts_unresolved_urls(monkeypatch):
+    """Unresolved links are reported as failed in the batch summary and reaction."""
+    mocks = _pipeline_patches()
+    mocks["resolve_urls"] = AsyncMock(return_value=["https://example.com/ok"])
+    mocks["extract_content"].return_value = _make_content("https://example.com/ok")
+    mocks["process_content"].return_value = (MagicMock(), 0.001)
+    mocks["create_notion_page"].return_value = _make_page_result("https://example.com/ok")
+    mocks["notify_batch_progress"] = AsyncMock()
+    payload = {
+        "channel_id": CHANNEL,
+        "timestamp": TS,
+        "user_id": USER,
+        "text": TEXT,
+        "user_note": None,
+        "urls": ["https://example.com/ok", "https://t.co/gone"],
+        "remaining_urls": [],
+        "batch": 2,
+        "total_batches": 2,
+        "failed": 0,
+    }
+
+    with ExitStack() as stack:
+        for name, mock in mocks.items():
+            stack.enter_context(patch(_target(name), mock))
+        await run_process_message_job(payload)
+
+    mocks["notify_batch_progress"].assert_awaited_once_with(CHANNEL, TS, 2, 2, 1, 2)
+    mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "x")
+
+
 # -- Duplicate URL --
 
 
@@ -151,10 +221,10 @@ async def test_single_url_duplicate():
 
     with (
         patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
-        patch(f"{_PATCH_PREFIX}.extract_content", mocks["extract_content"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
         patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
-        patch(f"{_PATCH_PREFIX}.process_content", mocks["process_content"]),
-        patch(f"{_PATCH_PREFIX}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
         patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
         patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
         patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
@@ -168,6 +238,29 @@ async def test_single_url_duplicate():
     mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "white_check_mark")
 
 
+async def test_duplicate_found_before_gemini(pre_llm_duplicate):
+    """A page saved under another URL form is reported without a Gemini call."""
+    mocks = _pipeline_patches()
+    url = "https://example.com/story/amp?fbclid=abc"
+    content = _make_content(url)
+    content.canonical_url = "https://example.com/story"
+    dup = _make_duplicate_result(url)
+
+    mocks["extract_content"].return_value = content
+    pre_llm_duplicate.return_value = dup
+
+    with ExitStack() as stack:
+        for name, mock in mocks.items():
+            stack.enter_context(patch(_target(name), mock))
+        await process_message_urls(CHANNEL, TS, USER, TEXT, [url], None)
+
+    pre_llm_duplicate.assert_called_once_with(url, "https://example.com/story")
+    mocks["process_content"].assert_not_called()
+    mocks["create_notion_page"].assert_not_called()
+    mocks["notify_duplicate"].assert_called_once_with(CHANNEL, TS, url, dup)
+    mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "white_check_mark")
+
+
 # -- LLM exception --
 
 
@@ -182,10 +275,10 @@ async def test_single_url_llm_exception():
 
     with (
         patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
-        patch(f"{_PATCH_PREFIX}.extract_content", mocks["extract_content"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
         patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
-        patch(f"{_PATCH_PREFIX}.process_content", mocks["process_content"]),
-        patch(f"{_PATCH_PREFIX}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
         patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
         patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
         patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
@@ -212,10 +305,10 @@ async def test_single_url_notion_exception():
 
     with (
         patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
-        patch(f"{_PATCH_PREFIX}.extract_content", mocks["extract_content"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
         patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
-        patch(f"{_PATCH_PREFIX}.process_content", mocks["process_content"]),
-        patch(f"{_PATCH_PREFIX}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
         patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
         patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
         patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
@@ -241,10 +334,10 @@ async def test_multi_url_all_succeed():
 
     with (
         patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
-        patch(f"{_PATCH_PREFIX}.extract_content", mocks["extract_content"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
         patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
-        patch(f"{_PATCH_PREFIX}.process_content", mocks["process_content"]),
-        patch(f"{_PATCH_PREFIX}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
         patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
         patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
         patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
@@ -273,10 +366,10 @@ async def test_multi_url_partial_failure():
 
     with (
         patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
-        patch(f"{_PATCH_PREFIX}.extract_content", mocks["extract_content"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
         patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
-        patch(f"{_PATCH_PREFIX}.process_content", mocks["process_content"]),
-        patch(f"{_PATCH_PREFIX}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
         patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
         patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
         patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
@@ -289,6 +382,82 @@ async def test_multi_url_partial_failure():
     mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "x")
 
 
+# -- Concurrent execution --
+
+
+async def test_out_of_order_completion_still_reports_failure(monkeypatch):
+    """A slow success finishing after a fast failure still yields the X reaction."""
+    monkeypatch.setenv("URL_CONCURRENCY", "4")
+    mocks = _pipeline_patches()
+    urls = ["https://example.com/slow", "https://example.com/fast-fail"]
+
+    async def extract(url):
+        if url.endswith("slow"):
+            await asyncio.sleep(0.05)
+            return _make_content(url)
+        return _make_content(url, status=ExtractionStatus.FAILED)
+
+    mocks["extract_content"].side_effect = extract
+    mocks["process_content"].return_value = (MagicMock(), 0.001)
+    mocks["create_notion_page"].return_value = _make_page_result(urls[0])
+
+    with (
+        patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
+        patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
+        patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
+        patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
+        patch(f"{_PATCH_PREFIX}.add_reaction", mocks["add_reaction"]),
+    ):
+        await process_message_urls(CHANNEL, TS, USER, TEXT, urls, None)
+
+    mocks["notify_success"].assert_called_once()
+    mocks["notify_error"].assert_called_once()
+    mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "x")
+
+
+async def test_llm_stage_respects_concurrency_limit(monkeypatch):
+    """URLs fan out concurrently, but no more than LLM_CONCURRENCY Gemini calls overlap."""
+    monkeypatch.setenv("URL_CONCURRENCY", "5")
+    monkeypatch.setenv("LLM_CONCURRENCY", "2")
+    mocks = _pipeline_patches()
+    urls = [f"https://example.com/{n}" for n in range(5)]
+    running = 0
+    peak = 0
+
+    async def process(client, content):  # noqa: ARG001
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return (MagicMock(), 0.001)
+
+    mocks["extract_content"].side_effect = _make_content
+    mocks["process_content"].side_effect = process
+    mocks["create_notion_page"].side_effect = _make_page_result
+
+    with (
+        patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
+        patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
+        patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
+        patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
+        patch(f"{_PATCH_PREFIX}.add_reaction", mocks["add_reaction"]),
+    ):
+        await process_message_urls(CHANNEL, TS, USER, TEXT, urls, None)
+
+    assert peak == 2
+    assert mocks["notify_success"].call_count == 5
+    mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "white_check_mark")
+
+
 # -- user_note propagation --
 
 
@@ -313,10 +482,10 @@ async def test_user_note_passed_to_content():
 
     with (
         patch(f"{_PATCH_PREFIX}.resolve_urls", mocks["resolve_urls"]),
-        patch(f"{_PATCH_PREFIX}.extract_content", mocks["extract_content"]),
+        patch(f"{_STAGES}.extract_content", mocks["extract_content"]),
         patch(f"{_PATCH_PREFIX}.get_gemini_client", mocks["get_gemini_client"]),
-        patch(f"{_PATCH_PREFIX}.process_content", mocks["process_content"]),
-        patch(f"{_PATCH_PREFIX}.create_notion_page", mocks["create_notion_page"]),
+        patch(f"{_STAGES}.process_content", mocks["process_content"]),
+        patch(f"{_STAGES}.create_notion_page", mocks["create_notion_page"]),
         patch(f"{_PATCH_PREFIX}.notify_success", mocks["notify_success"]),
         patch(f"{_PATCH_PREFIX}.notify_error", mocks["notify_error"]),
         patch(f"{_PATCH_PREFIX}.notify_duplicate", mocks["notify_duplicate"]),
@@ -328,6 +497,109 @@ async def test_user_note_passed_to_content():
     assert captured_content.user_note == "context here"
 
 
+# -- Checkpoint resume --
+
+
+def _patched(mocks: dict):
+    """Patch every pipeline dependency with the given mocks."""
+    stack = ExitStack()
+    for name, mock in mocks.items():
+        stack.enter_context(patch(_target(name), mock))
+    return stack
+
+
+async def test_extracted_checkpoint_written_before_llm_and_cleared_after():
+    """Extraction output is checkpointed before Gemini runs, and dropped once the batch ends."""
+    mocks = _pipeline_patches()
+    url = "https://example.com/checkpointed"
+    key = checkpoint_key(CHANNEL, TS, url)
+    seen_stage = None
+
+    async def process(client, content):  # noqa: ARG001
+        nonlocal seen_stage
+        seen_stage = get_checkpoint_store().get(key).stage
+        return (MagicMock(), 0.001)
+
+    mocks["extract_content"].return_value = _make_content(url)
+    mocks["process_content"].side_effect = process
+    mocks["create_notion_page"].return_value = _make_page_result(url)
+
+    with _patched(mocks):
+        await process_message_urls(CHANNEL, TS, USER, TEXT, [url], None)
+
+    assert seen_stage == Stage.EXTRACTED
+    assert get_checkpoint_store().get(key) is None
+
+
+async def test_resume_from_analyzed_checkpoint_skips_extraction_and_llm():
+    """A retried URL whose Gemini call finished goes straight to Notion."""
+    mocks = _pipeline_patches()
+    url = "https://example.com/resumed"
+    page = MagicMock()
+    store = MagicMock()
+    store.get.return_value = Checkpoint(
+        Stage.ANALYZED, content=_make_content(url), page=page, cost_usd=0.004
+    )
+    mocks["get_checkpoint_store"] = MagicMock(return_value=store)
+    mocks["create_notion_page"].return_value = _make_page_result(url)
+
+    with _patched(mocks):
+        await process_message_urls(CHANNEL, TS, USER, TEXT, [url], None)
+
+    mocks["extract_content"].assert_not_called()
+    mocks["process_content"].assert_not_called()
+    mocks["create_notion_page"].assert_called_once_with(page)
+    assert mocks["notify_success"].call_args.kwargs["cost_usd"] == 0.004
+    mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "white_check_mark")
+
+
+async def test_resume_skips_url_already_saved():
+    """A URL saved before the interruption is not re-created or re-announced."""
+    mocks = _pipeline_patches()
+    url = "https://example.com/done"
+    store = MagicMock()
+    store.get.return_value = Checkpoint(Stage.SAVED)
+    mocks["get_checkpoint_store"] = MagicMock(return_value=store)
+
+    with _patched(mocks):
+        await process_message_urls(CHANNEL, TS, USER, TEXT, [url], None)
+
+    mocks["create_notion_page"].assert_not_called()
+    mocks["notify_success"].assert_not_called()
+    mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "white_check_mark")
+
+
+# -- In-flight coalescing --
+
+
+async def test_same_url_twice_in_one_message_runs_gemini_once():
+    """The second copy of a URL awaits the first and is reported as a duplicate."""
+    mocks = _pipeline_patches()
+    url = "https://example.com/article"
+    page_result = _make_page_result(url)
+
+    async def extract(u):
+        await asyncio.sleep(0.01)
+        return _make_content(u)
+
+    mocks["extract_content"].side_effect = extract
+    mocks["process_content"].return_value = (MagicMock(), 0.001)
+    mocks["create_notion_page"].return_value = page_result
+
+    with _patched(mocks):
+        await process_message_urls(
+            CHANNEL, TS, USER, TEXT, [url, f"{url}?utm_source=twitter"], None
+        )
+
+    mocks["process_content"].assert_called_once()
+    mocks["create_notion_page"].assert_called_once()
+    mocks["notify_success"].assert_called_once_with(CHANNEL, TS, page_result, cost_usd=0.001)
+    mocks["notify_duplicate"].assert_called_once()
+    duplicate = mocks["notify_duplicate"].call_args.args[3]
+    assert duplicate.page_url == page_result.page_url
+    mocks["add_reaction"].assert_called_once_with(CHANNEL, TS, "white_check_mark")
+
+
 # -- _classify_stage tests --
 
 
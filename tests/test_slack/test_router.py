@@ -9,6 +9,7 @@ from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
 
 from knowledge_hub.app import app
+from knowledge_hub.pipeline import get_job_queue
 
 TEST_SIGNING_SECRET = "test_signing_secret_1234"
 TEST_ALLOWED_USER = "U_ALLOWED"
@@ -19,6 +20,7 @@ def _mock_settings() -> MagicMock:
     settings = MagicMock()
     settings.slack_signing_secret = TEST_SIGNING_SECRET
     settings.allowed_user_id = TEST_ALLOWED_USER
+    settings.message_batch_size = 10
     return settings
 
 
@@ -85,6 +87,18 @@ def test_invalid_signature_returns_403(mock_get_settings: MagicMock):
     assert response.status_code == 403
 
 
+@patch("knowledge_hub.slack.verification.get_settings")
+def test_non_json_body_returns_400(mock_get_settings: MagicMock):
+    """A correctly signed body that is not JSON returns 400."""
+    mock_get_settings.return_value = _mock_settings()
+    body = b"not json"
+    timestamp, signature = _sign_request(body, TEST_SIGNING_SECRET)
+    headers = {"X-Slack-Request-Timestamp": timestamp, "X-Slack-Signature": signature}
+    with TestClient(app) as client:
+        response = client.post("/slack/events", content=body, headers=headers)
+    assert response.status_code == 400
+
+
 @patch("knowledge_hub.slack.handlers.process_message_urls")
 @patch("knowledge_hub.slack.handlers.get_settings")
 @patch("knowledge_hub.slack.verification.get_settings")
@@ -112,24 +126,71 @@ def test_valid_message_returns_200(
     assert response.json() == {"ok": True}
 
 
-@patch("knowledge_hub.slack.verification.get_settings")
-def test_retry_header_returns_200_immediately(mock_get_settings: MagicMock):
-    """Slack retry header causes immediate 200 without processing."""
-    mock_get_settings.return_value = _mock_settings()
-    payload = {
+def _message_payload(event_id: str = "Ev0001") -> dict:
+    """Build an event_callback payload for a valid message with one URL."""
+    return {
         "type": "event_callback",
+        "event_id": event_id,
         "event": {
             "type": "message",
             "user": TEST_ALLOWED_USER,
+            "channel": "C0AFQJHAVS6",
+            "ts": "1234567890.123456",
             "text": "<https://example.com>",
         },
     }
+
+
+@patch("knowledge_hub.slack.handlers.get_settings")
+@patch("knowledge_hub.slack.verification.get_settings")
+def test_retry_of_seen_event_is_not_processed(
+    mock_verify_settings: MagicMock,
+    mock_handler_settings: MagicMock,
+):
+    """A Slack retry of an already-received event is acknowledged without enqueueing."""
+    mock_verify_settings.return_value = _mock_settings()
+    mock_handler_settings.return_value = _mock_settings()
+    with TestClient(app) as client:
+        first = _make_signed_request(client, _message_payload())
+        retry = _make_signed_request(
+            client, _message_payload(), extra_headers={"X-Slack-Retry-Num": "1"}
+        )
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json() == {"ok": True}
+    assert get_job_queue().depth() == 1
+
+
+@patch("knowledge_hub.slack.handlers.get_settings")
+@patch("knowledge_hub.slack.verification.get_settings")
+def test_retry_of_unseen_event_is_processed(
+    mock_verify_settings: MagicMock,
+    mock_handler_settings: MagicMock,
+):
+    """A retry whose original delivery was lost is processed like a first delivery."""
+    mock_verify_settings.return_value = _mock_settings()
+    mock_handler_settings.return_value = _mock_settings()
     with TestClient(app) as client:
         response = _make_signed_request(
-            client, payload, extra_headers={"X-Slack-Retry-Num": "1"}
+            client, _message_payload(), extra_headers={"X-Slack-Retry-Num": "1"}
         )
     assert response.status_code == 200
-    assert response.json() == {"ok": True}
+    assert get_job_queue().depth() == 1
+
+
+@patch("knowledge_hub.slack.handlers.get_settings")
+@patch("knowledge_hub.slack.verification.get_settings")
+def test_same_message_under_new_event_id_is_not_processed(
+    mock_verify_settings: MagicMock,
+    mock_handler_settings: MagicMock,
+):
+    """The (channel, ts) key catches the same message delivered under a different event_id."""
+    mock_verify_settings.return_value = _mock_settings()
+    mock_handler_settings.return_value = _mock_settings()
+    with TestClient(app) as client:
+        _make_signed_request(client, _message_payload("Ev0001"))
+        _make_signed_request(client, _message_payload("Ev0002"))
+    assert get_job_queue().depth() == 1
 
 
 @patch("knowledge_hub.slack.handlers.get_settings")
@@ -165,7 +226,7 @@ def test_message_with_urls_triggers_background(
     mock_handler_settings: MagicMock,
     mock_process: MagicMock,
 ):
-    """Valid message with URLs triggers background dispatch."""
+    """Valid message with URLs is enqueued on the job queue."""
     mock_verify_settings.return_value = _mock_settings()
     mock_handler_settings.return_value = _mock_settings()
     payload = {
@@ -182,3 +243,7 @@ def test_message_with_urls_triggers_background(
         response = _make_signed_request(client, payload)
     assert response.status_code == 200
     assert response.json() == {"ok": True}
+
+    job = get_job_queue().lease(visibility_timeout=60)
+    assert job is not None
+    assert job.payload["urls"] == ["https://example.com"]
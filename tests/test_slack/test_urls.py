@@ -1,9 +1,10 @@
 """Tests for URL extraction, user note extraction, and redirect resolution."""
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import MagicMock, patch
 
 import httpx
 
+from knowledge_hub.slack.resolver import UrlResolver
 from knowledge_hub.slack.urls import extract_urls, extract_user_note, resolve_url, resolve_urls
 
 # -- extract_urls tests (INGEST-02) --
@@ -113,61 +114,109 @@ def test_user_note_whitespace_only_after_removal():
 # -- resolve_url tests (INGEST-08) --
 
 
+def _resolver(handler) -> UrlResolver:
+    """Resolver whose pooled client is served by `handler` instead of the network."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+    return UrlResolver(client)
+
+
 async def test_resolve_url_follows_redirect():
-    """resolve_url follows redirects and returns the final URL."""
-    mock_response = AsyncMock()
-    mock_response.url = httpx.URL("https://example.com/article")
+    """resolve_url follows a shortener's redirects and returns the final URL."""
 
-    mock_client = AsyncMock()
-    mock_client.get = AsyncMock(return_value=mock_response)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "t.co":
+            return httpx.Response(301, headers={"Location": "https://example.com/article"})
+        return httpx.Response(200, text="<html>article</html>")
 
-    with patch("knowledge_hub.slack.urls.httpx.AsyncClient", return_value=mock_client):
+    with patch("knowledge_hub.slack.urls.get_url_resolver", return_value=_resolver(handler)):
         result = await resolve_url("https://t.co/abc")
 
     assert result == "https://example.com/article"
 
 
+async def test_resolve_url_leaves_slack_uploads_alone():
+    """Slack file URLs are not fetched anonymously (that would hit the sign-in page)."""
+    url = "https://files.slack.com/files-pri/T1-F1/report.pdf"
+    handler = MagicMock(side_effect=AssertionError("no request expected"))
+    with patch("knowledge_hub.slack.urls.get_url_resolver", return_value=_resolver(handler)):
+        assert await resolve_url(url) == url
+
+
+async def test_resolve_url_skips_hosts_that_are_not_shorteners():
+    """Ordinary article URLs are returned without any network request."""
+    handler = MagicMock(side_effect=AssertionError("no request expected"))
+    resolver = _resolver(handler)
+    assert await resolver.resolve("https://www.nytimes.com/2026/01/01/tech/a.html") == (
+        "https://www.nytimes.com/2026/01/01/tech/a.html"
+    )
+    assert await resolver.resolve("https://arxiv.org/abs/2401.00001") == (
+        "https://arxiv.org/abs/2401.00001"
+    )
+
+
+async def test_resolve_url_caches_results():
+    """A shortener link is fetched once and then served from the cache."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.host)
+        if request.url.host == "bit.ly":
+            return httpx.Response(302, headers={"Location": "https://example.com/a"})
+        return httpx.Response(200)
+
+    resolver = _resolver(handler)
+    assert await resolver.resolve("https://bit.ly/x") == "https://example.com/a"
+    assert await resolver.resolve("https://bit.ly/x") == "https://example.com/a"
+    assert requests == ["bit.ly", "example.com"]
+
+
+async def test_resolve_url_does_not_read_final_body():
+    """The destination body is not downloaded; resolution stops at the headers."""
+
+    async def body():
+        raise AssertionError("body must not be read")
+        yield b""  # pragma: no cover
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "t.co":
+            return httpx.Response(301, headers={"Location": "https://example.com/big"})
+        return httpx.Response(200, content=body())
+
+    assert await _resolver(handler).resolve("https://t.co/abc") == "https://example.com/big"
+
+
+async def test_resolve_url_extra_hosts_from_settings():
+    """Operators can add redirector hosts without a code change."""
+    resolver = UrlResolver(MagicMock(), extra_hosts=frozenset({"go.example.org"}))
+    assert resolver.needs_resolution("https://go.example.org/x") is True
+    assert resolver.needs_resolution("https://example.org/x") is False
+
+
 async def test_resolve_url_timeout_returns_none():
     """resolve_url returns None on timeout."""
-    mock_client = AsyncMock()
-    mock_client.get = AsyncMock(side_effect=httpx.TimeoutException("timeout"))
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
 
-    with patch("knowledge_hub.slack.urls.httpx.AsyncClient", return_value=mock_client):
-        result = await resolve_url("https://t.co/abc")
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.TimeoutException("timeout", request=request)
 
-    assert result is None
+    assert await _resolver(handler).resolve("https://t.co/abc") is None
 
 
 async def test_resolve_url_too_many_redirects_returns_none():
     """resolve_url returns None on too many redirects."""
-    mock_client = AsyncMock()
-    mock_client.get = AsyncMock(side_effect=httpx.TooManyRedirects("too many"))
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
 
-    with patch("knowledge_hub.slack.urls.httpx.AsyncClient", return_value=mock_client):
-        result = await resolve_url("https://t.co/abc")
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(301, headers={"Location": "https://t.co/loop"})
 
-    assert result is None
+    assert await _resolver(handler).resolve("https://t.co/abc") is None
 
 
 async def test_resolve_url_http_error_returns_none():
     """resolve_url returns None on HTTP errors."""
-    mock_client = AsyncMock()
-    mock_client.get = AsyncMock(
-        side_effect=httpx.HTTPError("connection failed")
-    )
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
 
-    with patch("knowledge_hub.slack.urls.httpx.AsyncClient", return_value=mock_client):
-        result = await resolve_url("https://t.co/abc")
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection failed", request=request)
 
-    assert result is None
+    assert await _resolver(handler).resolve("https://t.co/abc") is None
 
 
 # -- resolve_urls tests (INGEST-08) --
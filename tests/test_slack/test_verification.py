@@ -0,0 +1,74 @@
+"""Tests for Slack signature verification on raw body bytes."""
+
+import hashlib
+import hmac
+import time
+
+from knowledge_hub.slack.verification import SlackSignatureVerifier, get_verifier, loads_json
+
+SECRET = "test_signing_secret_1234"
+
+
+def _signature(body: bytes, timestamp: str, secret: str = SECRET) -> str:
+    basestring = f"v0:{timestamp}:".encode() + body
+    return "v0=" + hmac.new(secret.encode(), basestring, hashlib.sha256).hexdigest()
+
+
+def test_valid_signature_accepted():
+    """A correctly signed body with a fresh timestamp verifies."""
+    body = b'{"type":"event_callback"}'
+    timestamp = str(int(time.time()))
+    verifier = SlackSignatureVerifier(SECRET)
+    assert verifier.is_valid(body, timestamp, _signature(body, timestamp)) is True
+
+
+def test_verifier_reusable_across_requests():
+    """The cached keyed HMAC state is not mutated by a verification."""
+    verifier = SlackSignatureVerifier(SECRET)
+    timestamp = str(int(time.time()))
+    for body in (b"one", b"two", b"three"):
+        assert verifier.is_valid(body, timestamp, _signature(body, timestamp)) is True
+
+
+def test_tampered_body_rejected():
+    """Any change to the signed bytes fails verification."""
+    timestamp = str(int(time.time()))
+    signature = _signature(b'{"a":1}', timestamp)
+    assert SlackSignatureVerifier(SECRET).is_valid(b'{"a":2}', timestamp, signature) is False
+
+
+def test_wrong_secret_rejected():
+    """A signature made with another secret fails verification."""
+    body = b"{}"
+    timestamp = str(int(time.time()))
+    signature = _signature(body, timestamp, secret="other")
+    assert SlackSignatureVerifier(SECRET).is_valid(body, timestamp, signature) is False
+
+
+def test_stale_timestamp_rejected():
+    """Timestamps older than five minutes are rejected as replays."""
+    body = b"{}"
+    timestamp = str(int(time.time()) - 600)
+    signature = _signature(body, timestamp)
+    assert SlackSignatureVerifier(SECRET).is_valid(body, timestamp, signature) is False
+
+
+def test_missing_or_malformed_headers_rejected():
+    """Empty or non-numeric timestamps never verify."""
+    verifier = SlackSignatureVerifier(SECRET)
+    assert verifier.is_valid(b"{}", "", "v0=abc") is False
+    assert verifier.is_valid(b"{}", "not-a-number", "v0=abc") is False
+
+
+def test_get_verifier_cached_per_secret():
+    """The same secret returns the same verifier; a different secret does not."""
+    assert get_verifier(SECRET) is get_verifier(SECRET)
+    assert get_verifier(SECRET) is not get_verifier("another-secret")
+
+
+def test_loads_json_decodes_bytes():
+    """loads_json decodes raw bytes without an intermediate str."""
+    assert loads_json(b'{"type":"url_verification","challenge":"x"}') == {
+        "type": "url_verification",
+        "challenge": "x",
+    }